@@ -20,6 +20,7 @@ from app.services.unified_ai_service import unified_ai_service
 from app.services.hybrid_transcription import (
     hybrid_transcription_service,
     TranscriptionStrategy,
+    transcript_progress_listener,
 )
 
 logger = logging.getLogger(__name__)
@@ -55,6 +56,7 @@ class TranscriptionRequest(BaseModel):
     strategy: Optional[TranscriptionStrategy] = TranscriptionStrategy.AUTO
     language: str = "en"
     priority: Literal["speed", "balanced", "accuracy"] = "balanced"
+    task_id: Optional[str] = Field(None, description="Progress task to stream partial transcripts to")
 
 
 # Endpoints
@@ -197,7 +199,11 @@ async def transcribe_audio(
         result = await hybrid_transcription_service.transcribe_audio(
             audio_path=audio_path,
             strategy=request.strategy,
-            language=request.language
+            language=request.language,
+            on_segments=(
+                transcript_progress_listener(request.task_id, user_id=user_id)
+                if request.task_id else None
+            )
         )
         
         if not result:
@@ -7,7 +7,7 @@ from typing import Dict, List, Optional
 from uuid import uuid4, UUID
 
 import asyncpg
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, HttpUrl
 
 from app.api.instagram_handler import process_instagram_bookmark
@@ -25,11 +25,9 @@ from app.monitoring.metrics import (
 )
 from app.services.embedding_service import embedding_service
 from app.services.llm_processor import LLMProcessor
-from app.services.preview_service import preview_service
-from app.services.repository_analyzer import repository_analyzer
 from app.services.video_processor import VideoProcessor
 from app.services.websocket_manager import websocket_manager
-from app.services.auto_processing_service import auto_processing_service
+from app.services.capture_pipeline import enqueue, plan_stages
 from app.utils.media_detector import MediaDetector
 from app.utils.url_classifier import URLClassifier
 from app.utils.classification_validator import classify_url_with_validation
@@ -121,8 +119,12 @@ from app.services.cache import CacheKeys, invalidate_cache
 
 @router.post("/capture", status_code=status.HTTP_201_CREATED)
 @capture_throttle_limiter
-async def capture_item(request: Request, capture_request: CaptureRequest, background_tasks: BackgroundTasks, user_id: UUID = Depends(require_user_id)):
-    """Capture a new item (web page, note, file, etc.)."""
+async def capture_item(request: Request, capture_request: CaptureRequest, user_id: UUID = Depends(require_user_id)):
+    """Capture a new item (web page, note, file, etc.).
+
+    Validates, writes the item and enqueues its processing stages; scraping, previews,
+    video metadata and AI enrichment run in the capture pipeline.
+    """
     logger.info(f"Starting capture for URL: {capture_request.url}")
     
     # Use the same database connection method as timeline API
@@ -149,425 +151,234 @@ async def capture_item(request: Request, capture_request: CaptureRequest, backgr
                           f"Valid types: {', '.join(sorted(VALID_CONTENT_TYPES))}")
     
     item_id = uuid4()
-    item_type = 'article'
     
-    async with pool.acquire() as db_connection:
-        logger.info(f"🔍 DB CONNECTION TYPE: {type(db_connection)}")
-        logger.info(f"🔍 DB CONNECTION INFO: {db_connection.get_server_version() if hasattr(db_connection, 'get_server_version') else 'No version method'}")
-        logger.info(f"🔍 CONNECTION DSN: {getattr(db_connection, '_addr', 'Unknown')}")
-        params = getattr(db_connection, '_params', None)
-        logger.info(f"🔍 CONNECTION PARAMS: {params}")
-        if params:
-            logger.info(f"🔍 CONNECTION DB: {getattr(params, 'database', 'Unknown')}")
-            logger.info(f"🔍 CONNECTION USER: {getattr(params, 'user', 'Unknown')}")
-        else:
-            logger.info("🔍 No connection params available")
+    try:
+        # Classification is local (URL patterns only); network-bound work runs in the capture pipeline
+        # Determine item type - prioritize user content_type choice
+        media_info = None
+        classification_info = None
+        item_type = 'article'  # Default fallback
         
-        try:
-            # Check for duplicate URL if URL is provided
-            if capture_request.url:
-                existing_item = await db_connection.fetchrow("""
-                    SELECT id, title, created_at, status
-                    FROM items
-                    WHERE url = $1 AND user_id = $2
-                    LIMIT 1
-                """, str(capture_request.url), str(user_id))
-                
-                if existing_item:
-                    raise InvalidInput(
-                        f"This URL already exists in your knowledge base. "
-                        f"Item: '{existing_item['title']}' (created {existing_item['created_at'].strftime('%Y-%m-%d')})"
-                    )
+        # Rule 1: Auto-detect GitHub URLs with specific types (only in auto mode)
+        if (capture_request.url and 'github.com' in str(capture_request.url).lower() and 
+            (not capture_request.content_type or capture_request.content_type == 'auto')):
             
-            # Determine item type - prioritize user content_type choice
-            media_info = None
-            item_type = 'article'  # Default fallback
+            # Get detailed GitHub classification
+            url_classification = URLClassifier.classify_url(str(capture_request.url))
+            github_type = url_classification.get('content_type', 'development')
             
-            # Rule 1: Auto-detect GitHub URLs with specific types (only in auto mode)
-            if (capture_request.url and 'github.com' in str(capture_request.url).lower() and 
-                (not capture_request.content_type or capture_request.content_type == 'auto')):
-                
-                # Get detailed GitHub classification
-                url_classification = URLClassifier.classify_url(str(capture_request.url))
-                github_type = url_classification.get('content_type', 'development')
-                
-                # Map to item types
-                if github_type == 'github_document':
-                    item_type = 'github_document'
-                elif github_type == 'github_repo':
-                    item_type = 'github_repo'
-                else:
-                    item_type = 'development'  # Fallback
-                
-                capture_request.content_type = github_type
-                logger.info(f"🐙 GitHub URL auto-detected: {github_type} → type: {item_type}")
-                
-                # Auto-fill development fields for GitHub
-                if not capture_request.programming_language and url_classification.get('programming_language'):
-                    capture_request.programming_language = url_classification['programming_language']
-                if not capture_request.project_category and url_classification.get('project_category'):
-                    capture_request.project_category = url_classification['project_category']
-                    
-            # Rule 2: If user explicitly chose content_type, respect it (except 'auto' and GitHub override)
-            elif capture_request.content_type and capture_request.content_type != 'auto':
-                # Map content_type to item_type
-                if capture_request.content_type == 'video':
-                    item_type = 'video'
-                elif capture_request.content_type == 'document':
-                    item_type = 'document'
-                elif capture_request.content_type == 'image':
-                    item_type = 'image'
-                elif capture_request.content_type == 'note':
-                    item_type = 'note'
-                elif capture_request.content_type == 'tutorial':
-                    item_type = 'tutorial'
-                elif capture_request.content_type == 'article':
-                    item_type = 'article'
-                elif capture_request.content_type == 'link':
-                    item_type = 'link'
-                elif capture_request.content_type == 'github_repo':
-                    item_type = 'github_repo'
-                elif capture_request.content_type == 'github_document':
-                    item_type = 'github_document'
-                elif capture_request.content_type == 'recipe':
-                    item_type = 'recipe'
-                else:
-                    # For other content types, use the content_type as item_type
-                    item_type = capture_request.content_type
-                    
-                logger.info(f"🎯 Using user-selected content_type: {capture_request.content_type} → type: {item_type}")
+            # Map to item types
+            if github_type == 'github_document':
+                item_type = 'github_document'
+            elif github_type == 'github_repo':
+                item_type = 'github_repo'
+            else:
+                item_type = 'development'  # Fallback
             
-            # Rule 3: Auto-detection only when content_type='auto' or not specified
-            elif capture_request.url and (not capture_request.content_type or capture_request.content_type == 'auto'):
-                # Use validated classification pipeline
-                classified_type, classification_metadata = classify_url_with_validation(
-                    str(capture_request.url), 
-                    capture_request.content_type
-                )
-                
-                item_type = classified_type
-                confidence = classification_metadata.get('classification_confidence', 0.5)
-                method = classification_metadata.get('classification_method', 'unknown')
-                platform = classification_metadata.get('platform', 'unknown')
-                
-                logger.info(f"🔍 Validated classification: {platform} → type: {item_type} ({confidence:.0%} via {method})")
-                
-                # Store classification metadata for debugging
-                metadata.update({
-                    'url_classification': classification_metadata
-                })
-                
-                # Apply type-specific logic
-                if classified_type == 'development':
-                    # Auto-fill development fields from classification
-                    if not capture_request.programming_language:
-                        capture_request.programming_language = classification_metadata.get('programming_language')
-                    
-                    if not capture_request.project_category:
-                        capture_request.project_category = classification_metadata.get('project_category')
-                    
-                    if not capture_request.difficulty_level:
-                        capture_request.difficulty_level = classification_metadata.get('difficulty_level')
-                    
-                    # Set career-related flag
-                    capture_request.is_career_related = True
-                    
-                    # Check if it's a repository
-                    if _is_repository_url(str(capture_request.url)):
-                        item_type = 'repository'
-                
-                # Final fallback to media detection if needed
-                if item_type == 'article' and confidence < 0.5:
-                    media_info = MediaDetector.detect_media_type(str(capture_request.url))
-                    if media_info['type'] in ['video', 'image']:
-                        item_type = media_info['type']
-                        logger.info(f"🔄 Fallback to media detection: {media_info['type']}")
+            capture_request.content_type = github_type
+            logger.info(f"🐙 GitHub URL auto-detected: {github_type} → type: {item_type}")
             
-            # Rule 4: Special case - if no summarization requested for URL, treat as simple link
-            # Exception: Don't convert development content or videos to link (they need rich preview)
-            if (capture_request.url and not capture_request.enable_summarization and 
-                capture_request.content_type not in ['video', 'document', 'image', 'development'] and
-                item_type not in ['development', 'video']):
+            # Auto-fill development fields for GitHub
+            if not capture_request.programming_language and url_classification.get('programming_language'):
+                capture_request.programming_language = url_classification['programming_language']
+            if not capture_request.project_category and url_classification.get('project_category'):
+                capture_request.project_category = url_classification['project_category']
+                
+        # Rule 2: If user explicitly chose content_type, respect it (except 'auto' and GitHub override)
+        elif capture_request.content_type and capture_request.content_type != 'auto':
+            # Map content_type to item_type
+            if capture_request.content_type == 'video':
+                item_type = 'video'
+            elif capture_request.content_type == 'document':
+                item_type = 'document'
+            elif capture_request.content_type == 'image':
+                item_type = 'image'
+            elif capture_request.content_type == 'note':
+                item_type = 'note'
+            elif capture_request.content_type == 'tutorial':
+                item_type = 'tutorial'
+            elif capture_request.content_type == 'article':
+                item_type = 'article'
+            elif capture_request.content_type == 'link':
                 item_type = 'link'
-                logger.info("🔗 No summarization requested for URL → type: link")
-            
-            # Handle video processing if item is determined to be video
-            if item_type == 'video' and capture_request.url:
-                if not media_info:
-                    media_info = MediaDetector.detect_media_type(str(capture_request.url))
-                    
-                video_processor = VideoProcessor()
-                video_info = await video_processor.get_video_info(str(capture_request.url))
+            elif capture_request.content_type == 'github_repo':
+                item_type = 'github_repo'
+            elif capture_request.content_type == 'github_document':
+                item_type = 'github_document'
+            elif capture_request.content_type == 'recipe':
+                item_type = 'recipe'
+            else:
+                # For other content types, use the content_type as item_type
+                item_type = capture_request.content_type
                 
-                # Skip validation for Instagram and YouTube to avoid downloading
-                if media_info.get('platform') not in ['instagram', 'youtube']:
-                    # Perform video validation before inserting initial record
-                    try:
-                        await video_processor.validate_video_url(str(capture_request.url))
-                    except ValueError as e:
-                        VIDEO_CAPTURE_REQUESTS.labels(status='validation_failed').inc()
-                        raise InvalidInput(f"Video validation failed: {e}")
-        
-            # Determine platform based on item type and URL
-            platform = None
-            if item_type in ['github_repo', 'github_document']:
-                platform = 'github'
-            elif media_info and media_info.get('platform'):
-                platform = media_info['platform']
-            elif capture_request.url and 'youtube.com' in str(capture_request.url).lower():
-                platform = 'youtube'
-            elif capture_request.url and 'vimeo.com' in str(capture_request.url).lower():
-                platform = 'vimeo'
-        
-            # Insert initial item record with metadata for capture type
-            metadata = {
-                "capture_type": capture_request.type if hasattr(capture_request, 'type') else 'page',
-                "media_info": media_info,
-                "type": item_type,  # Store item type in metadata
-                "content_type": capture_request.content_type,  # Store user-selected content type
-                "platform": platform  # Store platform in metadata as well
-            }
-            
-            # Generate rich preview for ALL GitHub URLs (regardless of item type)
-            if capture_request.url and 'github.com' in str(capture_request.url).lower():
-                try:
-                    logger.info(f"🔍 Generating GitHub preview for URL: {capture_request.url}")
-                    preview_data = await preview_service.generate_preview(str(capture_request.url), 'development')
-                    if preview_data and preview_data.get('type') != 'error':
-                        metadata['rich_preview'] = preview_data
-                        logger.info(f"🟢 GitHub preview generated successfully for {capture_request.url}")
-                    else:
-                        logger.warning(f"🟡 GitHub preview generation failed or returned error for {capture_request.url}")
-                except Exception as e:
-                    logger.error(f"🔴 Error generating GitHub preview: {e}")
-                    # Don't fail the entire capture if preview generation fails
-                    pass
-            # Also generate rich preview for development content (non-GitHub)
-            elif (item_type == 'development' or capture_request.content_type == 'development') and capture_request.url:
-                try:
-                    logger.info(f"🔍 Generating rich preview for development content: {capture_request.url}")
-                    preview_data = await preview_service.generate_preview(str(capture_request.url), 'development')
-                    if preview_data and preview_data.get('type') != 'error':
-                        metadata['rich_preview'] = preview_data
-                        logger.info(f"🟢 Rich preview generated successfully for {capture_request.url}")
-                    else:
-                        logger.warning(f"🟡 Rich preview generation failed or returned error for {capture_request.url}")
-                except Exception as e:
-                    logger.error(f"🔴 Error generating rich preview: {e}")
-                    # Don't fail the entire capture if preview generation fails
-                    pass
-            logger.info(f"Creating item {item_id} with type {item_type}, URL: {capture_request.url}")
-            
-            # For content-only captures, store content in raw_content field
-            # Handle both content and highlight fields (highlight is legacy field name)
-            initial_content = capture_request.content if capture_request.content else capture_request.highlight if hasattr(capture_request, 'highlight') else None
-            
-            # Repository-specific processing
-            repository_metadata = None
-            if item_type == 'repository' and capture_request.url:
-                try:
-                    logger.info(f"🔍 Analyzing repository: {capture_request.url}")
-                    repo_analysis = await repository_analyzer.analyze_repository(str(capture_request.url))
-                    repository_metadata = repo_analysis.dict()
-                    
-                    # Auto-fill title if not provided
-                    if not capture_request.title:
-                        capture_request.title = f"{repo_analysis.owner}/{repo_analysis.repo_name}"
-                    
-                    # Auto-fill content if not provided
-                    if not initial_content and repo_analysis.description:
-                        initial_content = repo_analysis.description
-                    
-                    # Auto-fill development fields from AI analysis
-                    if repo_analysis.ai_analysis:
-                        if not capture_request.programming_language and repo_analysis.language:
-                            capture_request.programming_language = repo_analysis.language.lower()
-                        
-                        if not capture_request.project_category and repo_analysis.category:
-                            capture_request.project_category = repo_analysis.category
-                        
-                        if not capture_request.difficulty_level and repo_analysis.difficulty:
-                            capture_request.difficulty_level = repo_analysis.difficulty
-                    
-                    logger.info(f"🔍 Repository analysis completed: {repo_analysis.repo_name}")
-                    logger.info(f"🔍 Tech stack: {repo_analysis.tech_stack}")
-                    logger.info(f"🔍 Category: {repo_analysis.category}")
-                    
-                except Exception as e:
-                    logger.error(f"🔍 Repository analysis failed: {e}")
-                    # Continue with basic repository metadata
-                    repository_metadata = {
-                        "repo_url": str(capture_request.url),
-                        "analysis_error": str(e),
-                        "needs_manual_categorization": True
-                    }
+            logger.info(f"🎯 Using user-selected content_type: {capture_request.content_type} → type: {item_type}")
         
-            # Add detailed debugging for the INSERT statement
-            logger.info("🔍 ABOUT TO EXECUTE INSERT:")
-            logger.info(f"🔍 - item_id: {item_id}")
-            logger.info(f"🔍 - url: {capture_request.url}")
-            logger.info(f"🔍 - title: {capture_request.title}")
-            logger.info(f"🔍 - type: {item_type}")
-            logger.info(f"🔍 - content_type: {capture_request.content_type}")
-            logger.info(f"🔍 - enable_summarization: {capture_request.enable_summarization}")
-            logger.info(f"🔍 - metadata: {json.dumps(metadata)}")
-            
-            # Test the database connection first
-            try:
-                test_result = await db_connection.fetchval("SELECT 1")
-                logger.info(f"🔍 DB CONNECTION TEST: {test_result}")
-            except Exception as e:
-                logger.error(f"🔍 DB CONNECTION TEST FAILED: {e}")
-            
-            # Test if the table exists and columns exist
-            try:
-                columns_check = await db_connection.fetch("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'items' 
-                    AND column_name IN ('content_type', 'enable_summarization')
-                    ORDER BY column_name
-                """)
-                logger.info(f"🔍 COLUMN CHECK RESULT: {[row['column_name'] for row in columns_check]}")
-            except Exception as e:
-                logger.error(f"🔍 COLUMN CHECK FAILED: {e}")
-            
-            # Now try the actual INSERT
-            sql_query = """
-                INSERT INTO public.items (
-                    id, url, title, raw_content, status, type, content_type, enable_summarization, metadata,
-                    programming_language, project_category, difficulty_level, is_career_related, platform,
-                    repository_metadata, user_id
-                )
-                VALUES ($1, $2, $3, $4, 'pending', $5, $6, $7, $8::jsonb, $9, $10, $11, $12, $13, $14::jsonb, $15)
-            """
-            params = (
-                item_id, 
-                str(capture_request.url) if capture_request.url else None, 
-                capture_request.title or 'Untitled', 
-                initial_content, 
-                item_type, 
-                capture_request.content_type, 
-                capture_request.enable_summarization, 
-                json.dumps(metadata),
-                capture_request.programming_language,
-                capture_request.project_category,
-                capture_request.difficulty_level,
-                capture_request.is_career_related,
-                platform,
-                json.dumps(repository_metadata) if repository_metadata else None,
-                str(user_id)  # Convert UUID to string
+        # Rule 3: Auto-detection only when content_type='auto' or not specified
+        elif capture_request.url and (not capture_request.content_type or capture_request.content_type == 'auto'):
+            # Use validated classification pipeline
+            classified_type, classification_metadata = classify_url_with_validation(
+                str(capture_request.url), 
+                capture_request.content_type
             )
             
-            logger.info(f"🔍 EXACT SQL QUERY: {sql_query}")
-            logger.info(f"🔍 EXACT PARAMS: {params}")
+            item_type = classified_type
+            confidence = classification_metadata.get('classification_confidence', 0.5)
+            method = classification_metadata.get('classification_method', 'unknown')
+            platform = classification_metadata.get('platform', 'unknown')
             
-            # Step 3: Log search_path and current_schema
-            try:
-                search_path_row = await db_connection.fetchrow("SHOW search_path")
-                logger.warning(f"🔍 search_path = {search_path_row['search_path']}")
-                schema_row = await db_connection.fetchrow("SELECT current_schema()")
-                logger.warning(f"🔍 current_schema = {schema_row['current_schema']}")
-            except Exception as e:
-                logger.error(f"🔍 SCHEMA CHECK FAILED: {e}")
+            logger.info(f"🔍 Validated classification: {platform} → type: {item_type} ({confidence:.0%} via {method})")
             
-            # Step 4: Enhanced SQL execution with detailed logging
-            try:
-                await db_connection.execute(sql_query, *params)
-                logger.info(f"🔍 INSERT SUCCESSFUL for item_id: {item_id}")
-            except Exception as e:
-                logger.error("🚨 FAILED SQL: %s — ARGS: %r", sql_query, params)
-                logger.error(f"🔍 INSERT FAILED: {e}")
-                logger.error(f"🔍 INSERT ERROR TYPE: {type(e)}")
-                logger.error(f"🔍 INSERT ERROR DETAILS: {str(e)}")
-                raise
+            # Store classification metadata for debugging
+            classification_info = classification_metadata
             
-            logger.info(f"Successfully inserted item {item_id} into database")
+            # Apply type-specific logic
+            if classified_type == 'development':
+                # Auto-fill development fields from classification
+                if not capture_request.programming_language:
+                    capture_request.programming_language = classification_metadata.get('programming_language')
+                
+                if not capture_request.project_category:
+                    capture_request.project_category = classification_metadata.get('project_category')
+                
+                if not capture_request.difficulty_level:
+                    capture_request.difficulty_level = classification_metadata.get('difficulty_level')
+                
+                # Set career-related flag
+                capture_request.is_career_related = True
+                
+                # Check if it's a repository
+                if _is_repository_url(str(capture_request.url)):
+                    item_type = 'repository'
             
-            # Process tags if provided
-            if capture_request.tags:
-                for tag_name in capture_request.tags:
-                    # Get or create tag for this user
-                    # First check if tag exists
-                    tag_id = await db_connection.fetchval("""
-                        SELECT id FROM tags WHERE name = $1
-                    """, tag_name.lower())
-                    
-                    if not tag_id:
-                        # Create new tag with user_id
-                        tag_id = await db_connection.fetchval("""
-                            INSERT INTO tags (name, user_id) VALUES ($1, $2)
-                            RETURNING id
-                        """, tag_name.lower(), user_id)
+            # Final fallback to media detection if needed
+            if item_type == 'article' and confidence < 0.5:
+                media_info = MediaDetector.detect_media_type(str(capture_request.url))
+                if media_info['type'] in ['video', 'image']:
+                    item_type = media_info['type']
+                    logger.info(f"🔄 Fallback to media detection: {media_info['type']}")
+        
+        # Rule 4: Special case - if no summarization requested for URL, treat as simple link
+        # Exception: Don't convert development content or videos to link (they need rich preview)
+        if (capture_request.url and not capture_request.enable_summarization and 
+            capture_request.content_type not in ['video', 'document', 'image', 'development'] and
+            item_type not in ['development', 'video']):
+            item_type = 'link'
+            logger.info("🔗 No summarization requested for URL → type: link")
+        
+        if item_type == 'video' and capture_request.url and not media_info:
+            media_info = MediaDetector.detect_media_type(str(capture_request.url))
+        
+        # Determine platform based on item type and URL
+        platform = None
+        if item_type in ['github_repo', 'github_document']:
+            platform = 'github'
+        elif media_info and media_info.get('platform'):
+            platform = media_info['platform']
+        elif capture_request.url and 'youtube.com' in str(capture_request.url).lower():
+            platform = 'youtube'
+        elif capture_request.url and 'vimeo.com' in str(capture_request.url).lower():
+            platform = 'vimeo'
+        
+        # Insert initial item record with metadata for capture type
+        metadata = {
+            "capture_type": capture_request.type if hasattr(capture_request, 'type') else 'page',
+            "media_info": media_info,
+            "type": item_type,  # Store item type in metadata
+            "content_type": capture_request.content_type,  # Store user-selected content type
+            "platform": platform  # Store platform in metadata as well
+        }
+        if classification_info:
+            metadata['url_classification'] = classification_info
+        
+        # For content-only captures, store content in raw_content field
+        # Handle both content and highlight fields (highlight is legacy field name)
+        initial_content = capture_request.content if capture_request.content else capture_request.highlight if hasattr(capture_request, 'highlight') else None
+        url = str(capture_request.url) if capture_request.url else None
+        stages = plan_stages(item_type, url, capture_request.content_type)
+        
+        logger.info(f"Creating item {item_id} with type {item_type}, URL: {url}, stages: {stages}")
+        
+        async with pool.acquire() as db_connection:
+            async with db_connection.transaction():
+                # Check for duplicate URL if URL is provided
+                if url:
+                    existing_item = await db_connection.fetchrow("""
+                        SELECT id, title, created_at, status
+                        FROM items
+                        WHERE url = $1 AND user_id = $2
+                        LIMIT 1
+                    """, url, str(user_id))
                     
-                    # Link tag to item
+                    if existing_item:
+                        raise InvalidInput(
+                            f"This URL already exists in your knowledge base. "
+                            f"Item: '{existing_item['title']}' (created {existing_item['created_at'].strftime('%Y-%m-%d')})"
+                        )
+                
+                await db_connection.execute("""
+                    INSERT INTO public.items (
+                        id, url, title, raw_content, status, type, content_type, enable_summarization, metadata,
+                        programming_language, project_category, difficulty_level, is_career_related, platform,
+                        repository_metadata, user_id
+                    )
+                    VALUES ($1, $2, $3, $4, 'pending', $5, $6, $7, $8::jsonb, $9, $10, $11, $12, $13, NULL, $14)
+                """,
+                    item_id,
+                    url,
+                    capture_request.title or 'Untitled',
+                    initial_content,
+                    item_type,
+                    capture_request.content_type,
+                    capture_request.enable_summarization,
+                    json.dumps(metadata),
+                    capture_request.programming_language,
+                    capture_request.project_category,
+                    capture_request.difficulty_level,
+                    capture_request.is_career_related,
+                    platform,
+                    str(user_id)  # Convert UUID to string
+                )
+                
+                # Get or create tags and link them in one statement
+                if capture_request.tags:
                     await db_connection.execute("""
-                        INSERT INTO item_tags (item_id, tag_id) VALUES ($1, $2)
+                        WITH names AS (
+                            SELECT DISTINCT lower(name) AS name FROM unnest($2::text[]) AS name
+                        ),
+                        created AS (
+                            INSERT INTO tags (name, user_id)
+                            SELECT name, $3 FROM names
+                            ON CONFLICT (name) DO NOTHING
+                            RETURNING id
+                        )
+                        INSERT INTO item_tags (item_id, tag_id)
+                        SELECT $1, id FROM created
+                        UNION
+                        SELECT $1, t.id FROM tags t JOIN names n ON t.name = n.name
                         ON CONFLICT DO NOTHING
-                    """, item_id, tag_id)
+                    """, item_id, capture_request.tags, user_id)
+                
+                # Durable hand-off: the job commits with the item or not at all
+                await enqueue(db_connection, item_id, stages)
         
-            if item_type == 'video':
-                # Special handling for Instagram
-                if capture_request.url and 'instagram.com' in str(capture_request.url).lower():
-                    background_tasks.add_task(process_instagram_bookmark, item_id, str(capture_request.url))
-                else:
-                    # Process video metadata quickly, then enhance with AI in background if requested
-                    background_tasks.add_task(process_video_metadata_fast, item_id, str(capture_request.url), capture_request.enable_summarization)
-            else:
-                # AUTO-PROCESSING: Trigger automatic AI processing pipeline for non-video content
-                if capture_request.enable_summarization:
-                    logger.info(f"🤖 Triggering auto-processing pipeline for item {item_id}")
-                    background_tasks.add_task(
-                        auto_processing_service.process_captured_item,
-                        item_id,
-                        initial_content,  # Pass the raw content
-                        str(capture_request.url) if capture_request.url else None,
-                        capture_request.title or 'Untitled',
-                        True  # enable_ai_processing
-                    )
-                else:
-                    # Just basic processing without AI enhancement
-                    logger.info(f"Basic processing for item {item_id} (AI disabled)")
-                    background_tasks.add_task(
-                        auto_processing_service.process_captured_item,
-                        item_id,
-                        initial_content,
-                        str(capture_request.url) if capture_request.url else None,
-                        capture_request.title or 'Untitled',
-                        False  # disable AI processing
-                    )
-            
-            VIDEO_CAPTURE_REQUESTS.labels(status='success').inc()
-            logger.info(f"Capture initiated successfully for item {item_id}")
-            
-            # No duplicate check needed here - already checked before item creation
-            duplicate_info = None
-            
-            return CaptureResponse(
-                id=item_id,
-                status=ItemStatus.PENDING,
-                message="Item capture initiated",
-                duplicate_info=duplicate_info
-            )
-            
-        except InvalidInput:
-            # Re-raise InvalidInput exceptions without wrapping them
-            raise
-        except Exception as e:
-            logger.error(f"Failed to capture item: {str(e)}", exc_info=True)
-            # Update item status to failed if initial insertion happened
-            try:
-                async with pool.acquire() as conn:
-                    await conn.execute("""
-                        UPDATE items
-                        SET status = 'failed',
-                            metadata = jsonb_set(COALESCE(metadata, '{}'), '{error}', to_jsonb($2::text))
-                        WHERE id = $1
-                    """, item_id, str(e))
-            except Exception as update_error:
-                logger.error(f"Failed to update item status: {update_error}")
-            VIDEO_CAPTURE_REQUESTS.labels(status='internal_error').inc()
-            raise InternalServerError(f"Failed to capture item: {e}")
+        VIDEO_CAPTURE_REQUESTS.labels(status='success').inc()
+        logger.info(f"Capture accepted for item {item_id}")
+        
+        return CaptureResponse(
+            id=item_id,
+            status=ItemStatus.PENDING,
+            message="Item capture initiated",
+            duplicate_info=None
+        )
+        
+    except InvalidInput:
+        # Re-raise InvalidInput exceptions without wrapping them
+        raise
+    except Exception as e:
+        # The transaction rolled back, so no partial item is left behind
+        logger.error(f"Failed to capture item: {str(e)}", exc_info=True)
+        VIDEO_CAPTURE_REQUESTS.labels(status='internal_error').inc()
+        raise InternalServerError(f"Failed to capture item: {e}")
 
 
 async def process_video_metadata_fast(item_id: uuid4, url: str, enable_summarization: bool = False):
@@ -767,7 +578,7 @@ async def process_video_item(item_id: uuid4, url: str):
 
         # Transcribe video
         await websocket_manager.send_personal_message(f"Transcribing video for item {item_id}...", str(item_id))
-        transcription = await video_processor.transcribe_video(video_data.video_path)
+        transcription = await video_processor.transcribe_video(video_data.video_path, task_id=str(item_id))
         if transcription:
             async with pool.acquire() as conn:
                 await conn.execute("UPDATE items SET transcription = $1 WHERE id = $2", transcription, item_id)
@@ -22,7 +22,7 @@ class DuplicateItem(BaseModel):
     id: str
     title: str
     url: Optional[str]
-    type: str  # exact_url, exact_content, semantic
+    type: str  # exact_url, exact_content, near_duplicate, semantic
     confidence: float
     created_at: str
     similarity: Optional[float] = None
@@ -26,6 +26,10 @@ class SearchRequest(BaseModel):
     threshold: float = Field(default=0.3, ge=0.0, le=1.0, description="Minimum similarity threshold")
     include_duplicates: bool = Field(default=False, description="Whether to include duplicate content")
     filters: Optional[Dict[str, Any]] = Field(default=None, description="Additional filters")
+    fusion: Literal["rrf", "weighted"] = Field(default="rrf", description="Rank fusion method for hybrid search")
+    semantic_weight: float = Field(default=0.7, ge=0.0, le=1.0, description="Semantic weight for hybrid search")
+    keyword_weight: float = Field(default=0.3, ge=0.0, le=1.0, description="Keyword weight for hybrid search")
+    cursor: Optional[str] = Field(default=None, description="Cursor from a previous hybrid search page")
 
 
 class DuplicateSearchRequest(BaseModel):
@@ -73,16 +77,17 @@ async def enhanced_search(
         else:  # hybrid
             results = await enhanced_search_service.hybrid_search(
                 query=request.query,
-                limit=request.limit
+                limit=request.limit,
+                semantic_weight=request.semantic_weight,
+                keyword_weight=request.keyword_weight,
+                fusion=request.fusion,
+                cursor=request.cursor,
+                filter_by=request.filters
             )
         
-        # Apply deduplication if requested
+        # Apply deduplication to the fetched page instead of searching again
         if not request.include_duplicates:
-            results = await enhanced_search_service.search_with_deduplication(
-                query=request.query,
-                search_type=request.search_type,
-                limit=request.limit
-            )
+            results = enhanced_search_service.deduplicate_results(results, request.limit)
         
         # Add search metadata
         results["user_id"] = user_id
@@ -96,6 +101,8 @@ async def enhanced_search(
         logger.info(f"Search completed: {len(results.get('results', []))} results for '{request.query}'")
         return results
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Enhanced search failed: {e}")
         raise HTTPException(
@@ -271,17 +278,19 @@ async def get_search_stats(
 
 @router.post("/migrate-embeddings", dependencies=[Depends(embedding_limiter)])
 async def migrate_legacy_embeddings(
+    resume: bool = Query(True, description="Continue an interrupted migration from its checkpoint"),
     current_user = Depends(get_current_user_optional)
 ) -> Dict[str, Any]:
     """
     Migrate legacy embeddings from items.embedding to embeddings table.
     """
     try:
-        result = await embedding_manager.migrate_legacy_embeddings()
+        result = await embedding_manager.migrate_legacy_embeddings(resume=resume)
         
         return {
             "migration_result": result,
-            "message": f"Migrated {result['migrated']} embeddings, {result['failed']} failed",
+            "message": f"Migrated {result['migrated']} embeddings, {result['failed']} failed "
+                       f"({result['items_per_second']} items/s)",
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -293,17 +302,22 @@ async def migrate_legacy_embeddings(
 @router.post("/update-embeddings", dependencies=[Depends(embedding_limiter)])
 async def update_all_embeddings(
     model_name: Optional[str] = Query(None, description="Embedding model to use"),
+    resume: bool = Query(True, description="Continue an interrupted run from its checkpoint"),
+    force: bool = Query(False, description="Re-embed items even if their content is unchanged"),
     current_user = Depends(get_current_user_optional)
 ) -> Dict[str, Any]:
     """
     Update embeddings for all items using content fingerprint change detection.
     """
     try:
-        result = await embedding_manager.update_all_embeddings(model_name=model_name)
+        result = await embedding_manager.update_all_embeddings(
+            model_name=model_name, resume=resume, force=force
+        )
         
         return {
             "update_result": result,
-            "message": f"Updated {result['updated']} embeddings, {result['unchanged']} unchanged, {result['failed']} failed",
+            "message": f"Updated {result['updated']} embeddings, {result['unchanged']} unchanged, "
+                       f"{result['failed']} failed ({result['items_per_second']} items/s)",
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -1,115 +1,128 @@
 """
 Export API endpoints for PRSNL data
+
+Exports are streamed in batches (see app/services/export_stream.py), so memory
+stays flat regardless of library size. Every format accepts `gzip`, and
+chronological exports accept `limit` plus a resume `cursor`; the cursor for the
+next page is returned in the X-Export-Next-Cursor header.
 """
-import csv
-import io
-import json
 import logging
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-# Security imports will be added when authentication is implemented
-from app.db.database import get_db_connection
-from app.models.schemas import Item
+from app.services.export_stream import (
+    ExportFilters,
+    ItemExport,
+    csv_chunks,
+    gzip_chunks,
+    json_chunks,
+    markdown_chunks,
+    ndjson_chunks,
+    parse_export_cursor,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
+def _build_export(
+    item_ids: Optional[List[UUID]],
+    tags: Optional[List[str]],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    cursor: Optional[str],
+    limit: Optional[int],
+    include_attachments: bool = False
+) -> ItemExport:
+    try:
+        after = parse_export_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = ExportFilters(item_ids=item_ids, tags=tags, start_date=start_date, end_date=end_date)
+    return ItemExport(filters, after=after, limit=limit, include_attachments=include_attachments)
+
+
+async def _logged(chunks: AsyncIterator[str], label: str) -> AsyncIterator[str]:
+    # Headers are already sent once streaming starts; all we can do is log and stop
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        logger.error(f"Export {label} failed mid-stream: {e}")
+        raise
+
+
+def _stream(
+    chunks: AsyncIterator[str],
+    label: str,
+    media_type: str,
+    extension: str,
+    gzip: bool,
+    next_cursor: Optional[str] = None
+) -> StreamingResponse:
+    filename = f"prsnl_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    body: AsyncIterator[Any] = _logged(chunks, label)
+    if gzip:
+        body = gzip_chunks(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if next_cursor:
+        headers["X-Export-Next-Cursor"] = next_cursor
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+async def _prepare(export: ItemExport, label: str) -> Tuple[int, Optional[str]]:
+    try:
+        return await export.prepare()
+    except Exception as e:
+        logger.error(f"Export {label} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/json")
 async def export_json(
     item_ids: Optional[List[UUID]] = None,
     tags: Optional[List[str]] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    conn=Depends(get_db_connection)
-) -> Response:
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    gzip: bool = False
+) -> StreamingResponse:
     """
     Export items as JSON with optional filters
     """
-    try:
-        # Build query
-        query = """
-            SELECT DISTINCT i.*, 
-                   array_agg(DISTINCT t.name) FILTER (WHERE t.name IS NOT NULL) as tags,
-                   array_agg(DISTINCT jsonb_build_object(
-                       'id', a.id,
-                       'type', a.file_type,
-                       'file_path', a.file_path,
-                       'mime_type', a.mime_type,
-                       'file_size', a.file_size,
-                       'metadata', a.metadata
-                   )) FILTER (WHERE a.id IS NOT NULL) as attachments
-            FROM items i
-            LEFT JOIN item_tags it ON i.id = it.item_id
-            LEFT JOIN tags t ON it.tag_id = t.id
-            LEFT JOIN attachments a ON i.id = a.item_id
-            WHERE 1=1
-        """
-        params = []
-        param_count = 0
-        
-        # Apply filters
-        if item_ids:
-            param_count += 1
-            query += f" AND i.id = ANY(${param_count})"
-            params.append(item_ids)
-            
-        if tags:
-            param_count += 1
-            query += f" AND t.name = ANY(${param_count})"
-            params.append(tags)
-            
-        if start_date:
-            param_count += 1
-            query += f" AND i.created_at >= ${param_count}"
-            params.append(start_date)
-            
-        if end_date:
-            param_count += 1
-            query += f" AND i.created_at <= ${param_count}"
-            params.append(end_date)
-            
-        query += " GROUP BY i.id ORDER BY i.created_at DESC"
-        
-        rows = await conn.fetch(query, *params)
-        
-        # Format data
-        items = []
-        for row in rows:
-            item_dict = dict(row)
-            # Convert UUID to string for JSON serialization
-            item_dict['id'] = str(item_dict['id'])
-            # Convert datetime to ISO format
-            for key in ['created_at', 'updated_at', 'captured_at']:
-                if item_dict.get(key):
-                    item_dict[key] = item_dict[key].isoformat()
-            items.append(item_dict)
-        
-        # Create export data
-        export_data = {
-            "export_date": datetime.now().isoformat(),
-            "version": "1.0",
-            "total_items": len(items),
-            "items": items
-        }
-        
-        # Return as downloadable JSON
-        json_content = json.dumps(export_data, indent=2)
-        return Response(
-            content=json_content,
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f"attachment; filename=prsnl_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Export JSON failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    export = _build_export(item_ids, tags, start_date, end_date, cursor, limit, include_attachments=True)
+    total, next_cursor = await _prepare(export, "JSON")
+    return _stream(
+        json_chunks(export, total, next_cursor), "JSON", "application/json", "json", gzip, next_cursor
+    )
+
+
+@router.post("/ndjson")
+async def export_ndjson(
+    item_ids: Optional[List[UUID]] = None,
+    tags: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    gzip: bool = False
+) -> StreamingResponse:
+    """
+    Export items as newline-delimited JSON, one item per line.
+
+    A {"_checkpoint": cursor} line follows every batch; passing the last one
+    received as `cursor` resumes an interrupted export.
+    """
+    export = _build_export(item_ids, tags, start_date, end_date, cursor, limit, include_attachments=True)
+    next_cursor = (await _prepare(export, "NDJSON"))[1] if limit else None
+    return _stream(ndjson_chunks(export), "NDJSON", "application/x-ndjson", "ndjson", gzip, next_cursor)
 
 
 @router.post("/csv")
@@ -118,83 +131,16 @@ async def export_csv(
     tags: Optional[List[str]] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    conn=Depends(get_db_connection)
-) -> Response:
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    gzip: bool = False
+) -> StreamingResponse:
     """
     Export items as CSV with optional filters
     """
-    try:
-        # Build query (similar to JSON export)
-        query = """
-            SELECT i.id, i.title, i.url, i.type, i.summary, 
-                   i.created_at, i.captured_at,
-                   string_agg(DISTINCT t.name, ', ') as tags
-            FROM items i
-            LEFT JOIN item_tags it ON i.id = it.item_id
-            LEFT JOIN tags t ON it.tag_id = t.id
-            WHERE 1=1
-        """
-        params = []
-        param_count = 0
-        
-        # Apply filters (same as JSON)
-        if item_ids:
-            param_count += 1
-            query += f" AND i.id = ANY(${param_count})"
-            params.append(item_ids)
-            
-        if tags:
-            param_count += 1
-            query += f" AND t.name = ANY(${param_count})"
-            params.append(tags)
-            
-        if start_date:
-            param_count += 1
-            query += f" AND i.created_at >= ${param_count}"
-            params.append(start_date)
-            
-        if end_date:
-            param_count += 1
-            query += f" AND i.created_at <= ${param_count}"
-            params.append(end_date)
-            
-        query += " GROUP BY i.id ORDER BY i.created_at DESC"
-        
-        rows = await conn.fetch(query, *params)
-        
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.DictWriter(
-            output,
-            fieldnames=['id', 'title', 'url', 'type', 'summary', 'tags', 'created_at', 'captured_at']
-        )
-        writer.writeheader()
-        
-        for row in rows:
-            writer.writerow({
-                'id': str(row['id']),
-                'title': row['title'],
-                'url': row['url'],
-                'type': row['type'],
-                'summary': row['summary'],
-                'tags': row['tags'] or '',
-                'created_at': row['created_at'].isoformat() if row['created_at'] else '',
-                'captured_at': row['captured_at'].isoformat() if row['captured_at'] else ''
-            })
-        
-        # Return as downloadable CSV
-        csv_content = output.getvalue()
-        return Response(
-            content=csv_content,
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=prsnl_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Export CSV failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    export = _build_export(item_ids, tags, start_date, end_date, cursor, limit)
+    next_cursor = (await _prepare(export, "CSV"))[1] if limit else None
+    return _stream(csv_chunks(export), "CSV", "text/csv", "csv", gzip, next_cursor)
 
 
 @router.post("/markdown")
@@ -204,100 +150,21 @@ async def export_markdown(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     group_by_tag: bool = False,
-    conn=Depends(get_db_connection)
-) -> Response:
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    gzip: bool = False
+) -> StreamingResponse:
     """
     Export items as Markdown with optional filters and grouping
     """
-    try:
-        # Get items (similar query to JSON export)
-        query = """
-            SELECT i.*, 
-                   array_agg(DISTINCT t.name) FILTER (WHERE t.name IS NOT NULL) as tags
-            FROM items i
-            LEFT JOIN item_tags it ON i.id = it.item_id
-            LEFT JOIN tags t ON it.tag_id = t.id
-            WHERE 1=1
-        """
-        params = []
-        param_count = 0
-        
-        # Apply filters
-        if item_ids:
-            param_count += 1
-            query += f" AND i.id = ANY(${param_count})"
-            params.append(item_ids)
-            
-        if tags:
-            param_count += 1
-            query += f" AND t.name = ANY(${param_count})"
-            params.append(tags)
-            
-        if start_date:
-            param_count += 1
-            query += f" AND i.created_at >= ${param_count}"
-            params.append(start_date)
-            
-        if end_date:
-            param_count += 1
-            query += f" AND i.created_at <= ${param_count}"
-            params.append(end_date)
-            
-        query += " GROUP BY i.id ORDER BY i.created_at DESC"
-        
-        rows = await conn.fetch(query, *params)
-        
-        # Create markdown content
-        markdown_lines = [
-            "# PRSNL Knowledge Base Export",
-            f"\nExported on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Total items: {len(rows)}\n",
-            "---\n"
-        ]
-        
-        if group_by_tag:
-            # Group items by tags
-            tag_groups = {}
-            untagged = []
-            
-            for row in rows:
-                if row['tags']:
-                    for tag in row['tags']:
-                        if tag not in tag_groups:
-                            tag_groups[tag] = []
-                        tag_groups[tag].append(row)
-                else:
-                    untagged.append(row)
-            
-            # Write grouped content
-            for tag in sorted(tag_groups.keys()):
-                markdown_lines.append(f"## {tag}\n")
-                for item in tag_groups[tag]:
-                    markdown_lines.extend(_format_item_markdown(item))
-                markdown_lines.append("")
-            
-            if untagged:
-                markdown_lines.append("## Untagged\n")
-                for item in untagged:
-                    markdown_lines.extend(_format_item_markdown(item))
-        else:
-            # Write items chronologically
-            for row in rows:
-                markdown_lines.extend(_format_item_markdown(row))
-        
-        # Return as downloadable markdown
-        markdown_content = "\n".join(markdown_lines)
-        return Response(
-            content=markdown_content,
-            media_type="text/markdown",
-            headers={
-                "Content-Disposition": f"attachment; filename=prsnl_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Export Markdown failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if group_by_tag and (cursor or limit):
+        raise HTTPException(status_code=400, detail="cursor and limit are not supported with group_by_tag")
+    export = _build_export(item_ids, tags, start_date, end_date, cursor, limit)
+    total, next_cursor = await _prepare(export, "Markdown")
+    return _stream(
+        markdown_chunks(export, total, _format_item_markdown, group_by_tag),
+        "Markdown", "text/markdown", "md", gzip, next_cursor
+    )
 
 
 def _format_item_markdown(item: Dict[str, Any]) -> List[str]:
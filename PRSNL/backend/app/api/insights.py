@@ -316,10 +316,10 @@ async def get_timeline_trends(
         # Calculate date cutoff
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Query for daily content type counts
+        # Daily content type counts from the rollup table (migration 028)
         query = text("""
             SELECT 
-                DATE(created_at) as date,
+                day as date,
                 CASE 
                     WHEN type = 'article' THEN 'articles'
                     WHEN type = 'video' THEN 'videos' 
@@ -327,20 +327,15 @@ async def get_timeline_trends(
                     WHEN type = 'bookmark' THEN 'bookmarks'
                     ELSE 'other'
                 END as content_type,
-                COUNT(*) as count
-            FROM items 
-            WHERE created_at >= :cutoff_date
-            GROUP BY DATE(created_at), CASE 
-                    WHEN type = 'article' THEN 'articles'
-                    WHEN type = 'video' THEN 'videos' 
-                    WHEN type = 'note' THEN 'notes'
-                    WHEN type = 'bookmark' THEN 'bookmarks'
-                    ELSE 'other'
-                END
+                SUM(item_count) as count
+            FROM analytics_item_rollup
+            WHERE day >= :cutoff_day
+            GROUP BY 1, 2
+            HAVING SUM(item_count) > 0
             ORDER BY date DESC
         """)
         
-        result = await db.execute(query, {"cutoff_date": cutoff_date})
+        result = await db.execute(query, {"cutoff_day": cutoff_date.date()})
         rows = result.fetchall()
         
         # Organize data by date
@@ -412,27 +407,27 @@ async def get_top_tags(
         from datetime import datetime, timedelta
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Query for top tags with usage counts using proper table structure
+        # Top tags with usage counts from the tag rollup table (migration 028)
         query = text("""
             SELECT 
-                t.name,
-                COUNT(it.item_id) as usage_count,
-                MAX(i.created_at) as latest_use,
+                tag as name,
+                SUM(item_count) as usage_count,
+                MAX(last_seen) as latest_use,
                 CASE 
-                    WHEN MAX(i.created_at) >= :cutoff_date THEN 1.0
+                    WHEN MAX(last_seen) >= :cutoff_date THEN 1.0
                     ELSE 0.5
                 END as recency_weight
-            FROM tags t
-            JOIN item_tags it ON t.id = it.tag_id
-            JOIN items i ON it.item_id = i.id
-            WHERE i.created_at >= :cutoff_date
-            GROUP BY t.id, t.name
-            ORDER BY usage_count DESC, t.name
+            FROM analytics_tag_rollup
+            WHERE day >= :cutoff_day
+            GROUP BY tag
+            HAVING SUM(item_count) > 0
+            ORDER BY usage_count DESC, tag
             LIMIT :limit
         """)
         
         result = await db.execute(query, {
             "cutoff_date": cutoff_date,
+            "cutoff_day": cutoff_date.date(),
             "limit": limit
         })
         rows = result.fetchall()
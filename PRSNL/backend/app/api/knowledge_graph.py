@@ -438,7 +438,7 @@ async def get_visual_graph(
 async def get_full_visual_graph(
     content_type: Optional[str] = Query(None, description="Filter by content type"),
     tag: Optional[str] = Query(None, description="Filter by tag"),
-    limit: int = Query(100, ge=10, le=500, description="Max nodes"),
+    limit: int = Query(100, ge=10, le=10000, description="Max nodes"),
     threshold: float = Query(0.7, ge=0.5, le=0.95, description="Similarity threshold"),
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -68,6 +68,105 @@ class SearchResponse(ContentResponse):
     facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
+# ===========================
+# ROLLUP QUERIES
+# ===========================
+
+# Statuses counted by the library statistics
+COUNTED_STATUSES = ['completed', 'bookmark', 'pending']
+
+
+async def _content_type_stats_from_rollups(
+    db_connection: asyncpg.Connection,
+    category: Optional[str] = None
+) -> List[asyncpg.Record]:
+    """Content type counts, category distribution and recent tags from the rollup tables."""
+    return await db_connection.fetch("""
+        WITH type_counts AS (
+            SELECT type, SUM(item_count) as count
+            FROM analytics_item_rollup
+            WHERE status = ANY($1::text[])
+                AND ($2::text IS NULL OR category = $2)
+            GROUP BY type
+            HAVING SUM(item_count) > 0
+        ),
+        type_categories AS (
+            SELECT type, json_agg(json_build_object('id', category, 'count', count)) as categories
+            FROM (
+                SELECT type, category, SUM(item_count) as count
+                FROM analytics_item_rollup
+                WHERE status = ANY($1::text[]) AND category <> ''
+                GROUP BY type, category
+                HAVING SUM(item_count) > 0
+            ) c
+            GROUP BY type
+        ),
+        type_tags AS (
+            SELECT type, ARRAY_AGG(DISTINCT tag) as recent_tags
+            FROM analytics_tag_rollup
+            WHERE status = ANY($1::text[])
+                AND item_count > 0
+                AND day >= (NOW() AT TIME ZONE 'UTC')::date - 30
+            GROUP BY type
+        )
+        SELECT 
+            tc.type,
+            tc.count,
+            COALESCE(cat.categories, '[]'::json) as categories,
+            COALESCE(tt.recent_tags, '{}'::text[]) as recent_tags
+        FROM type_counts tc
+        LEFT JOIN type_categories cat ON cat.type = tc.type
+        LEFT JOIN type_tags tt ON tt.type = tc.type
+        ORDER BY tc.count DESC
+    """, COUNTED_STATUSES, category)
+
+
+async def _category_stats_from_rollups(
+    db_connection: asyncpg.Connection,
+    content_type: Optional[str] = None
+) -> List[asyncpg.Record]:
+    """Category counts and their content types from the rollup tables."""
+    return await db_connection.fetch("""
+        SELECT 
+            category as id,
+            SUM(item_count) as count,
+            ARRAY_AGG(DISTINCT type) as content_types
+        FROM analytics_item_rollup
+        WHERE status = ANY($1::text[])
+            AND category <> ''
+            AND item_count > 0
+            AND ($2::text IS NULL OR type = $2)
+        GROUP BY category
+        ORDER BY count DESC
+    """, COUNTED_STATUSES, content_type)
+
+
+async def _tag_stats_from_rollups(
+    db_connection: asyncpg.Connection,
+    tag: Optional[str] = None,
+    content_type: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[asyncpg.Record]:
+    """Tag usage with content types and categories from the tag rollup table."""
+    return await db_connection.fetch("""
+        SELECT 
+            tag,
+            SUM(item_count) as count,
+            ARRAY_AGG(DISTINCT type) as content_types,
+            ARRAY_AGG(DISTINCT category) FILTER (WHERE category <> '') as categories
+        FROM analytics_tag_rollup
+        WHERE status = ANY($1::text[])
+            AND item_count > 0
+            AND ($2::text IS NULL OR tag = $2)
+            AND ($3::text IS NULL OR type = $3)
+            AND ($4::text IS NULL OR category = $4)
+        GROUP BY tag
+        ORDER BY count DESC, tag
+        LIMIT $5
+    """, COUNTED_STATUSES, tag, content_type, category, limit)
+
+
 # ===========================
 # STATISTICS ENDPOINTS
 # ===========================
@@ -80,27 +179,30 @@ async def get_content_type_stats(
 ):
     """Get content type statistics with counts and category distribution."""
     try:
-        # Base query for content type stats
-        query = """
-            WITH type_counts AS (
-                SELECT 
-                    i.type,
-                    COUNT(DISTINCT i.id) as count
-                FROM items i
-                WHERE i.status IN ('completed', 'bookmark', 'pending')
-        """
+        if not tags:
+            # Without a tag filter every count comes from the rollups (migration 028)
+            rows = await _content_type_stats_from_rollups(db_connection, category)
+        else:
+            # Base query for content type stats
+            query = """
+                WITH type_counts AS (
+                    SELECT 
+                        i.type,
+                        COUNT(DISTINCT i.id) as count
+                    FROM items i
+                    WHERE i.status IN ('completed', 'bookmark', 'pending')
+            """
         
-        params = []
-        param_count = 0
+            params = []
+            param_count = 0
         
-        # Add category filter
-        if category:
-            param_count += 1
-            query += f" AND i.category = ${param_count}"
-            params.append(category)
+            # Add category filter
+            if category:
+                param_count += 1
+                query += f" AND i.category = ${param_count}"
+                params.append(category)
         
-        # Add tags filter
-        if tags:
+            # Add tags filter
             tag_list = [t.strip() for t in tags.split(',')]
             param_count += 1
             query += f"""
@@ -112,42 +214,42 @@ async def get_content_type_stats(
             """
             params.append(tag_list)
         
-        query += """
-                GROUP BY i.type
-            )
-            SELECT 
-                tc.type,
-                tc.count,
-                COALESCE(
-                    (SELECT json_agg(cat_obj) FROM (
-                        SELECT DISTINCT ON (category) json_build_object(
-                            'id', category,
-                            'count', COUNT(*)
-                        ) as cat_obj
-                        FROM items
-                        WHERE type = tc.type 
-                            AND status IN ('completed', 'bookmark', 'pending')
-                            AND category IS NOT NULL
-                        GROUP BY category
-                    ) cats),
-                    '[]'::json
-                ) as categories,
-                COALESCE(
-                    (SELECT ARRAY_AGG(DISTINCT t.name) 
-                     FROM items i
-                     JOIN item_tags it ON i.id = it.item_id
-                     JOIN tags t ON it.tag_id = t.id
-                     WHERE i.type = tc.type 
-                        AND i.status IN ('completed', 'bookmark', 'pending')
-                        AND i.created_at > NOW() - INTERVAL '30 days'
-                     LIMIT 10),
-                    '{}'::text[]
-                ) as recent_tags
-            FROM type_counts tc
-            ORDER BY tc.count DESC
-        """
+            query += """
+                    GROUP BY i.type
+                )
+                SELECT 
+                    tc.type,
+                    tc.count,
+                    COALESCE(
+                        (SELECT json_agg(cat_obj) FROM (
+                            SELECT DISTINCT ON (category) json_build_object(
+                                'id', category,
+                                'count', COUNT(*)
+                            ) as cat_obj
+                            FROM items
+                            WHERE type = tc.type 
+                                AND status IN ('completed', 'bookmark', 'pending')
+                                AND category IS NOT NULL
+                            GROUP BY category
+                        ) cats),
+                        '[]'::json
+                    ) as categories,
+                    COALESCE(
+                        (SELECT ARRAY_AGG(DISTINCT t.name) 
+                         FROM items i
+                         JOIN item_tags it ON i.id = it.item_id
+                         JOIN tags t ON it.tag_id = t.id
+                         WHERE i.type = tc.type 
+                            AND i.status IN ('completed', 'bookmark', 'pending')
+                            AND i.created_at > NOW() - INTERVAL '30 days'
+                         LIMIT 10),
+                        '{}'::text[]
+                    ) as recent_tags
+                FROM type_counts tc
+                ORDER BY tc.count DESC
+            """
         
-        rows = await db_connection.fetch(query, *params)
+            rows = await db_connection.fetch(query, *params)
         
         result = []
         for row in rows:
@@ -178,28 +280,30 @@ async def get_category_stats(
 ):
     """Get category statistics with counts and content type distribution."""
     try:
-        query = """
-            WITH category_counts AS (
-                SELECT 
-                    i.category,
-                    COUNT(DISTINCT i.id) as count,
-                    ARRAY_AGG(DISTINCT i.type) as content_types
-                FROM items i
-                WHERE i.status IN ('completed', 'bookmark', 'pending')
-                    AND i.category IS NOT NULL
-        """
+        if not tags:
+            rows = await _category_stats_from_rollups(db_connection, content_type)
+        else:
+            query = """
+                WITH category_counts AS (
+                    SELECT 
+                        i.category,
+                        COUNT(DISTINCT i.id) as count,
+                        ARRAY_AGG(DISTINCT i.type) as content_types
+                    FROM items i
+                    WHERE i.status IN ('completed', 'bookmark', 'pending')
+                        AND i.category IS NOT NULL
+            """
         
-        params = []
-        param_count = 0
+            params = []
+            param_count = 0
         
-        # Add content type filter
-        if content_type:
-            param_count += 1
-            query += f" AND i.type = ${param_count}"
-            params.append(content_type)
+            # Add content type filter
+            if content_type:
+                param_count += 1
+                query += f" AND i.type = ${param_count}"
+                params.append(content_type)
         
-        # Add tags filter
-        if tags:
+            # Add tags filter
             tag_list = [t.strip() for t in tags.split(',')]
             param_count += 1
             query += f"""
@@ -211,18 +315,18 @@ async def get_category_stats(
             """
             params.append(tag_list)
         
-        query += """
-                GROUP BY i.category
-            )
-            SELECT 
-                category as id,
-                count,
-                content_types
-            FROM category_counts
-            ORDER BY count DESC
-        """
+            query += """
+                    GROUP BY i.category
+                )
+                SELECT 
+                    category as id,
+                    count,
+                    content_types
+                FROM category_counts
+                ORDER BY count DESC
+            """
         
-        rows = await db_connection.fetch(query, *params)
+            rows = await db_connection.fetch(query, *params)
         
         return [
             CategoryStats(
@@ -250,20 +354,7 @@ async def get_tag_stats(
     try:
         if tag:
             # Get stats for a specific tag
-            query = """
-                SELECT 
-                    t.name as tag,
-                    COUNT(DISTINCT i.id) as count,
-                    ARRAY_AGG(DISTINCT i.type) as content_types,
-                    ARRAY_AGG(DISTINCT i.category) FILTER (WHERE i.category IS NOT NULL) as categories
-                FROM tags t
-                JOIN item_tags it ON t.id = it.tag_id
-                JOIN items i ON it.item_id = i.id
-                WHERE t.name = $1
-                    AND i.status IN ('completed', 'bookmark', 'pending')
-                GROUP BY t.name
-            """
-            rows = await db_connection.fetch(query, tag)
+            rows = await _tag_stats_from_rollups(db_connection, tag=tag)
         
         elif related_to:
             # Get tags that co-occur with the specified tag
@@ -293,39 +384,9 @@ async def get_tag_stats(
         
         else:
             # Get general tag stats with optional filters
-            query = """
-                SELECT 
-                    t.name as tag,
-                    COUNT(DISTINCT i.id) as count,
-                    ARRAY_AGG(DISTINCT i.type) as content_types,
-                    ARRAY_AGG(DISTINCT i.category) FILTER (WHERE i.category IS NOT NULL) as categories
-                FROM tags t
-                JOIN item_tags it ON t.id = it.tag_id
-                JOIN items i ON it.item_id = i.id
-                WHERE i.status IN ('completed', 'bookmark', 'pending')
-            """
-            
-            params = []
-            param_count = 0
-            
-            if content_type:
-                param_count += 1
-                query += f" AND i.type = ${param_count}"
-                params.append(content_type)
-            
-            if category:
-                param_count += 1
-                query += f" AND i.category = ${param_count}"
-                params.append(category)
-            
-            query += f"""
-                GROUP BY t.name
-                ORDER BY count DESC
-                LIMIT ${param_count + 1}
-            """
-            params.append(limit)
-            
-            rows = await db_connection.fetch(query, *params)
+            rows = await _tag_stats_from_rollups(
+                db_connection, content_type=content_type, category=category, limit=limit
+            )
         
         return [
             TagStats(
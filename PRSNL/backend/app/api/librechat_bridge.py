@@ -360,7 +360,8 @@ If you need more specific information, you can suggest targeted searches using t
                 system_prompt=system_prompt,
                 max_tokens=1000,
                 temperature=0.7,
-                model=model_to_use
+                model=model_to_use,
+                use_cache=False
             )
             
             return response
@@ -376,7 +377,8 @@ If you need more specific information, you can suggest targeted searches using t
             system_prompt="You are a helpful AI assistant.",
             max_tokens=1000,
             temperature=0.7,
-            model=settings.AZURE_OPENAI_LIBRECHAT_DEPLOYMENT
+            model=settings.AZURE_OPENAI_LIBRECHAT_DEPLOYMENT,
+            use_cache=False
         )
 
 @observe(name="stream_chat_response")
@@ -14,6 +14,7 @@ from pydantic import BaseModel
 
 from app.core.auth import get_current_user
 from app.db.database import get_db_pool
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.workers.package_intelligence_tasks import (
     analyze_project_packages, 
     check_package_security, 
@@ -312,8 +313,6 @@ async def get_package_intelligence_health():
     
     try:
         # Test connectivity to package registries
-        import aiohttp
-        
         registries = [
             ("npm", "https://registry.npmjs.org/express"),
             ("pypi", "https://pypi.org/pypi/requests/json"),
@@ -323,14 +322,14 @@ async def get_package_intelligence_health():
         
         health_status = {}
         
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        async with http_client_factory.client_session(ClientType.GENERAL) as client:
             for name, url in registries:
                 try:
-                    async with session.get(url) as response:
-                        health_status[name] = {
-                            "status": "healthy" if response.status == 200 else "degraded",
-                            "response_code": response.status
-                        }
+                    response = await client.get(url, timeout=5)
+                    health_status[name] = {
+                        "status": "healthy" if response.status_code == 200 else "degraded",
+                        "response_code": response.status_code
+                    }
                 except Exception as e:
                     health_status[name] = {
                         "status": "unhealthy",
@@ -1,3 +1,4 @@
+import logging
 import time
 from datetime import timedelta
 from typing import List, Optional
@@ -13,6 +14,8 @@ from app.db.database import find_similar_items_by_embedding, get_db_connection
 from app.services.cache import cache_result, cache_service, CacheKeys
 from app.services.embedding_service import EmbeddingService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class SearchResult(BaseModel):
@@ -29,14 +32,25 @@ async def search_items(
     query: str,
     limit: int = 10,
     offset: int = 0,
+    cursor: Optional[str] = None,
     db_connection: asyncpg.Connection = Depends(get_db_connection)
 ):
-    """Search for items by keyword or phrase."""
+    """Search for items by keyword or phrase.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page;
+    `offset` is kept for older clients.
+    """
     if not query:
         raise InvalidInput("Search query cannot be empty.")
+    try:
+        SearchEngine.parse_cursor(cursor, ranked=True)
+    except ValueError as e:
+        raise InvalidInput(str(e))
     
     # Try cache first
-    cache_key = cache_service.make_key(CacheKeys.SEARCH, query, limit=limit, offset=offset)
+    cache_key = cache_service.make_key(
+        CacheKeys.SEARCH, query, limit=limit, offset=offset, cursor=cursor or ""
+    )
     cached = await cache_service.get(cache_key)
     if cached:
         logger.debug(f"Returning cached response for key: {cache_key}")
@@ -49,8 +63,12 @@ async def search_items(
         start_time = time.time()
         
         search_engine = SearchEngine(db_connection)
-        # Pass parameters correctly with offset support
-        results = await search_engine.search(query, limit=limit, offset=offset)
+        page = await search_engine.search_page(
+            query, limit=limit, offset=offset, cursor=cursor
+        )
+        results = page["results"]
+        # Matches across all pages (estimated for large result sets), not just this one
+        total = await search_engine.count_results(query)
         
         # Calculate execution time
         execution_time_ms = int((time.time() - start_time) * 1000)
@@ -69,7 +87,8 @@ async def search_items(
                     "score": item.score if hasattr(item, 'score') else None
                 } for item in results
             ],
-            "total": len(results),
+            "total": total,
+            "next_cursor": page["next_cursor"],
             "took_ms": execution_time_ms
         }
         
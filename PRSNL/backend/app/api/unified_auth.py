@@ -5,7 +5,6 @@ Unified Authentication API endpoints for Keycloak + FusionAuth integration
 from fastapi import APIRouter, HTTPException, Request, Depends, status
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Dict, Any
-import httpx
 import jwt
 from datetime import datetime, timedelta
 import secrets
@@ -13,6 +12,7 @@ import secrets
 from app.middleware.unified_auth import UnifiedAuthService
 from app.core.config import settings
 from app.services.database import get_db_connection
+from app.services.http_client_factory import ClientType, http_client_factory
 
 router = APIRouter(prefix="/auth", tags=["unified-auth"])
 
@@ -344,7 +344,7 @@ async def fusionauth_callback(request: Request):
             )
         
         # Exchange code for token with FusionAuth
-        async with httpx.AsyncClient() as client:
+        async with http_client_factory.client_session(ClientType.GENERAL) as client:
             token_response = await client.post(
                 f"{settings.FUSIONAUTH_URL}/oauth2/token",
                 data={
@@ -48,6 +48,14 @@ class Settings(BaseSettings):
     AUTH_COOKIE_DOMAIN: str = os.getenv("AUTH_COOKIE_DOMAIN", "localhost")
     AUTH_COOKIE_SECURE: bool = os.getenv("AUTH_COOKIE_SECURE", "false").lower() == "true"
     AUTH_SESSION_TIMEOUT: int = int(os.getenv("AUTH_SESSION_TIMEOUT", "3600"))  # 1 hour
+
+    # Bearer-token verification (local JWKS checks plus in-process caches)
+    AUTH_JWKS_TTL: int = int(os.getenv("AUTH_JWKS_TTL", "3600"))  # seconds before signing keys are refetched
+    AUTH_JWKS_MIN_REFRESH_SECONDS: int = int(os.getenv("AUTH_JWKS_MIN_REFRESH_SECONDS", "30"))  # unknown-kid refetch limit
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_TOKEN_CACHE_TTL: int = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))  # upper bound; token expiry applies first
+    AUTH_NEGATIVE_CACHE_TTL: int = int(os.getenv("AUTH_NEGATIVE_CACHE_TTL", "30"))  # rejected tokens
+    AUTH_USER_MAPPING_TTL: int = int(os.getenv("AUTH_USER_MAPPING_TTL", "600"))
     
     # LLM
     AZURE_OPENAI_API_KEY: Optional[str] = None
@@ -59,6 +67,13 @@ class Settings(BaseSettings):
     AZURE_OPENAI_API_VERSION: str = "2025-01-01-preview"
 
     
+    # AI routing (local learned scoring; the LangChain ReAct router is opt-in)
+    AI_ROUTER_LLM_ROUTING: bool = os.getenv("AI_ROUTER_LLM_ROUTING", "false").lower() == "true"
+    AI_ROUTER_EWMA_ALPHA: float = float(os.getenv("AI_ROUTER_EWMA_ALPHA", "0.2"))
+    AI_ROUTER_BREAKER_FAILURES: int = int(os.getenv("AI_ROUTER_BREAKER_FAILURES", "5"))  # consecutive failures to open
+    AI_ROUTER_BREAKER_COOLDOWN: float = float(os.getenv("AI_ROUTER_BREAKER_COOLDOWN", "30"))  # seconds before a probe
+    AI_ROUTER_HEDGE_MIN_PRIORITY: int = int(os.getenv("AI_ROUTER_HEDGE_MIN_PRIORITY", "8"))  # hedge tasks at/above this priority
+    
     # Storage
     MEDIA_DIR: str = "./media"  # Media directory path
     
@@ -70,18 +85,96 @@ class Settings(BaseSettings):
     # Search
     SEARCH_RESULTS_LIMIT: int = 50
     SEARCH_MIN_SCORE: float = 0.1
-    
+
+    # In-process ANN vector index (falls back to pgvector when disabled or not ready)
+    VECTOR_INDEX_ENABLED: bool = os.getenv("VECTOR_INDEX_ENABLED", "true").lower() == "true"
+    VECTOR_INDEX_BACKEND: str = os.getenv("VECTOR_INDEX_BACKEND", "hnsw")
+    VECTOR_INDEX_DIR: str = os.getenv("VECTOR_INDEX_DIR", "./storage/vector_index")
+    VECTOR_INDEX_SYNC_INTERVAL: int = int(os.getenv("VECTOR_INDEX_SYNC_INTERVAL", "30"))  # seconds
+    VECTOR_INDEX_REBUILD_INTERVAL: int = int(os.getenv("VECTOR_INDEX_REBUILD_INTERVAL", "21600"))  # 6 hours
+    VECTOR_INDEX_HNSW_M: int = int(os.getenv("VECTOR_INDEX_HNSW_M", "16"))
+    VECTOR_INDEX_HNSW_EF_CONSTRUCTION: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+    VECTOR_INDEX_HNSW_EF_SEARCH: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", "64"))
+
+    # Embedding pipeline
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))  # texts per provider request
+    EMBEDDING_MAX_CONCURRENCY: int = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))  # provider requests in flight
+    EMBEDDING_CACHE_TTL: int = int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))  # 24 hours
+    EMBEDDING_CACHE_DTYPE: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")  # float32, float16, int8
+    EMBEDDING_BACKFILL_CHUNK_SIZE: int = int(os.getenv("EMBEDDING_BACKFILL_CHUNK_SIZE", "500"))  # items per write batch
+    EMBEDDING_BACKFILL_CONCURRENCY: int = int(os.getenv("EMBEDDING_BACKFILL_CONCURRENCY", "4"))  # chunks in flight
+
+    # AI completion cache (identical requests served from cache; concurrent ones share a call)
+    AI_COMPLETION_CACHE_ENABLED: bool = os.getenv("AI_COMPLETION_CACHE_ENABLED", "true").lower() == "true"
+    AI_COMPLETION_CACHE_TTL: int = int(os.getenv("AI_COMPLETION_CACHE_TTL", "86400"))  # 24 hours
+    AI_COMPLETION_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_COMPLETION_CACHE_MAX_ENTRIES", "2048"))  # in-process LRU
+    AI_COMPLETION_SEMANTIC_CACHE: bool = os.getenv("AI_COMPLETION_SEMANTIC_CACHE", "false").lower() == "true"
+    AI_COMPLETION_SEMANTIC_THRESHOLD: float = float(os.getenv("AI_COMPLETION_SEMANTIC_THRESHOLD", "0.98"))  # cosine
+
+    # Duplicate clustering (blocked cosine similarity + union-find)
+    DUPLICATE_CLUSTER_BLOCK_SIZE: int = int(os.getenv("DUPLICATE_CLUSTER_BLOCK_SIZE", "2048"))
+    DUPLICATE_CLUSTER_REBUILD_INTERVAL: int = int(os.getenv("DUPLICATE_CLUSTER_REBUILD_INTERVAL", "86400"))  # seconds
+
+    # MinHash/LSH near-duplicate index (capture-time dedupe without an embedding call)
+    NEAR_DUPLICATE_NUM_PERM: int = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128"))
+    NEAR_DUPLICATE_BANDS: int = int(os.getenv("NEAR_DUPLICATE_BANDS", "32"))  # 4 rows per band
+    NEAR_DUPLICATE_MIN_SHINGLES: int = int(os.getenv("NEAR_DUPLICATE_MIN_SHINGLES", "10"))  # shorter texts use embeddings
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))  # Jaccard for a confident match
+    NEAR_DUPLICATE_CANDIDATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_CANDIDATE_THRESHOLD", "0.4"))  # embeddings break ties above this
+    NEAR_DUPLICATE_SYNC_INTERVAL: int = int(os.getenv("NEAR_DUPLICATE_SYNC_INTERVAL", "30"))  # seconds
+
+    # Capture pipeline (durable capture_jobs queue; /capture only validates, inserts and enqueues)
+    CAPTURE_PIPELINE_ENABLED: bool = os.getenv("CAPTURE_PIPELINE_ENABLED", "true").lower() == "true"  # run workers in this process
+    CAPTURE_CONTENT_CONCURRENCY: int = int(os.getenv("CAPTURE_CONTENT_CONCURRENCY", "4"))  # scrape + LLM + embedding
+    CAPTURE_ENRICH_CONCURRENCY: int = int(os.getenv("CAPTURE_ENRICH_CONCURRENCY", "4"))  # auto-processing/categorization
+    CAPTURE_PREVIEW_CONCURRENCY: int = int(os.getenv("CAPTURE_PREVIEW_CONCURRENCY", "4"))  # rich previews, repo analysis
+    CAPTURE_VIDEO_CONCURRENCY: int = int(os.getenv("CAPTURE_VIDEO_CONCURRENCY", "2"))  # yt-dlp metadata, Instagram
+    CAPTURE_JOB_MAX_ATTEMPTS: int = int(os.getenv("CAPTURE_JOB_MAX_ATTEMPTS", "5"))
+    CAPTURE_JOB_RETRY_BASE_SECONDS: float = float(os.getenv("CAPTURE_JOB_RETRY_BASE_SECONDS", "10"))  # doubles per attempt
+    CAPTURE_JOB_LEASE_SECONDS: int = int(os.getenv("CAPTURE_JOB_LEASE_SECONDS", "900"))  # running jobs re-queued after this
+    CAPTURE_JOB_POLL_SECONDS: float = float(os.getenv("CAPTURE_JOB_POLL_SECONDS", "5"))  # fallback when NOTIFY is missed
+
+    # item_created worker (bounded queue, concurrent processors, pending-item catch-up)
+    ITEM_WORKER_CONCURRENCY: int = int(os.getenv("ITEM_WORKER_CONCURRENCY", "4"))
+    ITEM_WORKER_QUEUE_SIZE: int = int(os.getenv("ITEM_WORKER_QUEUE_SIZE", "1000"))  # overflow is left to the sweep
+    ITEM_WORKER_SWEEP_SECONDS: int = int(os.getenv("ITEM_WORKER_SWEEP_SECONDS", "60"))  # pending-item catch-up interval
+    ITEM_WORKER_LEASE_SECONDS: int = int(os.getenv("ITEM_WORKER_LEASE_SECONDS", "1800"))  # claims expire after this
+    ITEM_WORKER_MAX_ATTEMPTS: int = int(os.getenv("ITEM_WORKER_MAX_ATTEMPTS", "3"))
+
+    # Knowledge graph similarity edges
+    GRAPH_EXACT_EDGE_LIMIT: int = int(os.getenv("GRAPH_EXACT_EDGE_LIMIT", "2000"))  # nodes; all pairs above threshold
+    GRAPH_ANN_EDGE_LIMIT: int = int(os.getenv("GRAPH_ANN_EDGE_LIMIT", "4000"))  # nodes; exact k-NN up to here, HNSW beyond
+    GRAPH_MAX_NEIGHBORS: int = int(os.getenv("GRAPH_MAX_NEIGHBORS", "10"))  # edges per node for large graphs
+    GRAPH_EDGE_CACHE_TTL: int = int(os.getenv("GRAPH_EDGE_CACHE_TTL", "600"))  # seconds
+    GRAPH_NEIGHBOR_CACHE_TTL: int = int(os.getenv("GRAPH_NEIGHBOR_CACHE_TTL", "3600"))  # kNN lists for learning paths
+
+    # Conversation intelligence (single-call structured extraction, map-reduce over chunks)
+    CONVERSATION_EXTRACTION_CHUNK_CHARS: int = int(os.getenv("CONVERSATION_EXTRACTION_CHUNK_CHARS", "24000"))  # transcript per call
+    CONVERSATION_EXTRACTION_MESSAGE_CHARS: int = int(os.getenv("CONVERSATION_EXTRACTION_MESSAGE_CHARS", "4000"))  # per message
+    CONVERSATION_EXTRACTION_MAX_TOKENS: int = int(os.getenv("CONVERSATION_EXTRACTION_MAX_TOKENS", "3000"))
+    CONVERSATION_EXTRACTION_CONCURRENCY: int = int(os.getenv("CONVERSATION_EXTRACTION_CONCURRENCY", "4"))  # map calls in flight
+
+    # Streaming exports (server-side cursor batches; memory stays bounded by batch size)
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
     # Cache (Redis optional)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL", None)
     CACHE_ENABLED: bool = bool(os.getenv("REDIS_URL", False))
     
+    # Task progress bus (Redis/DragonflyDB pub/sub fan-out to WebSocket clients)
+    PROGRESS_MAX_UPDATES_PER_SECOND: float = float(os.getenv("PROGRESS_MAX_UPDATES_PER_SECOND", "4"))  # per task, latest wins
+    
     # Celery configuration for distributed task processing
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
     CELERY_TASK_ALWAYS_EAGER: bool = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False").lower() == "true"
+    # Per-process async runtime shared by Celery tasks (app/workers/async_runtime.py)
+    WORKER_DB_POOL_MIN_SIZE: int = int(os.getenv("WORKER_DB_POOL_MIN_SIZE", "1"))
+    WORKER_DB_POOL_MAX_SIZE: int = int(os.getenv("WORKER_DB_POOL_MAX_SIZE", "5"))
     CACHE_TTL_SECONDS: int = 3600  # 1 hour default
     CACHE_TTL_SEARCH: int = 300  # 5 minutes for search results
     CACHE_TTL_ITEM: int = 1800  # 30 minutes for items
+    CACHE_TTL_INSIGHTS: int = 600  # 10 minutes for dynamic insights
     
     # Additional settings from .env
 # Environment setting moved to top of configuration
@@ -96,13 +189,32 @@ class Settings(BaseSettings):
     GITHUB_CLIENT_SECRET: Optional[str] = os.getenv("GITHUB_CLIENT_SECRET", None)
     GITHUB_OAUTH_REDIRECT_URI: Optional[str] = os.getenv("GITHUB_OAUTH_REDIRECT_URI", None)
     
+    # Pooled outbound HTTP clients (app/services/http_client_factory.py)
+    HTTP_CLIENT_HTTP2: bool = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"  # used when h2 is installed
+    HTTP_CLIENT_MAX_PER_HOST: int = int(os.getenv("HTTP_CLIENT_MAX_PER_HOST", "8"))  # in-flight requests per host
+    HTTP_CLIENT_DNS_TTL: float = float(os.getenv("HTTP_CLIENT_DNS_TTL", "300"))
+    HTTP_CLIENT_RETRY_BUDGET_RATIO: float = float(os.getenv("HTTP_CLIENT_RETRY_BUDGET_RATIO", "0.2"))  # retries per request
+    HTTP_CLIENT_RETRY_BUDGET_MIN_PER_SECOND: float = float(os.getenv("HTTP_CLIENT_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+    
     # Firecrawl Web Scraping
     FIRECRAWL_API_KEY: Optional[str] = None
     FIRECRAWL_BASE_URL: str = "https://api.firecrawl.dev"
+
+    # Smart scraper orchestration (result cache, per-domain learning, hedging)
+    SCRAPE_CACHE_ENABLED: bool = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+    SCRAPE_CACHE_FRESH_SECONDS: int = int(os.getenv("SCRAPE_CACHE_FRESH_SECONDS", "3600"))  # served without contacting the origin
+    SCRAPE_CACHE_TTL: int = int(os.getenv("SCRAPE_CACHE_TTL", "604800"))  # kept for ETag/Last-Modified revalidation
+    SCRAPER_HEDGE_ENABLED: bool = os.getenv("SCRAPER_HEDGE_ENABLED", "true").lower() == "true"
+    SCRAPER_HEDGE_AFTER_SECONDS: float = float(os.getenv("SCRAPER_HEDGE_AFTER_SECONDS", "8"))  # upper bound; learned per domain
+    SCRAPER_PER_HOST_CONCURRENCY: int = int(os.getenv("SCRAPER_PER_HOST_CONCURRENCY", "2"))
+    SCRAPER_DOMAIN_MIN_SAMPLES: int = int(os.getenv("SCRAPER_DOMAIN_MIN_SAMPLES", "3"))  # before a domain's history reorders scrapers
     
     # OpenCLIP Vision
     OPENCLIP_MODEL: str = "ViT-B-32"
     OPENCLIP_PRETRAINED: str = "openai"
+    OPENCLIP_MAX_BATCH_SIZE: int = int(os.getenv("OPENCLIP_MAX_BATCH_SIZE", "32"))  # inputs per forward pass
+    OPENCLIP_MAX_WAIT_MS: float = float(os.getenv("OPENCLIP_MAX_WAIT_MS", "10"))  # wait to fill a batch
+    OPENCLIP_PREPROCESS_WORKERS: int = int(os.getenv("OPENCLIP_PREPROCESS_WORKERS", "2"))  # decode/resize threads
     
     # Voice Settings
     VOICE_TTS_ENGINE: str = os.getenv("VOICE_TTS_ENGINE", "piper")  # piper, chatterbox, edge-tts
@@ -111,6 +223,12 @@ class Settings(BaseSettings):
     VOICE_ENABLE_STREAMING: bool = os.getenv("VOICE_ENABLE_STREAMING", "false").lower() == "true"
     VOICE_DEFAULT_GENDER: str = os.getenv("VOICE_DEFAULT_GENDER", "female")  # male, female
     VOICE_EMOTION_STRENGTH: float = float(os.getenv("VOICE_EMOTION_STRENGTH", "1.0"))
+    # whisper.cpp chunked transcription (process pool, models stay loaded per worker)
+    WHISPER_WORKERS: int = int(os.getenv("WHISPER_WORKERS", "0"))  # 0 = half the CPUs
+    WHISPER_THREADS_PER_WORKER: int = int(os.getenv("WHISPER_THREADS_PER_WORKER", "0"))  # 0 = CPUs / workers
+    WHISPER_CHUNK_SECONDS: float = float(os.getenv("WHISPER_CHUNK_SECONDS", "60"))
+    WHISPER_CHUNK_OVERLAP_SECONDS: float = float(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "1.0"))
+    WHISPER_SILENCE_SEARCH_SECONDS: float = float(os.getenv("WHISPER_SILENCE_SEARCH_SECONDS", "5"))  # look for a pause this far around each cut
     RATE_LIMITING_ENABLED: bool = True
     
     # Service Port Configuration (Exclusive Port Ownership)
@@ -9,7 +9,7 @@ from app.db.database import get_db_pool, update_item_embedding
 from app.services.embedding_manager import embedding_manager
 from app.services.embedding_service import EmbeddingService
 from app.services.llm_processor import LLMProcessor
-from app.services.smart_scraper import SmartScraperService
+from app.services.smart_scraper import smart_scraper
 from app.services.unified_ai_service import unified_ai_service
 from app.utils.content_fingerprint import (
     ContentFingerprintManager,
@@ -24,7 +24,8 @@ class CaptureEngine:
     """Handles the capture and processing of items"""
     
     def __init__(self):
-        self.scraper = SmartScraperService()
+        # Shared so the scrape cache and per-domain learning span all engines
+        self.scraper = smart_scraper
         self.llm_processor = LLMProcessor()
         self.embedding_service = EmbeddingService()
     
@@ -1,18 +1,26 @@
 """Search engine using PostgreSQL full-text search"""
+import json
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
 
 import asyncpg
 
+from app.config import settings
 from app.models.schemas import SearchResult
+from app.services.cache import cache_service, CacheKeys
+from app.utils.pagination import decode_cursor, encode_cursor
 
 
 class SearchEngine:
     """Handles search queries using PostgreSQL FTS"""
-    
+
+    # Below this planner estimate an exact COUNT is cheap enough to run
+    EXACT_COUNT_THRESHOLD = 10000
+
     def __init__(self, conn: asyncpg.Connection):
         self.conn = conn
-    
+
     async def search(
         self,
         query: str,
@@ -20,81 +28,78 @@ class SearchEngine:
         type_filter: str = "all",
         tags: List[str] = [],
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[SearchResult]:
         """
         Perform full-text search with filters
         """
-        # Build the WHERE clause - include processed and pending items
-        where_clauses = ["i.status IN ('processed', 'pending', 'completed')"]
-        params = []
-        param_count = 1
-        
-        # Add search query
-        if query:
-            where_clauses.append(f"i.search_vector @@ plainto_tsquery('english', ${param_count})")
-            params.append(query)
-            param_count += 1
-        
-        # Add date filter
-        if date_filter != "all":
-            date_clause, date_param = self._build_date_filter(date_filter)
-            if date_clause:
-                where_clauses.append(date_clause.replace("$1", f"${param_count}"))
-                params.append(date_param)
-                param_count += 1
-        
-        # Add tag filter
-        if tags:
-            tag_placeholders = ", ".join([f"${i}" for i in range(param_count, param_count + len(tags))])
-            where_clauses.append(f"""
-                EXISTS (
-                    SELECT 1 FROM item_tags it
-                    JOIN tags t ON it.tag_id = t.id
-                    WHERE it.item_id = i.id AND t.name IN ({tag_placeholders})
-                )
-            """)
-            params.extend(tags)
-            param_count += len(tags)
-        
-        # Build the query
-        where_clause = " AND ".join(where_clauses)
-        
+        page = await self.search_page(
+            query, date_filter, type_filter, tags, limit, offset, cursor
+        )
+        return page["results"]
+
+    async def search_page(
+        self,
+        query: str,
+        date_filter: str = "all",
+        type_filter: str = "all",
+        tags: List[str] = [],
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Perform full-text search and return one page plus the cursor for the next.
+
+        Pages are keyed on (rank, created_at, id); `offset` is only honoured when
+        no cursor is given, for older clients.
+        """
+        where_clauses, params = self._build_where(query, date_filter, tags)
+
         # Add ranking for relevance
         rank_clause = ""
         if query:
-            rank_clause = f", ts_rank(i.search_vector, plainto_tsquery('english', $1)) as rank"
-            order_clause = "ORDER BY rank DESC, i.created_at DESC"
+            rank_expr = "ts_rank(i.search_vector, plainto_tsquery('english', $1))::float8"
+            rank_clause = f", {rank_expr} as rank"
+            sort_key = f"({rank_expr}, i.created_at, i.id)"
+            order_clause = "ORDER BY rank DESC, i.created_at DESC, i.id DESC"
         else:
-            order_clause = "ORDER BY i.created_at DESC"
-        
+            sort_key = "(i.created_at, i.id)"
+            order_clause = "ORDER BY i.created_at DESC, i.id DESC"
+
+        cursor_values = self.parse_cursor(cursor, ranked=bool(query))
+        if cursor_values:
+            placeholders = ", ".join(
+                f"${i}" for i in range(len(params) + 1, len(params) + 1 + len(cursor_values))
+            )
+            where_clauses.append(f"{sort_key} < ({placeholders})")
+            params.extend(cursor_values)
+            offset = 0
+
+        where_clause = " AND ".join(where_clauses)
+
+        # Tags come pre-aggregated on the row, so no join or GROUP BY is needed
         sql = f"""
-            SELECT 
+            SELECT
                 i.id,
                 i.title,
                 i.url,
                 COALESCE(i.summary, LEFT(i.processed_content, 200)) as snippet,
                 i.created_at,
-                COALESCE(
-                    array_agg(t.name) FILTER (WHERE t.name IS NOT NULL), 
-                    '{{}}'::text[]
-                ) as tags
+                i.tag_names as tags
                 {rank_clause}
             FROM items i
-            LEFT JOIN item_tags it ON i.id = it.item_id
-            LEFT JOIN tags t ON it.tag_id = t.id
             WHERE {where_clause}
-            GROUP BY i.id, i.title, i.url, i.summary, i.processed_content, i.created_at, i.search_vector
             {order_clause}
-            LIMIT ${param_count} OFFSET ${param_count + 1}
+            LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}
         """
-        
-        params.append(limit)
-        params.append(offset)
-        
-        # Execute query
-        rows = await self.conn.fetch(sql, *params)
-        
+
+        # Fetch one extra row to know whether another page exists
+        rows = await self.conn.fetch(sql, *params, limit + 1, offset)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
         # Convert to SearchResult objects
         results = []
         for row in rows:
@@ -103,70 +108,125 @@ class SearchEngine:
                 title=row['title'],
                 url=row['url'],
                 snippet=row['snippet'] or '',
-                tags=row['tags'],
+                tags=row['tags'] or [],
                 created_at=row['created_at'],
                 score=row.get('rank')
             ))
-        
-        return results
-    
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            cursor_values = {"created_at": last['created_at'], "id": last['id']}
+            if query:
+                cursor_values["rank"] = last['rank']
+            next_cursor = encode_cursor(cursor_values)
+
+        return {"results": results, "next_cursor": next_cursor}
+
     async def count_results(
         self,
         query: str,
         date_filter: str = "all",
         type_filter: str = "all",
-        tags: List[str] = []
+        tags: List[str] = [],
+        exact: bool = False
     ) -> int:
         """
         Count total results for a search query
+
+        Uses the same filters as search(). Large result sets get the planner's
+        row estimate instead of a full COUNT unless `exact` is set; either way
+        the value is cached for CACHE_TTL_SEARCH seconds.
+        """
+        cache_key = cache_service.make_key(
+            CacheKeys.SEARCH, "count", query or "", date_filter=date_filter,
+            tags=",".join(sorted(tags)), exact=exact
+        )
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return cached
+
+        where_clauses, params = self._build_where(query, date_filter, tags)
+        where_clause = " AND ".join(where_clauses)
+
+        count = None
+        if not exact:
+            plan = await self.conn.fetchval(
+                f"EXPLAIN (FORMAT JSON) SELECT 1 FROM items i WHERE {where_clause}",
+                *params
+            )
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate > self.EXACT_COUNT_THRESHOLD:
+                count = estimate
+
+        if count is None:
+            count = await self.conn.fetchval(
+                f"SELECT COUNT(*) FROM items i WHERE {where_clause}", *params
+            )
+
+        await cache_service.set(cache_key, count, settings.CACHE_TTL_SEARCH)
+        return count
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str], ranked: bool) -> Optional[List[Any]]:
+        """
+        Sort-key values of a search_page cursor: [rank,] created_at, id.
+
+        Raises ValueError if the cursor is malformed or was not issued for a
+        search of this kind (ranked or not).
+        """
+        after = decode_cursor(cursor)
+        if after is None:
+            return None
+        try:
+            created_at, item_id = after["created_at"], UUID(after["id"])
+            values = [float(after["rank"]), created_at, item_id] if ranked else [created_at, item_id]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+        if not isinstance(created_at, datetime):
+            raise ValueError("Invalid pagination cursor")
+        return values
+
+    def _build_where(
+        self,
+        query: str,
+        date_filter: str,
+        tags: List[str]
+    ) -> Tuple[List[str], List[Any]]:
         """
-        # Build the WHERE clause (same as search)
-        where_clauses = ["i.status = 'completed'"]
-        params = []
-        param_count = 1
-        
+        Build the WHERE clauses shared by search and count
+        """
+        # Include processed and pending items
+        where_clauses = ["i.status IN ('processed', 'pending', 'completed')"]
+        params: List[Any] = []
+
+        # Add search query
         if query:
-            where_clauses.append(f"i.search_vector @@ plainto_tsquery('english', ${param_count})")
             params.append(query)
-            param_count += 1
-        
+            where_clauses.append(f"i.search_vector @@ plainto_tsquery('english', ${len(params)})")
+
+        # Add date filter
         if date_filter != "all":
             date_clause, date_param = self._build_date_filter(date_filter)
             if date_clause:
-                where_clauses.append(date_clause.replace("$1", f"${param_count}"))
                 params.append(date_param)
-                param_count += 1
-        
+                where_clauses.append(date_clause.replace("$1", f"${len(params)}"))
+
+        # Add tag filter (any of the given tags)
         if tags:
-            tag_placeholders = ", ".join([f"${i}" for i in range(param_count, param_count + len(tags))])
-            where_clauses.append(f"""
-                EXISTS (
-                    SELECT 1 FROM item_tags it
-                    JOIN tags t ON it.tag_id = t.id
-                    WHERE it.item_id = i.id AND t.name IN ({tag_placeholders})
-                )
-            """)
-            params.extend(tags)
-        
-        where_clause = " AND ".join(where_clauses)
-        
-        sql = f"""
-            SELECT COUNT(DISTINCT i.id) as count
-            FROM items i
-            LEFT JOIN item_tags it ON i.id = it.item_id
-            LEFT JOIN tags t ON it.tag_id = t.id
-            WHERE {where_clause}
-        """
-        
-        result = await self.conn.fetchrow(sql, *params)
-        return result['count']
-    
+            params.append(list(tags))
+            where_clauses.append(f"i.tag_names && ${len(params)}::text[]")
+
+        return where_clauses, params
+
     def _build_date_filter(self, date_filter: str) -> tuple[str, datetime]:
         """
         Build date filter clause
         """
         now = datetime.now()
-        
+
         if date_filter == "today":
             date = now.replace(hour=0, minute=0, second=0, microsecond=0)
             return "i.created_at >= $1", date
@@ -179,5 +239,5 @@ class SearchEngine:
         elif date_filter == "year":
             date = now - timedelta(days=365)
             return "i.created_at >= $1", date
-        
-        return "", None
\ No newline at end of file
+
+        return "", None
@@ -47,13 +47,13 @@ async def safe_register_vector(conn):
         logger.warning(f"Could not register pgvector: {e} - vector operations will be disabled")
 
 
-async def create_db_pool():
+async def create_db_pool(min_size: int = 10, max_size: int = 20):
     """Create database connection pool"""
     global _db_pool
     _db_pool = await asyncpg.create_pool(
         settings.DATABASE_URL,
-        min_size=10,
-        max_size=20,
+        min_size=min_size,
+        max_size=max_size,
         command_timeout=60,
         server_settings={'jit': 'off'},  # Disable JIT for stability
         setup=setup_connection,  # Custom setup to disable prepared statements
@@ -3,15 +3,19 @@ from typing import Any, Dict, List
 
 import asyncpg
 
+# Daily and hourly aggregates read the trigger-maintained rollup tables from
+# migration 028 (UTC day granularity) instead of scanning items.
+
 
 async def get_knowledge_graph_tags(db_connection: asyncpg.Connection) -> List[Dict[str, Any]]:
     """
     Retrieves all tags and their counts for knowledge graph nodes.
     """
     query = """
-        SELECT tag, COUNT(*) as count
-        FROM item_tags
-        GROUP BY tag;
+        SELECT tag, SUM(item_count) as count
+        FROM analytics_tag_rollup
+        GROUP BY tag
+        HAVING SUM(item_count) > 0;
     """
     return await db_connection.fetch(query)
 
@@ -31,10 +35,11 @@ async def get_daily_additions(db_connection: asyncpg.Connection) -> List[Dict[st
     Retrieves daily content additions for the last 30 days.
     """
     query = """
-        SELECT DATE(created_at) as date, COUNT(*) as count
-        FROM items
-        WHERE created_at >= NOW() - INTERVAL '30 days'
-        GROUP BY DATE(created_at)
+        SELECT day as date, SUM(item_count) as count
+        FROM analytics_item_rollup
+        WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - 30
+        GROUP BY day
+        HAVING SUM(item_count) > 0
         ORDER BY date;
     """
     return await db_connection.fetch(query)
@@ -44,10 +49,11 @@ async def get_peak_activity_hours(db_connection: asyncpg.Connection) -> List[Dic
     Retrieves peak activity hours based on content creation in the last 7 days.
     """
     query = """
-        SELECT EXTRACT(HOUR FROM created_at) as hour, COUNT(*) as count
-        FROM items
-        WHERE created_at >= NOW() - INTERVAL '7 days'
-        GROUP BY EXTRACT(HOUR FROM created_at)
+        SELECT hour, SUM(item_count) as count
+        FROM analytics_item_rollup
+        WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - 7
+        GROUP BY hour
+        HAVING SUM(item_count) > 0
         ORDER BY count DESC;
     """
     return await db_connection.fetch(query)
@@ -56,14 +62,23 @@ async def get_total_items_last_30_days(db_connection: asyncpg.Connection) -> int
     """
     Retrieves the total number of items created in the last 30 days.
     """
-    query = "SELECT COUNT(*) FROM items WHERE created_at >= NOW() - INTERVAL '30 days';"
+    query = """
+        SELECT COALESCE(SUM(item_count), 0)
+        FROM analytics_item_rollup
+        WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - 30;
+    """
     return await db_connection.fetchval(query)
 
 async def get_total_items_prev_30_days(db_connection: asyncpg.Connection) -> int:
     """
     Retrieves the total number of items created in the previous 30 days.
     """
-    query = "SELECT COUNT(*) FROM items WHERE created_at >= NOW() - INTERVAL '60 days' AND created_at < NOW() - INTERVAL '30 days';"
+    query = """
+        SELECT COALESCE(SUM(item_count), 0)
+        FROM analytics_item_rollup
+        WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - 60
+          AND day < (NOW() AT TIME ZONE 'UTC')::date - 30;
+    """
     return await db_connection.fetchval(query)
 
 async def get_semantic_cluster_tags(db_connection: asyncpg.Connection) -> List[Dict[str, Any]]:
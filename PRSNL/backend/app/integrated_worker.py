@@ -135,7 +135,7 @@ class IntegratedWorker:
                     text_for_embedding = f"{title} {content[:2000]}"
                     embeddings = await self.ai_service.generate_embeddings([text_for_embedding])
                     
-                    if embeddings and len(embeddings) > 0:
+                    if embeddings and embeddings[0] is not None:
                         embedding = embeddings[0]
                         
                         # Convert to PostgreSQL format
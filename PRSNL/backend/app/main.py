@@ -139,8 +139,13 @@ from app.db.database import (
     init_sqlalchemy,
 )
 from app.services.cache import cache_service
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.services.storage_manager import StorageManager
 from app.services.codemirror_realtime_service import realtime_service
+from app.services.realtime_progress_service import realtime_progress_service
+from app.services.near_duplicate_index import near_duplicate_index
+from app.services.capture_pipeline import capture_pipeline
+from app.services.vector_index import vector_index_service
 from app.workers.celery_app import celery_app
 
 # Placeholder for worker task
@@ -181,6 +186,19 @@ async def startup_event():
     await realtime_service.start()
     logger.info("✅ CodeMirror real-time service started")
     
+    # Fan out task progress published by any process (API or Celery workers)
+    await realtime_progress_service.start()
+    
+    # Load/build the in-process ANN index in the background (pgvector serves until ready)
+    asyncio.create_task(vector_index_service.start())
+    
+    # Keep MinHash signatures current for capture-time near-duplicate checks
+    await near_duplicate_index.start()
+    
+    # Run queued capture stages (scraping, previews, enrichment) off the request path
+    if settings.CAPTURE_PIPELINE_ENABLED:
+        await capture_pipeline.start()
+    
     # Initialize Celery app for task dispatching
     logger.info(f"✅ Celery app initialized: {celery_app.main}")
     logger.info(f"✅ Celery broker: {celery_app.conf.broker_url}")
@@ -223,11 +241,20 @@ async def shutdown_event():
     if settings.CACHE_ENABLED:
         await cache_service.disconnect()
     
+    await realtime_progress_service.stop()
+    
     # Stop CodeMirror real-time service
     await realtime_service.stop()
     logger.info("✅ CodeMirror real-time service stopped")
     
+    # Snapshot the ANN index so the next start only replays recent changes
+    await vector_index_service.stop()
+    await near_duplicate_index.stop()
+    if settings.CAPTURE_PIPELINE_ENABLED:
+        await capture_pipeline.stop()
+    
     await close_db_pool()
+    await http_client_factory.close_all_clients()
     await background_tasks.shutdown()
 
 async def run_periodic_cleanup(storage_manager: StorageManager):
@@ -447,7 +474,7 @@ async def health_check():
     # Check Azure OpenAI Availability
     try:
         if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(
                     f"{settings.AZURE_OPENAI_ENDPOINT}/openai/models?api-version={settings.AZURE_OPENAI_API_VERSION}",
                     headers={"api-key": settings.AZURE_OPENAI_API_KEY},
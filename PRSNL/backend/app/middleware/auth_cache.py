@@ -0,0 +1,133 @@
+"""
+Auth Cache
+In-process caches for bearer-token authentication (UnifiedAuthService).
+
+- Verified claims are cached by SHA-256 of the token until the token expires,
+  capped at AUTH_TOKEN_CACHE_TTL, so repeat requests skip signature checks and
+  identity-provider round trips
+- Tokens that fail verification are remembered for AUTH_NEGATIVE_CACHE_TTL, so
+  replaying a bad token cannot force a provider call per request
+- External identity -> PRSNL user mappings are cached for AUTH_USER_MAPPING_TTL
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+_MISSING = object()
+
+
+class ExpiringLRU:
+    """Bounded LRU whose entries also expire after a per-entry TTL"""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenCache:
+    """Verified claims and rejections keyed by token hash"""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_ttl: float,
+        negative_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time
+    ):
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._wall_clock = wall_clock
+        self._entries = ExpiringLRU(max_entries, clock)
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stored": 0, "rejected": 0}
+
+    @staticmethod
+    def key(token: str) -> str:
+        # Never keep raw bearer tokens in memory longer than the request
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def lookup(self, token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(hit, claims); a hit with claims None means the token is known to be invalid."""
+        value = self._entries.get(self.key(token), _MISSING)
+        if value is _MISSING:
+            self.stats["misses"] += 1
+            return False, None
+        if value is None:
+            self.stats["negative_hits"] += 1
+            return True, None
+        self.stats["hits"] += 1
+        return True, dict(value)
+
+    def store(self, token: str, claims: Dict[str, Any]):
+        ttl = self.max_ttl
+        if claims.get("exp"):
+            ttl = min(ttl, float(claims["exp"]) - self._wall_clock())
+        self._entries.set(self.key(token), dict(claims), ttl)
+        self.stats["stored"] += 1
+
+    def reject(self, token: str):
+        self._entries.set(self.key(token), None, self.negative_ttl)
+        self.stats["rejected"] += 1
+
+    def invalidate(self, token: str):
+        self._entries.pop(self.key(token))
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round((self.stats["hits"] + self.stats["negative_hits"]) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class UserMappingCache:
+    """(auth source, external user id) -> PRSNL user id"""
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._entries = ExpiringLRU(max_entries, clock)
+
+    def get(self, source: str, external_id: str) -> Optional[UUID]:
+        return self._entries.get((source, external_id))
+
+    def set(self, source: str, external_id: str, prsnl_user_id: UUID):
+        self._entries.set((source, external_id), prsnl_user_id, self.ttl)
+
+    def invalidate(self, source: str, external_id: str):
+        self._entries.pop((source, external_id))
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -5,107 +5,148 @@ Handles authentication with both identity systems and provides unified user cont
 
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any, Tuple
 from uuid import UUID
-import httpx
 import jwt
-from datetime import datetime, timezone
 
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.security import HTTPBearer
 
 from app.config import settings
 from app.db.database import get_db_pool
+from app.middleware.auth_cache import TokenCache, UserMappingCache
+from app.services.http_client_factory import ClientType, http_client_factory
 
 logger = logging.getLogger(__name__)
 
+
+class JWKSKeyring:
+    """Signing keys from one identity provider's JWKS endpoint, refetched on unknown kid"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self._keys: Dict[str, Tuple[Any, str]] = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str, refresh: bool = True) -> Optional[Tuple[Any, str]]:
+        """(public key, algorithm) for kid, refetching the JWKS if stale or kid is unknown."""
+        now = time.monotonic()
+        stale = now - self._fetched_at > settings.AUTH_JWKS_TTL
+        if (kid not in self._keys or stale) and refresh:
+            await self._refresh()
+        return self._keys.get(kid)
+
+    async def _refresh(self):
+        async with self._lock:
+            # Unknown kids are attacker-controlled; never refetch more than once per interval
+            if time.monotonic() - self._attempted_at < settings.AUTH_JWKS_MIN_REFRESH_SECONDS:
+                return
+            self._attempted_at = time.monotonic()
+            try:
+                client = await http_client_factory.get_client(ClientType.GENERAL)
+                response = await client.get(self.url, timeout=5.0)
+                response.raise_for_status()
+                keys = {}
+                for key_data in response.json().get('keys', []):
+                    if key_data.get('use', 'sig') != 'sig' or not key_data.get('kid'):
+                        continue
+                    try:
+                        jwk = jwt.PyJWK(key_data)
+                    except jwt.PyJWKError as e:
+                        logger.debug(f"Skipping unusable {self.name} key {key_data.get('kid')}: {e}")
+                        continue
+                    keys[key_data['kid']] = (jwk.key, key_data.get('alg', 'RS256'))
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+            except Exception as e:
+                # Keep serving the last good keys
+                logger.warning(f"Failed to fetch {self.name} signing keys: {e}")
+
+
 class UnifiedAuthService:
     """Unified authentication service for Keycloak + FusionAuth integration"""
     
     def __init__(self):
         self.security = HTTPBearer(auto_error=False)
-        self._keycloak_public_keys = None
-        self._keys_cache_time = None
-        self._fusionauth_client = httpx.AsyncClient(timeout=10.0)
+        keycloak_url = getattr(settings, 'KEYCLOAK_URL', 'http://localhost:8080')
+        realm = getattr(settings, 'KEYCLOAK_REALM', 'prsnl')
+        fusionauth_url = getattr(settings, 'FUSIONAUTH_URL', 'http://localhost:9011')
+        self._keyrings = {
+            'keycloak': JWKSKeyring('Keycloak', f"{keycloak_url}/realms/{realm}/protocol/openid-connect/certs"),
+            'fusionauth': JWKSKeyring('FusionAuth', f"{fusionauth_url}/.well-known/jwks.json"),
+        }
+        self.token_cache = TokenCache(
+            max_entries=settings.AUTH_TOKEN_CACHE_SIZE,
+            max_ttl=settings.AUTH_TOKEN_CACHE_TTL,
+            negative_ttl=settings.AUTH_NEGATIVE_CACHE_TTL
+        )
+        self.user_mappings = UserMappingCache(
+            max_entries=settings.AUTH_TOKEN_CACHE_SIZE,
+            ttl=settings.AUTH_USER_MAPPING_TTL
+        )
         
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self._fusionauth_client.aclose()
+        # HTTP clients are pooled by http_client_factory and closed at shutdown
+        pass
 
-    async def get_keycloak_public_keys(self) -> Dict[str, Any]:
-        """Get Keycloak public keys for JWT verification (cached)"""
-        try:
-            # Cache keys for 1 hour
-            if (self._keycloak_public_keys and self._keys_cache_time and 
-                (datetime.now(timezone.utc) - self._keys_cache_time).seconds < 3600):
-                return self._keycloak_public_keys
-            
-            keycloak_url = getattr(settings, 'KEYCLOAK_URL', 'http://localhost:8080')
-            realm = getattr(settings, 'KEYCLOAK_REALM', 'prsnl')
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{keycloak_url}/realms/{realm}/protocol/openid-connect/certs",
-                    timeout=5.0
-                )
-                response.raise_for_status()
-                self._keycloak_public_keys = response.json()
-                self._keys_cache_time = datetime.now(timezone.utc)
-                return self._keycloak_public_keys
-                
-        except Exception as e:
-            logger.warning(f"Failed to fetch Keycloak public keys: {e}")
-            return {}
+    @staticmethod
+    def _auth_data(source: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if source == 'keycloak':
+            roles = payload.get('realm_access', {}).get('roles', [])
+            username = payload.get('preferred_username')
+        else:
+            roles = payload.get('roles', [])
+            username = payload.get('preferred_username', payload.get('email'))
+        return {
+            'user_id': payload.get('sub'),
+            'email': payload.get('email'),
+            'preferred_username': username,
+            'given_name': payload.get('given_name'),
+            'family_name': payload.get('family_name'),
+            'roles': roles,
+            'exp': payload.get('exp'),
+            'iat': payload.get('iat'),
+            'source': source
+        }
 
-    async def verify_keycloak_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify JWT token with Keycloak"""
-        try:
-            # Get public keys
-            keys_data = await self.get_keycloak_public_keys()
-            if not keys_data.get('keys'):
-                logger.warning("No Keycloak public keys available")
-                return None
-            
-            # Try to decode with each key
-            for key_data in keys_data['keys']:
-                try:
-                    # Create the public key (simplified - in production use proper key handling)
-                    payload = jwt.decode(
-                        token,
-                        options={"verify_signature": False},  # Simplified for demo
-                        algorithms=["RS256", "HS256"]
-                    )
-                    
-                    # Validate token claims
-                    if payload.get('exp', 0) < datetime.now(timezone.utc).timestamp():
-                        logger.warning("Keycloak token expired")
-                        return None
-                    
-                    return {
-                        'user_id': payload.get('sub'),
-                        'email': payload.get('email'),
-                        'preferred_username': payload.get('preferred_username'),
-                        'given_name': payload.get('given_name'),
-                        'family_name': payload.get('family_name'),
-                        'roles': payload.get('realm_access', {}).get('roles', []),
-                        'exp': payload.get('exp'),
-                        'iat': payload.get('iat'),
-                        'source': 'keycloak'
-                    }
-                except jwt.InvalidTokenError:
-                    continue
-            
-            logger.warning("Failed to verify Keycloak token with any key")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error verifying Keycloak token: {e}")
+    async def verify_local_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verify a JWT signature in-process against Keycloak/FusionAuth JWKS.
+
+        Returns None when no provider publishes the token's signing key (e.g.
+        FusionAuth HS256 tokens); raises jwt.InvalidTokenError for tokens that
+        are malformed, expired or fail signature verification.
+        """
+        kid = jwt.get_unverified_header(token).get('kid')
+        if not kid:
             return None
 
+        # Known keys first; only refetch JWKS when no provider recognises the kid
+        for refresh in (False, True):
+            for source, keyring in self._keyrings.items():
+                found = await keyring.get_key(kid, refresh=refresh)
+                if found is None:
+                    continue
+                key, algorithm = found
+                payload = jwt.decode(
+                    token,
+                    key,
+                    algorithms=[algorithm],
+                    options={"verify_aud": False, "require": ["exp", "sub"]},
+                    leeway=10
+                )
+                return self._auth_data(source, payload)
+        return None
+
     async def verify_fusionauth_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify JWT token with FusionAuth"""
+        """Verify JWT token remotely with FusionAuth (tokens whose key is not in its JWKS)"""
         try:
             fusionauth_url = getattr(settings, 'FUSIONAUTH_URL', 'http://localhost:9011')
             api_key = getattr(settings, 'FUSIONAUTH_API_KEY', '')
@@ -115,32 +156,24 @@ class UnifiedAuthService:
                 return None
             
             # Validate token with FusionAuth
-            response = await self._fusionauth_client.post(
+            client = await http_client_factory.get_client(ClientType.GENERAL)
+            response = await client.post(
                 f"{fusionauth_url}/api/jwt/validate",
                 headers={
                     'Authorization': api_key,
                     'Content-Type': 'application/json'
                 },
-                json={'encodedJWT': token}
+                json={'encodedJWT': token},
+                timeout=10.0
             )
             
             if response.status_code == 200:
                 data = response.json()
-                jwt_data = data.get('jwt', {})
-                
-                return {
-                    'user_id': jwt_data.get('sub'),
-                    'email': jwt_data.get('email'),
-                    'preferred_username': jwt_data.get('preferred_username', jwt_data.get('email')),
-                    'given_name': jwt_data.get('given_name'),
-                    'family_name': jwt_data.get('family_name'),
-                    'roles': jwt_data.get('roles', []),
-                    'exp': jwt_data.get('exp'),
-                    'iat': jwt_data.get('iat'),
-                    'source': 'fusionauth'
-                }
+                return self._auth_data('fusionauth', data.get('jwt', {}))
             else:
                 logger.warning(f"FusionAuth token validation failed: {response.status_code}")
+                if response.status_code in (400, 401):
+                    self.token_cache.reject(token)
                 return None
                 
         except Exception as e:
@@ -149,6 +182,9 @@ class UnifiedAuthService:
 
     async def get_or_create_user_mapping(self, auth_data: Dict[str, Any]) -> Optional[UUID]:
         """Get or create user mapping between PRSNL users and auth systems"""
+        cached = self.user_mappings.get(auth_data['source'], auth_data['user_id'])
+        if cached:
+            return cached
         try:
             pool = await get_db_pool()
             async with pool.acquire() as conn:
@@ -165,6 +201,7 @@ class UnifiedAuthService:
                     )
                 
                 if mapping_row:
+                    self.user_mappings.set(auth_data['source'], auth_data['user_id'], mapping_row['prsnl_user_id'])
                     return mapping_row['prsnl_user_id']
                 
                 # Check if user exists by email
@@ -212,6 +249,7 @@ class UnifiedAuthService:
                             fusionauth_user_id = $2, updated_at = NOW()
                     """, prsnl_user_id, UUID(auth_data['user_id']))
                 
+                self.user_mappings.set(auth_data['source'], auth_data['user_id'], prsnl_user_id)
                 return prsnl_user_id
                 
         except Exception as e:
@@ -220,34 +258,59 @@ class UnifiedAuthService:
 
     async def authenticate_request(self, request: Request) -> Tuple[Optional[UUID], Optional[Dict[str, Any]]]:
         """Authenticate request using either Keycloak or FusionAuth"""
+        user_id, auth_data, _ = await self._authenticate(request)
+        return user_id, auth_data
+
+    async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verified claims for a bearer token, served from cache when possible"""
+        hit, auth_data = self.token_cache.lookup(token)
+        if hit:
+            return auth_data
+        return await self._verify_uncached(token)
+
+    async def _verify_uncached(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            auth_data = await self.verify_local_token(token)
+        except jwt.InvalidTokenError as e:
+            logger.debug(f"Rejected bearer token: {e}")
+            self.token_cache.reject(token)
+            return None
+
+        if not auth_data:
+            # No published key matched (e.g. FusionAuth HS256): ask FusionAuth
+            auth_data = await self.verify_fusionauth_token(token)
+        if auth_data:
+            self.token_cache.store(token, auth_data)
+        return auth_data
+
+    async def _authenticate(self, request: Request) -> Tuple[Optional[UUID], Optional[Dict[str, Any]], bool]:
+        """(user id, auth data, whether the token was verified fresh rather than served from cache)"""
         # Get authorization header
         authorization = request.headers.get("authorization")
         if not authorization:
-            return None, None
+            return None, None, False
         
         # Extract token
         try:
             scheme, token = authorization.split(" ", 1)
             if scheme.lower() != "bearer":
-                return None, None
+                return None, None, False
         except ValueError:
-            return None, None
-        
-        # Try Keycloak first, then FusionAuth
-        auth_data = await self.verify_keycloak_token(token)
-        if not auth_data:
-            auth_data = await self.verify_fusionauth_token(token)
+            return None, None, False
         
+        hit, auth_data = self.token_cache.lookup(token)
+        if not hit:
+            auth_data = await self._verify_uncached(token)
         if not auth_data:
-            return None, None
+            return None, None, False
         
         # Get or create user mapping
         prsnl_user_id = await self.get_or_create_user_mapping(auth_data)
         if not prsnl_user_id:
             logger.error("Failed to get/create user mapping")
-            return None, None
+            return None, None, False
         
-        return prsnl_user_id, auth_data
+        return prsnl_user_id, auth_data, not hit
 
     async def log_auth_session(self, user_mapping_id: UUID, auth_data: Dict[str, Any], request: Request):
         """Log authentication session for audit trails"""
@@ -297,13 +360,16 @@ async def get_current_user_context(request: Request) -> Optional[Dict[str, Any]]
 
 async def require_user_id(request: Request) -> UUID:
     """Dependency function that requires authentication"""
-    user_id, auth_data = await unified_auth.authenticate_request(request)
+    user_id, auth_data, fresh = await unified_auth._authenticate(request)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not fresh:
+        # Session already logged when this token was first verified
+        return user_id
     
     # Log the session for audit
     try:
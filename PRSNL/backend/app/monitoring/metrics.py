@@ -35,4 +35,50 @@ STORAGE_USAGE_BYTES = Gauge(
 HEALTH_CHECK_STATUS = Gauge(
     'health_check_status',
     'Status of the application health check (1=up, 0=down)'
-)
\ No newline at end of file
+)
+
+# AI completion cache (app/services/completion_cache.py)
+AI_COMPLETION_CACHE_REQUESTS = Counter(
+    'ai_completion_cache_requests_total',
+    'AI completion requests by cache outcome',
+    ['result'] # hit, semantic_hit, coalesced, miss, bypass
+)
+
+AI_COMPLETION_CACHE_ENTRIES = Gauge(
+    'ai_completion_cache_entries',
+    'Completions held in the in-process LRU'
+)
+
+CAPTURE_PIPELINE_JOBS = Counter(
+    'capture_pipeline_jobs_total',
+    'Capture pipeline jobs by stage and outcome',
+    ['stage', 'result'] # done, retried, failed, requeued
+)
+
+CAPTURE_PIPELINE_RUNNING = Gauge(
+    'capture_pipeline_running_jobs',
+    'Capture pipeline jobs currently running in this process',
+    ['stage']
+)
+
+ITEM_WORKER_QUEUE_DEPTH = Gauge(
+    'item_worker_queue_depth',
+    'Item ids waiting for an item_created processor'
+)
+
+ITEM_WORKER_BUSY = Gauge(
+    'item_worker_busy_processors',
+    'Item processors currently working on an item'
+)
+
+ITEM_WORKER_EVENTS = Counter(
+    'item_worker_events_total',
+    'Item ids offered to the item worker queue',
+    ['source', 'result'] # source: notify, sweep; result: queued, duplicate, dropped
+)
+
+ITEM_WORKER_ITEMS = Counter(
+    'item_worker_items_total',
+    'Items handled by the item worker',
+    ['result'] # completed, failed, skipped
+)
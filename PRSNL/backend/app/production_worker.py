@@ -14,6 +14,7 @@ import asyncpg
 from dotenv import load_dotenv
 
 # Import all processing services
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.services.smart_scraper import smart_scraper
 from app.services.platforms.youtube import YouTubeProcessor
 from app.services.document_processor import DocumentProcessor
@@ -194,11 +195,10 @@ class ProductionWorker:
                 logger.info(f"📄 PDF processing: {url}")
                 try:
                     # Download PDF and extract text
-                    import httpx
                     import tempfile
                     import os
                     
-                    async with httpx.AsyncClient() as client:
+                    async with http_client_factory.client_session(ClientType.MEDIA_DOWNLOAD) as client:
                         response = await client.get(url)
                         response.raise_for_status()
                         
@@ -256,7 +256,7 @@ class ProductionWorker:
                     text_for_embedding = f"{title} {content[:2000]}"
                     embeddings = await self.ai_service.generate_embeddings([text_for_embedding])
                     
-                    if embeddings and len(embeddings) > 0:
+                    if embeddings and embeddings[0] is not None:
                         embedding = embeddings[0]
                         embedding_str = '[' + ','.join(map(str, embedding)) + ']'
                         
@@ -1,7 +1,9 @@
 """
 AI Router Service - Intelligently routes AI tasks to appropriate providers
 Optimizes for cost, performance, and availability
-Can be enhanced with LangChain ReAct agent for content-based routing
+Scores providers locally from online latency/error/cost statistics
+(ai_router_stats), with circuit breaking and hedged requests; the LangChain
+ReAct agent router is opt-in (AI_ROUTER_LLM_ROUTING)
 """
 import asyncio
 import json
@@ -11,6 +13,7 @@ from typing import Any, Dict, List, Literal, Optional
 
 from app.core.langfuse_wrapper import observe  # Safe wrapper to handle get_tracer error
 from app.config import settings
+from app.services.ai_router_stats import ProviderScoreboard
 from app.services.ai_router_types import (
     AIProvider, TaskType, AITask, ProviderConfig, RoutingDecision
 )
@@ -23,7 +26,13 @@ class AIRouter:
     
     def __init__(self):
         self.providers = self._initialize_providers()
-        # Usage tracking now handled by Langfuse
+        # Usage tracking now handled by Langfuse; routing learns from local stats
+        self.scoreboard = ProviderScoreboard(
+            self.providers,
+            alpha=settings.AI_ROUTER_EWMA_ALPHA,
+            failure_threshold=settings.AI_ROUTER_BREAKER_FAILURES,
+            cooldown=settings.AI_ROUTER_BREAKER_COOLDOWN
+        )
         self.provider_health = {provider: True for provider in AIProvider}
         self.enhanced_ai_router = None
         self._init_enhanced_router()
@@ -49,7 +58,8 @@ class AIRouter:
                 supports_streaming=True,
                 supports_vision=True,  # Confirmed: GPT-4.1 supports vision
                 supports_embeddings=True,
-                avg_response_time_ms=500
+                avg_response_time_ms=500,
+                cost_per_1k_tokens=0.03
             ),
             AIProvider.FALLBACK: ProviderConfig(
                 name=AIProvider.FALLBACK,
@@ -66,36 +76,27 @@ class AIRouter:
         """
         Route task to the best provider based on:
         1. Task requirements (vision, streaming, embeddings)
-        2. Provider availability
-        3. Cost optimization
-        4. Performance requirements
+        2. Provider availability (circuit breakers)
+        3. Learned latency percentiles, error rate and token cost per task type
         """
-        suitable_providers = self._get_suitable_providers(task)
+        ranked = self._rank_providers(task)
         
-        if not suitable_providers:
+        if not ranked:
             logger.warning(f"No suitable providers for task {task.type}")
             return AIProvider.FALLBACK
-            
-        # Score providers based on multiple factors
-        scores = {}
-        for provider in suitable_providers:
-            scores[provider] = self._calculate_provider_score(provider, task)
-            
-        # Select provider with highest score
-        best_provider = max(scores, key=scores.get)
         
-        logger.info(f"Routing {task.type} task to {best_provider.value}")
-        return best_provider
+        logger.debug(f"Routing {task.type} task to {ranked[0].value}")
+        return ranked[0]
+    
+    def _rank_providers(self, task: AITask) -> List[AIProvider]:
+        """Suitable providers, best first"""
+        return self.scoreboard.rank(self._get_suitable_providers(task), task.type, task.priority)
     
     def _get_suitable_providers(self, task: AITask) -> List[AIProvider]:
         """Get providers that can handle the task requirements"""
         suitable = []
         
         for provider, config in self.providers.items():
-            # Skip unhealthy providers
-            if not self.provider_health.get(provider, True):
-                continue
-                
             # Check task compatibility
             if task.type == TaskType.VISION and not config.supports_vision:
                 continue
@@ -109,29 +110,8 @@ class AIRouter:
         return suitable
     
     def _calculate_provider_score(self, provider: AIProvider, task: AITask) -> float:
-        """Calculate provider score based on multiple factors"""
-        config = self.providers[provider]
-        score = 0.0
-        
-        # Provider preference scoring (Langfuse tracks actual costs)
-        if provider == AIProvider.FALLBACK:
-            score += 5  # Lower score for fallback
-        else:
-            score += 30  # Prefer primary providers
-            
-        # Performance factor (faster = higher score)
-        score += 1000 / config.avg_response_time_ms * 10
-        
-        # Reliability factor
-        score += config.success_rate * 20
-        
-        # Priority factor
-        if task.priority >= 8 and provider == AIProvider.AZURE_OPENAI:
-            score += 20  # Use premium provider for high priority
-            
-        # Langfuse tracks usage patterns for load balancing insights
-            
-        return score
+        """Calculate provider score from learned statistics"""
+        return self.scoreboard.score(provider, task.type, task.priority)
     
     async def execute_with_fallback(self, task: AITask, execute_fn) -> Any:
         """Execute task with automatic fallback on failure"""
@@ -144,42 +124,105 @@ class AIRouter:
                 logger.warning(f"Enhanced routing failed, falling back to basic routing: {e}")
                 # Fall through to basic routing
         
-        # Basic routing
-        providers = [await self.route_task(task)]
-        
-        # Add fallback chain
-        if providers[-1] != AIProvider.FALLBACK:
-            providers.append(AIProvider.FALLBACK)
+        # Local routing: ranked providers, fallback last
+        providers = self._rank_providers(task)
+        if AIProvider.FALLBACK in providers:
+            providers.remove(AIProvider.FALLBACK)
+        providers.append(AIProvider.FALLBACK)
             
         last_error = None
         
         for provider in providers:
+            breaker = self.scoreboard.breakers[provider]
+            if provider != AIProvider.FALLBACK and not breaker.allow():
+                continue
             try:
-                start_time = time.time()
-                result = await execute_fn(provider, task)
-                
-                # Update stats on success
-                self._update_stats(provider, success=True, 
-                                 response_time=time.time() - start_time)
-                
-                return result
+                if self._should_hedge(task, provider):
+                    return await self._execute_hedged(task, provider, providers, execute_fn)
+                return await self._execute_once(task, provider, execute_fn)
                 
             except Exception as e:
                 logger.error(f"Provider {provider.value} failed: {e}")
                 last_error = e
-                self._update_stats(provider, success=False)
-                
-                # Mark provider as unhealthy if failed
-                # Langfuse tracks error patterns
-                self.provider_health[provider] = False
-                asyncio.create_task(self._health_check(provider))
                     
         # All providers failed
         raise last_error or Exception("All AI providers failed")
     
+    async def _execute_once(self, task: AITask, provider: AIProvider, execute_fn) -> Any:
+        """Run one attempt and record its outcome"""
+        start_time = time.time()
+        try:
+            result = await execute_fn(provider, task)
+        except asyncio.CancelledError:
+            # No outcome to record, but a half-open probe must not stay reserved
+            self.scoreboard.breakers[provider].release_probe()
+            raise
+        except Exception:
+            self._update_stats(provider, success=False, task_type=task.type)
+            raise
+        self._update_stats(
+            provider, success=True,
+            response_time=time.time() - start_time,
+            tokens=self._estimate_tokens(task, result),
+            task_type=task.type
+        )
+        return result
+    
+    def _should_hedge(self, task: AITask, provider: AIProvider) -> bool:
+        """Hedge idempotent, high-priority requests once the provider's p95 is known"""
+        if provider == AIProvider.FALLBACK or task.type == TaskType.STREAMING:
+            return False
+        requested = (task.options or {}).get("hedge")
+        if requested is False:
+            return False
+        if not requested and task.priority < settings.AI_ROUTER_HEDGE_MIN_PRIORITY:
+            return False
+        return self.scoreboard.hedge_delay(provider, task.type) is not None
+    
+    async def _execute_hedged(
+        self, task: AITask, provider: AIProvider, providers: List[AIProvider], execute_fn
+    ) -> Any:
+        """
+        Send the request; if it has not finished by the provider's p95 latency,
+        send a second copy (to the next primary provider, or the same one) and
+        return whichever succeeds first.
+        """
+        alternatives = [p for p in providers if p not in (provider, AIProvider.FALLBACK)]
+        hedge_provider = alternatives[0] if alternatives else provider
+        
+        attempts = [asyncio.create_task(self._execute_once(task, provider, execute_fn))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self.scoreboard.hedge_delay(provider, task.type))
+            if not done and self.scoreboard.breakers[hedge_provider].allow():
+                logger.debug(f"Hedging {task.type.value} request to {hedge_provider.value}")
+                attempts.append(asyncio.create_task(self._execute_once(task, hedge_provider, execute_fn)))
+            
+            last_error = None
+            for next_done in asyncio.as_completed(attempts):
+                try:
+                    return await next_done
+                except Exception as e:
+                    last_error = e
+            raise last_error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+    
+    @staticmethod
+    def _estimate_tokens(task: AITask, result: Any) -> int:
+        """Reported token usage when the result carries it, else ~4 characters per token"""
+        if isinstance(result, dict):
+            usage = result.get("usage")
+            if isinstance(usage, dict) and usage.get("total_tokens"):
+                return int(usage["total_tokens"])
+        return len(str(task.content)) // 4 + len(str(result)) // 4
+    
     def _should_use_enhanced_routing(self, task: AITask) -> bool:
         """Determine if enhanced routing should be used"""
-        # Check if enhanced routing is available
+        # Check if enhanced routing is available and opted into; it costs an
+        # extra LLM round trip per task
+        if not settings.AI_ROUTER_LLM_ROUTING:
+            return False
         if not self.enhanced_ai_router or not self.enhanced_ai_router.enabled:
             return False
             
@@ -198,23 +241,32 @@ class AIRouter:
         return False
     
     def _update_stats(self, provider: AIProvider, success: bool, 
-                     response_time: float = 0, tokens: int = 0):
+                     response_time: float = 0, tokens: int = 0,
+                     task_type: TaskType = TaskType.TEXT_GENERATION):
         """Update provider statistics - usage tracking handled by Langfuse"""
+        config = self.providers[provider]
+        self.scoreboard.record(
+            provider, task_type, success,
+            latency_ms=response_time * 1000 if success and response_time > 0 else None,
+            tokens=tokens
+        )
+        
+        # Provider-wide EWMAs (reported by /api/ai-router/providers)
+        alpha = settings.AI_ROUTER_EWMA_ALPHA
+        config.success_rate += alpha * ((1.0 if success else 0.0) - config.success_rate)
         if success and response_time > 0:
-            # Update average response time for routing decisions
-            config = self.providers[provider]
-            current_avg = config.avg_response_time_ms
-            new_avg = (current_avg * 0.9 + response_time * 1000 * 0.1)
-            config.avg_response_time_ms = new_avg
-    
-    async def _health_check(self, provider: AIProvider):
-        """Periodically check provider health"""
-        await asyncio.sleep(60)  # Wait before retry
+            config.avg_response_time_ms += alpha * (response_time * 1000 - config.avg_response_time_ms)
         
-        # Simple health check - could be enhanced
-        self.provider_health[provider] = True
-        self.usage_stats[provider]["errors"] = 0
-        logger.info(f"Provider {provider.value} marked as healthy again")
+        self.provider_health[provider] = self.scoreboard.breakers[provider].available()
+    
+    @property
+    def usage_stats(self) -> Dict[AIProvider, Dict[str, int]]:
+        """Request/error counts per provider (used by the enhanced router's health tool)"""
+        usage = {provider: {"requests": 0, "errors": 0} for provider in self.providers}
+        for (provider, _), stats in self.scoreboard.stats.items():
+            usage[provider]["requests"] += stats.samples
+            usage[provider]["errors"] += round(stats.samples * stats.error_rate)
+        return usage
     
     def get_usage_report(self) -> Dict[str, Any]:
         """Get usage report - now handled by Langfuse"""
@@ -225,7 +277,8 @@ class AIRouter:
             "provider_health": {
                 provider.value: health 
                 for provider, health in self.provider_health.items()
-            }
+            },
+            "routing_stats": self.scoreboard.snapshot()
         }
     
     async def stream_task(self, task: AITask):
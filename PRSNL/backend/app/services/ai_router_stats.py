@@ -0,0 +1,213 @@
+"""
+Online provider statistics for AI routing
+Local, microsecond-cost scoring that replaces an LLM call per routing decision.
+
+- Per (provider, task type): EWMA latency, error rate and tokens per request,
+  plus p50/p95 latency over a bounded window of recent samples
+- Percentiles are recomputed when a sample is recorded, so scoring is a handful
+  of attribute reads
+- A circuit breaker per provider opens after consecutive failures and lets a
+  single probe through once the cooldown has passed
+"""
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.services.ai_router_types import AIProvider, ProviderConfig, TaskType
+
+
+@dataclass
+class ProviderStats:
+    """Learned behaviour of one provider for one task type"""
+    latency_ms: float
+    error_rate: float
+    tokens: float = 0.0
+    samples: int = 0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    window: Deque[float] = field(default_factory=deque)
+    sorted_window: List[float] = field(default_factory=list)
+
+    def record(self, success: bool, latency_ms: Optional[float], tokens: int, alpha: float, window_size: int):
+        self.samples += 1
+        self.error_rate += alpha * ((0.0 if success else 1.0) - self.error_rate)
+        if tokens:
+            self.tokens = tokens if self.tokens == 0 else self.tokens + alpha * (tokens - self.tokens)
+        if success and latency_ms is not None:
+            self.latency_ms += alpha * (latency_ms - self.latency_ms)
+            # Bounded window kept sorted incrementally for percentiles
+            if len(self.window) >= window_size:
+                oldest = self.window.popleft()
+                del self.sorted_window[bisect.bisect_left(self.sorted_window, oldest)]
+            self.window.append(latency_ms)
+            bisect.insort(self.sorted_window, latency_ms)
+            self.p50_ms = self._percentile(0.50)
+            self.p95_ms = self._percentile(0.95)
+
+    def _percentile(self, q: float) -> float:
+        values = self.sorted_window
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open after `cooldown`
+
+    Half-open lets one probe through. A probe that never reports back (its
+    caller was cancelled without release_probe) expires after another cooldown.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+    def _expire_probe(self, now: float):
+        if self._probe_in_flight and now - self._probe_started_at >= self.cooldown:
+            self._probe_in_flight = False
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Whether a request may be sent now (reserves the probe when half-open)."""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            self._expire_probe(now)
+            if not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                return True
+        return False
+
+    def release_probe(self):
+        """Give back a reserved probe whose request ended without an outcome (cancelled)."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def available(self, now: Optional[float] = None) -> bool:
+        """Like allow() but without reserving the half-open probe."""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.cooldown
+        self._expire_probe(now)
+        return not self._probe_in_flight
+
+    def record(self, success: bool, now: Optional[float] = None):
+        if success:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic() if now is None else now
+            self._probe_in_flight = False
+
+
+class ProviderScoreboard:
+    """Scores providers per task type from online statistics and configured priors"""
+
+    # Quality prior: primary providers are preferred unless their learned
+    # latency/error/cost make them clearly worse
+    QUALITY_PRIOR = {AIProvider.FALLBACK: 0.0}
+    DEFAULT_QUALITY = 100.0
+    # Cost alone must never outweigh the quality gap between a primary provider
+    # and the fallback, however many tokens a task type uses
+    MAX_COST_PENALTY = 40.0
+
+    def __init__(
+        self,
+        providers: Dict[AIProvider, ProviderConfig],
+        alpha: float = 0.2,
+        window_size: int = 128,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        min_samples: int = 20
+    ):
+        self.providers = providers
+        self.alpha = alpha
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.stats: Dict[Tuple[AIProvider, TaskType], ProviderStats] = {}
+        self.breakers = {
+            provider: CircuitBreaker(failure_threshold, cooldown) for provider in providers
+        }
+
+    def get(self, provider: AIProvider, task_type: TaskType) -> ProviderStats:
+        key = (provider, task_type)
+        stats = self.stats.get(key)
+        if stats is None:
+            config = self.providers[provider]
+            stats = self.stats[key] = ProviderStats(
+                latency_ms=config.avg_response_time_ms,
+                error_rate=1.0 - config.success_rate
+            )
+        return stats
+
+    def record(
+        self,
+        provider: AIProvider,
+        task_type: TaskType,
+        success: bool,
+        latency_ms: Optional[float] = None,
+        tokens: int = 0
+    ):
+        self.get(provider, task_type).record(success, latency_ms, tokens, self.alpha, self.window_size)
+        self.breakers[provider].record(success)
+
+    def score(self, provider: AIProvider, task_type: TaskType, priority: int = 5) -> float:
+        """Higher is better; high-priority tasks are judged on tail (p95) latency."""
+        stats = self.get(provider, task_type)
+        config = self.providers[provider]
+        if stats.samples >= self.min_samples:
+            latency = stats.p95_ms if priority >= 7 else stats.p50_ms
+        else:
+            latency = stats.latency_ms
+        token_cost = stats.tokens / 1000 * config.cost_per_1k_tokens
+        return (
+            self.QUALITY_PRIOR.get(provider, self.DEFAULT_QUALITY)
+            - latency / 100
+            - stats.error_rate * 100
+            - min(token_cost * 1000, self.MAX_COST_PENALTY)
+        )
+
+    def rank(self, providers: List[AIProvider], task_type: TaskType, priority: int = 5) -> List[AIProvider]:
+        """Providers with a closed (or probe-ready) breaker, best first."""
+        now = time.monotonic()
+        usable = [p for p in providers if self.breakers[p].available(now)]
+        return sorted(usable, key=lambda p: self.score(p, task_type, priority), reverse=True)
+
+    def hedge_delay(self, provider: AIProvider, task_type: TaskType) -> Optional[float]:
+        """Seconds to wait before hedging: the provider's p95 latency once it is known."""
+        stats = self.get(provider, task_type)
+        if stats.samples < self.min_samples or not stats.p95_ms:
+            return None
+        return stats.p95_ms / 1000
+
+    def snapshot(self) -> Dict[str, Dict]:
+        report: Dict[str, Dict] = {}
+        for (provider, task_type), stats in self.stats.items():
+            report.setdefault(provider.value, {})[task_type.value] = {
+                "samples": stats.samples,
+                "latency_ewma_ms": round(stats.latency_ms, 1),
+                "latency_p50_ms": round(stats.p50_ms, 1),
+                "latency_p95_ms": round(stats.p95_ms, 1),
+                "error_rate": round(stats.error_rate, 3),
+                "tokens_per_request": round(stats.tokens, 1),
+            }
+        for provider, breaker in self.breakers.items():
+            report.setdefault(provider.value, {})["circuit"] = breaker.state
+        return report
@@ -45,6 +45,7 @@ class ProviderConfig:
     supports_embeddings: bool
     avg_response_time_ms: float
     success_rate: float = 0.95
+    cost_per_1k_tokens: float = 0.0
 
 
 @dataclass
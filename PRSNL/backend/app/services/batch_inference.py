@@ -0,0 +1,146 @@
+"""
+Batch Inference
+Micro-batching front end for synchronous model inference (OpenCLIP).
+
+- Preprocessing (decode, resize, tokenize) runs on a small thread pool and
+  inference on a dedicated single thread, so neither blocks the event loop
+- Requests arriving within max_wait_ms of each other are run as one batch of
+  up to max_batch_size inputs
+- While a batch is in the model, later inputs are already being preprocessed
+  and queue up for the next batch
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PreprocessFn = Callable[[Any], Any]
+InferFn = Callable[[List[Any]], Sequence[Any]]
+
+
+class MicroBatcher:
+    """Collects concurrent inference requests into batches for one model"""
+
+    def __init__(
+        self,
+        name: str,
+        preprocess: PreprocessFn,
+        infer: InferFn,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        preprocess_workers: int = 2
+    ):
+        self.name = name
+        self._preprocess = preprocess
+        self._infer = infer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._preprocess_pool = ThreadPoolExecutor(preprocess_workers, thread_name_prefix=f"{name}-preprocess")
+        self._inference_pool = ThreadPoolExecutor(1, thread_name_prefix=f"{name}-inference")
+
+        # Loop-bound state; reset if the batcher is used from a different event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "requests": 0,
+            "inferred": 0,
+            "batches": 0,
+            "failed": 0,
+            "largest_batch": 0,
+            "inference_seconds": 0.0,
+        }
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._worker is None or self._worker.done():
+            if loop is not self._loop:
+                self._queue = asyncio.Queue()
+                self._loop = loop
+            self._worker = loop.create_task(self._run())
+        return loop
+
+    async def submit(self, item: Any) -> Any:
+        """Preprocess and infer one input; raises if either step fails for it."""
+        loop = self._bind_loop()
+        self.stats["requests"] += 1
+        prepared = await loop.run_in_executor(self._preprocess_pool, self._preprocess, item)
+        future = loop.create_future()
+        self._queue.put_nowait((prepared, future))
+        return await future
+
+    async def submit_many(self, items: Sequence[Any]) -> List[Any]:
+        """Infer many inputs; failed entries come back as None."""
+        results = await asyncio.gather(*(self.submit(item) for item in items), return_exceptions=True)
+        output = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"{self.name} inference failed for one input: {result}")
+                output.append(None)
+            else:
+                output.append(result)
+        return output
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    else:
+                        # Past the deadline: take only what is already waiting
+                        batch.append(self._queue.get_nowait())
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+            await self._run_batch(loop, batch)
+
+    async def _run_batch(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[Any, asyncio.Future]]):
+        batch = [(prepared, future) for prepared, future in batch if not future.cancelled()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            outputs = await loop.run_in_executor(
+                self._inference_pool, self._infer, [prepared for prepared, _ in batch]
+            )
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"{self.name} returned {len(outputs)} outputs for {len(batch)} inputs")
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+            self.stats["failed"] += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.stats["inference_seconds"] += time.perf_counter() - started
+
+        self.stats["batches"] += 1
+        self.stats["inferred"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "avg_batch_size": round(self.stats["inferred"] / batches, 2) if batches else 0.0,
+        }
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._preprocess_pool.shutdown(wait=False, cancel_futures=True)
+        self._inference_pool.shutdown(wait=False, cancel_futures=True)
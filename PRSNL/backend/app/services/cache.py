@@ -9,8 +9,11 @@ from datetime import datetime, timedelta
 from functools import wraps
 from typing import Any, Optional, Union
 
+import numpy as np
 import redis.asyncio as redis
 
+from app.utils.vector_codec import decode_vector, encode_vector, is_encoded_vector
+
 logger = logging.getLogger(__name__)
 
 class SecureJSONEncoder(json.JSONEncoder):
@@ -120,6 +123,118 @@ class CacheService:
             logger.error(f"Cache set error for key {key}: {e}")
             return False
     
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Get several values in one MGET round trip (None for misses)"""
+        if not keys or not self.enabled or not self.redis_client:
+            return [None] * len(keys)
+
+        try:
+            values = await self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"Cache mget error for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+
+        results = []
+        for key, value in zip(keys, values):
+            if not value:
+                results.append(None)
+                continue
+            try:
+                results.append(json.loads(value, object_hook=secure_json_decode))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Failed to deserialize cached value for key {key}: {e}")
+                results.append(None)
+        return results
+
+    async def set_many(
+        self,
+        mapping: dict[str, Any],
+        expire: Optional[Union[int, timedelta]] = None
+    ) -> bool:
+        """Set several values with a single pipelined round trip"""
+        if not mapping or not self.enabled or not self.redis_client:
+            return False
+
+        if isinstance(expire, timedelta):
+            expire = int(expire.total_seconds())
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    try:
+                        serialized = json.dumps(value, cls=SecureJSONEncoder)
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Failed to serialize value for caching: {e}")
+                        continue
+                    pipe.set(key, serialized, ex=expire)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache pipelined set error for {len(mapping)} keys: {e}")
+            return False
+
+    async def get_vectors_many(self, keys: list[str]) -> list[Optional[np.ndarray]]:
+        """Get binary-encoded vectors with one MGET (None for misses or legacy JSON entries)"""
+        if not keys or not self.enabled or not self.redis_client:
+            return [None] * len(keys)
+
+        try:
+            values = await self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"Cache mget error for {len(keys)} vector keys: {e}")
+            return [None] * len(keys)
+
+        results = []
+        for key, value in zip(keys, values):
+            if not is_encoded_vector(value):
+                results.append(None)
+                continue
+            try:
+                results.append(decode_vector(value).vector)
+            except ValueError as e:
+                logger.warning(f"Failed to decode cached vector for key {key}: {e}")
+                results.append(None)
+        return results
+
+    async def get_vector(self, key: str) -> Optional[np.ndarray]:
+        """Get a single binary-encoded vector"""
+        return (await self.get_vectors_many([key]))[0]
+
+    async def set_vectors_many(
+        self,
+        mapping: dict[str, Any],
+        model: str = "",
+        expire: Optional[Union[int, timedelta]] = None,
+        dtype: Optional[str] = None
+    ) -> bool:
+        """Store vectors as compact binary (see app.utils.vector_codec) in one pipelined round trip"""
+        if not mapping or not self.enabled or not self.redis_client:
+            return False
+
+        if isinstance(expire, timedelta):
+            expire = int(expire.total_seconds())
+        dtype = dtype or settings.EMBEDDING_CACHE_DTYPE
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, vector in mapping.items():
+                    pipe.set(key, encode_vector(vector, model=model, dtype=dtype), ex=expire)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache pipelined vector set error for {len(mapping)} keys: {e}")
+            return False
+
+    async def set_vector(
+        self,
+        key: str,
+        vector: Any,
+        model: str = "",
+        expire: Optional[Union[int, timedelta]] = None
+    ) -> bool:
+        """Store a single vector as compact binary"""
+        return await self.set_vectors_many({key: vector}, model=model, expire=expire)
+
     async def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self.enabled or not self.redis_client:
@@ -192,6 +307,7 @@ class CacheKeys:
     SIMILAR = "similar"
     STATS = "stats"
     USER = "user"
+    GRAPH = "graph"
 
 
 # Cache decorators
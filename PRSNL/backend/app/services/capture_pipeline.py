@@ -0,0 +1,451 @@
+"""
+Capture Pipeline
+Durable, staged follow-up processing for captured items.
+
+- POST /capture writes the item row and its first job to capture_jobs in the
+  same transaction and returns; nothing in the request touches the network
+- Each job runs one stage (preview, repository, content, enrich, video,
+  instagram) and enqueues the next stage of the item's plan when it succeeds
+- Workers claim due jobs with FOR UPDATE SKIP LOCKED, so several API processes
+  can share the queue; NOTIFY capture_jobs wakes them and polling covers gaps
+- Every stage has its own concurrency limit; failures are retried with
+  exponential backoff up to CAPTURE_JOB_MAX_ATTEMPTS before the item is marked
+  failed, and jobs whose worker died are re-queued once their lease expires
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+import asyncpg
+
+from app.config import settings
+from app.db.database import get_db_pool
+from app.monitoring.metrics import CAPTURE_PIPELINE_JOBS, CAPTURE_PIPELINE_RUNNING
+
+logger = logging.getLogger(__name__)
+
+StageHandler = Callable[[asyncpg.Record], Awaitable[None]]
+
+
+class PermanentJobError(Exception):
+    """A stage failure that retrying cannot fix (e.g. an unsupported video URL)"""
+
+
+def plan_stages(item_type: str, url: Optional[str], content_type: Optional[str] = None) -> List[str]:
+    """Ordered pipeline stages for a newly captured item."""
+    url = (url or "").lower()
+    if item_type == 'video' and url:
+        return ['instagram'] if 'instagram.com' in url else ['video']
+
+    stages = []
+    if item_type == 'repository' and url:
+        stages.append('repository')
+    if url and ('github.com' in url or item_type == 'development' or content_type == 'development'):
+        stages.append('preview')
+    # Previews land in metadata before content processing merges over it
+    stages.extend(['content', 'enrich'])
+    return stages
+
+
+def retry_delay(attempt: int, base: float) -> float:
+    """Seconds before retrying after the given (1-based) failed attempt."""
+    return base * (2 ** (attempt - 1))
+
+
+async def enqueue(conn: asyncpg.Connection, item_id: UUID, stages: List[str]):
+    """Queue an item's first stage; call inside the transaction that creates the item."""
+    if not stages:
+        return
+    await conn.execute("""
+        INSERT INTO capture_jobs (item_id, stage, payload)
+        VALUES ($1, $2, $3::jsonb)
+    """, item_id, stages[0], json.dumps({"next": stages[1:]}))
+
+
+# =============================================
+# Stages
+# =============================================
+
+async def _load_item(item_id: UUID) -> Optional[asyncpg.Record]:
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        return await conn.fetchrow("""
+            SELECT id, url, title, raw_content, processed_content, type, content_type,
+                   enable_summarization, status
+            FROM items WHERE id = $1
+        """, item_id)
+
+
+async def _merge_metadata(item_id: UUID, values: Dict[str, Any]):
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("""
+            UPDATE items
+            SET metadata = COALESCE(metadata, '{}'::jsonb) || $2::jsonb, updated_at = NOW()
+            WHERE id = $1
+        """, item_id, json.dumps(values))
+
+
+async def _preview_stage(item: asyncpg.Record):
+    from app.services.preview_service import preview_service
+
+    # A missing preview never fails the capture
+    try:
+        preview_data = await preview_service.generate_preview(item['url'], 'development')
+    except Exception as e:
+        logger.error(f"Error generating rich preview for {item['url']}: {e}")
+        return
+    if preview_data and preview_data.get('type') != 'error':
+        await _merge_metadata(item['id'], {'rich_preview': preview_data})
+    else:
+        logger.warning(f"Rich preview generation failed or returned error for {item['url']}")
+
+
+async def _repository_stage(item: asyncpg.Record):
+    from app.services.repository_analyzer import repository_analyzer
+
+    try:
+        repo_analysis = await repository_analyzer.analyze_repository(item['url'])
+    except Exception as e:
+        logger.error(f"Repository analysis failed for {item['url']}: {e}")
+        repository_metadata = {
+            "repo_url": item['url'],
+            "analysis_error": str(e),
+            "needs_manual_categorization": True
+        }
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE items SET repository_metadata = $2::jsonb WHERE id = $1",
+                item['id'], json.dumps(repository_metadata)
+            )
+        return
+
+    has_ai = bool(repo_analysis.ai_analysis)
+    pool = await get_db_pool()
+    async with pool.acquire() as conn:
+        # Only fill what the user did not provide at capture time
+        await conn.execute("""
+            UPDATE items SET
+                repository_metadata = $2::jsonb,
+                title = CASE WHEN title IS NULL OR title = 'Untitled' THEN $3 ELSE title END,
+                raw_content = COALESCE(raw_content, $4),
+                programming_language = COALESCE(programming_language, $5),
+                project_category = COALESCE(project_category, $6),
+                difficulty_level = COALESCE(difficulty_level, $7),
+                updated_at = NOW()
+            WHERE id = $1
+        """,
+            item['id'],
+            json.dumps(repo_analysis.dict(), default=str),
+            f"{repo_analysis.owner}/{repo_analysis.repo_name}",
+            repo_analysis.description or None,
+            repo_analysis.language.lower() if has_ai and repo_analysis.language else None,
+            repo_analysis.category if has_ai else None,
+            repo_analysis.difficulty if has_ai else None
+        )
+
+
+async def _content_stage(item: asyncpg.Record):
+    from app.core.capture_engine import CaptureEngine
+
+    # Scrape (unless content was captured), LLM processing and embeddings
+    await CaptureEngine().process_item(
+        item_id=item['id'],
+        url=item['url'],
+        content=item['raw_content'],
+        enable_summarization=bool(item['enable_summarization']),
+        content_type=item['content_type'] or 'auto'
+    )
+    # CaptureEngine records its own failures on the item instead of raising
+    after = await _load_item(item['id'])
+    if after and after['status'] == 'failed':
+        raise RuntimeError("content processing failed")
+
+
+async def _enrich_stage(item: asyncpg.Record):
+    from app.services.auto_processing_service import auto_processing_service
+
+    await auto_processing_service.process_captured_item(
+        item['id'],
+        None,  # read the scraped content back from the item
+        item['url'],
+        item['title'] or 'Untitled',
+        bool(item['enable_summarization'])
+    )
+
+
+async def _video_stage(item: asyncpg.Record):
+    from app.api.capture import process_video_metadata_fast
+    from app.services.video_processor import VideoProcessor
+    from app.utils.media_detector import MediaDetector
+
+    media_info = MediaDetector.detect_media_type(item['url'])
+    # Instagram and YouTube are not validated to avoid downloading
+    if media_info.get('platform') not in ['instagram', 'youtube']:
+        try:
+            await VideoProcessor().validate_video_url(item['url'])
+        except ValueError as e:
+            raise PermanentJobError(f"Video validation failed: {e}")
+    await process_video_metadata_fast(item['id'], item['url'], bool(item['enable_summarization']))
+
+
+async def _instagram_stage(item: asyncpg.Record):
+    from app.api.instagram_handler import process_instagram_bookmark
+
+    await process_instagram_bookmark(item['id'], item['url'])
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: StageHandler
+    concurrency: int
+    running: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(0, self.concurrency - self.running)
+
+
+# =============================================
+# Workers
+# =============================================
+
+class CapturePipeline:
+    """Claims capture_jobs and runs their stages under per-stage concurrency limits"""
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.register('preview', _preview_stage, settings.CAPTURE_PREVIEW_CONCURRENCY)
+        self.register('repository', _repository_stage, settings.CAPTURE_PREVIEW_CONCURRENCY)
+        self.register('content', _content_stage, settings.CAPTURE_CONTENT_CONCURRENCY)
+        self.register('enrich', _enrich_stage, settings.CAPTURE_ENRICH_CONCURRENCY)
+        self.register('video', _video_stage, settings.CAPTURE_VIDEO_CONCURRENCY)
+        self.register('instagram', _instagram_stage, settings.CAPTURE_VIDEO_CONCURRENCY)
+
+        self.max_attempts = settings.CAPTURE_JOB_MAX_ATTEMPTS
+        self.retry_base = settings.CAPTURE_JOB_RETRY_BASE_SECONDS
+        self.lease_seconds = settings.CAPTURE_JOB_LEASE_SECONDS
+        self.poll_seconds = settings.CAPTURE_JOB_POLL_SECONDS
+
+        self._wake: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._jobs: Dict[int, asyncio.Task] = {}
+        self.stats = {"done": 0, "retried": 0, "failed": 0, "requeued": 0}
+
+    def register(self, name: str, handler: StageHandler, concurrency: int):
+        self.stages[name] = Stage(name, handler, max(1, concurrency))
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        try:
+            self._listener = await asyncpg.connect(settings.DATABASE_URL)
+            await self._listener.add_listener('capture_jobs', lambda *args: self._wake.set())
+        except Exception as e:
+            logger.warning(f"Capture pipeline LISTEN unavailable, polling every {self.poll_seconds}s: {e}")
+            self._listener = None
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info("Capture pipeline started")
+
+    async def stop(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+        interrupted = list(self._jobs)
+        for task in self._jobs.values():
+            task.cancel()
+        await asyncio.gather(*self._jobs.values(), return_exceptions=True)
+        if interrupted:
+            # Hand unfinished jobs straight back instead of waiting out the lease
+            try:
+                pool = await get_db_pool()
+                async with pool.acquire() as conn:
+                    await conn.execute("""
+                        UPDATE capture_jobs
+                        SET status = 'queued', attempts = GREATEST(attempts - 1, 0), locked_at = NULL, updated_at = NOW()
+                        WHERE id = ANY($1::bigint[]) AND status = 'running'
+                    """, interrupted)
+            except Exception as e:
+                logger.warning(f"Could not release {len(interrupted)} capture jobs: {e}")
+
+        if self._listener:
+            await self._listener.close()
+            self._listener = None
+
+    async def _dispatch_loop(self):
+        while True:
+            try:
+                await self._requeue_expired()
+                claimed = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Capture pipeline dispatch failed: {e}")
+                claimed = 0
+            if claimed:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> int:
+        """Start as many due jobs as stage capacity allows; returns the number started."""
+        pool = await get_db_pool()
+        started = 0
+        async with pool.acquire() as conn:
+            for stage in self.stages.values():
+                if not stage.capacity:
+                    continue
+                jobs = await conn.fetch("""
+                    UPDATE capture_jobs j
+                    SET status = 'running', attempts = j.attempts + 1, locked_at = NOW(), updated_at = NOW()
+                    FROM (
+                        SELECT id FROM capture_jobs
+                        WHERE status = 'queued' AND stage = $1 AND run_after <= NOW()
+                        ORDER BY run_after, id
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    ) due
+                    WHERE j.id = due.id
+                    RETURNING j.id, j.item_id, j.stage, j.payload, j.attempts
+                """, stage.name, stage.capacity)
+                for job in jobs:
+                    stage.running += 1
+                    CAPTURE_PIPELINE_RUNNING.labels(stage=stage.name).inc()
+                    self._jobs[job['id']] = asyncio.create_task(self._run(stage, job))
+                started += len(jobs)
+        return started
+
+    async def _requeue_expired(self):
+        """Re-queue jobs whose worker lease expired; fail those already at max_attempts.
+
+        A job that kills its worker never reaches _run's error handling, so the
+        lease is where its attempts are enforced.
+        """
+        error = f"Worker lease expired after {self.max_attempts} attempts"
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch("""
+                    UPDATE capture_jobs
+                    SET status = CASE WHEN attempts >= $2 THEN 'failed' ELSE 'queued' END,
+                        last_error = CASE WHEN attempts >= $2 THEN $3 ELSE last_error END,
+                        locked_at = NULL, run_after = NOW(), updated_at = NOW()
+                    WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => $1)
+                    RETURNING item_id, stage, status
+                """, float(self.lease_seconds), self.max_attempts, error)
+                failed = [row for row in rows if row['status'] == 'failed']
+                if failed:
+                    await conn.execute("""
+                        UPDATE items
+                        SET status = 'failed',
+                            metadata = jsonb_set(COALESCE(metadata, '{}'), '{error}', to_jsonb($2::text))
+                        WHERE id = ANY($1::uuid[])
+                    """, [row['item_id'] for row in failed], error)
+        for row in rows:
+            if row['status'] == 'failed':
+                logger.error(f"Capture {row['stage']} for item {row['item_id']} failed permanently: {error}")
+                CAPTURE_PIPELINE_JOBS.labels(stage=row['stage'], result='failed').inc()
+            else:
+                logger.warning(f"Re-queued expired {row['stage']} capture job")
+                CAPTURE_PIPELINE_JOBS.labels(stage=row['stage'], result='requeued').inc()
+        self.stats["failed"] += len(failed)
+        self.stats["requeued"] += len(rows) - len(failed)
+
+    async def _run(self, stage: Stage, job: asyncpg.Record):
+        try:
+            item = await _load_item(job['item_id'])
+            if item is None:
+                # Item deleted while queued (the job row cascades with it)
+                return
+            await stage.handler(item)
+            await self._complete(job)
+        except asyncio.CancelledError:
+            raise
+        except PermanentJobError as e:
+            await self._fail(job, str(e))
+        except Exception as e:
+            if job['attempts'] >= self.max_attempts:
+                await self._fail(job, str(e))
+            else:
+                await self._retry(job, str(e))
+        finally:
+            stage.running -= 1
+            CAPTURE_PIPELINE_RUNNING.labels(stage=stage.name).dec()
+            self._jobs.pop(job['id'], None)
+            self._wake.set()
+
+    async def _complete(self, job: asyncpg.Record):
+        payload = job['payload']
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        remaining = payload.get('next', [])
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "UPDATE capture_jobs SET status = 'done', locked_at = NULL, updated_at = NOW() WHERE id = $1",
+                    job['id']
+                )
+                await enqueue(conn, job['item_id'], remaining)
+        self.stats["done"] += 1
+        CAPTURE_PIPELINE_JOBS.labels(stage=job['stage'], result='done').inc()
+
+    async def _retry(self, job: asyncpg.Record, error: str):
+        delay = retry_delay(job['attempts'], self.retry_base)
+        logger.warning(
+            f"Capture {job['stage']} for item {job['item_id']} failed "
+            f"(attempt {job['attempts']}/{self.max_attempts}), retrying in {delay:.0f}s: {error}"
+        )
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE capture_jobs
+                SET status = 'queued', locked_at = NULL, last_error = $2,
+                    run_after = NOW() + make_interval(secs => $3), updated_at = NOW()
+                WHERE id = $1
+            """, job['id'], error, delay)
+        self.stats["retried"] += 1
+        CAPTURE_PIPELINE_JOBS.labels(stage=job['stage'], result='retried').inc()
+
+    async def _fail(self, job: asyncpg.Record, error: str):
+        logger.error(f"Capture {job['stage']} for item {job['item_id']} failed permanently: {error}")
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    UPDATE capture_jobs
+                    SET status = 'failed', locked_at = NULL, last_error = $2, updated_at = NOW()
+                    WHERE id = $1
+                """, job['id'], error)
+                await conn.execute("""
+                    UPDATE items
+                    SET status = 'failed',
+                        metadata = jsonb_set(COALESCE(metadata, '{}'), '{error}', to_jsonb($2::text))
+                    WHERE id = $1
+                """, job['item_id'], error)
+        self.stats["failed"] += 1
+        CAPTURE_PIPELINE_JOBS.labels(stage=job['stage'], result='failed').inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": {name: stage.running for name, stage in self.stages.items()},
+            "listening": self._listener is not None,
+        }
+
+
+# Singleton instance
+capture_pipeline = CapturePipeline()
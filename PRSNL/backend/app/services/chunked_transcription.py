@@ -0,0 +1,286 @@
+"""
+Chunked Transcription
+Parallel whisper.cpp transcription of long audio.
+
+- Audio is decoded once (ffmpeg, 16 kHz mono) and split at the quietest point
+  near every WHISPER_CHUNK_SECONDS, so cuts fall in pauses rather than words
+- Chunks carry WHISPER_CHUNK_OVERLAP_SECONDS of context on each side and are
+  transcribed concurrently on a process pool whose workers keep their model
+  loaded between files
+- Segments are shifted to file time and each cut keeps only the segments whose
+  midpoint falls on its side, so overlap is not transcribed twice in the output
+- Segments are streamed in timeline order to an optional listener as soon as
+  every earlier chunk has finished
+"""
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+SegmentListener = Callable[[List[Dict[str, Any]], float], Union[None, Awaitable[None]]]
+
+
+# =============================================
+# Splitting and stitching (pure)
+# =============================================
+
+def find_split_points(
+    samples: np.ndarray,
+    chunk_seconds: float,
+    search_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30
+) -> List[int]:
+    """Sample offsets to cut at: the lowest-energy frame within search_seconds of each target."""
+    total = len(samples)
+    chunk = int(chunk_seconds * sample_rate)
+    if total <= chunk * 1.5:
+        return []
+
+    frame = max(1, sample_rate * frame_ms // 1000)
+    frames = total // frame
+    energy = np.sqrt(np.mean(
+        samples[:frames * frame].astype(np.float32).reshape(frames, frame) ** 2, axis=1
+    ))
+
+    window = int(search_seconds * sample_rate) // frame
+    splits = []
+    target = chunk
+    while target < total - chunk // 2:
+        centre = target // frame
+        lo, hi = max(0, centre - window), min(frames, centre + window + 1)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame
+        if splits and cut <= splits[-1]:
+            cut = target
+        splits.append(cut)
+        target = cut + chunk
+    return splits
+
+
+def plan_chunks(
+    total_samples: int, splits: List[int], overlap_samples: int
+) -> List[Tuple[int, int, int, int]]:
+    """(read_start, read_end, keep_start, keep_end) sample ranges per chunk."""
+    bounds = [0, *splits, total_samples]
+    return [
+        (max(0, keep_start - overlap_samples), min(total_samples, keep_end + overlap_samples), keep_start, keep_end)
+        for keep_start, keep_end in zip(bounds, bounds[1:])
+    ]
+
+
+def place_segments(
+    segments: List[Dict[str, Any]],
+    read_start: int,
+    keep_start: int,
+    keep_end: int,
+    sample_rate: int = SAMPLE_RATE
+) -> List[Dict[str, Any]]:
+    """Shift chunk-relative segments to file time and keep those centred in [keep_start, keep_end)."""
+    offset = read_start / sample_rate
+    lo, hi = keep_start / sample_rate, keep_end / sample_rate
+    placed = []
+    for segment in segments:
+        start, end = segment["start"] + offset, segment["end"] + offset
+        if not lo <= (start + end) / 2 < hi:
+            continue
+        shifted = {**segment, "start": round(start, 3), "end": round(end, 3)}
+        if "words" in segment:
+            shifted["words"] = [
+                {**word, "start": round(word["start"] + offset, 3), "end": round(word["end"] + offset, 3)}
+                for word in segment["words"]
+            ]
+        placed.append(shifted)
+    return placed
+
+
+# =============================================
+# Worker process
+# =============================================
+
+_worker_models: Dict[str, Any] = {}
+_worker_threads = 1
+
+
+def _init_worker(n_threads: int):
+    global _worker_threads
+    _worker_threads = n_threads
+
+
+def _segment_to_dict(segment: Any, word_timestamps: bool) -> Dict[str, Any]:
+    # pywhispercpp segments carry t0/t1 in 10 ms ticks; other bindings use seconds
+    if hasattr(segment, "start"):
+        start, end = float(segment.start), float(segment.end)
+    else:
+        start, end = segment.t0 / 100, segment.t1 / 100
+    data = {"start": start, "end": end, "text": segment.text.strip()}
+    if word_timestamps and getattr(segment, "words", None):
+        data["words"] = [
+            {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+            for word in segment.words
+        ]
+    return data
+
+
+def _transcribe_chunk(
+    model_name: str, pcm: np.ndarray, params: Dict[str, Any], word_timestamps: bool
+) -> List[Dict[str, Any]]:
+    """Runs in a pool worker; the model is loaded on first use and kept."""
+    model = _worker_models.get(model_name)
+    if model is None:
+        from pywhispercpp.model import Model as WhisperModel
+        model = WhisperModel(model_name, n_threads=_worker_threads)
+        _worker_models[model_name] = model
+    audio = pcm.astype(np.float32) / 32768.0
+    return [_segment_to_dict(segment, word_timestamps) for segment in model.transcribe(audio, **params)]
+
+
+# =============================================
+# Engine
+# =============================================
+
+class ChunkedTranscriber:
+    """Splits audio into overlapping chunks and transcribes them on a process pool"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        search_seconds: Optional[float] = None
+    ):
+        cpus = os.cpu_count() or 1
+        self.workers = workers or settings.WHISPER_WORKERS or max(1, cpus // 2)
+        self.threads_per_worker = settings.WHISPER_THREADS_PER_WORKER or max(1, cpus // self.workers)
+        self.chunk_seconds = chunk_seconds or settings.WHISPER_CHUNK_SECONDS
+        self.overlap_seconds = settings.WHISPER_CHUNK_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        self.search_seconds = search_seconds or settings.WHISPER_SILENCE_SEARCH_SECONDS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers must not inherit the server's event loop, sockets or threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads_per_worker,)
+            )
+        return self._pool
+
+    async def load_audio(self, audio_path: str) -> np.ndarray:
+        """Decode any ffmpeg-readable file to 16 kHz mono int16 samples."""
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-i", audio_path,
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-loglevel", "error", "-",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg could not decode {audio_path}: {stderr.decode(errors='ignore')[:500]}")
+        return np.frombuffer(stdout, dtype=np.int16)
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        model_name: str,
+        params: Dict[str, Any],
+        word_timestamps: bool = True,
+        on_segments: Optional[SegmentListener] = None
+    ) -> Tuple[List[Dict[str, Any]], float]:
+        """Segments in file time and the audio duration in seconds."""
+        samples = await self.load_audio(audio_path)
+        if len(samples) == 0:
+            return [], 0.0
+        duration = len(samples) / SAMPLE_RATE
+        splits = await asyncio.to_thread(
+            find_split_points, samples, self.chunk_seconds, self.search_seconds
+        )
+        chunks = plan_chunks(len(samples), splits, int(self.overlap_seconds * SAMPLE_RATE))
+        logger.info(f"Transcribing {duration:.0f}s of audio in {len(chunks)} chunk(s) on {self.workers} worker(s)")
+
+        placed: List[Optional[List[Dict[str, Any]]]] = [None] * len(chunks)
+        try:
+            await self._transcribe_chunks(samples, chunks, placed, model_name, params, word_timestamps, on_segments)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM loading a large model): replace the pool and
+            # retry the unfinished chunks once
+            logger.warning("Transcription worker pool broke; restarting it and retrying")
+            self.shutdown()
+            await self._transcribe_chunks(samples, chunks, placed, model_name, params, word_timestamps, on_segments)
+
+        return [segment for chunk_segments in placed for segment in chunk_segments], duration
+
+    async def _transcribe_chunks(
+        self,
+        samples: np.ndarray,
+        chunks: List[Tuple[int, int, int, int]],
+        placed: List[Optional[List[Dict[str, Any]]]],
+        model_name: str,
+        params: Dict[str, Any],
+        word_timestamps: bool,
+        on_segments: Optional[SegmentListener]
+    ):
+        """Fill the unfinished entries of `placed`, streaming the timeline as it completes."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        futures = {
+            loop.run_in_executor(
+                pool, _transcribe_chunk, model_name, samples[read_start:read_end], params, word_timestamps
+            ): index
+            for index, (read_start, read_end, _, _) in enumerate(chunks)
+            if placed[index] is None
+        }
+
+        # Chunks are streamed as soon as they are placed, so the placed prefix was already emitted
+        emitted = next((index for index, chunk_segments in enumerate(placed) if chunk_segments is None), len(chunks))
+        try:
+            pending = dict(futures)
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                error: Optional[BaseException] = None
+                for future in done:
+                    index = pending.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    read_start, _, keep_start, keep_end = chunks[index]
+                    placed[index] = place_segments(future.result(), read_start, keep_start, keep_end)
+                # Stream every newly completed prefix of the timeline
+                while emitted < len(chunks) and placed[emitted] is not None:
+                    if on_segments is not None:
+                        await self._notify(on_segments, placed[emitted], chunks[emitted][3] / len(samples))
+                    emitted += 1
+                # Raise only after keeping the chunks that finished alongside the failure
+                if error is not None:
+                    raise error
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    @staticmethod
+    async def _notify(listener: SegmentListener, segments: List[Dict[str, Any]], progress: float):
+        try:
+            result = listener(segments, progress)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Transcription progress listener failed: {e}")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
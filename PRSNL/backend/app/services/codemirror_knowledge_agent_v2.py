@@ -468,7 +468,7 @@ class CodeMirrorKnowledgeAgentV2:
         """Generate embedding for search text"""
         try:
             embeddings = await self.ai_service.generate_embeddings([text])
-            return embeddings[0] if embeddings else []
+            return embeddings[0] if embeddings and embeddings[0] is not None else []
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             return []
@@ -0,0 +1,223 @@
+"""
+Completion Cache
+Response cache with request coalescing in front of chat completions.
+
+- Keyed by a hash of model, system prompt, prompt, temperature, max tokens and
+  response format
+- In-process LRU with per-entry TTL, backed by Redis so workers and API
+  processes share answers
+- Identical concurrent requests share one provider call
+- Optional semantic lookup: a prompt whose embedding is within
+  AI_COMPLETION_SEMANTIC_THRESHOLD of a cached prompt with the same model,
+  system prompt and parameters reuses that answer
+- Hit/miss counts are exported as Prometheus metrics
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.monitoring.metrics import AI_COMPLETION_CACHE_ENTRIES, AI_COMPLETION_CACHE_REQUESTS
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], Awaitable[List[Optional[List[float]]]]]
+
+
+class _LeaderCancelled(Exception):
+    """Raised to waiters when the request creating their completion was cancelled"""
+
+
+class CompletionCache:
+    """Two-level (LRU + Redis), coalescing cache for completion text"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None,
+        semantic_threshold: Optional[float] = None,
+        embed: Optional[EmbedFn] = None
+    ):
+        self.max_entries = max_entries or settings.AI_COMPLETION_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.AI_COMPLETION_CACHE_TTL
+        self.semantic_threshold = semantic_threshold or settings.AI_COMPLETION_SEMANTIC_THRESHOLD
+        # Semantic lookup is enabled by passing an embedding function
+        self._embed = embed
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # scope -> {key: unit prompt vector}; bounded alongside the LRU
+        self._vectors: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+
+        # Loop-bound state; reset if the cache is used from a different event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {"hit": 0, "semantic_hit": 0, "coalesced": 0, "miss": 0, "bypass": 0}
+
+    @staticmethod
+    def make_scope(
+        model: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict]
+    ) -> str:
+        """Hash of everything except the prompt; semantic matches stay within a scope."""
+        payload = json.dumps(
+            [model, system_prompt or "", round(temperature, 3), max_tokens, response_format],
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(scope: str, prompt: str) -> str:
+        return f"completion:{scope}:{hashlib.sha256(prompt.encode()).hexdigest()}"
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._in_flight = {}
+        return loop
+
+    def _count(self, result: str):
+        self.stats[result] += 1
+        AI_COMPLETION_CACHE_REQUESTS.labels(result=result).inc()
+
+    def record_bypass(self):
+        self._count("bypass")
+
+    async def get_or_create(
+        self,
+        scope: str,
+        prompt: str,
+        create: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Cached completion for (scope, prompt), calling `create` at most once on a miss."""
+        loop = self._bind_loop()
+        key = self.make_key(scope, prompt)
+
+        cached = self._local_get(key)
+        if cached is not None:
+            self._count("hit")
+            return cached
+
+        if key in self._in_flight:
+            self._count("coalesced")
+        while key in self._in_flight:
+            try:
+                return await asyncio.shield(self._in_flight[key])
+            except _LeaderCancelled:
+                # The caller that was creating it went away; the first waiter takes over
+                continue
+
+        future = loop.create_future()
+        self._in_flight[key] = future
+        try:
+            result, outcome, vector = await self._resolve(scope, key, prompt, create)
+            self._count(outcome)
+            future.set_result(result)
+            if outcome == "miss":
+                await cache_service.set(key, result, expire=self.ttl)
+            self._local_set(key, result)
+            if vector is not None:
+                self._remember_vector(scope, key, vector)
+            return result
+        except BaseException as e:
+            if not future.done():
+                # Waiters were not cancelled themselves, so they retry rather than fail
+                future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+                # Consume the exception so an unawaited future does not log it
+                future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _resolve(
+        self, scope: str, key: str, prompt: str, create: Callable[[], Awaitable[str]]
+    ) -> Tuple[str, str, Optional[np.ndarray]]:
+        shared = await cache_service.get(key)
+        if isinstance(shared, str):
+            return shared, "hit", None
+
+        vector = None
+        if self._embed is not None:
+            vector = await self._prompt_vector(prompt)
+            similar = self._semantic_get(scope, vector) if vector is not None else None
+            if similar is not None:
+                return similar, "semantic_hit", None
+
+        return await create(), "miss", vector
+
+    def _local_get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _local_set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+        AI_COMPLETION_CACHE_ENTRIES.set(len(self._entries))
+
+    def _evict(self, key: str):
+        self._entries.pop(key, None)
+        scope = key.split(":", 2)[1]
+        vectors = self._vectors.get(scope)
+        if vectors is not None:
+            vectors.pop(key, None)
+            if not vectors:
+                del self._vectors[scope]
+
+    async def _prompt_vector(self, prompt: str) -> Optional[np.ndarray]:
+        try:
+            vectors = await self._embed([prompt])
+        except Exception as e:
+            logger.warning(f"Semantic completion lookup skipped: {e}")
+            return None
+        if not vectors or vectors[0] is None:
+            return None
+        vector = np.asarray(vectors[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_get(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        vectors = self._vectors.get(scope)
+        if not vectors:
+            return None
+        keys = list(vectors)
+        similarities = np.stack([vectors[k] for k in keys]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None
+        return self._local_get(keys[best])
+
+    def _remember_vector(self, scope: str, key: str, vector: np.ndarray):
+        if key in self._entries:
+            self._vectors.setdefault(scope, OrderedDict())[key] = vector
+
+    def get_stats(self) -> Dict[str, int]:
+        lookups = sum(self.stats.values()) - self.stats["bypass"]
+        served = self.stats["hit"] + self.stats["semantic_hit"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+        }
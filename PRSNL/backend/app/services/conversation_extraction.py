@@ -0,0 +1,270 @@
+"""
+Conversation Extraction
+Single-call structured extraction for conversation intelligence.
+
+- The conversation is sent once and one JSON document covering every facet
+  (summary, concepts, flow, user context, learning, technical content,
+  actionable insights, knowledge gaps) comes back, validated against
+  ConversationExtraction
+- Conversations longer than one chunk are extracted chunk by chunk
+  concurrently (map) and the partial extractions merged by one more call
+  (reduce)
+- Incremental: only messages added since the stored extraction are sent,
+  together with that extraction, so re-processing a grown conversation does
+  not resend old messages
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryFacet(BaseModel):
+    full_summary: str = ""
+    one_line_summary: str = ""
+    main_objective: str = "Unknown"
+    key_solutions: List[str] = []
+    complexity_level: str = "intermediate"
+    value_score: float = 5
+
+
+class ConceptsFacet(BaseModel):
+    topics: List[str] = []
+    technical_concepts: List[str] = []
+    technologies: Dict[str, List[str]] = {"languages": [], "frameworks": [], "tools": []}
+    problem_domains: List[str] = []
+    concept_map: List[Dict[str, Any]] = []
+
+
+class FlowFacet(BaseModel):
+    conversation_type: str = "q&a"
+    flow_pattern: str = "linear"
+    topic_transitions: List[str] = []
+    complexity_curve: str = "stable"
+    resolution_points: List[int] = []
+    interaction_quality: str = "medium"
+
+
+class UserContextFacet(BaseModel):
+    experience_level: str = "intermediate"
+    primary_goal: str = "Unknown"
+    use_case: str = "personal"
+    apparent_skills: List[str] = []
+    learning_style: str = "exploratory"
+    engagement_level: str = "medium"
+
+
+class LearningFacet(BaseModel):
+    learning_stages: List[Dict[str, Any]] = []
+    breakthrough_moments: List[Dict[str, Any]] = []
+    knowledge_evolution: str = ""
+    confidence_progression: str = "unclear"
+
+
+class TechnicalFacet(BaseModel):
+    code_snippets: List[Dict[str, Any]] = []
+    technologies: List[Dict[str, Any]] = []
+    implementation_patterns: List[Dict[str, Any]] = []
+    technical_recommendations: List[Dict[str, Any]] = []
+
+
+class InsightsFacet(BaseModel):
+    immediate_actions: List[Dict[str, Any]] = []
+    implementation_steps: List[Dict[str, Any]] = []
+    tools_and_resources: List[Dict[str, Any]] = []
+    best_practices: List[Dict[str, Any]] = []
+
+
+class GapsFacet(BaseModel):
+    knowledge_gaps: List[Dict[str, Any]] = []
+    prerequisite_knowledge: List[Dict[str, Any]] = []
+    learning_opportunities: List[Dict[str, Any]] = []
+    implementation_gaps: List[Dict[str, Any]] = []
+
+
+class ConversationExtraction(BaseModel):
+    """Every facet of a conversation analysis, as returned by one extraction call"""
+    summary: SummaryFacet = Field(default_factory=SummaryFacet)
+    concepts: ConceptsFacet = Field(default_factory=ConceptsFacet)
+    flow: FlowFacet = Field(default_factory=FlowFacet)
+    user_context: UserContextFacet = Field(default_factory=UserContextFacet)
+    learning: LearningFacet = Field(default_factory=LearningFacet)
+    technical: TechnicalFacet = Field(default_factory=TechnicalFacet)
+    insights: InsightsFacet = Field(default_factory=InsightsFacet)
+    gaps: GapsFacet = Field(default_factory=GapsFacet)
+
+
+EXTRACTION_SYSTEM_PROMPT = """You analyze AI chat conversations for a personal knowledge base.
+Be specific and concrete: name exact technologies, steps and concepts from the conversation
+rather than generic advice. Respond with a single JSON object and nothing else."""
+
+EXTRACTION_TEMPLATE = """{
+  "summary": {"full_summary": "2-3 paragraphs", "one_line_summary": "one sentence",
+              "main_objective": "what the user wanted", "key_solutions": ["..."],
+              "complexity_level": "beginner|intermediate|advanced", "value_score": 0-10},
+  "concepts": {"topics": ["..."], "technical_concepts": ["..."],
+               "technologies": {"languages": [], "frameworks": [], "tools": []},
+               "problem_domains": ["..."],
+               "concept_map": [{"from": "a", "to": "b", "relationship": "depends on"}]},
+  "flow": {"conversation_type": "q&a|tutorial|debugging|exploration|discussion",
+           "flow_pattern": "linear|branching|circular|exploratory", "topic_transitions": ["..."],
+           "complexity_curve": "increasing|stable|decreasing|variable",
+           "resolution_points": [message numbers], "interaction_quality": "high|medium|low"},
+  "user_context": {"experience_level": "beginner|intermediate|advanced", "primary_goal": "...",
+                   "use_case": "personal|professional|educational|research", "apparent_skills": ["..."],
+                   "learning_style": "systematic|exploratory|practical|theoretical",
+                   "engagement_level": "high|medium|low"},
+  "learning": {"learning_stages": [{"stage": 1, "focus": "...", "understanding_level": "...", "key_insight": "..."}],
+               "breakthrough_moments": [{"moment": "...", "trigger": "...", "impact": "..."}],
+               "knowledge_evolution": "narrative", "confidence_progression": "..."},
+  "technical": {"code_snippets": [{"language": "...", "purpose": "...", "code": "...", "context": "..."}],
+                "technologies": [{"name": "...", "version": "...", "purpose": "...", "specific_use": "..."}],
+                "implementation_patterns": [{"pattern": "...", "purpose": "...", "implementation": "..."}],
+                "technical_recommendations": [{"category": "...", "recommendation": "...", "reasoning": "..."}]},
+  "insights": {"immediate_actions": [{"action": "...", "time_estimate": "...", "difficulty": "easy|medium|hard"}],
+               "implementation_steps": [{"step": 1, "task": "...", "code_example": "...", "resources": ["..."]}],
+               "tools_and_resources": [{"name": "...", "purpose": "...", "setup": "..."}],
+               "best_practices": [{"practice": "...", "example": "...", "reasoning": "..."}]},
+  "gaps": {"knowledge_gaps": [{"gap": "...", "impact": "...", "priority": "high|medium|low"}],
+           "prerequisite_knowledge": [{"concept": "...", "reason": "...", "resources": ["..."]}],
+           "learning_opportunities": [{"topic": "...", "benefit": "...", "time_investment": "..."}],
+           "implementation_gaps": [{"skill": "...", "current_level": "...", "target_level": "..."}]}
+}"""
+
+
+class ConversationExtractor:
+    """Map-reduce structured extraction over conversation messages"""
+
+    def __init__(self, ai_service, chunk_chars: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.ai_service = ai_service
+        self.chunk_chars = chunk_chars or settings.CONVERSATION_EXTRACTION_CHUNK_CHARS
+        self.max_concurrency = max_concurrency or settings.CONVERSATION_EXTRACTION_CONCURRENCY
+        self.message_chars = settings.CONVERSATION_EXTRACTION_MESSAGE_CHARS
+
+    async def extract(
+        self,
+        conversation: Dict[str, Any],
+        messages: List[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> ConversationExtraction:
+        """
+        Extract every facet for `messages`.
+
+        With `previous`, `messages` are only the messages added since that
+        extraction and the result covers the whole conversation.
+        """
+        chunks = self.chunk_messages(messages)
+        if not chunks:
+            return ConversationExtraction.model_validate(previous or {})
+
+        if len(chunks) == 1:
+            return await self._extract_chunk(conversation, chunks[0], 1, 1, previous)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def map_chunk(index: int, chunk: str) -> ConversationExtraction:
+            async with semaphore:
+                return await self._extract_chunk(conversation, chunk, index, len(chunks))
+
+        partials = await asyncio.gather(*(map_chunk(i + 1, chunk) for i, chunk in enumerate(chunks)))
+        if previous is not None:
+            partials = [ConversationExtraction.model_validate(previous), *partials]
+        if len(partials) == 1:
+            return partials[0]
+        return await self._reduce(conversation, partials)
+
+    def chunk_messages(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """Render messages as numbered transcript lines grouped into chunks of about chunk_chars."""
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+        for msg in messages:
+            line = f"[{msg.get('sequence_number', '?')}] {msg['role'].upper()}: {(msg.get('content_text') or '')[:self.message_chars]}"
+            if current and size + len(line) > self.chunk_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(line)
+            size += len(line) + 2
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    async def _extract_chunk(
+        self,
+        conversation: Dict[str, Any],
+        transcript: str,
+        index: int,
+        total: int,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> ConversationExtraction:
+        part = f" (part {index} of {total}; extract only what this part shows)" if total > 1 else ""
+        earlier = ""
+        if previous is not None:
+            part = " (new messages only)"
+            earlier = f"""
+Analysis of the earlier messages (update it so it covers the whole conversation):
+{ConversationExtraction.model_validate(previous).model_dump_json(exclude_defaults=True)}
+"""
+        prompt = f"""Analyze this {conversation.get('platform', 'AI')} conversation{part}.
+
+Title: {conversation.get('title', '')}
+{earlier}
+Conversation (message numbers in brackets):
+{transcript}
+
+Return JSON with exactly this structure:
+{EXTRACTION_TEMPLATE}"""
+        return await self._call(prompt, max_tokens=settings.CONVERSATION_EXTRACTION_MAX_TOKENS)
+
+    async def _reduce(
+        self, conversation: Dict[str, Any], partials: List[ConversationExtraction]
+    ) -> ConversationExtraction:
+        parts = "\n\n".join(
+            f"PARTIAL {i + 1}:\n{partial.model_dump_json(exclude_defaults=True)}"
+            for i, partial in enumerate(partials)
+        )
+        prompt = f"""These are partial analyses of consecutive parts of one {conversation.get('platform', 'AI')} conversation
+titled "{conversation.get('title', '')}", in order. Merge them into a single analysis of the whole
+conversation: rewrite the summary and learning narrative to cover all parts, merge and deduplicate
+lists, and keep the most specific entries.
+
+{parts}
+
+Return JSON with exactly this structure:
+{EXTRACTION_TEMPLATE}"""
+        return await self._call(prompt, max_tokens=settings.CONVERSATION_EXTRACTION_MAX_TOKENS)
+
+    async def _call(self, prompt: str, max_tokens: int) -> ConversationExtraction:
+        response = await self.ai_service.complete(
+            prompt=prompt,
+            system_prompt=EXTRACTION_SYSTEM_PROMPT,
+            max_tokens=max_tokens,
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        )
+        return self.parse(response)
+
+    @staticmethod
+    def parse(response: str) -> ConversationExtraction:
+        """Validate a model response; facets that are missing or malformed fall back to defaults."""
+        try:
+            data = json.loads(response)
+        except (TypeError, json.JSONDecodeError):
+            logger.warning("Conversation extraction returned invalid JSON")
+            return ConversationExtraction(summary=SummaryFacet(full_summary=(response or "").strip()))
+        if not isinstance(data, dict):
+            return ConversationExtraction()
+
+        facets = {}
+        for name, field in ConversationExtraction.model_fields.items():
+            try:
+                facets[name] = field.annotation.model_validate(data.get(name) or {})
+            except ValidationError as e:
+                logger.warning(f"Conversation extraction facet '{name}' failed validation: {e.error_count()} errors")
+        return ConversationExtraction(**facets)
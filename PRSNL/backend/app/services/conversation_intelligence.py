@@ -8,85 +8,67 @@ and actionable knowledge for the PRSNL knowledge base.
 import logging
 import json
 import re
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from uuid import UUID
-import asyncio
 
 from app.db.database import get_db_connection
 from app.services.unified_ai_service import UnifiedAIService
 from app.services.multimodal_embedding_service import multimodal_embedding_service
-from app.services.conversation_agents import (
-    TechnicalContentExtractor,
-    LearningJourneyAnalyzer, 
-    ActionableInsightsExtractor,
-    KnowledgeGapIdentifier
-)
+from app.services.conversation_extraction import ConversationExtraction, ConversationExtractor
 
 logger = logging.getLogger(__name__)
 
 class ConversationIntelligenceAgent:
     """
-    Multi-agent AI system for conversation analysis that extracts:
+    AI system for conversation analysis that extracts:
     - Comprehensive summaries
     - Learning journeys  
     - Key concepts and insights
     - Knowledge gaps
     - Actionable next steps
     
-    Uses specialized agents for different analysis aspects:
-    - Technical Content Extractor Agent
-    - Learning Journey Agent
-    - Actionable Insights Agent
-    - Knowledge Gap Agent
+    All facets come from one structured extraction per conversation
+    (map-reduce for long conversations); re-processing only sends messages
+    added since the stored extraction.
     """
     
     def __init__(self):
         self.ai_service = UnifiedAIService()
-        # Initialize specialized agents
-        self.technical_agent = TechnicalContentExtractor(self.ai_service)
-        self.learning_agent = LearningJourneyAnalyzer(self.ai_service)
-        self.insights_agent = ActionableInsightsExtractor(self.ai_service)
-        self.gaps_agent = KnowledgeGapIdentifier(self.ai_service)
+        self.extractor = ConversationExtractor(self.ai_service)
         
     async def process_conversation(self, conversation_id: UUID) -> Dict[str, Any]:
         """
         Main entry point for processing a conversation with full intelligence analysis.
         """
+        started = time.monotonic()
         try:
-            # Load conversation and messages
+            # Load conversation and the messages not yet covered by its extraction
             conversation, messages = await self._load_conversation_data(conversation_id)
             
-            if not conversation or not messages:
+            if not conversation:
                 raise ValueError(f"Conversation {conversation_id} not found")
             
-            # Run all analysis tasks in parallel for efficiency
-            results = await asyncio.gather(
-                self._generate_comprehensive_summary(conversation, messages),
-                self._analyze_learning_journey(messages),
-                self._extract_key_concepts_and_topics(messages),
-                self._analyze_conversation_flow(messages),
-                self._identify_knowledge_gaps(messages),
-                self._extract_actionable_insights(messages),
-                self._analyze_user_context(messages),
-                self._extract_code_and_solutions(messages)
-            )
+            previous = conversation.get('intelligence_extraction')
+            if isinstance(previous, str):
+                previous = json.loads(previous)
+            if not messages and previous is None:
+                raise ValueError(f"Conversation {conversation_id} has no messages")
             
-            # Unpack results
-            summary = results[0]
-            learning_journey = results[1]
-            concepts = results[2]
-            flow_analysis = results[3]
-            knowledge_gaps = results[4]
-            actionable_insights = results[5]
-            user_context = results[6]
-            code_solutions = results[7]
+            extraction = await self.extractor.extract(conversation, messages, previous)
+            processed_sequence = max(
+                (m['sequence_number'] for m in messages),
+                default=conversation.get('intelligence_processed_sequence')
+            )
             
-            # Get specialized agent outputs for storage
-            technical_content = await self.technical_agent.extract_technical_content(messages)
-            learning_analysis = await self.learning_agent.analyze_learning_progression(messages)
-            actionable_insights_detailed = await self.insights_agent.extract_actionable_insights(messages)
-            knowledge_gap_analysis = await self.gaps_agent.identify_knowledge_gaps(messages)
+            # Adapt facets to the shapes stored and returned by earlier versions
+            summary = self._summary(conversation, extraction)
+            learning_journey = self._analyze_learning_journey(extraction)
+            concepts = self._extract_key_concepts_and_topics(extraction, messages)
+            knowledge_gaps = self._identify_knowledge_gaps(extraction)
+            actionable_insights = self._extract_actionable_insights(extraction)
+            code_solutions = self._extract_code_and_solutions(extraction)
             
             # Update conversation with intelligence data
             await self._update_conversation_intelligence(
@@ -96,34 +78,38 @@ class ConversationIntelligenceAgent:
                 learning_points=learning_journey['key_learnings'],
                 user_journey=learning_journey['journey_narrative'],
                 knowledge_gaps=knowledge_gaps['gaps'],
-                # Store specialized agent outputs
-                technical_content=technical_content,
-                learning_analysis=learning_analysis,
-                actionable_insights_detailed=actionable_insights_detailed,
-                knowledge_gap_analysis=knowledge_gap_analysis
+                technical_content=extraction.technical.model_dump(),
+                learning_analysis=extraction.learning.model_dump(),
+                actionable_insights_detailed=extraction.insights.model_dump(),
+                knowledge_gap_analysis=extraction.gaps.model_dump(),
+                extraction=extraction,
+                processed_sequence=processed_sequence,
+                processing_time_ms=int((time.monotonic() - started) * 1000)
             )
             
-            # Process individual messages for insights
-            await self._process_message_insights(conversation_id, messages)
-            
-            # Create enhanced search embeddings
-            await self._create_intelligent_embeddings(
-                conversation_id, 
-                summary, 
-                concepts, 
-                learning_journey
-            )
+            if messages:
+                # Process new messages for insights
+                await self._process_message_insights(conversation_id, messages)
+                
+                # Create enhanced search embeddings
+                await self._create_intelligent_embeddings(
+                    conversation_id, 
+                    summary, 
+                    concepts, 
+                    learning_journey
+                )
             
             return {
                 'conversation_id': str(conversation_id),
                 'summary': summary,
                 'learning_journey': learning_journey,
                 'concepts': concepts,
-                'flow_analysis': flow_analysis,
+                'flow_analysis': extraction.flow.model_dump(),
                 'knowledge_gaps': knowledge_gaps,
                 'actionable_insights': actionable_insights,
-                'user_context': user_context,
+                'user_context': extraction.user_context.model_dump(),
                 'code_solutions': code_solutions,
+                'new_messages_processed': len(messages),
                 'processing_status': 'completed'
             }
             
@@ -133,313 +119,119 @@ class ConversationIntelligenceAgent:
             raise
     
     async def _load_conversation_data(self, conversation_id: UUID) -> Tuple[Dict, List[Dict]]:
-        """Load conversation and its messages from database."""
+        """Load conversation and the messages after its processed-sequence watermark."""
         async for conn in get_db_connection():
             conversation = await conn.fetchrow("""
                 SELECT * FROM ai_conversation_imports WHERE id = $1
             """, conversation_id)
             
+            if not conversation:
+                return None, []
+            
             messages = await conn.fetch("""
                 SELECT * FROM ai_conversation_messages 
-                WHERE conversation_id = $1 
+                WHERE conversation_id = $1
+                  AND ($2::int IS NULL OR sequence_number > $2)
                 ORDER BY sequence_number ASC
-            """, conversation_id)
+            """, conversation_id, conversation.get('intelligence_processed_sequence'))
             
-            return dict(conversation) if conversation else None, [dict(m) for m in messages]
+            return dict(conversation), [dict(m) for m in messages]
     
-    async def _generate_comprehensive_summary(
-        self, 
-        conversation: Dict, 
-        messages: List[Dict]
-    ) -> Dict[str, Any]:
-        """Generate a comprehensive, intelligent summary of the entire conversation."""
-        
-        # Build conversation context
-        conversation_text = self._build_conversation_text(messages)
-        
-        prompt = f"""
-        Analyze this {conversation['platform']} conversation and provide a comprehensive summary.
-        
-        Title: {conversation['title']}
-        Platform: {conversation['platform']}
-        Message Count: {len(messages)}
-        
-        Conversation:
-        {conversation_text[:8000]}  # Limit for token constraints
-        
-        Provide a detailed summary that includes:
-        1. Main objective - What was the user trying to achieve?
-        2. Key topics discussed - Major subjects and concepts
-        3. Solutions provided - Concrete answers and solutions
-        4. Learning outcomes - What the user learned
-        5. Conversation tone - Technical level, complexity
-        6. Noteworthy insights - Unique or valuable information
-        
-        Format as JSON:
-        {{
-            "full_summary": "2-3 paragraph comprehensive summary",
-            "one_line_summary": "Single sentence capturing the essence",
-            "main_objective": "What the user wanted",
-            "key_solutions": ["solution1", "solution2"],
-            "complexity_level": "beginner|intermediate|advanced",
-            "value_score": 0-10
-        }}
-        """
-        
-        response = await self.ai_service.complete(
-            prompt=prompt,
-            max_tokens=800,
-            temperature=0.3
-        )
-        
-        try:
-            return json.loads(response.strip())
-        except:
-            return {
-                "full_summary": response,
-                "one_line_summary": conversation['title'],
-                "main_objective": "Unknown",
-                "key_solutions": [],
-                "complexity_level": "intermediate",
-                "value_score": 5
-            }
+    def _summary(self, conversation: Dict, extraction: ConversationExtraction) -> Dict[str, Any]:
+        """Summary facet, with the title standing in for a missing one-liner."""
+        summary = extraction.summary.model_dump()
+        if not summary['one_line_summary']:
+            summary['one_line_summary'] = conversation.get('title') or ''
+        return summary
     
-    async def _analyze_learning_journey(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Use specialized Learning Journey Agent for learning analysis."""
-        learning_result = await self.learning_agent.analyze_learning_progression(messages)
-        
-        # Adapt to expected format
+    def _analyze_learning_journey(self, extraction: ConversationExtraction) -> Dict[str, Any]:
+        """Learning facet in the journey format."""
+        learning = extraction.learning
         return {
-            "journey_narrative": learning_result.get("knowledge_evolution", "Analysis completed"),
-            "starting_point": "Analysis completed with specialized agent",
-            "ending_point": learning_result.get("confidence_progression", "Analysis completed"),
-            "key_learnings": [stage.get("key_insight", "") for stage in learning_result.get("learning_stages", [])],
-            "understanding_progression": learning_result.get("learning_stages", []),
+            "journey_narrative": learning.knowledge_evolution or "Analysis completed",
+            "starting_point": learning.learning_stages[0].get("focus", "") if learning.learning_stages else "",
+            "ending_point": learning.confidence_progression,
+            "key_learnings": [stage.get("key_insight", "") for stage in learning.learning_stages],
+            "understanding_progression": learning.learning_stages,
             "confidence_score_start": 5,
             "confidence_score_end": 7
         }
     
-    async def _extract_key_concepts_and_topics(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Extract and categorize key concepts, topics, and technical terms."""
-        
-        # Combine all message content
-        all_content = " ".join([m['content_text'] for m in messages[:20]])
-        
-        prompt = f"""
-        Extract key concepts, topics, and technical terms from this conversation.
-        
-        Content sample:
-        {all_content[:6000]}
-        
-        Identify:
-        1. Main topics - Primary subjects discussed
-        2. Technical concepts - Programming concepts, frameworks, tools
-        3. Problem domains - What kind of problems were addressed
-        4. Technologies mentioned - Languages, libraries, platforms
-        5. Concept relationships - How concepts connect
-        
-        Format as JSON:
-        {{
-            "topics": ["topic1", "topic2"],
-            "technical_concepts": ["concept1", "concept2"],
-            "technologies": {{"languages": [], "frameworks": [], "tools": []}},
-            "problem_domains": ["domain1", "domain2"],
-            "concept_map": [
-                {{"from": "concept1", "to": "concept2", "relationship": "depends on"}}
-            ]
-        }}
-        """
-        
-        response = await self.ai_service.complete(
-            prompt=prompt,
-            max_tokens=500,
-            temperature=0.2
-        )
-        
-        try:
-            return json.loads(response.strip())
-        except:
-            # Extract topics using simple pattern matching as fallback
-            topics = self._extract_topics_fallback(all_content)
-            return {
-                "topics": topics,
-                "technical_concepts": [],
-                "technologies": {"languages": [], "frameworks": [], "tools": []},
-                "problem_domains": [],
-                "concept_map": []
-            }
-    
-    async def _analyze_conversation_flow(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Analyze how the conversation flowed and progressed."""
-        
-        # Build flow representation
-        flow_data = []
-        for i, msg in enumerate(messages[:15]):
-            flow_data.append({
-                "position": i + 1,
-                "role": msg['role'],
-                "preview": msg['content_text'][:100]
-            })
-        
-        prompt = f"""
-        Analyze the flow and progression of this conversation.
-        
-        Message Flow:
-        {json.dumps(flow_data, indent=2)}
-        
-        Analyze:
-        1. Conversation pattern - Q&A, tutorial, debugging, exploration?
-        2. Topic transitions - How did topics change?
-        3. Depth progression - Did it get more complex?
-        4. Resolution points - Where were problems solved?
-        5. Follow-up patterns - How did questions build on each other?
-        
-        Format as JSON:
-        {{
-            "conversation_type": "q&a|tutorial|debugging|exploration|discussion",
-            "flow_pattern": "linear|branching|circular|exploratory",
-            "topic_transitions": ["Started with X", "Moved to Y"],
-            "complexity_curve": "increasing|stable|decreasing|variable",
-            "resolution_points": [3, 7, 10],
-            "interaction_quality": "high|medium|low"
-        }}
-        """
-        
-        response = await self.ai_service.complete(
-            prompt=prompt,
-            max_tokens=400,
-            temperature=0.3
-        )
-        
-        try:
-            return json.loads(response.strip())
-        except:
-            return {
-                "conversation_type": "q&a",
-                "flow_pattern": "linear",
-                "topic_transitions": [],
-                "complexity_curve": "stable",
-                "resolution_points": [],
-                "interaction_quality": "medium"
-            }
+    def _extract_key_concepts_and_topics(
+        self, extraction: ConversationExtraction, messages: List[Dict]
+    ) -> Dict[str, Any]:
+        """Concepts facet, falling back to keyword topics when none were extracted."""
+        concepts = extraction.concepts.model_dump()
+        if not concepts['topics'] and messages:
+            concepts['topics'] = self._extract_topics_fallback(
+                " ".join(m['content_text'] or '' for m in messages[:20])
+            )
+        return concepts
     
-    async def _identify_knowledge_gaps(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Use specialized Knowledge Gap Agent for gap identification."""
-        gap_result = await self.gaps_agent.identify_knowledge_gaps(messages)
-        
-        # Adapt specialized agent output to expected format
+    def _identify_knowledge_gaps(self, extraction: ConversationExtraction) -> Dict[str, Any]:
+        """Gaps facet in the summary format."""
+        gaps = extraction.gaps
         return {
-            "gaps": [gap.get("gap", "") for gap in gap_result.get("knowledge_gaps", [])],
-            "missing_prerequisites": [prereq.get("concept", "") for prereq in gap_result.get("prerequisite_knowledge", [])],
-            "recommended_next_topics": [topic.get("topic", "") for topic in gap_result.get("learning_opportunities", [])],
-            "implementation_steps": [skill.get("skill", "") for skill in gap_result.get("implementation_gaps", [])],
-            "confidence_score": 0.8  # Higher confidence with specialized agent
+            "gaps": [gap.get("gap", "") for gap in gaps.knowledge_gaps],
+            "missing_prerequisites": [prereq.get("concept", "") for prereq in gaps.prerequisite_knowledge],
+            "recommended_next_topics": [topic.get("topic", "") for topic in gaps.learning_opportunities],
+            "implementation_steps": [skill.get("skill", "") for skill in gaps.implementation_gaps],
+            "confidence_score": 0.8
         }
     
-    async def _extract_actionable_insights(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Use specialized Actionable Insights Agent for insight extraction."""
-        insights_result = await self.insights_agent.extract_actionable_insights(messages)
-        
-        # Adapt specialized agent output to expected format
+    def _extract_actionable_insights(self, extraction: ConversationExtraction) -> Dict[str, Any]:
+        """Insights facet in the summary format."""
+        insights = extraction.insights
         return {
-            "immediate_actions": [action.get("action", "") for action in insights_result.get("immediate_actions", [])],
-            "technical_practices": [practice.get("practice", "") for practice in insights_result.get("best_practices", [])],
-            "recommended_tools": insights_result.get("tools_and_resources", []),
+            "immediate_actions": [action.get("action", "") for action in insights.immediate_actions],
+            "technical_practices": [practice.get("practice", "") for practice in insights.best_practices],
+            "recommended_tools": insights.tools_and_resources,
             "critical_warnings": ["Check implementation steps for specific warnings"],
-            "implementation_plan": [f"Step {step.get('step', i+1)}: {step.get('task', '')}" for i, step in enumerate(insights_result.get("implementation_steps", []))]
+            "implementation_plan": [f"Step {step.get('step', i+1)}: {step.get('task', '')}" for i, step in enumerate(insights.implementation_steps)]
         }
     
-    async def _analyze_user_context(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Understand the user's context, goals, and background."""
-        
-        user_messages = [m for m in messages if m['role'] == 'user'][:8]
-        
-        prompt = f"""
-        Analyze the user's context and background from their messages.
-        
-        User messages:
-        {self._build_conversation_text(user_messages)}
-        
-        Determine:
-        1. Experience level - Beginner, intermediate, advanced?
-        2. Primary goal - What are they trying to achieve?
-        3. Use case - Personal project, work, learning?
-        4. Technical background - What do they already know?
-        5. Learning style - How do they ask questions?
-        
-        Format as JSON:
-        {{
-            "experience_level": "beginner|intermediate|advanced",
-            "primary_goal": "Description of main objective",
-            "use_case": "personal|professional|educational|research",
-            "apparent_skills": ["skill1", "skill2"],
-            "learning_style": "systematic|exploratory|practical|theoretical",
-            "engagement_level": "high|medium|low"
-        }}
-        """
-        
-        response = await self.ai_service.complete(
-            prompt=prompt,
-            max_tokens=300,
-            temperature=0.4
-        )
-        
-        try:
-            return json.loads(response.strip())
-        except:
-            return {
-                "experience_level": "intermediate",
-                "primary_goal": "Unknown",
-                "use_case": "personal",
-                "apparent_skills": [],
-                "learning_style": "exploratory",
-                "engagement_level": "medium"
-            }
-    
-    async def _extract_code_and_solutions(self, messages: List[Dict]) -> Dict[str, Any]:
-        """Use specialized Technical Content Agent for code and solution extraction."""
-        technical_result = await self.technical_agent.extract_technical_content(messages)
-        
-        # Adapt to expected format
+    def _extract_code_and_solutions(self, extraction: ConversationExtraction) -> Dict[str, Any]:
+        """Technical facet in the code/solutions format."""
+        technical = extraction.technical
         code_snippets = [
             {"code": snippet.get("code", "")[:500], "context": snippet.get("context", "")}
-            for snippet in technical_result.get("code_snippets", [])
+            for snippet in technical.code_snippets
         ]
         
         return {
             "code_snippets": code_snippets[:10],
-            "solution_count": len(technical_result.get("technical_recommendations", [])),
+            "solution_count": len(technical.technical_recommendations),
             "has_implementation": len(code_snippets) > 0,
             "primary_language": self._detect_primary_language(code_snippets),
-            "solution_types": [rec.get("category", "general") for rec in technical_result.get("technical_recommendations", [])],
-            "technologies": technical_result.get("technologies", []),
-            "implementation_patterns": technical_result.get("implementation_patterns", [])
+            "solution_types": [rec.get("category", "general") for rec in technical.technical_recommendations],
+            "technologies": technical.technologies,
+            "implementation_patterns": technical.implementation_patterns
         }
     
     async def _process_message_insights(self, conversation_id: UUID, messages: List[Dict]):
         """Process individual messages to extract insights."""
         
+        updates = [
+            (
+                self._summarize_message(msg['content_text']),
+                self._extract_key_points(msg['content_text']),
+                self._extract_concepts(msg['content_text']),
+                msg['id']
+            )
+            for msg in messages
+            if msg['role'] == 'assistant' and len(msg['content_text'] or '') > 100
+        ]
+        if not updates:
+            return
+        
         async for conn in get_db_connection():
-            for msg in messages:
-                if msg['role'] == 'assistant' and len(msg['content_text']) > 100:
-                    # Extract key points from this message
-                    summary = self._summarize_message(msg['content_text'])
-                    key_points = self._extract_key_points(msg['content_text'])
-                    concepts = self._extract_concepts(msg['content_text'])
-                    
-                    # Update message with insights
-                    await conn.execute("""
-                        UPDATE ai_conversation_messages
-                        SET summary = $1,
-                            key_points = $2,
-                            concepts_introduced = $3
-                        WHERE id = $4
-                    """, 
-                        summary,
-                        key_points,
-                        concepts,
-                        msg['id']
-                    )
+            await conn.executemany("""
+                UPDATE ai_conversation_messages
+                SET summary = $1,
+                    key_points = $2,
+                    concepts_introduced = $3
+                WHERE id = $4
+            """, updates)
     
     async def _create_intelligent_embeddings(
         self, 
@@ -496,13 +288,13 @@ class ConversationIntelligenceAgent:
         technical_content: Dict[str, Any] = None,
         learning_analysis: Dict[str, Any] = None,
         actionable_insights_detailed: Dict[str, Any] = None,
-        knowledge_gap_analysis: Dict[str, Any] = None
+        knowledge_gap_analysis: Dict[str, Any] = None,
+        extraction: Optional[ConversationExtraction] = None,
+        processed_sequence: Optional[int] = None,
+        processing_time_ms: Optional[int] = None
     ):
         """Update conversation with intelligence analysis results."""
         
-        import time
-        processing_time = int(time.time() * 1000)  # Simple timestamp for now
-        
         async for conn in get_db_connection():
             await conn.execute("""
                 UPDATE ai_conversation_imports
@@ -515,12 +307,14 @@ class ConversationIntelligenceAgent:
                     learning_analysis = $7,
                     actionable_insights = $8,
                     knowledge_gap_analysis = $9,
-                    agent_processing_version = 'v2.0',
-                    agents_used = ARRAY['technical', 'learning', 'insights', 'gaps'],
-                    processing_time_ms = $10,
+                    intelligence_extraction = $10,
+                    intelligence_processed_sequence = $11,
+                    agent_processing_version = 'v3.0',
+                    agents_used = ARRAY['structured_extraction'],
+                    processing_time_ms = $12,
                     processing_status = 'completed',
                     updated_at = NOW()
-                WHERE id = $11
+                WHERE id = $13
             """,
                 summary,
                 key_topics,
@@ -531,7 +325,9 @@ class ConversationIntelligenceAgent:
                 json.dumps(learning_analysis or {}),
                 json.dumps(actionable_insights_detailed or {}),
                 json.dumps(knowledge_gap_analysis or {}),
-                processing_time,
+                extraction.model_dump_json() if extraction else None,
+                processed_sequence,
+                processing_time_ms,
                 conversation_id
             )
     
@@ -555,17 +351,6 @@ class ConversationIntelligenceAgent:
             )
     
     # Helper methods
-    def _build_conversation_text(self, messages: List[Dict]) -> str:
-        """Build readable conversation text from messages."""
-        
-        text_parts = []
-        for msg in messages:
-            role = msg['role'].upper()
-            content = msg['content_text'][:500]  # Limit each message
-            text_parts.append(f"{role}: {content}")
-        
-        return "\n\n".join(text_parts)
-    
     def _extract_topics_fallback(self, text: str) -> List[str]:
         """Simple keyword extraction as fallback."""
         
@@ -134,8 +134,11 @@ class DragonflyDBService:
             await pubsub.subscribe(*channels)
             logger.info(f"Subscribed to channels: {channels}")
             
-            async for message in pubsub.listen():
-                if message['type'] == 'message':
+            while True:
+                # get_message() waits with its own timeout; listen() would hit the
+                # socket timeout on an idle channel and drop the subscription
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'message':
                     yield message['data']
                     
         except Exception as e:
@@ -162,8 +165,9 @@ class DragonflyDBService:
             await pubsub.psubscribe(*patterns)
             logger.info(f"Pattern subscribed to: {patterns}")
             
-            async for message in pubsub.listen():
-                if message['type'] == 'pmessage':
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'pmessage':
                     yield {
                         'pattern': message['pattern'],
                         'channel': message['channel'],
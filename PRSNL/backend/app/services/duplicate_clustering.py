@@ -0,0 +1,238 @@
+"""
+Duplicate Clustering
+Corpus-wide semantic duplicate groups from item embeddings.
+
+- Embeddings are held as one L2-normalized float32 matrix, so cosine similarity is a
+  plain dot product and norms are computed once per item instead of once per pair
+- All-pairs similarity is computed with tiled matrix multiplies, bounding the
+  temporary similarity matrix to block_size x block_size
+- Pairs above the threshold are merged into groups with union-find (transitive)
+- After the first build only items added or changed since the last watermark are
+  compared against the corpus; a full rebuild runs periodically to drop stale edges
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.config import settings
+from app.db.database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NIL_UUID = UUID(int=0)
+
+
+class UnionFind:
+    """Disjoint sets over dense integer ids with path halving and union by size"""
+
+    def __init__(self, size: int = 0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def groups(self, min_size: int = 2) -> List[List[int]]:
+        members: Dict[int, List[int]] = {}
+        for x in range(len(self.parent)):
+            members.setdefault(self.find(x), []).append(x)
+        return [group for group in members.values() if len(group) >= min_size]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return a float32 copy with unit-length rows (all-zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def similar_pairs(
+    left: np.ndarray,
+    right: Optional[np.ndarray] = None,
+    threshold: float = 0.85,
+    block_size: int = 2048
+) -> Iterator[Tuple[int, int, float]]:
+    """
+    Yield (i, j, similarity) for row pairs of pre-normalized matrices with
+    similarity >= threshold.
+
+    With `right` omitted, pairs within `left` are yielded once each (i < j).
+    """
+    self_join = right is None
+    if self_join:
+        right = left
+
+    for row_start in range(0, left.shape[0], block_size):
+        row_block = left[row_start:row_start + block_size]
+        # For a self-join, blocks left of the diagonal were covered already
+        col_from = row_start if self_join else 0
+        for col_start in range(col_from, right.shape[0], block_size):
+            sims = row_block @ right[col_start:col_start + block_size].T
+            rows, cols = np.nonzero(sims >= threshold)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                i, j = row_start + r, col_start + c
+                if self_join and j <= i:
+                    continue
+                yield i, j, float(sims[r, c])
+
+
+class DuplicateClusterer:
+    """Incrementally maintained union-find duplicate groups over item embeddings"""
+
+    def __init__(self):
+        self.block_size = settings.DUPLICATE_CLUSTER_BLOCK_SIZE
+        self.rebuild_interval = settings.DUPLICATE_CLUSTER_REBUILD_INTERVAL
+        self.batch_size = 2000
+
+        self.threshold: Optional[float] = None
+        self.item_ids: List[str] = []
+        self._index_of: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._union_find = UnionFind()
+        self._watermark: Tuple[datetime, UUID] = (_EPOCH, _NIL_UUID)
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_groups(self, threshold: float) -> List[Tuple[List[str], np.ndarray]]:
+        """
+        Bring the groups up to date and return (item_ids, normalized vectors) per group.
+        """
+        async with self._lock:
+            stale = time.monotonic() - self._built_at >= self.rebuild_interval
+            if self.threshold != threshold or stale:
+                await self._rebuild(threshold)
+            else:
+                await self._update()
+
+            return [
+                ([self.item_ids[i] for i in group], self._matrix[group])
+                for group in self._union_find.groups()
+            ]
+
+    async def _stream(self, since: Tuple[datetime, UUID]):
+        """Yield (item_ids, vectors, watermark) for items whose embedding row changed after `since`."""
+        pool = await get_db_pool()
+        last_updated, last_id = since
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT id, embedding, updated_at
+                    FROM items
+                    WHERE embedding IS NOT NULL
+                    AND (updated_at, id) > ($1, $2)
+                    ORDER BY updated_at, id
+                    LIMIT $3
+                """, last_updated, last_id, self.batch_size)
+            if not rows:
+                return
+            last_updated, last_id = rows[-1]['updated_at'], rows[-1]['id']
+            yield (
+                [str(row['id']) for row in rows],
+                np.vstack([np.asarray(row['embedding'], dtype=np.float32) for row in rows]),
+                (last_updated, last_id),
+            )
+
+    async def _rebuild(self, threshold: float):
+        start = time.monotonic()
+        item_ids: List[str] = []
+        batches = []
+        watermark = (_EPOCH, _NIL_UUID)
+        async for batch_ids, vectors, watermark in self._stream(watermark):
+            item_ids.extend(batch_ids)
+            batches.append(normalize_rows(vectors))
+
+        # Items updated mid-stream can appear twice; keep the latest row
+        index_of: Dict[str, int] = {}
+        for position, item_id in enumerate(item_ids):
+            index_of[item_id] = position
+        keep = sorted(index_of.values())
+        matrix = np.vstack(batches)[keep] if batches else np.zeros((0, 0), dtype=np.float32)
+        item_ids = [item_ids[i] for i in keep]
+
+        union_find = await asyncio.to_thread(self._cluster_all, matrix, threshold)
+
+        self.threshold = threshold
+        self.item_ids = item_ids
+        self._index_of = {item_id: i for i, item_id in enumerate(item_ids)}
+        self._matrix = matrix
+        self._union_find = union_find
+        self._watermark = watermark
+        self._built_at = time.monotonic()
+        logger.info(
+            f"Duplicate clusters rebuilt over {len(item_ids)} items in {time.monotonic() - start:.2f}s"
+        )
+
+    def _cluster_all(self, matrix: np.ndarray, threshold: float) -> UnionFind:
+        union_find = UnionFind(matrix.shape[0])
+        for i, j, _ in similar_pairs(matrix, threshold=threshold, block_size=self.block_size):
+            union_find.union(i, j)
+        return union_find
+
+    async def _update(self):
+        checked = 0
+        async for batch_ids, vectors, watermark in self._stream(self._watermark):
+            await asyncio.to_thread(self._add_batch, batch_ids, normalize_rows(vectors))
+            self._watermark = watermark
+            checked += len(batch_ids)
+        if checked:
+            logger.debug(f"Duplicate clusters checked {checked} new or changed items")
+
+    def _add_batch(self, batch_ids: List[str], vectors: np.ndarray):
+        positions = []
+        new_rows = []
+        for item_id, vector in zip(batch_ids, vectors):
+            position = self._index_of.get(item_id)
+            if position is None:
+                position = self._union_find.add()
+                self._index_of[item_id] = position
+                self.item_ids.append(item_id)
+                new_rows.append(vector)
+            else:
+                self._matrix[position] = vector
+            positions.append(position)
+
+        if new_rows:
+            new_rows = np.vstack(new_rows)
+            self._matrix = np.vstack([self._matrix, new_rows]) if self._matrix.size else new_rows
+
+        # Only the batch is compared against the corpus (which now includes the batch)
+        for r, j, _ in similar_pairs(
+            self._matrix[positions], self._matrix,
+            threshold=self.threshold, block_size=self.block_size
+        ):
+            i = positions[r]
+            if i != j:
+                self._union_find.union(i, j)
+
+
+# Singleton instance
+duplicate_clusterer = DuplicateClusterer()
@@ -12,6 +12,8 @@ import numpy as np
 
 from app.config import settings
 from app.db.database import get_db_pool
+from app.services.duplicate_clustering import duplicate_clusterer
+from app.services.near_duplicate_index import near_duplicate_index
 from app.services.unified_ai_service import unified_ai_service
 from app.utils.fingerprint import calculate_content_fingerprint
 
@@ -121,80 +123,42 @@ class DuplicateDetectionService:
                             "created_at": match['created_at'].isoformat()
                         })
             
-            # 3. Check for semantic duplicates using embeddings
-            if duplicates:  # If we already found exact duplicates, skip semantic search
+            if duplicates:  # If we already found exact duplicates, skip the fuzzy checks
                 return {
                     "is_duplicate": True,
                     "duplicates": duplicates,
                     "recommendation": "exact_duplicate_found"
                 }
             
-            # Generate embedding for new content using unified AI service
             check_text = f"{title} {content[:1000] if content else ''}"
-            embeddings = await unified_ai_service.generate_embeddings([check_text])
-            embedding = embeddings[0] if embeddings else None
             
-            if embedding:
-                # Find similar items using pgvector
-                similar_items = await conn.fetch("""
-                    SELECT 
-                        id, 
-                        title, 
-                        url, 
-                        summary,
-                        created_at,
-                        embedding,
-                        1 - (embedding <=> $1::vector) as similarity
-                    FROM items
-                    WHERE embedding IS NOT NULL
-                    ORDER BY similarity DESC
-                    LIMIT 20
-                """, embedding)
-                
-                # Get all embeddings and IDs for comparison
-                embeddings_to_compare = [
-                    (str(item['id']), item['embedding'])
-                    for item in similar_items
-                    if item['similarity'] > 0.5  # Pre-filter
-                ]
-                
-                # Use unified AI service for semantic duplicate detection
-                duplicates_found = await unified_ai_service.find_duplicates_semantic(
-                    content=check_text,
-                    embeddings_to_compare=embeddings_to_compare,
-                    threshold=self.similarity_threshold
+            # 3. Near-duplicates from the local MinHash/LSH index; embeddings are
+            #    only used to break ties or when the text is too short to shingle
+            signature = near_duplicate_index.signature(title, content)
+            candidate_ids = None
+            if signature is not None:
+                near_matches = await near_duplicate_index.find(
+                    conn, signature, min_similarity=settings.NEAR_DUPLICATE_CANDIDATE_THRESHOLD
                 )
-                
-                # Map duplicate results back to item data
-                item_map = {str(item['id']): item for item in similar_items}
-                
-                for dup in duplicates_found:
-                    item = item_map.get(dup['item_id'])
-                    if item:
-                        # Additional checks for high confidence
-                        is_same_domain = False
-                        if url and item['url']:
-                            try:
-                                new_domain = urlparse(url).netloc
-                                existing_domain = urlparse(item['url']).netloc
-                                is_same_domain = new_domain == existing_domain
-                            except:
-                                pass
-                        
-                        # Adjust confidence based on additional factors
-                        confidence = dup['similarity']
-                        if is_same_domain:
-                            confidence = min(confidence * 1.1, 1.0)
-                        
+                for match in near_matches:
+                    if match['similarity'] >= settings.NEAR_DUPLICATE_THRESHOLD:
                         duplicates.append({
-                            "id": dup['item_id'],
-                            "title": item['title'],
-                            "url": item['url'],
-                            "type": "semantic",
-                            "confidence": confidence,
-                            "similarity": dup['similarity'],
-                            "created_at": item['created_at'].isoformat()
+                            "id": match['id'],
+                            "title": match['title'],
+                            "url": match['url'],
+                            "type": "near_duplicate",
+                            "confidence": match['similarity'],
+                            "similarity": match['similarity'],
+                            "created_at": match['created_at'].isoformat()
                         })
+                if not duplicates:
+                    candidate_ids = [match['id'] for match in near_matches]
+            
+            # 4. Semantic comparison via embeddings
+            if not duplicates and (signature is None or candidate_ids):
+                duplicates.extend(
+                    await self._semantic_duplicates(conn, url, check_text, candidate_ids)
+                )
         
         if duplicates:
             # Sort by confidence
@@ -220,70 +184,140 @@ class DuplicateDetectionService:
             "recommendation": "no_duplicate"
         }
     
+    async def _semantic_duplicates(
+        self,
+        conn,
+        url: Optional[str],
+        check_text: str,
+        candidate_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Semantic duplicates of check_text by embedding similarity, optionally
+        restricted to the given candidate items
+        """
+        # Generate embedding for new content using unified AI service
+        embeddings = await unified_ai_service.generate_embeddings([check_text])
+        embedding = embeddings[0] if embeddings else None
+        if not embedding:
+            return []
+        
+        # Find similar items using pgvector
+        similar_items = await conn.fetch("""
+            SELECT 
+                id, 
+                title, 
+                url, 
+                summary,
+                created_at,
+                embedding,
+                1 - (embedding <=> $1::vector) as similarity
+            FROM items
+            WHERE embedding IS NOT NULL
+            AND ($2::uuid[] IS NULL OR id = ANY($2::uuid[]))
+            ORDER BY similarity DESC
+            LIMIT 20
+        """, embedding, candidate_ids)
+        
+        # Get all embeddings and IDs for comparison
+        embeddings_to_compare = [
+            (str(item['id']), item['embedding'])
+            for item in similar_items
+            if item['similarity'] > 0.5  # Pre-filter
+        ]
+        
+        # Use unified AI service for semantic duplicate detection
+        duplicates_found = await unified_ai_service.find_duplicates_semantic(
+            content=check_text,
+            embeddings_to_compare=embeddings_to_compare,
+            threshold=self.similarity_threshold
+        )
+        
+        # Map duplicate results back to item data
+        item_map = {str(item['id']): item for item in similar_items}
+        
+        duplicates = []
+        for dup in duplicates_found:
+            item = item_map.get(dup['item_id'])
+            if item:
+                # Additional checks for high confidence
+                is_same_domain = False
+                if url and item['url']:
+                    try:
+                        new_domain = urlparse(url).netloc
+                        existing_domain = urlparse(item['url']).netloc
+                        is_same_domain = new_domain == existing_domain
+                    except:
+                        pass
+                
+                # Adjust confidence based on additional factors
+                confidence = dup['similarity']
+                if is_same_domain:
+                    confidence = min(confidence * 1.1, 1.0)
+                
+                duplicates.append({
+                    "id": dup['item_id'],
+                    "title": item['title'],
+                    "url": item['url'],
+                    "type": "semantic",
+                    "confidence": confidence,
+                    "similarity": dup['similarity'],
+                    "created_at": item['created_at'].isoformat()
+                })
+        return duplicates
+    
     async def find_all_duplicates(self, min_similarity: float = 0.85) -> List[Dict[str, Any]]:
         """
         Find all duplicate groups in the database
         Returns groups of duplicate items
+        
+        Groups cover the whole corpus and are transitive: items linked by a chain
+        of pairs above min_similarity share a group (see duplicate_clustering).
+        Each member's similarity is measured against the group's newest item.
         """
-        pool = await get_db_pool()
+        groups = await duplicate_clusterer.get_groups(min_similarity)
+        if not groups:
+            return []
         
+        pool = await get_db_pool()
         async with pool.acquire() as conn:
-            # Get all items with embeddings
-            items = await conn.fetch("""
-                SELECT id, title, url, embedding, created_at
+            rows = await conn.fetch("""
+                SELECT id, title, url, created_at
                 FROM items
-                WHERE embedding IS NOT NULL
-                ORDER BY created_at DESC
-                LIMIT 1000
-            """)
-            
-            if len(items) < 2:
-                return []
-            
-            # Find duplicate groups
-            duplicate_groups = []
-            processed_ids = set()
+                WHERE id = ANY($1::uuid[])
+            """, [item_id for item_ids, _ in groups for item_id in item_ids])
+        items = {str(row['id']): row for row in rows}
+        
+        duplicate_groups = []
+        for item_ids, vectors in groups:
+            # Items deleted since the last rebuild are dropped here
+            members = [(items[item_id], vector) for item_id, vector in zip(item_ids, vectors) if item_id in items]
+            if len(members) < 2:
+                continue
+            members.sort(key=lambda member: member[0]['created_at'], reverse=True)
             
-            for i, item in enumerate(items):
-                if str(item['id']) in processed_ids:
-                    continue
-                
-                group = [{
+            anchor = members[0][1]
+            group = []
+            for position, (item, vector) in enumerate(members):
+                entry = {
                     "id": str(item['id']),
                     "title": item['title'],
                     "url": item['url'],
                     "created_at": item['created_at'].isoformat()
-                }]
-                
-                # Find all items similar to this one
-                for j, other_item in enumerate(items[i+1:], i+1):
-                    if str(other_item['id']) in processed_ids:
-                        continue
-                    
-                    # Calculate similarity using numpy (faster than DB query)
-                    similarity = np.dot(item['embedding'], other_item['embedding']) / (
-                        np.linalg.norm(item['embedding']) * np.linalg.norm(other_item['embedding'])
-                    )
-                    
-                    if similarity >= min_similarity:
-                        group.append({
-                            "id": str(other_item['id']),
-                            "title": other_item['title'],
-                            "url": other_item['url'],
-                            "created_at": other_item['created_at'].isoformat(),
-                            "similarity": similarity
-                        })
-                        processed_ids.add(str(other_item['id']))
-                
-                if len(group) > 1:
-                    processed_ids.add(str(item['id']))
-                    duplicate_groups.append({
-                        "group_id": f"group_{len(duplicate_groups) + 1}",
-                        "items": group,
-                        "count": len(group)
-                    })
-            
-            return duplicate_groups
+                }
+                if position:
+                    entry["similarity"] = float(np.dot(anchor, vector))
+                group.append(entry)
+            duplicate_groups.append(group)
+        
+        duplicate_groups.sort(key=lambda group: group[0]['created_at'], reverse=True)
+        return [
+            {
+                "group_id": f"group_{index + 1}",
+                "items": group,
+                "count": len(group)
+            }
+            for index, group in enumerate(duplicate_groups)
+        ]
     
     async def merge_duplicates(self, keep_id: str, duplicate_ids: List[str]) -> Dict[str, Any]:
         """
@@ -1,24 +1,39 @@
 """
 Dynamic Insights Service - Generates intelligent insights about the user's knowledge base
 """
+import asyncio
 import json
 import logging
 from collections import Counter, defaultdict
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import numpy as np
-from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
-from app.db.models import Item, item_tags, Tag
+from app.config import settings
+from app.db.database import get_db_pool
+from app.services.cache import cache_service, CacheKeys
 from app.services.embedding_service import EmbeddingService
 from app.services.knowledge_graph import KnowledgeGraphService
 from app.services.llm_processor import LLMProcessor
 
 logger = logging.getLogger(__name__)
 
+# Aggregate datasets each analyzer reads (loaded once per request, in parallel)
+INSIGHT_DATASETS = {
+    "trending_topics": {"tags"},
+    "knowledge_evolution": {"tags"},
+    "content_patterns": {"sources"},
+    "learning_velocity": {"activity"},
+    "connection_opportunities": {"recent_items"},
+    "knowledge_depth": {"tags", "cooccurrence"},
+    "exploration_suggestions": {"tags", "cooccurrence"},
+    "time_patterns": {"activity"},
+    "content_diversity": {"sources"},
+    "emerging_themes": {"recent_items"},
+}
+
 class DynamicInsightsService:
     def __init__(self):
         self.llm_processor = LLMProcessor()
@@ -48,26 +63,37 @@ class DynamicInsightsService:
     ) -> Dict[str, Any]:
         """
         Generate comprehensive insights about the knowledge base
+        
+        Analyzers read a fixed set of SQL aggregates (tag counts per month, source
+        and content-type histograms, activity by day/hour/weekday, the newest items)
+        loaded concurrently, so the query count does not grow with library size.
+        Results are cached per (user, time_range, insight_types).
         """
         try:
             logger.debug(f"Starting generate_insights with time_range={time_range}, user_id={user_id}")
+            requested = [t for t in self.insight_types if not insight_types or t in insight_types]
+            cache_key = cache_service.make_key(
+                CacheKeys.STATS, "insights", str(user_id or "anonymous"), time_range,
+                types=",".join(requested)
+            )
+            cached = await cache_service.get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Parse time range
             days = self._parse_time_range(time_range)
-            from datetime import timezone
-            start_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # Get items within time range
-            query = select(Item).where(Item.created_at >= start_date)
-            if user_id:
-                # For now, skip user filtering until we fix the JSON field access
-                pass
-                # query = query.where(Item.metadata['user_id'].astext == user_id)
-            
-            logger.debug("About to execute query")
-            result = await db.execute(query.order_by(Item.created_at.desc()))
-            items = result.scalars().all()
-            
-            if not items:
+            now = datetime.now(timezone.utc)
+            start_date = now - timedelta(days=days)
+            recent_date = now - timedelta(days=7)
+            
+            # For now, skip user filtering until items are scoped per user here
+            datasets = {"totals"}
+            for insight_type in requested:
+                datasets |= INSIGHT_DATASETS[insight_type]
+            data = await self._load_datasets(datasets, start_date, recent_date)
+            
+            item_count = data["totals"]["item_count"]
+            if not item_count:
                 return {
                     "insights": [],
                     "summary": "No items found in the specified time range",
@@ -75,69 +101,38 @@ class DynamicInsightsService:
                     "item_count": 0
                 }
             
-            # Generate different types of insights
-            insights = []
-            
-            if not insight_types or "trending_topics" in insight_types:
-                trending = await self._analyze_trending_topics(items, db)
-                if trending:
-                    insights.append(trending)
-            
-            if not insight_types or "knowledge_evolution" in insight_types:
-                evolution = await self._analyze_knowledge_evolution(items, db)
-                if evolution:
-                    insights.append(evolution)
-            
-            if not insight_types or "content_patterns" in insight_types:
-                patterns = await self._analyze_content_patterns(items)
-                if patterns:
-                    insights.append(patterns)
-            
-            if not insight_types or "learning_velocity" in insight_types:
-                velocity = await self._analyze_learning_velocity(items, days)
-                if velocity:
-                    insights.append(velocity)
-            
-            if not insight_types or "connection_opportunities" in insight_types:
-                connections = await self._find_connection_opportunities(items, db)
-                if connections:
-                    insights.append(connections)
-            
-            if not insight_types or "knowledge_depth" in insight_types:
-                depth = await self._analyze_knowledge_depth(items, db)
-                if depth:
-                    insights.append(depth)
-            
-            if not insight_types or "exploration_suggestions" in insight_types:
-                suggestions = await self._generate_exploration_suggestions(items, db)
-                if suggestions:
-                    insights.append(suggestions)
-            
-            if not insight_types or "time_patterns" in insight_types:
-                time_patterns = self._analyze_time_patterns(items)
-                if time_patterns:
-                    insights.append(time_patterns)
-            
-            if not insight_types or "content_diversity" in insight_types:
-                diversity = await self._calculate_content_diversity(items)
-                if diversity:
-                    insights.append(diversity)
-            
-            if not insight_types or "emerging_themes" in insight_types:
-                themes = await self._detect_emerging_themes(items, db)
-                if themes:
-                    insights.append(themes)
+            # Independent analyzers run concurrently; output keeps the declared order
+            analyzers = {
+                "trending_topics": lambda: self._analyze_trending_topics(data["tags"]),
+                "knowledge_evolution": lambda: self._analyze_knowledge_evolution(data["tags"]),
+                "content_patterns": lambda: self._analyze_content_patterns(data["sources"]),
+                "learning_velocity": lambda: self._analyze_learning_velocity(data["activity"], data["totals"]),
+                "connection_opportunities": lambda: self._find_connection_opportunities(data["recent_items"]),
+                "knowledge_depth": lambda: self._analyze_knowledge_depth(data["tags"], data["cooccurrence"]),
+                "exploration_suggestions": lambda: self._generate_exploration_suggestions(
+                    data["tags"], data["cooccurrence"]
+                ),
+                "time_patterns": lambda: self._analyze_time_patterns(data["activity"]),
+                "content_diversity": lambda: self._calculate_content_diversity(data["sources"], data["totals"]),
+                "emerging_themes": lambda: self._detect_emerging_themes(
+                    data["recent_items"], data["totals"], recent_date
+                ),
+            }
+            results = await asyncio.gather(*(analyzers[t]() for t in requested))
+            insights = [insight for insight in results if insight]
             
             # Generate overall summary
-            summary = await self._generate_insights_summary(insights, len(items))
+            summary = await self._generate_insights_summary(insights, item_count)
             
-            return {
+            response = {
                 "insights": insights,
                 "summary": summary,
                 "time_range": time_range,
-                "item_count": len(items),
-                "generated_at": datetime.now(timezone.utc).isoformat()
+                "item_count": item_count,
+                "generated_at": now.isoformat()
             }
+            await cache_service.set(cache_key, response, settings.CACHE_TTL_INSIGHTS)
+            return response
             
         except Exception as e:
             import traceback
@@ -145,6 +140,145 @@ class DynamicInsightsService:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
     
+    async def _load_datasets(
+        self,
+        datasets: Set[str],
+        start_date: datetime,
+        recent_date: datetime
+    ) -> Dict[str, Any]:
+        """
+        Run the aggregate queries the requested analyzers need, concurrently and
+        each on its own pooled connection
+        """
+        pool = await get_db_pool()
+        loaders = {
+            "totals": self._fetch_totals,
+            "tags": self._fetch_tag_buckets,
+            "cooccurrence": self._fetch_tag_cooccurrence,
+            "sources": self._fetch_sources,
+            "activity": self._fetch_activity,
+            "recent_items": self._fetch_recent_items,
+        }
+        names = sorted(datasets)
+        
+        async def load(name: str):
+            async with pool.acquire() as conn:
+                return await loaders[name](conn, start_date, recent_date)
+        
+        results = await asyncio.gather(*(load(name) for name in names))
+        return dict(zip(names, results))
+    
+    async def _fetch_totals(self, conn, start_date: datetime, recent_date: datetime) -> Dict[str, int]:
+        row = await conn.fetchrow("""
+            SELECT
+                COUNT(*) AS item_count,
+                COUNT(*) FILTER (WHERE created_at >= $2) AS recent_count
+            FROM items
+            WHERE created_at >= $1
+        """, start_date, recent_date)
+        return {"item_count": row['item_count'], "recent_count": row['recent_count']}
+    
+    async def _fetch_tag_buckets(self, conn, start_date: datetime, recent_date: datetime) -> List[Dict[str, Any]]:
+        """Tag counts per month, with the last-7-days share and first/last use"""
+        rows = await conn.fetch("""
+            SELECT
+                tag,
+                date_trunc('month', i.created_at AT TIME ZONE 'UTC') AS month,
+                COUNT(*) AS total,
+                COUNT(*) FILTER (WHERE i.created_at >= $2) AS recent,
+                MIN(i.created_at) AS first_seen,
+                MAX(i.created_at) AS last_seen
+            FROM items i
+            CROSS JOIN LATERAL unnest(i.tag_names) AS tag
+            WHERE i.created_at >= $1
+            GROUP BY tag, month
+            ORDER BY month, total DESC, tag
+        """, start_date, recent_date)
+        return [dict(row) for row in rows]
+    
+    async def _fetch_tag_cooccurrence(
+        self, conn, start_date: datetime, recent_date: datetime, per_tag: int = 10
+    ) -> Dict[str, List[str]]:
+        """For each tag, the tags most often saved on the same items"""
+        rows = await conn.fetch("""
+            SELECT tag, other
+            FROM (
+                SELECT
+                    a.tag,
+                    b.tag AS other,
+                    ROW_NUMBER() OVER (PARTITION BY a.tag ORDER BY COUNT(*) DESC, b.tag) AS rank
+                FROM items i
+                CROSS JOIN LATERAL unnest(i.tag_names) AS a(tag)
+                CROSS JOIN LATERAL unnest(i.tag_names) AS b(tag)
+                WHERE i.created_at >= $1 AND a.tag <> b.tag
+                GROUP BY a.tag, b.tag
+            ) pairs
+            WHERE rank <= $2
+            ORDER BY tag, rank
+        """, start_date, per_tag)
+        related = defaultdict(list)
+        for row in rows:
+            related[row['tag']].append(row['other'])
+        return dict(related)
+    
+    async def _fetch_sources(self, conn, start_date: datetime, recent_date: datetime) -> List[Dict[str, Any]]:
+        """Item counts and content length per (domain, content type)"""
+        rows = await conn.fetch("""
+            SELECT
+                substring(url from '://([^/?#]+)') AS domain,
+                CASE
+                    WHEN COALESCE(metadata->>'video', '') NOT IN ('', 'false', 'null') THEN 'video'
+                    WHEN url LIKE '%github.com%' THEN 'code'
+                    WHEN url LIKE '%arxiv.org%' OR url LIKE '%scholar.google%' THEN 'academic'
+                    WHEN url LIKE '%medium.com%' OR url LIKE '%substack.com%' THEN 'article'
+                    ELSE 'other'
+                END AS content_type,
+                COUNT(*) AS count,
+                COALESCE(SUM(length(processed_content)) FILTER (WHERE processed_content <> ''), 0) AS content_length,
+                COUNT(*) FILTER (WHERE processed_content <> '') AS with_content
+            FROM items
+            WHERE created_at >= $1
+            GROUP BY domain, content_type
+        """, start_date)
+        return [dict(row) for row in rows]
+    
+    async def _fetch_activity(self, conn, start_date: datetime, recent_date: datetime) -> Dict[str, Dict]:
+        """Saves per day, per hour of day and per ISO weekday (UTC) in one pass"""
+        rows = await conn.fetch("""
+            SELECT day, hour, dow, GROUPING(day, hour, dow) AS grouping_id, COUNT(*) AS count
+            FROM (
+                SELECT
+                    (created_at AT TIME ZONE 'UTC')::date AS day,
+                    EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC')::int AS hour,
+                    EXTRACT(ISODOW FROM created_at AT TIME ZONE 'UTC')::int AS dow
+                FROM items
+                WHERE created_at >= $1
+            ) activity
+            GROUP BY GROUPING SETS ((day), (hour), (dow))
+        """, start_date)
+        activity = {"daily": {}, "hourly": {}, "weekday": {}}
+        for row in rows:
+            # GROUPING() sets a bit for each column not in the row's grouping set
+            if row['grouping_id'] == 0b011:
+                activity["daily"][row['day'].isoformat()] = row['count']
+            elif row['grouping_id'] == 0b101:
+                activity["hourly"][row['hour']] = row['count']
+            else:
+                activity["weekday"][row['dow']] = row['count']
+        return activity
+    
+    async def _fetch_recent_items(
+        self, conn, start_date: datetime, recent_date: datetime, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        rows = await conn.fetch("""
+            SELECT id, title, summary, url, embedding, created_at
+            FROM items
+            WHERE created_at >= $1
+            ORDER BY created_at DESC
+            LIMIT $2
+        """, start_date, limit)
+        return [dict(row) for row in rows]
+    
     def _parse_time_range(self, time_range: str) -> int:
         """
         Parse time range string to days
@@ -160,39 +294,23 @@ class DynamicInsightsService:
         else:
             return 30  # Default to 30 days
     
-    async def _analyze_trending_topics(
-        self, 
-        items: List[Item], 
-        db: AsyncSession
-    ) -> Dict[str, Any]:
+    async def _analyze_trending_topics(self, tag_buckets: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze trending topics in recent saves
         """
         try:
-            # Get tags for recent items
+            # Last 7 days vs the rest of the range
             recent_tags = defaultdict(int)
             older_tags = defaultdict(int)
-            
-            from datetime import timezone
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
-            
-            for item in items:
-                # Get item tags
-                tag_query = select(Tag).join(item_tags).where(
-                    item_tags.c.item_id == item.id
-                )
-                result = await db.execute(tag_query)
-                tags = result.scalars().all()
-                
-                for tag in tags:
-                    if item.created_at >= cutoff_date:
-                        recent_tags[tag.name] += 1
-                    else:
-                        older_tags[tag.name] += 1
+            for bucket in tag_buckets:
+                recent_tags[bucket['tag']] += bucket['recent']
+                older_tags[bucket['tag']] += bucket['total'] - bucket['recent']
             
             # Calculate trending score
             trending_topics = []
             for tag, recent_count in recent_tags.items():
+                if not recent_count:
+                    continue
                 older_count = older_tags.get(tag, 0)
                 if older_count == 0:
                     trend_score = recent_count * 2  # New topic
@@ -225,36 +343,19 @@ class DynamicInsightsService:
             logger.error(f"Error analyzing trending topics: {str(e)}")
             return None
     
-    async def _analyze_knowledge_evolution(
-        self, 
-        items: List[Item], 
-        db: AsyncSession
-    ) -> Dict[str, Any]:
+    async def _analyze_knowledge_evolution(self, tag_buckets: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze how knowledge interests have evolved
         """
         try:
-            # Group items by month
+            # Group tag counts by month
             monthly_topics = defaultdict(lambda: defaultdict(int))
-            
-            for item in items:
-                month_key = item.created_at.strftime("%Y-%m")
-                
-                # Get item tags
-                tag_query = select(Tag).join(item_tags).where(
-                    item_tags.c.item_id == item.id
-                )
-                result = await db.execute(tag_query)
-                tags = result.scalars().all()
-                
-                for tag in tags:
-                    monthly_topics[month_key][tag.name] += 1
+            for bucket in tag_buckets:
+                monthly_topics[bucket['month'].strftime("%Y-%m")][bucket['tag']] += bucket['total']
             
             # Analyze evolution
             evolution_data = []
-            months = sorted(monthly_topics.keys())
-            
-            for i, month in enumerate(months):
+            for month in sorted(monthly_topics.keys()):
                 top_topics = sorted(
                     monthly_topics[month].items(), 
                     key=lambda x: x[1], 
@@ -285,42 +386,25 @@ class DynamicInsightsService:
             logger.error(f"Error analyzing knowledge evolution: {str(e)}")
             return None
     
-    async def _analyze_content_patterns(self, items: List[Item]) -> Dict[str, Any]:
+    async def _analyze_content_patterns(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze patterns in content types and sources
         """
         try:
-            # Analyze content types
             content_types = Counter()
-            sources = Counter()
-            content_length = []
-            
-            for item in items:
-                # Determine content type
-                metadata = item.metadata_ or {}
-                if metadata.get('video'):
-                    content_types['video'] += 1
-                elif item.url and 'github.com' in item.url:
-                    content_types['code'] += 1
-                elif item.url and any(domain in item.url for domain in ['arxiv.org', 'scholar.google']):
-                    content_types['academic'] += 1
-                elif item.url and any(domain in item.url for domain in ['medium.com', 'substack.com']):
-                    content_types['article'] += 1
-                else:
-                    content_types['other'] += 1
-                
-                # Extract domain
-                if item.url:
-                    from urllib.parse import urlparse
-                    domain = urlparse(item.url).netloc
-                    sources[domain] += 1
-                
-                # Content length
-                if item.processed_content:
-                    content_length.append(len(item.processed_content))
+            domains = Counter()
+            total_length = 0
+            with_content = 0
+            
+            for row in sources:
+                content_types[row['content_type']] += row['count']
+                if row['domain']:
+                    domains[row['domain']] += row['count']
+                total_length += row['content_length']
+                with_content += row['with_content']
             
             # Calculate statistics
-            avg_length = np.mean(content_length) if content_length else 0
+            avg_length = total_length / with_content if with_content else 0
             
             return {
                 "type": "content_patterns",
@@ -328,9 +412,9 @@ class DynamicInsightsService:
                 "description": self.insight_types["content_patterns"],
                 "data": {
                     "content_types": dict(content_types.most_common()),
-                    "top_sources": dict(sources.most_common(10)),
+                    "top_sources": dict(domains.most_common(10)),
                     "average_content_length": int(avg_length),
-                    "total_sources": len(sources)
+                    "total_sources": len(domains)
                 },
                 "visualization": "content_breakdown"
             }
@@ -341,18 +425,14 @@ class DynamicInsightsService:
     
     async def _analyze_learning_velocity(
         self, 
-        items: List[Item], 
-        days: int
+        activity: Dict[str, Dict], 
+        totals: Dict[str, int]
     ) -> Dict[str, Any]:
         """
         Analyze learning pace and intensity
         """
         try:
-            # Calculate daily saves
-            daily_saves = defaultdict(int)
-            for item in items:
-                day_key = item.created_at.strftime("%Y-%m-%d")
-                daily_saves[day_key] += 1
+            daily_saves = activity["daily"]
             
             # Calculate statistics
             save_counts = list(daily_saves.values())
@@ -368,10 +448,7 @@ class DynamicInsightsService:
             
             # Calculate momentum (recent vs overall average)
             recent_days = 7
-            from datetime import timezone
-            recent_cutoff = datetime.now(timezone.utc) - timedelta(days=recent_days)
-            recent_items = [i for i in items if i.created_at >= recent_cutoff]
-            recent_avg = len(recent_items) / recent_days
+            recent_avg = totals["recent_count"] / recent_days
             momentum = (recent_avg - avg_daily) / (avg_daily + 1) * 100
             
             return {
@@ -379,11 +456,11 @@ class DynamicInsightsService:
                 "title": "Learning Velocity",
                 "description": self.insight_types["learning_velocity"],
                 "data": {
-                    "average_daily_saves": round(avg_daily, 1),
+                    "average_daily_saves": round(float(avg_daily), 1),
                     "peak_daily_saves": max_daily,
                     "peak_learning_days": [{"date": d[0], "count": d[1]} for d in peak_days],
                     "momentum": {
-                        "value": round(momentum, 1),
+                        "value": round(float(momentum), 1),
                         "trend": "increasing" if momentum > 10 else "decreasing" if momentum < -10 else "stable"
                     },
                     "total_learning_days": len(daily_saves)
@@ -395,54 +472,34 @@ class DynamicInsightsService:
             logger.error(f"Error analyzing learning velocity: {str(e)}")
             return None
     
-    async def _find_connection_opportunities(
-        self, 
-        items: List[Item], 
-        db: AsyncSession
-    ) -> Dict[str, Any]:
+    async def _find_connection_opportunities(self, recent_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Find potential connections between disparate topics
         """
         try:
-            # Get embeddings for recent items
-            item_embeddings = []
-            item_data = []
-            
-            for item in items[:50]:  # Limit to recent 50 items
-                if item.embedding:
-                    item_embeddings.append(item.embedding)
-                    item_data.append({
-                        "id": str(item.id),
-                        "title": item.title,
-                        "summary": item.summary
-                    })
-            
-            if len(item_embeddings) < 10:
+            # Embeddings of the most recent items
+            with_embeddings = [item for item in recent_items if item['embedding'] is not None]
+            if len(with_embeddings) < 10:
                 return None
             
             # Find surprising connections (items that are similar but from different domains)
-            connections = []
-            embeddings_array = np.array(item_embeddings)
+            embeddings = np.asarray([item['embedding'] for item in with_embeddings], dtype=np.float32)
+            similarities = embeddings @ embeddings.T
+            domains = [self._extract_domain(item['url']) for item in with_embeddings]
             
-            for i in range(len(item_embeddings)):
-                # Calculate similarities
-                similarities = np.dot(embeddings_array, embeddings_array[i])
-                
-                # Find items with moderate similarity (not too similar, not too different)
-                for j in range(i + 1, len(similarities)):
-                    similarity = similarities[j]
-                    if 0.6 < similarity < 0.8:  # Moderate similarity range
-                        # Check if they're from different domains
-                        domain1 = self._extract_domain(items[i].url)
-                        domain2 = self._extract_domain(items[j].url)
-                        
-                        if domain1 != domain2:
-                            connections.append({
-                                "item1": item_data[i],
-                                "item2": item_data[j],
-                                "similarity": round(float(similarity), 3),
-                                "potential": "cross-domain insight"
-                            })
+            # Moderate similarity (not too similar, not too different), each pair once
+            candidate_pairs = np.argwhere(
+                np.triu((similarities > 0.6) & (similarities < 0.8), k=1)
+            )
+            connections = []
+            for i, j in candidate_pairs.tolist():
+                if domains[i] != domains[j]:
+                    connections.append({
+                        "item1": self._connection_item(with_embeddings[i]),
+                        "item2": self._connection_item(with_embeddings[j]),
+                        "similarity": round(float(similarities[i, j]), 3),
+                        "potential": "cross-domain insight"
+                    })
             
             # Sort by similarity and take top connections
             connections.sort(key=lambda x: x['similarity'], reverse=True)
@@ -470,67 +527,51 @@ class DynamicInsightsService:
             logger.error(f"Error finding connection opportunities: {str(e)}")
             return None
     
-    def _extract_domain(self, url: str) -> str:
+    def _connection_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": str(item['id']),
+            "title": item['title'],
+            "summary": item['summary']
+        }
+    
+    def _extract_domain(self, url: Optional[str]) -> str:
         """
         Extract domain from URL
         """
         from urllib.parse import urlparse
-        return urlparse(url).netloc
+        return urlparse(url).netloc if url else ""
     
     async def _analyze_knowledge_depth(
         self, 
-        items: List[Item], 
-        db: AsyncSession
+        tag_buckets: List[Dict[str, Any]], 
+        related_topics: Dict[str, List[str]]
     ) -> Dict[str, Any]:
         """
         Analyze depth of knowledge in different areas
         """
         try:
-            # Count items per topic
+            # Count items and first/last save per topic
             topic_counts = defaultdict(int)
-            topic_items = defaultdict(list)
-            
-            for item in items:
-                # Get item tags
-                tag_query = select(Tag).join(item_tags).where(
-                    item_tags.c.item_id == item.id
-                )
-                result = await db.execute(tag_query)
-                tags = result.scalars().all()
-                
-                for tag in tags:
-                    topic_counts[tag.name] += 1
-                    # Ensure timezone-aware datetime
-                    created_at = item.created_at
-                    if created_at.tzinfo is None:
-                        # If naive datetime, assume UTC
-                        from datetime import timezone
-                        created_at = created_at.replace(tzinfo=timezone.utc)
-                    
-                    topic_items[tag.name].append({
-                        "id": str(item.id),
-                        "title": item.title,
-                        "created_at": created_at.isoformat()
-                    })
+            first_seen = {}
+            last_seen = {}
+            for bucket in tag_buckets:
+                topic = bucket['tag']
+                topic_counts[topic] += bucket['total']
+                first_seen[topic] = min(first_seen.get(topic, bucket['first_seen']), bucket['first_seen'])
+                last_seen[topic] = max(last_seen.get(topic, bucket['last_seen']), bucket['last_seen'])
             
             # Identify areas of deep knowledge
             depth_analysis = []
             for topic, count in topic_counts.items():
                 if count >= 5:  # Threshold for "deep" knowledge
-                    # Check time span
-                    items_for_topic = topic_items[topic]
-                    dates = [datetime.fromisoformat(i['created_at']) for i in items_for_topic]
-                    time_span = (max(dates) - min(dates)).days
-                    
-                    # Get related topics through knowledge graph
-                    related = await self._get_related_topics(topic, items, db)
+                    time_span = (last_seen[topic] - first_seen[topic]).days
                     
                     depth_analysis.append({
                         "topic": topic,
                         "item_count": count,
                         "time_span_days": time_span,
                         "consistency_score": min(count / (time_span / 30 + 1), 10),  # Items per month
-                        "related_topics": related[:3]
+                        "related_topics": related_topics.get(topic, [])[:3]
                     })
             
             # Sort by depth (combination of count and consistency)
@@ -555,34 +596,6 @@ class DynamicInsightsService:
             logger.error(f"Error analyzing knowledge depth: {str(e)}")
             return None
     
-    async def _get_related_topics(
-        self, 
-        topic: str, 
-        items: List[Item], 
-        db: AsyncSession
-    ) -> List[str]:
-        """
-        Get topics related to a given topic
-        """
-        related = set()
-        
-        # Find items with this topic
-        for item in items:
-            tag_query = select(Tag).join(item_tags).where(
-                item_tags.c.item_id == item.id
-            )
-            result = await db.execute(tag_query)
-            tags = result.scalars().all()
-            
-            tag_names = [t.name for t in tags]
-            if topic in tag_names:
-                # Add other tags from this item
-                for tag_name in tag_names:
-                    if tag_name != topic:
-                        related.add(tag_name)
-        
-        return list(related)
-    
     def _calculate_expertise_level(self, depth_analysis: List[Dict]) -> str:
         """
         Calculate overall expertise level
@@ -603,30 +616,24 @@ class DynamicInsightsService:
     
     async def _generate_exploration_suggestions(
         self, 
-        items: List[Item], 
-        db: AsyncSession
+        tag_buckets: List[Dict[str, Any]], 
+        related_topics: Dict[str, List[str]]
     ) -> Dict[str, Any]:
         """
         Generate suggestions for new areas to explore
         """
         try:
-            # Get current topics
-            current_topics = set()
-            for item in items:
-                tag_query = select(Tag).join(item_tags).where(
-                    item_tags.c.item_id == item.id
-                )
-                result = await db.execute(tag_query)
-                tags = result.scalars().all()
-                current_topics.update(t.name for t in tags)
-            
-            # Use knowledge graph to find adjacent topics
+            # Current topics, most used first
+            topic_counts = Counter()
+            for bucket in tag_buckets:
+                topic_counts[bucket['tag']] += bucket['total']
+            ordered_topics = [topic for topic, _ in topic_counts.most_common()]
+            current_topics = set(ordered_topics)
+            
+            # Topics that co-occur with the main ones
             adjacent_topics = set()
-            for topic in list(current_topics)[:10]:  # Limit to avoid too many queries
-                # This would use the knowledge graph to find related topics
-                # For now, we'll simulate with a simple approach
-                related = await self._get_related_topics(topic, items, db)
-                adjacent_topics.update(related)
+            for topic in ordered_topics[:10]:
+                adjacent_topics.update(related_topics.get(topic, []))
             
             # Find topics that are adjacent but not current
             exploration_candidates = adjacent_topics - current_topics
@@ -634,7 +641,7 @@ class DynamicInsightsService:
             # Generate AI suggestions if we have candidates
             suggestions = []
             if exploration_candidates:
-                prompt = f"""Based on someone interested in these topics: {', '.join(list(current_topics)[:10])},
+                prompt = f"""Based on someone interested in these topics: {', '.join(ordered_topics[:10])},
 suggest 5 related topics they should explore next from: {', '.join(exploration_candidates)}.
 For each suggestion, provide a brief reason why it would be valuable.
 Format: Topic: Reason (one line each)"""
@@ -673,7 +680,7 @@ Format: Topic: Reason (one line each)"""
                 "description": self.insight_types["exploration_suggestions"],
                 "data": {
                     "suggestions": suggestions[:5],
-                    "based_on_topics": list(current_topics)[:10],
+                    "based_on_topics": ordered_topics[:10],
                     "expansion_potential": len(exploration_candidates)
                 },
                 "visualization": "suggestion_cards"
@@ -683,21 +690,16 @@ Format: Topic: Reason (one line each)"""
             logger.error(f"Error generating exploration suggestions: {str(e)}")
             return None
     
-    def _analyze_time_patterns(self, items: List[Item]) -> Dict[str, Any]:
+    async def _analyze_time_patterns(self, activity: Dict[str, Dict]) -> Dict[str, Any]:
         """
         Analyze when user is most active
         """
         try:
-            # Analyze by hour of day
-            hourly_activity = defaultdict(int)
-            daily_activity = defaultdict(int)
-            
-            for item in items:
-                hour = item.created_at.hour
-                day = item.created_at.strftime("%A")
-                
-                hourly_activity[hour] += 1
-                daily_activity[day] += 1
+            hourly_activity = activity["hourly"]
+            day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+            daily_activity = defaultdict(int, {
+                day_order[dow - 1]: count for dow, count in activity["weekday"].items()
+            })
             
             # Find peak hours
             peak_hours = sorted(
@@ -706,12 +708,8 @@ Format: Topic: Reason (one line each)"""
                 reverse=True
             )[:3]
             
-            # Find most active days
-            day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-            active_days = sorted(
-                daily_activity.items(),
-                key=lambda x: day_order.index(x[0])
-            )
+            # Most active days, in weekday order
+            active_days = [(day, daily_activity[day]) for day in day_order if day in daily_activity]
             
             # Determine pattern type
             weekend_activity = daily_activity["Saturday"] + daily_activity["Sunday"]
@@ -741,31 +739,24 @@ Format: Topic: Reason (one line each)"""
             logger.error(f"Error analyzing time patterns: {str(e)}")
             return None
     
-    async def _calculate_content_diversity(self, items: List[Item]) -> Dict[str, Any]:
+    async def _calculate_content_diversity(
+        self, 
+        sources: List[Dict[str, Any]], 
+        totals: Dict[str, int]
+    ) -> Dict[str, Any]:
         """
         Calculate diversity score of knowledge base
         """
         try:
-            # Get all unique domains
-            domains = set()
-            content_types = set()
-            topics = set()
-            
-            for item in items:
-                if item.url:
-                    domains.add(self._extract_domain(item.url))
-                
-                # Determine content type
-                metadata = item.metadata_ or {}
-                if metadata.get('video'):
-                    content_types.add('video')
-                elif item.url and 'github.com' in item.url:
-                    content_types.add('code')
-                else:
-                    content_types.add('article')
+            # Unique domains and coarse content types (video, code, everything else)
+            domains = {row['domain'] for row in sources if row['domain']}
+            content_types = {
+                row['content_type'] if row['content_type'] in ('video', 'code') else 'article'
+                for row in sources
+            }
             
             # Calculate diversity metrics
-            domain_diversity = len(domains) / max(len(items), 1)
+            domain_diversity = len(domains) / max(totals["item_count"], 1)
             type_diversity = len(content_types) / 5  # Assuming 5 main content types
             
             # Overall diversity score (0-100)
@@ -781,7 +772,7 @@ Format: Topic: Reason (one line each)"""
                 "data": {
                     "diversity_score": round(diversity_score),
                     "unique_sources": len(domains),
-                    "content_types": list(content_types),
+                    "content_types": sorted(content_types),
                     "interpretation": self._interpret_diversity_score(diversity_score)
                 },
                 "visualization": "diversity_gauge"
@@ -806,25 +797,23 @@ Format: Topic: Reason (one line each)"""
     
     async def _detect_emerging_themes(
         self, 
-        items: List[Item], 
-        db: AsyncSession
+        recent_items: List[Dict[str, Any]], 
+        totals: Dict[str, int],
+        recent_date: datetime
     ) -> Dict[str, Any]:
         """
         Detect emerging themes from recent content
         """
         try:
             # Focus on last 7 days
-            from datetime import timezone
-            recent_date = datetime.now(timezone.utc) - timedelta(days=7)
-            recent_items = [i for i in items if i.created_at >= recent_date]
-            
-            if len(recent_items) < 3:
+            if totals["recent_count"] < 3:
                 return None
+            recent = [item for item in recent_items if item['created_at'] >= recent_date]
             
             # Extract key phrases from recent content
             content_texts = []
-            for item in recent_items[:20]:  # Limit to prevent token overflow
-                text = f"{item.title}. {item.summary or ''}"
+            for item in recent[:20]:  # Limit to prevent token overflow
+                text = f"{item['title']}. {item['summary'] or ''}"
                 content_texts.append(text)
             
             # Use AI to identify emerging themes
@@ -863,7 +852,7 @@ Format: Theme Name | Description | Confidence"""
                 "description": self.insight_types["emerging_themes"],
                 "data": {
                     "themes": themes[:5],
-                    "based_on_items": len(recent_items),
+                    "based_on_items": totals["recent_count"],
                     "time_window": "last 7 days"
                 },
                 "visualization": "theme_bubbles"
@@ -0,0 +1,326 @@
+"""
+Embedding Backfill Engine
+Bulk (re)embedding and legacy migration for the whole item corpus.
+
+- Items are streamed in id order from a server-side cursor instead of loaded at once
+- Each chunk is embedded through the batched embedding pipeline and written with
+  COPY into a temp table followed by one set-based upsert + items update
+- Chunks run concurrently in windows; after each window the last written item id
+  is checkpointed in embedding_backfill_jobs so an interrupted job resumes there
+- Progress and throughput (items/s) are logged per window and stored with the job
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import asyncpg
+
+from app.config import settings
+from app.db.database import get_db_pool
+from app.services.cache import cache_service
+from app.services.embedding_manager import EmbeddingManager
+from app.services.unified_ai_service import unified_ai_service
+from app.utils.fingerprint import calculate_content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Characters of item content that go into the embedding text (after the title)
+EMBED_CONTENT_CHARS = 1000
+
+
+class EmbeddingBackfill:
+    """Resumable, batched embedding jobs over all items"""
+
+    def __init__(self, chunk_size: Optional[int] = None, concurrency: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.EMBEDDING_BACKFILL_CHUNK_SIZE
+        self.concurrency = concurrency or settings.EMBEDDING_BACKFILL_CONCURRENCY
+
+    async def reembed(
+        self,
+        model_name: str,
+        model_version: str = "v1",
+        job_name: Optional[str] = None,
+        resume: bool = True,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate text embeddings for every item whose content changed or that has
+        no embedding for this model/version yet (all items when `force` is set).
+        """
+        job_name = job_name or f"reembed:{model_name}:{model_version}"
+        sql = """
+            SELECT
+                i.id,
+                i.title,
+                COALESCE(i.processed_content, i.raw_content) AS content,
+                i.content_fingerprint,
+                EXISTS (
+                    SELECT 1 FROM embeddings e
+                    WHERE e.item_id = i.id AND e.model_name = $2
+                    AND e.model_version = $3 AND e.embedding_type = 'text'
+                ) AS has_embedding
+            FROM items i
+            WHERE (i.raw_content IS NOT NULL OR i.processed_content IS NOT NULL)
+            AND ($1::uuid IS NULL OR i.id > $1)
+            ORDER BY i.id
+        """
+
+        async def process(rows: List[asyncpg.Record]) -> Dict[str, int]:
+            return await self._reembed_chunk(rows, model_name, model_version, force)
+
+        return await self._run(
+            job_name, model_name, model_version, sql, [model_name, model_version], process, resume
+        )
+
+    async def migrate_legacy(
+        self,
+        model_name: str,
+        model_version: str = "v1",
+        job_name: str = "legacy-migration",
+        resume: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Copy vectors from items.embedding into the embeddings table for items that
+        have no embed_vector_id. Vectors are copied inside the database.
+        """
+        sql = """
+            SELECT id
+            FROM items
+            WHERE embedding IS NOT NULL AND embed_vector_id IS NULL
+            AND ($1::uuid IS NULL OR id > $1)
+            ORDER BY id
+        """
+
+        async def process(rows: List[asyncpg.Record]) -> Dict[str, int]:
+            return await self._migrate_chunk(rows, model_name, model_version)
+
+        return await self._run(job_name, model_name, model_version, sql, [], process, resume)
+
+    async def get_job(self, job_name: str) -> Optional[Dict[str, Any]]:
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT * FROM embedding_backfill_jobs WHERE job_name = $1", job_name
+            )
+        return dict(row) if row else None
+
+    async def _run(
+        self,
+        job_name: str,
+        model_name: str,
+        model_version: str,
+        sql: str,
+        sql_args: List[Any],
+        process,
+        resume: bool
+    ) -> Dict[str, Any]:
+        pool = await get_db_pool()
+        counts = {"processed": 0, "written": 0, "skipped": 0, "failed": 0}
+        last_item_id: Optional[UUID] = None
+
+        job = await self.get_job(job_name) if resume else None
+        if job and job["status"] != "completed":
+            last_item_id = job["last_item_id"]
+            counts = {key: job[key] for key in counts}
+            logger.info(f"Resuming embedding job {job_name} after item {last_item_id}")
+
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO embedding_backfill_jobs (job_name, model_name, model_version, status, last_item_id,
+                                                     processed, written, skipped, failed, started_at, updated_at)
+                VALUES ($1, $2, $3, 'running', $4, $5, $6, $7, $8, NOW(), NOW())
+                ON CONFLICT (job_name) DO UPDATE SET
+                    model_name = EXCLUDED.model_name, model_version = EXCLUDED.model_version,
+                    status = 'running', last_item_id = EXCLUDED.last_item_id,
+                    processed = EXCLUDED.processed, written = EXCLUDED.written,
+                    skipped = EXCLUDED.skipped, failed = EXCLUDED.failed,
+                    error = NULL, completed_at = NULL, updated_at = NOW()
+            """, job_name, model_name, model_version, last_item_id,
+                counts["processed"], counts["written"], counts["skipped"], counts["failed"])
+
+        started = time.monotonic()
+        run_processed = 0
+        try:
+            async with pool.acquire() as reader:
+                async with reader.transaction(readonly=True):
+                    cursor = await reader.cursor(sql, last_item_id, *sql_args)
+                    while True:
+                        window = []
+                        for _ in range(self.concurrency):
+                            rows = await cursor.fetch(self.chunk_size)
+                            if rows:
+                                window.append(rows)
+                            if len(rows) < self.chunk_size:
+                                break
+                        if not window:
+                            break
+
+                        results = await asyncio.gather(*(process(rows) for rows in window))
+                        for result in results:
+                            for key, value in result.items():
+                                counts[key] += value
+                        window_size = sum(len(rows) for rows in window)
+                        counts["processed"] += window_size
+                        run_processed += window_size
+                        last_item_id = window[-1][-1]["id"]
+
+                        rate = run_processed / max(time.monotonic() - started, 1e-6)
+                        await self._checkpoint(job_name, last_item_id, counts, rate)
+                        logger.info(
+                            f"Embedding job {job_name}: {counts['processed']} processed, "
+                            f"{counts['written']} written, {counts['failed']} failed ({rate:.1f} items/s)"
+                        )
+
+                        if len(window[-1]) < self.chunk_size:
+                            break
+        except Exception as e:
+            logger.error(f"Embedding job {job_name} failed after item {last_item_id}: {e}")
+            await self._checkpoint(job_name, last_item_id, counts, None, status="failed", error=str(e))
+            raise
+
+        elapsed = time.monotonic() - started
+        rate = run_processed / elapsed if elapsed > 0 else 0.0
+        await self._checkpoint(job_name, last_item_id, counts, rate, status="completed")
+        return {
+            **counts,
+            "job_name": job_name,
+            "elapsed_seconds": round(elapsed, 2),
+            "items_per_second": round(rate, 2),
+        }
+
+    async def _checkpoint(
+        self,
+        job_name: str,
+        last_item_id: Optional[UUID],
+        counts: Dict[str, int],
+        rate: Optional[float],
+        status: str = "running",
+        error: Optional[str] = None
+    ):
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE embedding_backfill_jobs
+                SET last_item_id = $2, processed = $3, written = $4, skipped = $5, failed = $6,
+                    items_per_second = COALESCE($7, items_per_second), status = $8, error = $9,
+                    updated_at = NOW(),
+                    completed_at = CASE WHEN $8 = 'completed' THEN NOW() ELSE NULL END
+                WHERE job_name = $1
+            """, job_name, last_item_id, counts["processed"], counts["written"],
+                counts["skipped"], counts["failed"], rate, status, error)
+
+    async def _reembed_chunk(
+        self,
+        rows: List[asyncpg.Record],
+        model_name: str,
+        model_version: str,
+        force: bool
+    ) -> Dict[str, int]:
+        pending = []
+        skipped = 0
+        for row in rows:
+            content = row["content"]
+            if not content:
+                skipped += 1
+                continue
+            fingerprint = calculate_content_fingerprint(content)
+            if not force and row["has_embedding"] and row["content_fingerprint"] == fingerprint:
+                skipped += 1
+                continue
+            pending.append((row["id"], f"{row['title']} {content[:EMBED_CONTENT_CHARS]}", fingerprint))
+
+        if not pending:
+            return {"written": 0, "skipped": skipped, "failed": 0}
+
+        vectors = await unified_ai_service.generate_embeddings([text for _, text, _ in pending])
+        records = [
+            (item_id, vector, fingerprint)
+            for (item_id, _, fingerprint), vector in zip(pending, vectors)
+            if vector is not None
+        ]
+        failed = len(pending) - len(records)
+        if records:
+            await self._write_vectors(records, model_name, model_version)
+        return {"written": len(records), "skipped": skipped, "failed": failed}
+
+    async def _write_vectors(self, records: List[tuple], model_name: str, model_version: str):
+        """COPY (item_id, vector, fingerprint) rows and apply them with one upsert/update"""
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE _embedding_backfill (
+                        item_id UUID PRIMARY KEY,
+                        vector vector,
+                        fingerprint TEXT
+                    ) ON COMMIT DROP
+                """)
+                await conn.copy_records_to_table(
+                    "_embedding_backfill", records=records,
+                    columns=["item_id", "vector", "fingerprint"]
+                )
+                # The legacy items.embedding column is still read by older endpoints,
+                # so it is refreshed in the same statement rather than a second pass
+                await conn.execute("""
+                    WITH upserted AS (
+                        INSERT INTO embeddings (item_id, model_name, model_version, vector, embedding_type, content_source)
+                        SELECT item_id, $1, $2, vector, 'text', 'direct_text' FROM _embedding_backfill
+                        ON CONFLICT (item_id, model_name, model_version, embedding_type)
+                        DO UPDATE SET vector = EXCLUDED.vector, updated_at = NOW()
+                        RETURNING id, item_id
+                    )
+                    UPDATE items i
+                    SET embed_vector_id = u.id,
+                        embedding = b.vector,
+                        content_fingerprint = b.fingerprint,
+                        updated_at = NOW()
+                    FROM upserted u
+                    JOIN _embedding_backfill b ON b.item_id = u.item_id
+                    WHERE i.id = u.item_id
+                """, model_name, model_version)
+
+        # Keep read-through entries in EmbeddingManager.get_embedding current
+        cached_vectors = {}
+        for item_id, vector, _ in records:
+            cached_vectors[EmbeddingManager._embedding_cache_key(str(item_id))] = vector
+            cached_vectors[
+                EmbeddingManager._embedding_cache_key(str(item_id), model_name, model_version)
+            ] = vector
+        await cache_service.set_vectors_many(
+            cached_vectors, model=model_name, expire=settings.CACHE_TTL_ITEM
+        )
+
+    async def _migrate_chunk(
+        self,
+        rows: List[asyncpg.Record],
+        model_name: str,
+        model_version: str
+    ) -> Dict[str, int]:
+        item_ids = [row["id"] for row in rows]
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            written = await conn.fetchval("""
+                WITH upserted AS (
+                    INSERT INTO embeddings (item_id, model_name, model_version, vector, embedding_type, content_source)
+                    SELECT id, $2, $3, embedding, 'text', 'legacy_migration'
+                    FROM items
+                    WHERE id = ANY($1::uuid[]) AND embedding IS NOT NULL
+                    ON CONFLICT (item_id, model_name, model_version, embedding_type)
+                    DO UPDATE SET vector = EXCLUDED.vector, updated_at = NOW()
+                    RETURNING id, item_id
+                ), linked AS (
+                    UPDATE items i
+                    SET embed_vector_id = u.id
+                    FROM upserted u
+                    WHERE i.id = u.item_id
+                    RETURNING i.id
+                )
+                SELECT COUNT(*) FROM linked
+            """, item_ids, model_name, model_version)
+        return {"written": written, "skipped": 0, "failed": len(item_ids) - written}
+
+
+# Singleton instance
+embedding_backfill = EmbeddingBackfill()
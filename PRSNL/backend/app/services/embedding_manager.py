@@ -13,11 +13,13 @@ from uuid import UUID
 
 import numpy as np
 
+from app.config import settings
 from app.db.database import get_db_pool
+from app.services.cache import cache_service, CacheKeys
 from app.services.unified_ai_service import unified_ai_service
 from app.services.multimodal_embedding_service import multimodal_embedding_service
 from app.services.embedding_service import embedding_service
-from app.utils.fingerprint import calculate_content_fingerprint
+from app.services.vector_index import vector_index_service
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,7 @@ class EmbeddingManager:
         try:
             # Generate embedding using unified AI service
             embeddings = await unified_ai_service.generate_embeddings([content])
-            if not embeddings:
+            if not embeddings or embeddings[0] is None:
                 logger.error(f"Failed to generate embedding for item {item_id}")
                 return None
             
@@ -110,15 +112,27 @@ class EmbeddingManager:
                             SET embedding = $1
                             WHERE id = $2
                         """, embedding_vector, UUID(item_id))
-                    
-                    return {
-                        "embedding_id": str(embedding_id),
-                        "item_id": item_id,
-                        "model_name": model_name,
-                        "model_version": model_version,
-                        "vector_length": len(embedding_vector)
-                    }
-                    
+
+            # Write-through so get_embedding never serves a stale vector
+            cached_vectors = {
+                self._embedding_cache_key(item_id, model_name, model_version): embedding_vector
+            }
+            if update_item:
+                cached_vectors[self._embedding_cache_key(item_id)] = embedding_vector
+                # Keep the in-process ANN index current without waiting for sync
+                await vector_index_service.upsert(item_id, embedding_vector)
+            await cache_service.set_vectors_many(
+                cached_vectors, model=model_name, expire=settings.CACHE_TTL_ITEM
+            )
+
+            return {
+                "embedding_id": str(embedding_id),
+                "item_id": item_id,
+                "model_name": model_name,
+                "model_version": model_version,
+                "vector_length": len(embedding_vector)
+            }
+
         except Exception as e:
             logger.error(f"Error creating embedding for item {item_id}: {e}")
             return None
@@ -243,6 +257,11 @@ class EmbeddingManager:
         Returns:
             Numpy array of embedding vector or None
         """
+        cache_key = self._embedding_cache_key(item_id, model_name, model_version)
+        cached = await cache_service.get_vector(cache_key)
+        if cached is not None:
+            return cached
+        
         pool = await get_db_pool()
         async with pool.acquire() as conn:
             if model_name and model_version:
@@ -260,10 +279,66 @@ class EmbeddingManager:
                     WHERE i.id = $1
                 """, UUID(item_id))
             
-            if result and result['vector']:
-                return np.array(result['vector'])
+            if result and result['vector'] is not None:
+                vector = np.asarray(result['vector'], dtype=np.float32)
+                await cache_service.set_vector(
+                    cache_key, vector, model=model_name or "", expire=settings.CACHE_TTL_ITEM
+                )
+                return vector
             return None
     
+    async def get_embeddings_many(self, item_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Get the current embeddings of several items with one cache MGET and at
+        most one database query for the misses.
+
+        Items without an embedding are left out of the result.
+        """
+        if not item_ids:
+            return {}
+        item_ids = list(dict.fromkeys(str(item_id) for item_id in item_ids))
+        cache_keys = [self._embedding_cache_key(item_id) for item_id in item_ids]
+
+        vectors: Dict[str, np.ndarray] = {}
+        misses = []
+        for item_id, cached in zip(item_ids, await cache_service.get_vectors_many(cache_keys)):
+            if cached is not None:
+                vectors[item_id] = cached
+            else:
+                misses.append(item_id)
+
+        if misses:
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT i.id, e.vector
+                    FROM items i
+                    JOIN embeddings e ON i.embed_vector_id = e.id
+                    WHERE i.id = ANY($1::uuid[])
+                """, misses)
+            fetched = {
+                str(row['id']): np.asarray(row['vector'], dtype=np.float32)
+                for row in rows if row['vector'] is not None
+            }
+            if fetched:
+                await cache_service.set_vectors_many(
+                    {self._embedding_cache_key(item_id): vector for item_id, vector in fetched.items()},
+                    expire=settings.CACHE_TTL_ITEM
+                )
+            vectors.update(fetched)
+
+        return vectors
+
+    @staticmethod
+    def _embedding_cache_key(
+        item_id: str,
+        model_name: Optional[str] = None,
+        model_version: Optional[str] = None
+    ) -> str:
+        if model_name and model_version:
+            return f"{CacheKeys.ITEM}:embedding:{item_id}:{model_name}:{model_version}"
+        return f"{CacheKeys.ITEM}:embedding:{item_id}:current"
+    
     async def search_similar(
         self,
         query_embedding: List[float],
@@ -284,52 +359,82 @@ class EmbeddingManager:
             List of similar items with similarity scores
         """
         pool = await get_db_pool()
+
+        if not model_name:
+            # Answer top-k from the in-process ANN index, then apply the threshold
+            hits = await vector_index_service.search(query_embedding, limit)
+            if hits is not None:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch("""
+                        SELECT id, title, url, summary, created_at
+                        FROM items
+                        WHERE id = ANY($1::uuid[])
+                    """, [UUID(item_id) for item_id, _ in hits])
+                rows_by_id = {str(row['id']): row for row in rows}
+                return [
+                    self._format_similar_row(rows_by_id[item_id], similarity)
+                    for item_id, similarity in hits
+                    if similarity > threshold and item_id in rows_by_id
+                ]
+
+        # pgvector fallback: rank by distance first so the ivfflat index is usable,
+        # and only filter by threshold on the top-k candidates
         async with pool.acquire() as conn:
             if model_name:
                 # Search within specific model embeddings
                 results = await conn.fetch("""
-                    SELECT 
-                        i.id,
-                        i.title,
-                        i.url,
-                        i.summary,
-                        i.created_at,
-                        1 - (e.vector <=> $1::vector) as similarity
-                    FROM embeddings e
-                    JOIN items i ON e.item_id = i.id
-                    WHERE e.model_name = $2
-                    AND 1 - (e.vector <=> $1::vector) > $3
+                    SELECT * FROM (
+                        SELECT 
+                            i.id,
+                            i.title,
+                            i.url,
+                            i.summary,
+                            i.created_at,
+                            1 - (e.vector <=> $1::vector) as similarity
+                        FROM embeddings e
+                        JOIN items i ON e.item_id = i.id
+                        WHERE e.model_name = $2
+                        ORDER BY e.vector <=> $1::vector
+                        LIMIT $4
+                    ) top_k
+                    WHERE similarity > $3
                     ORDER BY similarity DESC
-                    LIMIT $4
                 """, query_embedding, model_name, threshold, limit)
             else:
                 # Search using items' current embeddings
                 results = await conn.fetch("""
-                    SELECT 
-                        i.id,
-                        i.title,
-                        i.url,
-                        i.summary,
-                        i.created_at,
-                        1 - (e.vector <=> $1::vector) as similarity
-                    FROM items i
-                    JOIN embeddings e ON i.embed_vector_id = e.id
-                    WHERE 1 - (e.vector <=> $1::vector) > $2
+                    SELECT * FROM (
+                        SELECT 
+                            i.id,
+                            i.title,
+                            i.url,
+                            i.summary,
+                            i.created_at,
+                            1 - (e.vector <=> $1::vector) as similarity
+                        FROM items i
+                        JOIN embeddings e ON i.embed_vector_id = e.id
+                        ORDER BY e.vector <=> $1::vector
+                        LIMIT $3
+                    ) top_k
+                    WHERE similarity > $2
                     ORDER BY similarity DESC
-                    LIMIT $3
                 """, query_embedding, threshold, limit)
             
             return [
-                {
-                    "id": str(row['id']),
-                    "title": row['title'],
-                    "url": row['url'],
-                    "summary": row['summary'],
-                    "created_at": row['created_at'].isoformat(),
-                    "similarity": float(row['similarity'])
-                }
+                self._format_similar_row(row, row['similarity'])
                 for row in results
             ]
+
+    @staticmethod
+    def _format_similar_row(row, similarity: float) -> Dict[str, Any]:
+        return {
+            "id": str(row['id']),
+            "title": row['title'],
+            "url": row['url'],
+            "summary": row['summary'],
+            "created_at": row['created_at'].isoformat(),
+            "similarity": float(similarity)
+        }
     
     async def cross_modal_search(
         self,
@@ -378,135 +483,64 @@ class EmbeddingManager:
             logger.error(f"Error getting multimodal stats: {e}")
             return {}
     
-    async def migrate_legacy_embeddings(self, batch_size: int = 100) -> Dict[str, int]:
+    async def migrate_legacy_embeddings(self, batch_size: int = 100, resume: bool = True) -> Dict[str, Any]:
         """
         Migrate embeddings from items.embedding to embeddings table.
         
+        Runs as a resumable bulk job (see app.services.embedding_backfill).
+        
         Args:
             batch_size: Number of items to process at once
+            resume: Continue an interrupted migration from its checkpoint
             
         Returns:
             Dict with migration statistics
         """
-        pool = await get_db_pool()
-        migrated = 0
-        skipped = 0
-        failed = 0
-        
-        async with pool.acquire() as conn:
-            # Get items with embeddings but no embed_vector_id
-            while True:
-                items = await conn.fetch("""
-                    SELECT id, embedding
-                    FROM items
-                    WHERE embedding IS NOT NULL 
-                    AND embed_vector_id IS NULL
-                    LIMIT $1
-                """, batch_size)
-                
-                if not items:
-                    break
-                
-                for item in items:
-                    try:
-                        # Insert into embeddings table
-                        result = await conn.fetchrow("""
-                            INSERT INTO embeddings (item_id, model_name, model_version, vector)
-                            VALUES ($1, $2, $3, $4)
-                            ON CONFLICT (item_id, model_name, model_version) 
-                            DO UPDATE SET vector = EXCLUDED.vector, updated_at = NOW()
-                            RETURNING id
-                        """, item['id'], self.default_model, self.default_version, item['embedding'])
-                        
-                        # Update item with embed_vector_id
-                        await conn.execute("""
-                            UPDATE items
-                            SET embed_vector_id = $1
-                            WHERE id = $2
-                        """, result['id'], item['id'])
-                        
-                        migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to migrate embedding for item {item['id']}: {e}")
-                        failed += 1
-                
-                logger.info(f"Migrated batch: {migrated} successful, {failed} failed")
+        from app.services.embedding_backfill import EmbeddingBackfill
         
+        result = await EmbeddingBackfill(chunk_size=batch_size).migrate_legacy(
+            self.default_text_model, self.default_version, resume=resume
+        )
         return {
-            "migrated": migrated,
-            "skipped": skipped,
-            "failed": failed
+            "migrated": result["written"],
+            "skipped": result["skipped"],
+            "failed": result["failed"],
+            "items_per_second": result["items_per_second"],
+            "elapsed_seconds": result["elapsed_seconds"]
         }
     
-    async def update_all_embeddings(self, model_name: Optional[str] = None) -> Dict[str, int]:
+    async def update_all_embeddings(
+        self,
+        model_name: Optional[str] = None,
+        resume: bool = True,
+        force: bool = False
+    ) -> Dict[str, Any]:
         """
         Update embeddings for all items, using content fingerprint to detect changes.
         
+        Items whose content is unchanged and that already have an embedding for the
+        model are skipped unless `force` is set. Runs as a resumable bulk job.
+        
         Args:
             model_name: Model to use for embedding generation
+            resume: Continue an interrupted run from its checkpoint
+            force: Re-embed every item regardless of fingerprint
             
         Returns:
             Dict with update statistics
         """
-        pool = await get_db_pool()
-        updated = 0
-        unchanged = 0
-        failed = 0
+        from app.services.embedding_backfill import embedding_backfill
         
         model_name = model_name or self.default_text_model
-        
-        async with pool.acquire() as conn:
-            # Get all items
-            items = await conn.fetch("""
-                SELECT id, title, raw_content, processed_content, content_fingerprint
-                FROM items
-                WHERE (raw_content IS NOT NULL OR processed_content IS NOT NULL)
-                ORDER BY created_at DESC
-            """)
-            
-            for item in items:
-                try:
-                    # Use processed content if available, otherwise raw content
-                    content = item['processed_content'] or item['raw_content']
-                    if not content:
-                        continue
-                    
-                    # Calculate current fingerprint
-                    current_fingerprint = calculate_content_fingerprint(content)
-                    
-                    # Check if content has changed
-                    if item['content_fingerprint'] == current_fingerprint:
-                        unchanged += 1
-                        continue
-                    
-                    # Update fingerprint
-                    await conn.execute("""
-                        UPDATE items
-                        SET content_fingerprint = $1
-                        WHERE id = $2
-                    """, current_fingerprint, item['id'])
-                    
-                    # Create new embedding
-                    result = await self.create_embedding(
-                        str(item['id']),
-                        f"{item['title']} {content[:1000]}",
-                        model_name=model_name
-                    )
-                    
-                    if result:
-                        updated += 1
-                    else:
-                        failed += 1
-                        
-                except Exception as e:
-                    logger.error(f"Failed to update embedding for item {item['id']}: {e}")
-                    failed += 1
-        
+        result = await embedding_backfill.reembed(
+            model_name, self.default_version, resume=resume, force=force
+        )
         return {
-            "updated": updated,
-            "unchanged": unchanged,
-            "failed": failed
+            "updated": result["written"],
+            "unchanged": result["skipped"],
+            "failed": result["failed"],
+            "items_per_second": result["items_per_second"],
+            "elapsed_seconds": result["elapsed_seconds"]
         }
     
     async def search_similar_items(
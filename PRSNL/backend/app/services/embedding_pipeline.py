@@ -0,0 +1,170 @@
+"""
+Embedding Pipeline
+Batched, deduplicated embedding generation in front of the embedding provider.
+
+- Identical texts within a request are embedded once
+- Cache lookups use one MGET and results are written back with one pipelined SET,
+  stored in the compact binary vector format (app.utils.vector_codec)
+- Provider batches run concurrently under a configurable limit
+- Concurrent requests for a text that is already being embedded share one call
+- Failed texts come back as None instead of placeholder vectors
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+EmbedBatchFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingPipeline:
+    """Cache-aware, coalescing front end for an embedding provider"""
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        model: str = "",
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        cache_ttl: Optional[int] = None
+    ):
+        self._embed_batch = embed_batch
+        self.model = model
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_concurrency = max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY
+        self.cache_ttl = cache_ttl or settings.EMBEDDING_CACHE_TTL
+
+        # Loop-bound state; reset if the pipeline is used from a different event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {
+            "requested": 0,
+            "deduplicated": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "generated": 0,
+            "failed": 0,
+            "provider_calls": 0,
+        }
+
+    @staticmethod
+    def make_key(text: str, cache_key_prefix: str = "emb") -> str:
+        return f"{cache_key_prefix}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = {}
+        return loop
+
+    async def embed(
+        self, texts: List[str], cache_key_prefix: str = "emb"
+    ) -> List[Optional[List[float]]]:
+        """
+        Embed texts, returning one vector per input in input order.
+
+        Entries for texts that could not be embedded are None.
+        """
+        if not texts:
+            return []
+        loop = self._bind_loop()
+
+        keys = [self.make_key(text, cache_key_prefix) for text in texts]
+        text_by_key = dict(zip(keys, texts))
+        unique_keys = list(text_by_key)
+        self.stats["requested"] += len(texts)
+        self.stats["deduplicated"] += len(texts) - len(unique_keys)
+
+        resolved: Dict[str, Optional[List[float]]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+
+        # Join generations already in flight for the same text
+        lookup_keys = []
+        for key in unique_keys:
+            if key in self._in_flight:
+                waiting[key] = self._in_flight[key]
+            else:
+                lookup_keys.append(key)
+
+        # One MGET for everything else
+        misses = []
+        for key, cached in zip(lookup_keys, await cache_service.get_vectors_many(lookup_keys)):
+            if cached is not None:
+                resolved[key] = cached.tolist()
+            else:
+                misses.append(key)
+        self.stats["cache_hits"] += len(lookup_keys) - len(misses)
+
+        # Claim the misses (another caller may have claimed some during the MGET)
+        owned = []
+        for key in misses:
+            if key in self._in_flight:
+                waiting[key] = self._in_flight[key]
+            else:
+                self._in_flight[key] = loop.create_future()
+                owned.append(key)
+        self.stats["coalesced"] += len(waiting)
+
+        if owned:
+            generated: Dict[str, Optional[List[float]]] = {}
+            try:
+                generated = await self._generate(owned, text_by_key)
+            finally:
+                for key in owned:
+                    future = self._in_flight.pop(key, None)
+                    if future is not None and not future.done():
+                        future.set_result(generated.get(key))
+            resolved.update(generated)
+
+        for key, future in waiting.items():
+            resolved[key] = await asyncio.shield(future)
+
+        return [resolved.get(key) for key in keys]
+
+    async def _generate(
+        self, keys: List[str], text_by_key: Dict[str, str]
+    ) -> Dict[str, Optional[List[float]]]:
+        """Embed uncached texts in concurrent provider batches and cache the results."""
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        batch_results = await asyncio.gather(
+            *(self._run_batch(batch, text_by_key) for batch in batches)
+        )
+
+        generated: Dict[str, Optional[List[float]]] = {}
+        for result in batch_results:
+            generated.update(result)
+
+        to_cache = {key: vector for key, vector in generated.items() if vector is not None}
+        if to_cache:
+            await cache_service.set_vectors_many(to_cache, model=self.model, expire=self.cache_ttl)
+        self.stats["generated"] += len(to_cache)
+        self.stats["failed"] += len(generated) - len(to_cache)
+        return generated
+
+    async def _run_batch(
+        self, batch: List[str], text_by_key: Dict[str, str]
+    ) -> Dict[str, Optional[List[float]]]:
+        async with self._semaphore:
+            self.stats["provider_calls"] += 1
+            try:
+                vectors = await self._embed_batch([text_by_key[key] for key in batch])
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(batch)} texts failed: {e}")
+                return {key: None for key in batch}
+
+        if len(vectors) != len(batch):
+            logger.error(f"Embedding provider returned {len(vectors)} vectors for {len(batch)} texts")
+            return {key: None for key in batch}
+        return dict(zip(batch, vectors))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": len(self._in_flight)}
@@ -8,9 +8,11 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from app.core.exceptions import InvalidInput
 from app.db.database import get_db_pool
 from app.services.duplicate_detection import duplicate_detection
 from app.services.embedding_manager import embedding_manager
+from app.services.hybrid_search_engine import HybridSearchEngine, hybrid_search_engine
 from app.services.unified_ai_service import unified_ai_service
 from app.utils.fingerprint import calculate_content_fingerprint
 
@@ -49,21 +51,22 @@ class EnhancedSearchService:
         try:
             # Generate query embedding
             query_embeddings = await unified_ai_service.generate_embeddings([query])
-            if not query_embeddings:
+            if not query_embeddings or query_embeddings[0] is None:
                 return {"results": [], "error": "Failed to generate query embedding"}
             
             query_embedding = query_embeddings[0]
             
-            # Use embedding manager for search
+            # Use embedding manager for search (top-k first, threshold applied after);
+            # over-fetch when post-filters will discard some of the candidates
             similar_items = await embedding_manager.search_similar(
                 query_embedding=query_embedding,
-                limit=limit,
+                limit=limit * 3 if filter_by else limit,
                 threshold=threshold
             )
             
             # Apply additional filters if provided
             if filter_by:
-                similar_items = await self._apply_filters(similar_items, filter_by)
+                similar_items = (await self._apply_filters(similar_items, filter_by))[:limit]
             
             # Enhance results with additional metadata
             enhanced_results = []
@@ -88,46 +91,47 @@ class EnhancedSearchService:
         query: str,
         limit: int = None,
         semantic_weight: float = 0.7,
-        keyword_weight: float = 0.3
+        keyword_weight: float = 0.3,
+        fusion: str = "rrf",
+        cursor: Optional[str] = None,
+        filter_by: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Perform hybrid search combining semantic and keyword search.
         
+        Both candidate sets are generated, fused and paged in a single query
+        by the hybrid search engine.
+        
         Args:
             query: Search query text
             limit: Maximum number of results
             semantic_weight: Weight for semantic similarity
             keyword_weight: Weight for keyword matching
+            fusion: Fusion method ("rrf" or "weighted")
+            cursor: Cursor from a previous page's next_cursor
+            filter_by: Additional filters (type, date_range)
             
         Returns:
             Dict with search results and metadata
         """
         limit = limit or self.default_limit
+        # A bad cursor is the caller's error, not a search failure
+        try:
+            HybridSearchEngine.parse_cursor(cursor)
+        except ValueError as e:
+            raise InvalidInput(str(e))
         
         try:
-            # Get semantic results
-            semantic_results = await self.semantic_search(query, limit=limit * 2)
-            
-            # Get keyword results
-            keyword_results = await self.keyword_search(query, limit=limit * 2)
-            
-            # Combine and rerank results
-            combined_results = self._combine_search_results(
-                semantic_results.get("results", []),
-                keyword_results.get("results", []),
-                semantic_weight,
-                keyword_weight
+            return await hybrid_search_engine.search(
+                query,
+                limit=limit,
+                fusion=fusion,
+                semantic_weight=semantic_weight,
+                keyword_weight=keyword_weight,
+                cursor=cursor,
+                filter_by=filter_by
             )
             
-            return {
-                "results": combined_results[:limit],
-                "total": len(combined_results),
-                "query": query,
-                "search_type": "hybrid",
-                "weights": {"semantic": semantic_weight, "keyword": keyword_weight},
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
             return {"results": [], "error": str(e)}
@@ -282,7 +286,10 @@ class EnhancedSearchService:
         else:  # hybrid
             results = await self.hybrid_search(query, limit=limit * 2)
         
-        # Deduplicate by content fingerprint
+        return self.deduplicate_results(results, limit or self.default_limit)
+    
+    def deduplicate_results(self, results: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """Drop results whose content fingerprint was already seen, keeping rank order."""
         seen_fingerprints = set()
         deduplicated = []
         
@@ -297,7 +304,7 @@ class EnhancedSearchService:
         
         return {
             **results,
-            "results": deduplicated[:limit or self.default_limit],
+            "results": deduplicated[:limit],
             "deduplication": {
                 "original_count": len(results.get("results", [])),
                 "deduplicated_count": len(deduplicated),
@@ -349,59 +356,6 @@ class EnhancedSearchService:
         
         return enhanced
     
-    def _combine_search_results(
-        self,
-        semantic_results: List[Dict[str, Any]],
-        keyword_results: List[Dict[str, Any]],
-        semantic_weight: float,
-        keyword_weight: float
-    ) -> List[Dict[str, Any]]:
-        """Combine and rerank semantic and keyword search results."""
-        # Create lookup for semantic scores
-        semantic_scores = {r["id"]: r["similarity"] for r in semantic_results}
-        keyword_scores = {r["id"]: r["similarity"] for r in keyword_results}
-        
-        # Get all unique items
-        all_item_ids = set(semantic_scores.keys()) | set(keyword_scores.keys())
-        
-        combined = []
-        for item_id in all_item_ids:
-            # Get item data (prefer semantic result, fallback to keyword)
-            item_data = None
-            for r in semantic_results:
-                if r["id"] == item_id:
-                    item_data = r.copy()
-                    break
-            
-            if not item_data:
-                for r in keyword_results:
-                    if r["id"] == item_id:
-                        item_data = r.copy()
-                        break
-            
-            if item_data:
-                # Calculate combined score
-                semantic_score = semantic_scores.get(item_id, 0)
-                keyword_score = keyword_scores.get(item_id, 0)
-                
-                combined_score = (
-                    semantic_score * semantic_weight +
-                    keyword_score * keyword_weight
-                )
-                
-                item_data["similarity"] = combined_score
-                item_data["search_type"] = "hybrid"
-                item_data["component_scores"] = {
-                    "semantic": semantic_score,
-                    "keyword": keyword_score
-                }
-                
-                combined.append(item_data)
-        
-        # Sort by combined score
-        combined.sort(key=lambda x: x["similarity"], reverse=True)
-        return combined
-    
     def _build_filter_clauses(
         self,
         filters: Dict[str, Any],
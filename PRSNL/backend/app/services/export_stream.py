@@ -0,0 +1,308 @@
+"""
+Export Streaming
+Bounded-memory item exports for /api/export.
+
+- Items are read through a server-side cursor in EXPORT_BATCH_SIZE batches on a
+  single pooled connection; attachments are fetched per batch
+- Each format is an async generator of text chunks, so only one batch is in
+  memory at a time regardless of library size
+- Exports are ordered by (created_at, id) descending and can resume after an
+  opaque keyset cursor; NDJSON emits a checkpoint cursor after every batch and a
+  `limit` reports the cursor for the next page up front
+- Optional gzip wraps any format
+"""
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.db.database import get_db_pool
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Columns not worth shipping in an export (derived search/index data)
+EXCLUDED_COLUMNS = {"search_vector", "embedding", "embed_vector_id", "tag_names"}
+
+CSV_FIELDS = ['id', 'title', 'url', 'type', 'summary', 'tags', 'created_at', 'captured_at']
+
+
+@dataclass
+class ExportFilters:
+    item_ids: Optional[List[UUID]] = None
+    tags: Optional[List[str]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    params: List[Any] = field(default_factory=list)
+
+    def _param(self, value: Any) -> str:
+        self.params.append(value)
+        return f"${len(self.params)}"
+
+    def where(self, after: Optional[Dict[str, Any]] = None, until: Optional[Dict[str, Any]] = None) -> str:
+        """SQL predicate over `items i`, optionally between two keyset positions
+        (`after` exclusive, `until` inclusive); appends its parameters to self.params."""
+        self.params = []
+        clauses = ["TRUE"]
+        if self.item_ids:
+            clauses.append(f"i.id = ANY({self._param(self.item_ids)})")
+        if self.tags:
+            clauses.append(f"i.tag_names && {self._param(self.tags)}::text[]")
+        if self.start_date:
+            clauses.append(f"i.created_at >= {self._param(self.start_date)}")
+        if self.end_date:
+            clauses.append(f"i.created_at <= {self._param(self.end_date)}")
+        if after:
+            clauses.append(
+                f"(i.created_at, i.id) < ({self._param(after['created_at'])}, {self._param(after['id'])})"
+            )
+        if until:
+            clauses.append(
+                f"(i.created_at, i.id) >= ({self._param(until['created_at'])}, {self._param(until['id'])})"
+            )
+        return " AND ".join(clauses)
+
+
+def parse_export_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a resume cursor; raises ValueError if it is not an export cursor."""
+    after = decode_cursor(cursor)
+    if after is None:
+        return None
+    if not isinstance(after.get("created_at"), datetime) or "id" not in after:
+        raise ValueError("Invalid export cursor")
+    return {"created_at": after["created_at"], "id": UUID(str(after["id"]))}
+
+
+def row_cursor(row: Dict[str, Any]) -> str:
+    return encode_cursor({"created_at": row["created_at"], "id": row["id"]})
+
+
+class ItemExport:
+    """Filtered, keyset-ordered item export read in batches"""
+
+    def __init__(
+        self,
+        filters: ExportFilters,
+        after: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        include_attachments: bool = False
+    ):
+        self.filters = filters
+        self.after = after
+        self.limit = limit
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+        self.include_attachments = include_attachments
+        # Last row of a limited export, fixed by prepare(); streaming stops at this
+        # keyset position rather than after `limit` rows, so items inserted in the
+        # meantime cannot push the boundary row out of the export
+        self.until: Optional[Dict[str, Any]] = None
+        self._prepared = False
+
+    async def prepare(self) -> Tuple[int, Optional[str]]:
+        """Item count for this export and the cursor that resumes after it (if limited)."""
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            where = self.filters.where(self.after)
+            total = await conn.fetchval(f"SELECT COUNT(*) FROM items i WHERE {where}", *self.filters.params)
+            next_cursor = None
+            if self.limit and total > self.limit:
+                boundary = await conn.fetchrow(f"""
+                    SELECT i.created_at, i.id FROM items i
+                    WHERE {where}
+                    ORDER BY i.created_at DESC, i.id DESC
+                    OFFSET {int(self.limit) - 1} LIMIT 1
+                """, *self.filters.params)
+                self.until = {"created_at": boundary["created_at"], "id": boundary["id"]}
+                next_cursor = row_cursor(self.until)
+                total = self.limit
+        self._prepared = True
+        return total, next_cursor
+
+    async def batches(self, columns: str = "i.*") -> AsyncIterator[List[Dict[str, Any]]]:
+        """Lists of up to batch_size item dicts, newest first."""
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            where = self.filters.where(self.after, self.until)
+            # Without prepare() there is no boundary row, so fall back to LIMIT
+            limit = f"LIMIT {int(self.limit)}" if self.limit and not self._prepared else ""
+            query = f"""
+                SELECT {columns}, i.tag_names AS tags
+                FROM items i
+                WHERE {where}
+                ORDER BY i.created_at DESC, i.id DESC
+                {limit}
+            """
+            batch: List[Dict[str, Any]] = []
+            async with conn.transaction():
+                async for record in conn.cursor(query, *self.filters.params, prefetch=self.batch_size):
+                    batch.append(dict(record))
+                    if len(batch) >= self.batch_size:
+                        yield await self._finish(conn, batch)
+                        batch = []
+            if batch:
+                yield await self._finish(conn, batch)
+
+    async def tag_groups(self) -> AsyncIterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """(tag, batch) pairs ordered by tag, untagged (None) last; items repeat under each tag."""
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            where = self.filters.where(self.after, self.until)
+            query = f"""
+                SELECT i.*, i.tag_names AS tags, g.tag AS group_tag
+                FROM items i
+                CROSS JOIN LATERAL unnest(
+                    CASE WHEN cardinality(i.tag_names) > 0 THEN i.tag_names ELSE ARRAY[NULL::text] END
+                ) AS g(tag)
+                WHERE {where}
+                ORDER BY g.tag NULLS LAST, i.created_at DESC, i.id DESC
+            """
+            batch: List[Dict[str, Any]] = []
+            current: Optional[str] = None
+            async with conn.transaction():
+                async for record in conn.cursor(query, *self.filters.params, prefetch=self.batch_size):
+                    row = dict(record)
+                    if batch and (row["group_tag"] != current or len(batch) >= self.batch_size):
+                        yield current, batch
+                        batch = []
+                    current = row["group_tag"]
+                    batch.append(row)
+            if batch:
+                yield current, batch
+
+    async def _finish(self, conn, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self.include_attachments:
+            return batch
+        rows = await conn.fetch("""
+            SELECT item_id, jsonb_agg(jsonb_build_object(
+                'id', id,
+                'type', file_type,
+                'file_path', file_path,
+                'mime_type', mime_type,
+                'file_size', file_size,
+                'metadata', metadata
+            )) AS attachments
+            FROM attachments
+            WHERE item_id = ANY($1::uuid[])
+            GROUP BY item_id
+        """, [row["id"] for row in batch])
+        by_item = {row["item_id"]: row["attachments"] for row in rows}
+        for row in batch:
+            attachments = by_item.get(row["id"])
+            row["attachments"] = json.loads(attachments) if isinstance(attachments, str) else attachments
+        return batch
+
+
+# =============================================
+# Formats
+# =============================================
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (bytes, memoryview)):
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _item_json(row: Dict[str, Any]) -> str:
+    return json.dumps(
+        {key: value for key, value in row.items() if key not in EXCLUDED_COLUMNS},
+        default=_json_default
+    )
+
+
+async def json_chunks(export: ItemExport, total: int, next_cursor: Optional[str]) -> AsyncIterator[str]:
+    """One JSON document: export metadata, then the items array streamed batch by batch."""
+    yield (
+        "{\n"
+        f'  "export_date": "{datetime.now().isoformat()}",\n'
+        '  "version": "1.0",\n'
+        f'  "total_items": {total},\n'
+        f'  "next_cursor": {json.dumps(next_cursor)},\n'
+        '  "items": ['
+    )
+    first = True
+    async for batch in export.batches():
+        parts = []
+        for row in batch:
+            parts.append(("\n    " if first else ",\n    ") + _item_json(row))
+            first = False
+        yield "".join(parts)
+    yield "\n  ]\n}\n"
+
+
+async def ndjson_chunks(export: ItemExport) -> AsyncIterator[str]:
+    """One item per line; a {"_checkpoint": cursor} line after every batch allows resuming."""
+    async for batch in export.batches():
+        lines = [_item_json(row) for row in batch]
+        lines.append(json.dumps({"_checkpoint": row_cursor(batch[-1])}))
+        yield "\n".join(lines) + "\n"
+
+
+async def csv_chunks(export: ItemExport) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    columns = "i.id, i.title, i.url, i.type, i.summary, i.created_at, i.captured_at"
+    async for batch in export.batches(columns):
+        for row in batch:
+            writer.writerow({
+                'id': str(row['id']),
+                'title': row['title'],
+                'url': row['url'],
+                'type': row['type'],
+                'summary': row['summary'],
+                'tags': ', '.join(row['tags'] or []),
+                'created_at': row['created_at'].isoformat() if row['created_at'] else '',
+                'captured_at': row['captured_at'].isoformat() if row['captured_at'] else ''
+            })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def markdown_chunks(
+    export: ItemExport, total: int, format_item, group_by_tag: bool = False
+) -> AsyncIterator[str]:
+    yield "\n".join([
+        "# PRSNL Knowledge Base Export",
+        f"\nExported on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Total items: {total}\n",
+        "---\n",
+        ""
+    ])
+    if not group_by_tag:
+        async for batch in export.batches():
+            yield "\n".join(line for row in batch for line in format_item(row)) + "\n"
+        return
+
+    started = False
+    heading: Optional[str] = None
+    async for tag, batch in export.tag_groups():
+        lines = []
+        if not started or tag != heading:
+            lines.append(f"## {tag if tag is not None else 'Untagged'}\n")
+            started, heading = True, tag
+        lines.extend(line for row in batch for line in format_item(row))
+        yield "\n".join(lines) + "\n"
+
+
+async def gzip_chunks(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Gzip-compress a text stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
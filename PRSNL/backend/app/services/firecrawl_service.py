@@ -12,6 +12,7 @@ from urllib.parse import urljoin, urlparse
 import httpx
 
 from app.config import settings
+from app.services.http_client_factory import ClientType, http_client_factory
 
 logger = logging.getLogger(__name__)
 
@@ -76,16 +77,15 @@ class FirecrawlService:
             if headers:
                 request_data["headers"] = headers
             
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(self.timeout, connect=10.0)
-            ) as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.post(
                     f"{self.base_url}/v1/scrape",
                     json=request_data,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
-                    }
+                    },
+                    timeout=httpx.Timeout(self.timeout, connect=10.0)
                 )
                 
                 response.raise_for_status()
@@ -174,14 +174,15 @@ class FirecrawlService:
                 }
             }
             
-            async with httpx.AsyncClient(timeout=300) as client:  # 5 minute timeout for crawling
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.post(
                     f"{self.base_url}/v1/crawl",
                     json=request_data,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
-                    }
+                    },
+                    timeout=300  # 5 minute timeout for crawling
                 )
                 
                 response.raise_for_status()
@@ -238,14 +239,15 @@ class FirecrawlService:
                 }
             }
             
-            async with httpx.AsyncClient(timeout=60) as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.post(
                     f"{self.base_url}/v1/scrape",
                     json=request_data,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
-                    }
+                    },
+                    timeout=60
                 )
                 
                 response.raise_for_status()
@@ -275,10 +277,11 @@ class FirecrawlService:
             return {"error": "Firecrawl service not enabled"}
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(
                     f"{self.base_url}/v1/crawl/{job_id}",
-                    headers={"Authorization": f"Bearer {self.api_key}"}
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    timeout=30
                 )
                 
                 response.raise_for_status()
@@ -0,0 +1,139 @@
+"""
+Graph Edge Builder
+Similarity edges for knowledge-graph visualization.
+
+- Embeddings are stacked into one L2-normalized float32 matrix
+- Small graphs get every pair above the threshold from a single matmul
+- Larger graphs keep each node's k nearest neighbours above the threshold,
+  exact via blocked matmul + argpartition up to GRAPH_ANN_EDGE_LIMIT nodes
+  and from a temporary HNSW index (hnswlib) beyond that
+- Edge lists are cached by node set, item versions and parameters
+"""
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.cache import cache_service, CacheKeys
+from app.services.duplicate_clustering import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# Try to import hnswlib
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    logger.warning("hnswlib not available - large graphs will use exact k-NN edges")
+    HNSWLIB_AVAILABLE = False
+
+Edge = Tuple[int, int, float]
+
+
+def threshold_edges(matrix: np.ndarray, threshold: float) -> List[Edge]:
+    """All (i, j, similarity) with i < j and similarity >= threshold from one matmul."""
+    sims = matrix @ matrix.T
+    rows, cols = np.nonzero(np.triu(sims >= threshold, k=1))
+    return list(zip(rows.tolist(), cols.tolist(), sims[rows, cols].tolist()))
+
+
+def _dedupe_knn(neighbors: np.ndarray, sims: np.ndarray, threshold: float) -> List[Edge]:
+    """Turn per-row neighbour lists into undirected edges, keeping the best similarity."""
+    edges = {}
+    for i in range(neighbors.shape[0]):
+        for j, sim in zip(neighbors[i].tolist(), sims[i].tolist()):
+            if j < 0 or j == i or sim < threshold:
+                continue
+            key = (i, j) if i < j else (j, i)
+            if sim > edges.get(key, -1.0):
+                edges[key] = sim
+    return [(i, j, sim) for (i, j), sim in edges.items()]
+
+
+def exact_knn_edges(
+    matrix: np.ndarray, k: int, threshold: float, block_size: int = 1024
+) -> List[Edge]:
+    """Each node's k most similar nodes above threshold, computed block by block."""
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return []
+    neighbors = np.empty((n, k), dtype=np.int64)
+    neighbor_sims = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_size):
+        sims = matrix[start:start + block_size] @ matrix.T
+        rows = np.arange(sims.shape[0])
+        sims[rows, rows + start] = -np.inf  # exclude self
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        neighbors[start:start + sims.shape[0]] = top
+        neighbor_sims[start:start + sims.shape[0]] = np.take_along_axis(sims, top, axis=1)
+    return _dedupe_knn(neighbors, neighbor_sims, threshold)
+
+
+def ann_knn_edges(matrix: np.ndarray, k: int, threshold: float) -> List[Edge]:
+    """Approximate k-nearest-neighbour edges from a temporary HNSW index."""
+    n, dim = matrix.shape
+    k = min(k + 1, n)  # +1: each node finds itself
+    index = hnswlib.Index(space="cosine", dim=dim)
+    # Throwaway index: a lower ef_construction than the search index trades a
+    # little recall for a much faster build
+    index.init_index(max_elements=n, M=settings.VECTOR_INDEX_HNSW_M, ef_construction=64)
+    index.add_items(matrix, np.arange(n))
+    index.set_ef(max(k * 2, settings.VECTOR_INDEX_HNSW_EF_SEARCH))
+    labels, distances = index.knn_query(matrix, k=k)
+    return _dedupe_knn(labels.astype(np.int64), 1.0 - distances, threshold)
+
+
+class GraphEdgeBuilder:
+    """Builds (and caches) similarity edges for a set of graph nodes"""
+
+    def __init__(self):
+        self.exact_limit = settings.GRAPH_EXACT_EDGE_LIMIT
+        self.ann_limit = settings.GRAPH_ANN_EDGE_LIMIT
+        self.max_neighbors = settings.GRAPH_MAX_NEIGHBORS
+        self.cache_ttl = settings.GRAPH_EDGE_CACHE_TTL
+
+    def compute(self, vectors: np.ndarray, threshold: float) -> List[Edge]:
+        """Edges between rows of `vectors` (CPU-bound; call off the event loop)."""
+        n = vectors.shape[0]
+        if n < 2:
+            return []
+        matrix = normalize_rows(vectors)
+        if n <= self.exact_limit:
+            return threshold_edges(matrix, threshold)
+        if n <= self.ann_limit or not HNSWLIB_AVAILABLE:
+            return exact_knn_edges(matrix, self.max_neighbors, threshold)
+        return ann_knn_edges(matrix, self.max_neighbors, threshold)
+
+    async def build(
+        self,
+        node_ids: Sequence[str],
+        vectors: np.ndarray,
+        threshold: float,
+        version_key: Optional[str] = None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        (source_id, target_id, similarity) edges for the given nodes.
+
+        `version_key` should change whenever any node's embedding may have
+        changed (e.g. a digest of updated_at values); it is part of the cache key.
+        """
+        digest = hashlib.sha256(
+            "|".join([*node_ids, version_key or "", str(threshold), str(self.max_neighbors)]).encode()
+        ).hexdigest()
+        cache_key = f"{CacheKeys.GRAPH}:edges:{digest}"
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return [tuple(edge) for edge in cached]
+
+        edges = await asyncio.to_thread(self.compute, vectors, threshold)
+        result = [(node_ids[i], node_ids[j], float(sim)) for i, j, sim in edges]
+        await cache_service.set(cache_key, result, self.cache_ttl)
+        return result
+
+
+# Singleton instance
+graph_edge_builder = GraphEdgeBuilder()
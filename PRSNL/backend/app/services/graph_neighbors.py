@@ -0,0 +1,110 @@
+"""
+Graph Neighbours
+Cached k-nearest-neighbour lists for graph traversal (learning paths).
+
+- Lists for a whole batch of items are read with one cache MGET
+- Misses are answered by the in-process ANN index when it is ready, otherwise
+  by one LATERAL pgvector query covering every missing item
+- Results are written back with one pipelined SET
+"""
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from app.config import settings
+from app.db.database import get_db_pool
+from app.services.cache import cache_service, CacheKeys
+from app.services.embedding_manager import embedding_manager
+from app.services.vector_index import vector_index_service
+
+logger = logging.getLogger(__name__)
+
+Neighbors = List[Tuple[str, float]]
+
+
+class GraphNeighborCache:
+    """Batched, cached kNN neighbour lists keyed by item id"""
+
+    def __init__(self):
+        self.cache_ttl = settings.GRAPH_NEIGHBOR_CACHE_TTL
+        self.stats = {"requested": 0, "cache_hits": 0, "index_lookups": 0, "db_queries": 0}
+
+    @staticmethod
+    def _cache_key(item_id: str, k: int) -> str:
+        return f"{CacheKeys.GRAPH}:neighbors:{k}:{item_id}"
+
+    async def get_neighbors(self, item_ids: Sequence[str], k: int = 5) -> Dict[str, Neighbors]:
+        """
+        Up to k (neighbour_id, similarity) pairs per item, most similar first.
+
+        Items without an embedding map to an empty list.
+        """
+        item_ids = list(dict.fromkeys(str(item_id) for item_id in item_ids))
+        if not item_ids:
+            return {}
+        self.stats["requested"] += len(item_ids)
+
+        result: Dict[str, Neighbors] = {}
+        misses = []
+        cached = await cache_service.get_many([self._cache_key(item_id, k) for item_id in item_ids])
+        for item_id, neighbors in zip(item_ids, cached):
+            if neighbors is not None:
+                result[item_id] = [(neighbor_id, similarity) for neighbor_id, similarity in neighbors]
+            else:
+                misses.append(item_id)
+        self.stats["cache_hits"] += len(item_ids) - len(misses)
+
+        if misses:
+            fetched = await self._from_index(misses, k) if vector_index_service.is_ready else None
+            if fetched is None:
+                fetched = await self._from_database(misses, k)
+            result.update(fetched)
+            await cache_service.set_many(
+                {self._cache_key(item_id, k): neighbors for item_id, neighbors in fetched.items()},
+                expire=self.cache_ttl
+            )
+
+        return result
+
+    async def _from_index(self, item_ids: List[str], k: int):
+        vectors = await embedding_manager.get_embeddings_many(item_ids)
+        fetched: Dict[str, Neighbors] = {}
+        for item_id in item_ids:
+            vector = vectors.get(item_id)
+            if vector is None:
+                fetched[item_id] = []
+                continue
+            hits = await vector_index_service.search(vector, k + 1)
+            if hits is None:
+                return None
+            fetched[item_id] = [(hit_id, score) for hit_id, score in hits if hit_id != item_id][:k]
+        self.stats["index_lookups"] += len(item_ids)
+        return fetched
+
+    async def _from_database(self, item_ids: List[str], k: int) -> Dict[str, Neighbors]:
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT src.id AS source_id, nb.id AS neighbor_id, 1 - nb.distance AS similarity
+                FROM unnest($1::uuid[]) AS src(id)
+                JOIN items si ON si.id = src.id
+                JOIN embeddings se ON se.id = si.embed_vector_id
+                CROSS JOIN LATERAL (
+                    SELECT i.id, e.vector <=> se.vector AS distance
+                    FROM embeddings e
+                    JOIN items i ON i.embed_vector_id = e.id
+                    WHERE i.id <> src.id
+                    ORDER BY e.vector <=> se.vector
+                    LIMIT $2
+                ) nb
+                ORDER BY src.id, nb.distance
+            """, item_ids, k)
+        self.stats["db_queries"] += 1
+
+        fetched: Dict[str, Neighbors] = {item_id: [] for item_id in item_ids}
+        for row in rows:
+            fetched[str(row['source_id'])].append((str(row['neighbor_id']), float(row['similarity'])))
+        return fetched
+
+
+# Singleton instance
+graph_neighbor_cache = GraphNeighborCache()
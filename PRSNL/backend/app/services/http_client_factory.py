@@ -1,11 +1,20 @@
 """
 HTTPClientFactory - Centralized HTTP client management with dependency injection
 Provides optimized connection pooling and unified client configuration
+
+- Clients speak HTTP/2 when the h2 package is installed (HTTP_CLIENT_HTTP2)
+- Every pool resolves hosts through one shared DNS cache and caps in-flight
+  requests per host (see app.services.http_transport)
+- make_request retries are limited by a per-client retry budget
+- Clients are kept per (client type, event loop), since pooled connections
+  cannot be reused across loops (worker threads, Celery tasks and scripts run
+  their own); clients of a loop that has closed are dropped
 """
 
 import asyncio
+import importlib.util
 import logging
-from typing import Dict, Optional, Any, Union
+from typing import Dict, Optional, Any, Tuple, Union
 from contextlib import asynccontextmanager
 from enum import Enum
 
@@ -13,9 +22,14 @@ import httpx
 from pydantic import BaseModel, Field
 
 from app.config import settings
+from app.services.http_transport import CachingResolver, HostLimitedTransport, ResolvingHTTPTransport, RetryBudget
 
 logger = logging.getLogger(__name__)
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+ClientKey = Tuple[str, asyncio.AbstractEventLoop]
+
 
 class ClientType(str, Enum):
     """Types of HTTP clients with specific configurations"""
@@ -37,6 +51,8 @@ class HTTPClientConfig(BaseModel):
     base_url: Optional[str] = None
     follow_redirects: bool = True
     verify: bool = True
+    http2: bool = True
+    max_connections_per_host: Optional[int] = None  # None: only the pool-wide limit applies
     
 
 class HTTPClientFactory:
@@ -51,8 +67,11 @@ class HTTPClientFactory:
     """
     
     def __init__(self):
-        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._clients: Dict[ClientKey, httpx.AsyncClient] = {}
+        self._transports: Dict[ClientKey, HostLimitedTransport] = {}
+        self._retry_budgets: Dict[str, RetryBudget] = {}
         self._configs: Dict[ClientType, HTTPClientConfig] = {}
+        self._resolver = CachingResolver(ttl=settings.HTTP_CLIENT_DNS_TTL)
         self._setup_default_configs()
         self._cleanup_lock = asyncio.Lock()
         
@@ -84,7 +103,7 @@ class HTTPClientFactory:
             retries=2,
             headers={
                 "Content-Type": "application/json",
-                "api-key": settings.AZURE_OPENAI_API_KEY,
+                "api-key": settings.AZURE_OPENAI_API_KEY or "",
                 "User-Agent": "PRSNL-SecondBrain/1.0"
             },
             base_url=settings.AZURE_OPENAI_ENDPOINT,
@@ -101,7 +120,8 @@ class HTTPClientFactory:
             headers={
                 "User-Agent": "PRSNL-SecondBrain/1.0"
             },
-            follow_redirects=True
+            follow_redirects=True,
+            max_connections_per_host=settings.HTTP_CLIENT_MAX_PER_HOST
         )
         
         # Media download client (for large files)
@@ -114,7 +134,8 @@ class HTTPClientFactory:
             headers={
                 "User-Agent": "PRSNL-SecondBrain/1.0"
             },
-            follow_redirects=True
+            follow_redirects=True,
+            max_connections_per_host=settings.HTTP_CLIENT_MAX_PER_HOST
         )
         
         # Crawl client for web scraping
@@ -127,10 +148,11 @@ class HTTPClientFactory:
             headers={
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             },
-            follow_redirects=True
+            follow_redirects=True,
+            max_connections_per_host=settings.HTTP_CLIENT_MAX_PER_HOST
         )
     
-    def _create_client(self, client_type: ClientType, config: HTTPClientConfig) -> httpx.AsyncClient:
+    def _create_client(self, client_key: ClientKey, config: HTTPClientConfig) -> httpx.AsyncClient:
         """Create a new HTTP client with optimized configuration"""
         
         # Create optimized limits
@@ -148,13 +170,22 @@ class HTTPClientFactory:
             pool=config.timeout / 10
         )
         
+        http2 = config.http2 and settings.HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE
+        # Connections are opened through the shared DNS cache
+        transport = ResolvingHTTPTransport(self._resolver, limits, http2=http2, verify=config.verify)
+        
+        # Single-host clients are bounded by max_connections already
+        transport = HostLimitedTransport(
+            transport, config.max_connections_per_host or config.max_connections
+        )
+        self._transports[client_key] = transport
+        
         # Create client with configuration
         client_kwargs = {
-            'limits': limits,
+            'transport': transport,
             'timeout': timeout,
             'headers': config.headers,
-            'follow_redirects': config.follow_redirects,
-            'verify': config.verify
+            'follow_redirects': config.follow_redirects
         }
         
         # Only add base_url if it's not None
@@ -163,7 +194,7 @@ class HTTPClientFactory:
         
         client = httpx.AsyncClient(**client_kwargs)
         
-        logger.info(f"Created HTTP client for {client_type.value} with limits: {limits}")
+        logger.info(f"Created HTTP client for {client_key[0]} with limits: {limits}, http2={http2}")
         return client
     
     async def get_client(self, client_type: ClientType = ClientType.GENERAL) -> httpx.AsyncClient:
@@ -176,24 +207,59 @@ class HTTPClientFactory:
         Returns:
             Configured HTTP client instance
         """
-        client_key = client_type.value
+        client_key = (client_type.value, asyncio.get_running_loop())
+        self._drop_closed_loops()
         
         # Return existing client if available
-        if client_key in self._clients:
-            client = self._clients[client_key]
-            if not client.is_closed:
-                return client
-            else:
-                # Remove closed client
-                del self._clients[client_key]
+        client = self._clients.get(client_key)
+        if client is not None and not client.is_closed:
+            return client
         
         # Create new client
         config = self._configs.get(client_type, self._configs[ClientType.GENERAL])
-        client = self._create_client(client_type, config)
+        client = self._create_client(client_key, config)
         self._clients[client_key] = client
         
         return client
     
+    def _drop_closed_loops(self):
+        """Forget clients whose event loop has closed.
+        
+        Their connections can no longer be closed gracefully; owners of a loop
+        (e.g. WorkerRuntime) close its clients before stopping it.
+        """
+        for client_key in [key for key in list(self._clients) if key[1].is_closed()]:
+            self._clients.pop(client_key, None)
+            self._transports.pop(client_key, None)
+    
+    def _loop_clients(self) -> Dict[str, Tuple[httpx.AsyncClient, Optional[HostLimitedTransport]]]:
+        """Clients of the running event loop by client type"""
+        loop = asyncio.get_running_loop()
+        return {
+            client_key[0]: (client, self._transports.get(client_key))
+            for client_key, client in list(self._clients.items())
+            if client_key[1] is loop
+        }
+    
+    async def _close(self, client_key: ClientKey, client: httpx.AsyncClient):
+        """Close a client on the loop that owns its connections"""
+        if client.is_closed:
+            return
+        loop = client_key[1]
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+    
+    def _retry_budget(self, client_type: ClientType) -> RetryBudget:
+        budget = self._retry_budgets.get(client_type.value)
+        if budget is None:
+            budget = self._retry_budgets[client_type.value] = RetryBudget(
+                ratio=settings.HTTP_CLIENT_RETRY_BUDGET_RATIO,
+                min_per_second=settings.HTTP_CLIENT_RETRY_BUDGET_MIN_PER_SECOND
+            )
+        return budget
+    
     @asynccontextmanager
     async def client_session(self, client_type: ClientType = ClientType.GENERAL):
         """
@@ -233,23 +299,26 @@ class HTTPClientFactory:
         """
         client = await self.get_client(client_type)
         
-        # Add retries with exponential backoff
+        # Add retries with exponential backoff, within the client's retry budget
         config = self._configs.get(client_type, self._configs[ClientType.GENERAL])
         max_retries = config.retries
+        budget = self._retry_budget(client_type)
+        budget.record_request()
         
         for attempt in range(max_retries + 1):
             try:
                 response = await client.request(method, url, **kwargs)
                 
                 # Check if we should retry on this status
-                if response.status_code >= 500 and attempt < max_retries:
+                if response.status_code >= 500 and attempt < max_retries and budget.try_retry():
+                    await response.aclose()
                     await asyncio.sleep(2 ** attempt)  # Exponential backoff
                     continue
                 
                 return response
                 
             except (httpx.TimeoutException, httpx.ConnectError) as e:
-                if attempt < max_retries:
+                if attempt < max_retries and budget.try_retry():
                     logger.warning(f"Request attempt {attempt + 1} failed for {url}: {e}")
                     await asyncio.sleep(2 ** attempt)
                     continue
@@ -261,40 +330,51 @@ class HTTPClientFactory:
                 raise
     
     async def get_connection_stats(self) -> Dict[str, Any]:
-        """Get connection statistics for all clients"""
+        """Get connection pool utilization, per-host limits and retry budgets for all clients"""
         stats = {}
         
-        for client_type, client in self._clients.items():
+        for client_type, (client, transport) in self._loop_clients().items():
             if not client.is_closed:
-                # Get connection pool stats
-                transport = client._transport
-                if hasattr(transport, '_pool'):
-                    pool = transport._pool
+                pool = transport.pool if transport else None
+                if pool is not None:
+                    connections = pool.connections
+                    active = [c for c in connections if not c.is_idle()]
                     stats[client_type] = {
-                        "total_connections": len(pool._connections),
-                        "idle_connections": len([c for c in pool._connections if not c.is_busy()]),
+                        "total_connections": len(connections),
+                        "active_connections": len(active),
+                        "idle_connections": len(connections) - len(active),
+                        "http2_connections": sum(1 for c in connections if "HTTP/2" in c.info()),
+                        "queued_requests": sum(1 for r in pool._requests if r.is_queued()),
                         "max_connections": pool._max_connections,
                         "max_keepalive": pool._max_keepalive_connections,
+                        "utilization": round(len(active) / pool._max_connections, 3) if pool._max_connections else 0.0,
+                        "per_host": transport.get_stats(),
                         "client_closed": client.is_closed
                     }
                 else:
                     stats[client_type] = {
                         "client_closed": client.is_closed,
-                        "transport_type": type(transport).__name__
+                        "transport_type": type(client._transport).__name__
                     }
+                budget = self._retry_budgets.get(client_type)
+                if budget is not None:
+                    stats[client_type]["retry_budget"] = budget.get_stats()
         
+        if stats:
+            stats["dns_cache"] = self._resolver.get_stats()
         return stats
     
     async def health_check(self) -> Dict[str, Any]:
-        """Check health of all HTTP clients"""
+        """Check health of the HTTP clients of the running event loop"""
+        clients = self._loop_clients()
         health_status = {
             "status": "healthy",
             "clients": {},
-            "total_clients": len(self._clients),
+            "total_clients": len(clients),
             "active_clients": 0
         }
         
-        for client_type, client in self._clients.items():
+        for client_type, (client, _) in clients.items():
             client_health = {
                 "type": client_type,
                 "is_closed": client.is_closed,
@@ -320,29 +400,38 @@ class HTTPClientFactory:
         return health_status
     
     async def close_client(self, client_type: ClientType):
-        """Close a specific client"""
-        client_key = client_type.value
-        if client_key in self._clients:
-            client = self._clients[client_key]
-            if not client.is_closed:
-                await client.aclose()
-            del self._clients[client_key]
+        """Close a specific client on every event loop"""
+        for client_key in [key for key in list(self._clients) if key[0] == client_type.value]:
+            client = self._clients.pop(client_key)
+            self._transports.pop(client_key, None)
+            await self._close(client_key, client)
             logger.info(f"Closed HTTP client for {client_type.value}")
     
     async def close_all_clients(self):
         """Close all HTTP clients"""
         async with self._cleanup_lock:
-            for client_type, client in self._clients.items():
-                if not client.is_closed:
-                    try:
-                        await client.aclose()
-                        logger.info(f"Closed HTTP client for {client_type}")
-                    except Exception as e:
-                        logger.warning(f"Error closing client {client_type}: {e}")
+            for client_key, client in list(self._clients.items()):
+                try:
+                    await self._close(client_key, client)
+                    logger.info(f"Closed HTTP client for {client_key[0]}")
+                except Exception as e:
+                    logger.warning(f"Error closing client {client_key[0]}: {e}")
             
             self._clients.clear()
+            self._transports.clear()
             logger.info("All HTTP clients closed")
     
+    async def close_loop_clients(self):
+        """Close the clients of the running event loop (e.g. before the loop stops)"""
+        loop = asyncio.get_running_loop()
+        for client_key in [key for key in list(self._clients) if key[1] is loop]:
+            client = self._clients.pop(client_key)
+            self._transports.pop(client_key, None)
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing client {client_key[0]}: {e}")
+    
     async def refresh_client(self, client_type: ClientType):
         """Refresh a client by closing and recreating it"""
         await self.close_client(client_type)
@@ -354,7 +443,7 @@ class HTTPClientFactory:
         self._configs[client_type] = config
         
         # If client exists, refresh it to use new config
-        if client_type.value in self._clients:
+        if any(client_key[0] == client_type.value for client_key in list(self._clients)):
             asyncio.create_task(self.refresh_client(client_type))
     
     async def __aenter__(self):
@@ -0,0 +1,271 @@
+"""
+Transport building blocks for HTTPClientFactory
+Connection-level behaviour shared by every pooled outbound client.
+
+- CachingResolver is the pool's network backend: DNS answers are cached for
+  HTTP_CLIENT_DNS_TTL and every cached address is tried, within the caller's
+  connect timeout, before re-resolving (TLS still verifies against the
+  hostname, which httpcore passes as SNI)
+- ResolvingHTTPTransport builds the httpcore pool with that backend
+- HostLimitedTransport caps in-flight requests per host, holding the slot until
+  the response body is closed, so one slow site cannot take the whole pool
+- RetryBudget allows retries only up to a fraction of recent requests, so a
+  failing upstream sees a bounded amount of extra load instead of retries x load
+"""
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+
+class CachingResolver(httpcore.AsyncNetworkBackend):
+    """Network backend that caches getaddrinfo results per (host, port)"""
+
+    def __init__(self, ttl: float = 300.0, backend: Optional[httpcore.AsyncNetworkBackend] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._clock = clock
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.stats = {"hits": 0, "misses": 0, "failovers": 0}
+
+    async def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> List[str]:
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > self._clock():
+            self.stats["hits"] += 1
+            return cached[1]
+
+        self.stats["misses"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout=timeout
+            )
+        except asyncio.TimeoutError as e:
+            raise httpcore.ConnectTimeout(f"DNS lookup timed out for {host}") from e
+        except OSError as e:
+            raise httpcore.ConnectError(f"DNS lookup failed for {host}: {e}") from e
+
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[key] = (self._clock() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options=None) -> httpcore.AsyncNetworkStream:
+        if _is_ip(host):
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        addresses = await self.resolve(host, port, timeout)
+        error: Optional[Exception] = None
+        for index, address in enumerate(addresses):
+            attempt_timeout = None
+            if deadline is not None:
+                # Share what is left of the caller's connect timeout between the
+                # remaining addresses, so failover never extends it
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise httpcore.ConnectTimeout(f"Connecting to {host} timed out")
+                attempt_timeout = remaining / (len(addresses) - index)
+            if index:
+                self.stats["failovers"] += 1
+            try:
+                stream = await self._backend.connect_tcp(address, port, attempt_timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+                continue
+            cached = self._cache.get((host, port))
+            if index and cached is not None:
+                # Try the address that answered first from now on
+                self._cache[(host, port)] = (cached[0], [address] + [a for a in cached[1] if a != address])
+            return stream
+        # Every cached address failed; resolve again on the next attempt
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options=None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_hosts": len(self._cache)}
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class ResolvingHTTPTransport(httpx.AsyncHTTPTransport):
+    """httpx transport over an explicitly built httpcore pool that opens its
+    connections through `network_backend`"""
+
+    def __init__(self, network_backend: httpcore.AsyncNetworkBackend, limits: httpx.Limits,
+                 http2: bool = False, verify: bool = True):
+        # AsyncHTTPTransport.__init__ is skipped because it would build a second
+        # pool; request handling only uses self._pool
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+    @property
+    def pool(self) -> httpcore.AsyncConnectionPool:
+        return self._pool
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives the host slot back when it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport with a per-host cap on in-flight requests"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self.max_per_host = max(1, max_per_host)
+        self._hosts: Dict[str, list] = {}  # host -> [semaphore, users]
+        self.in_flight = 0
+        self.stats = {"waited": 0, "timed_out": 0}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.max_per_host), 0]
+        entry[1] += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight -= 1
+            entry[0].release()
+            entry[1] -= 1
+            if entry[1] == 0 and self._hosts.get(host) is entry:
+                del self._hosts[host]
+
+        try:
+            if entry[0].locked():
+                self.stats["waited"] += 1
+            # httpcore only enforces timeouts once it sees the request, so the
+            # wait for a host slot honours the pool timeout here
+            pool_timeout = request.extensions.get("timeout", {}).get("pool")
+            try:
+                await asyncio.wait_for(entry[0].acquire(), pool_timeout)
+            except asyncio.TimeoutError:
+                self.stats["timed_out"] += 1
+                raise httpx.PoolTimeout(
+                    f"Timed out waiting for one of {self.max_per_host} connections to {host}",
+                    request=request,
+                ) from None
+            self.in_flight += 1
+        except BaseException:
+            entry[1] -= 1
+            if entry[1] == 0 and self._hosts.get(host) is entry:
+                del self._hosts[host]
+            raise
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    @property
+    def pool(self):
+        return getattr(self._transport, "pool", None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "max_per_host": self.max_per_host,
+            "active_hosts": len(self._hosts),
+            "in_flight": self.in_flight,
+            "busiest_host": max(
+                ((host, entry[1]) for host, entry in self._hosts.items()), key=lambda item: item[1], default=None
+            ),
+        }
+
+
+class RetryBudget:
+    """Sliding-window retry budget: retries <= ratio * requests + min_per_second * window"""
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_per_second * window
+        self.window = window
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.stats = {"requests": 0, "retries": 0, "denied": 0}
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def record_request(self):
+        now = self._clock()
+        self._prune(now)
+        self._requests.append(now)
+        self.stats["requests"] += 1
+
+    def try_retry(self) -> bool:
+        """Spend one retry from the budget; False when it is exhausted."""
+        now = self._clock()
+        self._prune(now)
+        if len(self._retries) >= self.ratio * len(self._requests) + self.min_retries:
+            self.stats["denied"] += 1
+            return False
+        self._retries.append(now)
+        self.stats["retries"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -0,0 +1,240 @@
+"""
+Hybrid Search Engine
+Runs keyword (ts_rank_cd) and semantic (pgvector distance) candidate generation
+in a single CTE query, fuses the two rankings inside PostgreSQL and pages the
+fused list with keyset cursors - one database round trip per page.
+
+Fusion methods:
+- rrf: reciprocal-rank fusion, sum of weight / (rrf_k + rank)
+- weighted: weighted sum of max-normalized keyword rank and cosine similarity
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.db.database import get_db_pool
+from app.services.unified_ai_service import unified_ai_service
+from app.utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Fused score expressions over the FULL OUTER JOIN of keyword (k) and semantic (s)
+# candidates. $4 = keyword weight, $5 = semantic weight, $6 = RRF constant.
+FUSION_EXPRESSIONS = {
+    "rrf": (
+        "COALESCE($4::float8 / ($6::float8 + k.rnk), 0)"
+        " + COALESCE($5::float8 / ($6::float8 + s.rnk), 0)"
+    ),
+    "weighted": (
+        "COALESCE($4::float8 * k.norm_score, 0)"
+        " + COALESCE($5::float8 * s.score, 0)"
+    ),
+}
+
+
+class HybridSearchEngine:
+    """Single-query hybrid search with SQL-side fusion and cursor pagination"""
+
+    def __init__(self):
+        self.default_limit = 20
+        self.rrf_k = 60
+        self.candidate_multiplier = 5
+        self.min_candidates = 100
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, UUID]]:
+        """(fused_score, id) of a search cursor. Raises ValueError if malformed."""
+        after = decode_cursor(cursor)
+        if after is None:
+            return None
+        try:
+            return float(after["score"]), UUID(after["id"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+
+    async def search(
+        self,
+        query: str,
+        limit: int = None,
+        fusion: str = "rrf",
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        cursor: Optional[str] = None,
+        filter_by: Optional[Dict[str, Any]] = None,
+        rrf_k: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Perform hybrid search in one round trip.
+
+        Args:
+            query: Search query text
+            limit: Page size
+            fusion: "rrf" or "weighted"
+            semantic_weight: Weight for the semantic ranking
+            keyword_weight: Weight for the keyword ranking
+            cursor: Opaque cursor from a previous page's next_cursor
+            filter_by: Additional filters (type, date_range)
+            rrf_k: RRF smoothing constant (defaults to 60)
+
+        Returns:
+            Dict with fused results, next_cursor and metadata
+        """
+        limit = limit or self.default_limit
+        if fusion not in FUSION_EXPRESSIONS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        after = self.parse_cursor(cursor)
+
+        query_embeddings = await unified_ai_service.generate_embeddings([query])
+        query_embedding = query_embeddings[0] if query_embeddings else None
+        if query_embedding is None:
+            logger.warning("Hybrid search falling back to keyword-only candidates")
+
+        candidate_limit = max(limit * self.candidate_multiplier, self.min_candidates)
+        params: List[Any] = [
+            query,
+            query_embedding,
+            candidate_limit,
+            keyword_weight,
+            semantic_weight,
+            rrf_k or self.rrf_k,
+        ]
+        filter_sql = self._build_filter_sql(filter_by, params)
+
+        if query_embedding is not None:
+            semantic_cte = f"""
+                semantic AS (
+                    SELECT id, score, ROW_NUMBER() OVER (ORDER BY score DESC) AS rnk
+                    FROM (
+                        SELECT i.id, 1 - (e.vector <=> $2::vector) AS score
+                        FROM items i
+                        JOIN embeddings e ON i.embed_vector_id = e.id
+                        WHERE TRUE {filter_sql}
+                        ORDER BY e.vector <=> $2::vector
+                        LIMIT $3
+                    ) nearest
+                )"""
+        else:
+            semantic_cte = """
+                semantic AS (
+                    SELECT NULL::uuid AS id, NULL::float8 AS score, NULL::bigint AS rnk
+                    WHERE $2::text IS NULL AND FALSE
+                )"""
+
+        cursor_sql = ""
+        if after:
+            params.extend(after)
+            cursor_sql = f"WHERE (fused_score, id) < (${len(params) - 1}, ${len(params)})"
+        params.append(limit + 1)
+
+        sql = f"""
+            WITH keyword AS (
+                SELECT id, score,
+                       score / NULLIF(MAX(score) OVER (), 0) AS norm_score,
+                       ROW_NUMBER() OVER (ORDER BY score DESC) AS rnk
+                FROM (
+                    SELECT i.id, ts_rank_cd(i.search_vector, plainto_tsquery('english', $1)) AS score
+                    FROM items i
+                    WHERE i.search_vector @@ plainto_tsquery('english', $1) {filter_sql}
+                    ORDER BY score DESC
+                    LIMIT $3
+                ) matches
+            ),
+            {semantic_cte},
+            fused AS (
+                SELECT
+                    COALESCE(k.id, s.id) AS id,
+                    k.score AS keyword_score,
+                    s.score AS semantic_score,
+                    k.rnk AS keyword_rank,
+                    s.rnk AS semantic_rank,
+                    {FUSION_EXPRESSIONS[fusion]} AS fused_score
+                FROM keyword k
+                FULL OUTER JOIN semantic s ON k.id = s.id
+            ),
+            page AS (
+                SELECT *, COUNT(*) OVER () AS candidate_total
+                FROM fused
+            )
+            SELECT
+                p.*,
+                i.title,
+                i.url,
+                i.summary,
+                i.type,
+                i.created_at,
+                i.content_fingerprint
+            FROM (
+                SELECT * FROM page
+                {cursor_sql}
+                ORDER BY fused_score DESC, id DESC
+                LIMIT ${len(params)}
+            ) p
+            JOIN items i ON i.id = p.id
+            ORDER BY p.fused_score DESC, p.id DESC
+        """
+
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor({"score": float(last['fused_score']), "id": last['id']})
+
+        return {
+            "results": [self._format_row(row) for row in rows],
+            "total": rows[0]['candidate_total'] if rows else 0,
+            "next_cursor": next_cursor,
+            "query": query,
+            "search_type": "hybrid",
+            "fusion": fusion,
+            "weights": {"semantic": semantic_weight, "keyword": keyword_weight},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def _build_filter_sql(self, filters: Optional[Dict[str, Any]], params: List[Any]) -> str:
+        """Append filter params and return SQL fragments applied to both candidate sets."""
+        if not filters:
+            return ""
+        clauses = []
+        if "type" in filters:
+            params.append(filters["type"])
+            clauses.append(f"i.type = ${len(params)}")
+        date_range = filters.get("date_range") or {}
+        if date_range.get("start"):
+            params.append(datetime.fromisoformat(date_range["start"]))
+            clauses.append(f"i.created_at >= ${len(params)}")
+        if date_range.get("end"):
+            params.append(datetime.fromisoformat(date_range["end"]))
+            clauses.append(f"i.created_at <= ${len(params)}")
+        return "".join(f" AND {clause}" for clause in clauses)
+
+    @staticmethod
+    def _format_row(row) -> Dict[str, Any]:
+        return {
+            "id": str(row['id']),
+            "title": row['title'],
+            "url": row['url'],
+            "summary": row['summary'],
+            "type": row['type'],
+            "created_at": row['created_at'].isoformat(),
+            "content_fingerprint": row['content_fingerprint'],
+            "similarity": float(row['fused_score']),
+            "search_type": "hybrid",
+            "component_scores": {
+                "semantic": float(row['semantic_score'] or 0),
+                "keyword": float(row['keyword_score'] or 0)
+            },
+            "component_ranks": {
+                "semantic": row['semantic_rank'],
+                "keyword": row['keyword_rank']
+            }
+        }
+
+
+# Create singleton instance
+hybrid_search_engine = HybridSearchEngine()
@@ -9,7 +9,7 @@ import asyncio
 import logging
 import os
 from enum import Enum
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
 
 # Import whisper.cpp for high-quality offline transcription
 try:
@@ -27,9 +27,31 @@ except ImportError:
     WHISPER_CLOUD_AVAILABLE = False
     TranscriptionService = None
 
+from app.services.realtime_progress_service import ProgressType, send_task_progress
+
 logger = logging.getLogger(__name__)
 
 
+def transcript_progress_listener(
+    task_id: str,
+    entity_id: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> Callable[[List[Dict[str, Any]], float], Awaitable[None]]:
+    """Build an on_segments listener that streams partial transcripts as progress events."""
+    async def publish(segments: List[Dict[str, Any]], progress: float):
+        await send_task_progress(
+            task_id=task_id,
+            progress_type=ProgressType.MEDIA_PROCESSING.value,
+            current_value=int(progress * 100),
+            total_value=100,
+            message=f"Transcribed {progress:.0%}",
+            entity_id=entity_id,
+            user_id=user_id,
+            metadata={"segments": segments}
+        )
+    return publish
+
+
 class TranscriptionStrategy(str, Enum):
     """Transcription strategy options."""
     AUTO = "auto"           # Automatically choose best service
@@ -68,7 +90,8 @@ class HybridTranscriptionService:
         strategy: TranscriptionStrategy = TranscriptionStrategy.AUTO,
         language: str = "en",
         privacy_sensitive: bool = False,
-        user_preference: Optional[str] = None
+        user_preference: Optional[str] = None,
+        on_segments: Optional[Callable] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Transcribe audio using the optimal service based on strategy and context.
@@ -79,6 +102,8 @@ class HybridTranscriptionService:
             language: Language code for transcription
             privacy_sensitive: Whether content contains sensitive information
             user_preference: User's preferred transcription service
+            on_segments: Optional listener for partial segments (whisper.cpp only),
+                called with (segments, fraction_done)
             
         Returns:
             Transcription result with service metadata
@@ -97,7 +122,7 @@ class HybridTranscriptionService:
         if primary_service:
             logger.info(f"🚀 Attempting transcription with primary service: {primary_service}")
             result = await self._transcribe_with_service(
-                primary_service, audio_path, language
+                primary_service, audio_path, language, on_segments
             )
             
             if result:
@@ -112,7 +137,7 @@ class HybridTranscriptionService:
         if fallback_service:
             logger.info(f"🔄 Attempting transcription with fallback service: {fallback_service}")
             result = await self._transcribe_with_service(
-                fallback_service, audio_path, language
+                fallback_service, audio_path, language, on_segments
             )
             
             if result:
@@ -214,7 +239,8 @@ class HybridTranscriptionService:
         self, 
         service: str, 
         audio_path: str, 
-        language: str
+        language: str,
+        on_segments: Optional[Callable] = None
     ) -> Optional[Dict[str, Any]]:
         """Transcribe with specific service."""
         try:
@@ -226,7 +252,8 @@ class HybridTranscriptionService:
                     audio_path=audio_path,
                     model_name=model_name,
                     language=language,
-                    word_timestamps=True
+                    word_timestamps=True,
+                    on_segments=on_segments
                 )
                 
                 if result:
@@ -10,10 +10,10 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 
-import httpx
 from PIL import Image
 
 from app.config import settings
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.utils.media_detector import MediaDetector
 
 logger = logging.getLogger(__name__)
@@ -56,7 +56,7 @@ class ImageProcessor:
             
             # Process each image
             processed_images = []
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.MEDIA_DOWNLOAD) as client:
                 for img_info in images[:10]:  # Limit to 10 images per article
                     try:
                         image_data = await self._download_and_process_image(
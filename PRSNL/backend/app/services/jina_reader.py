@@ -9,6 +9,8 @@ from typing import Dict, Any, Optional
 import httpx
 from bs4 import BeautifulSoup
 
+from app.services.http_client_factory import ClientType, http_client_factory
+
 logger = logging.getLogger(__name__)
 
 class JinaReaderService:
@@ -33,8 +35,8 @@ class JinaReaderService:
             # Jina Reader: just prepend https://r.jina.ai/ to the URL
             jina_url = f"{self.base_url}{url}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(jina_url)
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
+                response = await client.get(jina_url, timeout=self.timeout)
                 response.raise_for_status()
                 
                 content = response.text
@@ -9,6 +9,8 @@ This service extends the existing knowledge graph functionality with:
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import logging
 from collections import defaultdict, deque
@@ -22,7 +24,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.db.models import Item
+from app.services.embedding_manager import embedding_manager
 from app.services.embedding_service import EmbeddingService
+from app.services.graph_edge_builder import graph_edge_builder
+from app.services.graph_neighbors import graph_neighbor_cache
 from app.services.knowledge_graph import KnowledgeGraphService as BaseKnowledgeGraphService
 
 logger = logging.getLogger(__name__)
@@ -168,29 +173,29 @@ class KnowledgeGraphService(BaseKnowledgeGraphService):
             node_map[str(item.id)] = node
             item_ids.append(str(item.id))
         
-        # Calculate similarities and create edges
+        # Similarity edges from one normalized embedding matrix (see graph_edge_builder)
         edges = []
         embeddings = await self._get_embeddings_batch(db, items)
-        
-        for i in range(len(items)):
-            for j in range(i + 1, len(items)):
-                if embeddings[i] is not None and embeddings[j] is not None:
-                    similarity = self._cosine_similarity(
-                        embeddings[i], embeddings[j]
-                    )
-                    
-                    if similarity >= similarity_threshold:
-                        edge = {
-                            "source": str(items[i].id),
-                            "target": str(items[j].id),
-                            "relationship": self._infer_relationship(similarity),
-                            "strength": float(similarity),
-                            "metadata": {
-                                "similarity_score": float(similarity),
-                                "auto_generated": True
-                            }
-                        }
-                        edges.append(edge)
+        embedded = [(item, vector) for item, vector in zip(items, embeddings) if vector is not None]
+        
+        if len(embedded) > 1:
+            similarity_edges = await graph_edge_builder.build(
+                [str(item.id) for item, _ in embedded],
+                np.vstack([vector for _, vector in embedded]).astype(np.float32),
+                similarity_threshold,
+                version_key=",".join(item.updated_at.isoformat() for item, _ in embedded)
+            )
+            for source, target, similarity in similarity_edges:
+                edges.append({
+                    "source": source,
+                    "target": target,
+                    "relationship": self._infer_relationship(similarity),
+                    "strength": similarity,
+                    "metadata": {
+                        "similarity_score": similarity,
+                        "auto_generated": True
+                    }
+                })
         
         # Add manual relationships
         manual_edges = await self._get_manual_relationships(db, set(item_ids))
@@ -220,42 +225,45 @@ class KnowledgeGraphService(BaseKnowledgeGraphService):
         """
         Find optimal learning path between two items using A* search.
         """
-        # Get items and their embeddings
-        start_item = await self._get_item_with_embedding(db, start_id)
-        end_item = await self._get_item_with_embedding(db, end_id)
+        # Get items and their embeddings (one query each, cache first for vectors)
+        start_key, end_key = str(start_id), str(end_id)
+        result = await db.execute(select(Item).where(Item.id.in_([start_id, end_id])))
+        items_by_id = {str(item.id): item for item in result.scalars().all()}
         
-        if not start_item or not end_item:
+        if start_key not in items_by_id or end_key not in items_by_id:
             raise ValueError("Start or end item not found")
         
-        if not start_item["embedding"] or not end_item["embedding"]:
+        vectors = await embedding_manager.get_embeddings_many([start_key, end_key])
+        if start_key not in vectors or end_key not in vectors:
             raise ValueError("Items must have embeddings for path finding")
         
         # A* search implementation
-        path = await self._astar_search(
-            db,
-            start_item,
-            end_item,
-            max_steps
-        )
+        path_ids = await self._astar_search(start_key, end_key, vectors, max_steps)
         
-        if not path:
+        if not path_ids:
             return {"path": [], "total_items": 0, "estimated_time": 0}
         
+        missing = [UUID(item_id) for item_id in path_ids if item_id not in items_by_id]
+        if missing:
+            result = await db.execute(select(Item).where(Item.id.in_(missing)))
+            items_by_id.update({str(item.id): item for item in result.scalars().all()})
+        path = [items_by_id[item_id] for item_id in path_ids if item_id in items_by_id]
+        
         # Create response
         path_nodes = []
         difficulty_progression = []
         estimated_time = 0
         
         for item in path:
-            node = self._create_graph_node(item["item"])
+            node = self._create_graph_node(item)
             path_nodes.append(node)
             
             # Extract difficulty if available
-            difficulty = item["item"].metadata.get("difficulty_level", 3)
+            difficulty = (item.metadata_ or {}).get("difficulty_level", 3)
             difficulty_progression.append(difficulty)
             
             # Estimate reading/learning time
-            content_length = len(item["item"].content or "") + len(item["item"].summary or "")
+            content_length = len(item.processed_content or item.raw_content or "") + len(item.summary or "")
             estimated_time += max(5, content_length // 200)  # ~200 wpm reading speed
         
         return {
@@ -340,17 +348,19 @@ class KnowledgeGraphService(BaseKnowledgeGraphService):
     
     def _create_graph_node(self, item: Item, importance: float = 1.0) -> Dict[str, Any]:
         """Create a node object for graph visualization."""
+        # Item.metadata is SQLAlchemy's table MetaData; the column is mapped as metadata_
+        metadata = item.metadata_ or {}
         return {
             "id": str(item.id),
             "title": item.title,
             "type": item.type,
             "summary": item.summary,
-            "tags": item.metadata.get("tags", []) if item.metadata else [],
+            "tags": metadata.get("tags", []),
             "importance": importance,
             "metadata": {
                 "created_at": item.created_at.isoformat(),
-                "difficulty_level": item.metadata.get("difficulty_level") if item.metadata else None,
-                "programming_language": item.metadata.get("programming_language") if item.metadata else None
+                "difficulty_level": metadata.get("difficulty_level"),
+                "programming_language": metadata.get("programming_language")
             }
         }
     
@@ -453,17 +463,18 @@ class KnowledgeGraphService(BaseKnowledgeGraphService):
             return [None] * len(items)
         
         query = text("""
-            SELECT id, embedding
+            SELECT id, vector
             FROM embeddings
             WHERE id = ANY(:ids)
         """)
         
         result = await db.execute(query, {"ids": embed_ids})
         
-        # Create mapping
+        # Create mapping (pgvector values arrive as '[x,y,...]' text without a registered codec)
         embedding_map = {}
         for row in result:
-            embedding_map[row.id] = np.array(row.embedding)
+            vector = json.loads(row.vector) if isinstance(row.vector, str) else row.vector
+            embedding_map[row.id] = np.asarray(vector, dtype=np.float32)
         
         # Return in order
         embeddings = []
@@ -513,68 +524,87 @@ class KnowledgeGraphService(BaseKnowledgeGraphService):
     
     async def _astar_search(
         self,
-        db: AsyncSession,
-        start: Dict[str, Any],
-        goal: Dict[str, Any],
-        max_steps: int
-    ) -> List[Dict[str, Any]]:
+        start_id: str,
+        goal_id: str,
+        vectors: Dict[str, np.ndarray],
+        max_steps: int,
+        neighbors_per_node: int = 5,
+        prefetch: int = 8
+    ) -> List[str]:
         """
         A* search implementation for finding learning paths.
+        
+        Edge cost is 1 - similarity and the heuristic is 1 - similarity to the goal.
+        Neighbour lists come from graph_neighbor_cache; whenever a node without a
+        list is expanded, lists for the most promising frontier nodes are fetched
+        in the same batch, along with all their neighbours' embeddings. Paths are
+        rebuilt from parent pointers. Returns item ids from start to goal.
         """
-        import heapq
+        def unit(vector: np.ndarray) -> np.ndarray:
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else vector
         
-        # Heuristic: semantic similarity to goal
-        def heuristic(item_embedding):
-            return 1 - self._cosine_similarity(item_embedding, goal["embedding"])
+        unit_vectors = {item_id: unit(vector) for item_id, vector in vectors.items()}
+        goal = unit_vectors[goal_id]
         
-        # Priority queue: (f_score, g_score, current_item, path)
-        open_set = [(0, 0, start, [start])]
-        visited = set()
+        def heuristic(item_id: str) -> float:
+            return 1.0 - float(np.dot(unit_vectors[item_id], goal))
         
-        while open_set and len(visited) < max_steps * 10:  # Prevent infinite loops
-            f_score, g_score, current, path = heapq.heappop(open_set)
-            
-            current_id = str(current["item"].id)
+        neighbor_lists: Dict[str, List[Tuple[str, float]]] = {}
+        came_from: Dict[str, Optional[str]] = {start_id: None}
+        g_scores = {start_id: 0.0}
+        depths = {start_id: 1}
+        closed: Set[str] = set()
+        tie_breaker = itertools.count()
+        
+        # Priority queue: (f_score, g_score, tie_breaker, item_id)
+        open_set = [(heuristic(start_id), 0.0, next(tie_breaker), start_id)]
+        
+        while open_set and len(closed) < max_steps * 10:  # Prevent infinite loops
+            _, g_score, _, current = heapq.heappop(open_set)
             
-            if current_id == str(goal["item"].id):
-                return path
+            if current == goal_id:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1]
             
-            if current_id in visited:
+            if current in closed or g_score > g_scores[current]:
                 continue
+            closed.add(current)
             
-            visited.add(current_id)
-            
-            if len(path) >= max_steps:
+            if depths[current] >= max_steps:
                 continue
             
-            # Get neighbors
-            neighbors = await self._find_semantically_related(
-                db, UUID(current_id), limit=5
-            )
+            if current not in neighbor_lists:
+                batch = [current] + [
+                    item_id for _, _, _, item_id in heapq.nsmallest(prefetch, open_set)
+                    if item_id not in neighbor_lists and item_id not in closed
+                ]
+                neighbor_lists.update(
+                    await graph_neighbor_cache.get_neighbors(batch, neighbors_per_node)
+                )
+                unseen = [
+                    neighbor_id
+                    for item_id in batch
+                    for neighbor_id, _ in neighbor_lists.get(item_id, [])
+                    if neighbor_id not in unit_vectors
+                ]
+                fetched = await embedding_manager.get_embeddings_many(unseen)
+                unit_vectors.update({item_id: unit(vector) for item_id, vector in fetched.items()})
             
-            for neighbor_item, similarity in neighbors:
-                neighbor_id = str(neighbor_item.id)
-                
-                if neighbor_id not in visited:
-                    neighbor_data = await self._get_item_with_embedding(
-                        db, neighbor_item.id
+            for neighbor_id, similarity in neighbor_lists.get(current, []):
+                if neighbor_id in closed or neighbor_id not in unit_vectors:
+                    continue
+                new_g_score = g_score + (1 - similarity)
+                if new_g_score < g_scores.get(neighbor_id, float("inf")):
+                    g_scores[neighbor_id] = new_g_score
+                    came_from[neighbor_id] = current
+                    depths[neighbor_id] = depths[current] + 1
+                    heapq.heappush(
+                        open_set,
+                        (new_g_score + heuristic(neighbor_id), new_g_score, next(tie_breaker), neighbor_id)
                     )
-                    
-                    if neighbor_data and neighbor_data["embedding"] is not None:
-                        # Calculate new g_score (cost from start)
-                        new_g_score = g_score + (1 - similarity)
-                        
-                        # Calculate h_score (heuristic to goal)
-                        h_score = heuristic(neighbor_data["embedding"])
-                        
-                        # f_score = g_score + h_score
-                        new_f_score = new_g_score + h_score
-                        
-                        new_path = path + [neighbor_data]
-                        
-                        heapq.heappush(
-                            open_set,
-                            (new_f_score, new_g_score, neighbor_data, new_path)
-                        )
-        
-        return []  # No path found
\ No newline at end of file
+        
+        return []  # No path found
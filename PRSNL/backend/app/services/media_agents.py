@@ -37,6 +37,7 @@ try:
 except ImportError:
     WHISPER_CPP_AVAILABLE = False
     whisper_cpp_service = None
+from app.services.hybrid_transcription import transcript_progress_listener
 from app.services.unified_ai_service import unified_ai_service
 from app.services.cache import cache_service, CacheKeys
 from app.services.embedding_manager import embedding_manager
@@ -318,6 +319,7 @@ class VideoTranscriptionAgent:
             task_data: Dictionary containing:
                 - file_path: Path to video file
                 - item_id: Optional item ID for database linking
+                - task_id: Optional progress task for partial transcripts (default: item_id)
                 - model_name: Whisper model to use (default: "base")
                 - language: Language code (default: "en")
                 - create_summary: Whether to create AI summary
@@ -330,6 +332,7 @@ class VideoTranscriptionAgent:
         try:
             file_path = task_data.get("file_path")
             item_id = task_data.get("item_id")
+            task_id = task_data.get("task_id") or item_id
             model_name = task_data.get("model_name", "base")
             language = task_data.get("language", "en")
             create_summary = task_data.get("create_summary", True)
@@ -351,7 +354,8 @@ class VideoTranscriptionAgent:
                     audio_path=audio_path,
                     model_name=model_name,
                     language=language,
-                    word_timestamps=True
+                    word_timestamps=True,
+                    on_segments=transcript_progress_listener(str(task_id), entity_id=item_id) if task_id else None
                 )
                 
                 if not transcription_result:
@@ -640,6 +644,7 @@ class AudioJournalAgent:
                 - file_path: Path to audio file
                 - item_id: Optional item ID for database linking
                 - journal_id: Optional audio journal ID
+                - task_id: Optional progress task for partial transcripts (default: journal_id)
                 - model_name: Whisper model to use (default: "base")
                 - language: Language code (default: "en")
                 - analyze_emotions: Whether to perform emotion analysis
@@ -653,6 +658,7 @@ class AudioJournalAgent:
             file_path = task_data.get("file_path")
             item_id = task_data.get("item_id")
             journal_id = task_data.get("journal_id")
+            task_id = task_data.get("task_id") or journal_id
             model_name = task_data.get("model_name", "base")
             language = task_data.get("language", "en")
             analyze_emotions = task_data.get("analyze_emotions", True)
@@ -670,7 +676,8 @@ class AudioJournalAgent:
                 audio_path=file_path,
                 model_name=model_name,
                 language=language,
-                word_timestamps=True
+                word_timestamps=True,
+                on_segments=transcript_progress_listener(str(task_id), entity_id=journal_id) if task_id else None
             )
             
             if not transcription_result:
@@ -646,7 +646,7 @@ class MultimodalAIOrchestrator:
         try:
             # Generate embeddings for both texts
             embeddings = await unified_ai_service.generate_embeddings([text1, text2])
-            if len(embeddings) == 2:
+            if len(embeddings) == 2 and all(e is not None for e in embeddings):
                 # Calculate cosine similarity
                 similarity = np.dot(embeddings[0], embeddings[1]) / (
                     np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
@@ -0,0 +1,171 @@
+"""
+Near-Duplicate Index
+MinHash/LSH index over item text for capture-time duplicate checks.
+
+- Each item's title + content is stored as a MinHash signature with its LSH
+  band buckets (item_minhash / item_minhash_bands, migration 027)
+- A lookup hashes the incoming text locally, fetches items sharing any bucket in
+  one indexed query and scores them by estimated Jaccard similarity
+- A background loop indexes items that are new or changed since they were last
+  signed, the same way the vector index follows the embeddings table
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+from app.config import settings
+from app.db.database import get_db_pool
+from app.utils.minhash import MinHasher, shingles
+
+logger = logging.getLogger(__name__)
+
+
+class NearDuplicateIndex:
+    """MinHash signatures and band buckets for items, stored in Postgres"""
+
+    def __init__(self):
+        self.hasher = MinHasher(
+            num_perm=settings.NEAR_DUPLICATE_NUM_PERM, bands=settings.NEAR_DUPLICATE_BANDS
+        )
+        self.min_shingles = settings.NEAR_DUPLICATE_MIN_SHINGLES
+        self.sync_interval = settings.NEAR_DUPLICATE_SYNC_INTERVAL
+        self.batch_size = 500
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def item_text(title: Optional[str], content: Optional[str]) -> str:
+        return f"{title or ''} {content or ''}"
+
+    def signature(self, title: Optional[str], content: Optional[str]):
+        """Signature for the text, or None if it is too short to compare reliably."""
+        shingle_set = shingles(self.item_text(title, content))
+        if len(shingle_set) < self.min_shingles:
+            return None
+        return self.hasher.signature(shingle_set)
+
+    async def find(
+        self,
+        conn: asyncpg.Connection,
+        signature,
+        min_similarity: float = 0.5,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Items sharing an LSH bucket with `signature`, with estimated Jaccard
+        similarity >= min_similarity, most similar first.
+        """
+        buckets = self.hasher.band_buckets(signature)
+        rows = await conn.fetch("""
+            SELECT i.id, i.title, i.url, i.created_at, m.signature
+            FROM (
+                SELECT DISTINCT b.item_id
+                FROM item_minhash_bands b
+                JOIN unnest($1::smallint[], $2::bigint[]) AS q(band, bucket)
+                  ON b.band = q.band AND b.bucket = q.bucket
+            ) candidates
+            JOIN item_minhash m ON m.item_id = candidates.item_id
+            JOIN items i ON i.id = candidates.item_id
+            WHERE m.signature IS NOT NULL
+        """, [band for band, _ in buckets], [bucket for _, bucket in buckets])
+
+        matches = []
+        for row in rows:
+            similarity = self.hasher.jaccard(signature, self.hasher.from_bytes(row['signature']))
+            if similarity >= min_similarity:
+                matches.append({
+                    "id": str(row['id']),
+                    "title": row['title'],
+                    "url": row['url'],
+                    "created_at": row['created_at'],
+                    "similarity": similarity
+                })
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+
+    async def start(self):
+        self._sync_task = asyncio.create_task(self._sync_loop())
+        logger.info("Near-duplicate index service started")
+
+    async def stop(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Near-duplicate index sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def sync(self) -> int:
+        """Sign items that are new or changed since they were last signed."""
+        pool = await get_db_pool()
+        indexed = 0
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT
+                        i.id,
+                        i.title,
+                        COALESCE(i.raw_content, i.processed_content) AS content,
+                        COALESCE(i.updated_at, i.created_at) AS updated_at
+                    FROM items i
+                    LEFT JOIN item_minhash m ON m.item_id = i.id
+                    WHERE m.item_id IS NULL OR m.item_updated_at < COALESCE(i.updated_at, i.created_at)
+                    LIMIT $1
+                """, self.batch_size)
+                if not rows:
+                    break
+                signatures = await asyncio.to_thread(
+                    lambda: [self.signature(row['title'], row['content']) for row in rows]
+                )
+                await self._write(conn, rows, signatures)
+            indexed += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        if indexed:
+            logger.debug(f"Near-duplicate index signed {indexed} items")
+        return indexed
+
+    async def _write(self, conn: asyncpg.Connection, rows: List[asyncpg.Record], signatures: List):
+        item_ids = [row['id'] for row in rows]
+        band_items, bands, buckets = [], [], []
+        for row, signature in zip(rows, signatures):
+            if signature is None:
+                continue
+            for band, bucket in self.hasher.band_buckets(signature):
+                band_items.append(row['id'])
+                bands.append(band)
+                buckets.append(bucket)
+
+        async with conn.transaction():
+            await conn.execute("""
+                INSERT INTO item_minhash (item_id, signature, item_updated_at)
+                SELECT * FROM unnest($1::uuid[], $2::bytea[], $3::timestamptz[])
+                ON CONFLICT (item_id) DO UPDATE
+                SET signature = EXCLUDED.signature, item_updated_at = EXCLUDED.item_updated_at
+            """, item_ids,
+                [self.hasher.to_bytes(s) if s is not None else None for s in signatures],
+                [row['updated_at'] for row in rows])
+            await conn.execute(
+                "DELETE FROM item_minhash_bands WHERE item_id = ANY($1::uuid[])", item_ids
+            )
+            if band_items:
+                await conn.execute("""
+                    INSERT INTO item_minhash_bands (band, bucket, item_id)
+                    SELECT * FROM unnest($1::smallint[], $2::bigint[], $3::uuid[])
+                    ON CONFLICT DO NOTHING
+                """, bands, buckets, band_items)
+
+
+# Singleton instance
+near_duplicate_index = NearDuplicateIndex()
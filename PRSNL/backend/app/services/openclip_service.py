@@ -1,10 +1,15 @@
 """
 OpenCLIP Vision Service for PRSNL
 Advanced image understanding and visual-semantic search
+
+Image and text encoding go through MicroBatcher (app/services/batch_inference.py):
+decoding/tokenizing and the forward pass run off the event loop, and concurrent
+requests share batched forward passes.
 """
 
 import asyncio
 import base64
+import hashlib
 import io
 import logging
 from datetime import datetime
@@ -16,6 +21,8 @@ import torch
 from PIL import Image
 
 from app.config import settings
+from app.services.batch_inference import MicroBatcher
+from app.services.cache import cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +44,8 @@ class OpenCLIPService:
         self.model = None
         self.preprocess = None
         self.tokenizer = None
+        self.image_batcher: Optional[MicroBatcher] = None
+        self.text_batcher: Optional[MicroBatcher] = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         # Model configuration
@@ -64,12 +73,63 @@ class OpenCLIPService:
             # Set to evaluation mode
             self.model.eval()
             
+            self.image_batcher = MicroBatcher(
+                "openclip-image",
+                self._prepare_image,
+                self._infer_images,
+                max_batch_size=settings.OPENCLIP_MAX_BATCH_SIZE,
+                max_wait_ms=settings.OPENCLIP_MAX_WAIT_MS,
+                preprocess_workers=settings.OPENCLIP_PREPROCESS_WORKERS
+            )
+            self.text_batcher = MicroBatcher(
+                "openclip-text",
+                self._prepare_text,
+                self._infer_texts,
+                max_batch_size=settings.OPENCLIP_MAX_BATCH_SIZE,
+                max_wait_ms=settings.OPENCLIP_MAX_WAIT_MS,
+                preprocess_workers=1
+            )
+            
             logger.info(f"OpenCLIP model loaded successfully on {self.device}")
             
         except Exception as e:
             logger.error(f"Failed to initialize OpenCLIP model: {e}")
             self.enabled = False
     
+    def _cache_key(self, kind: str, digest: str) -> str:
+        """Cache key for an encoded CLIP feature vector (stored in binary vector format)"""
+        return f"clip:{self.model_name}:{self.pretrained}:{kind}:{digest}"
+    
+    # Run on MicroBatcher threads
+    def _prepare_image(self, image: Union[bytes, Image.Image]) -> torch.Tensor:
+        if isinstance(image, bytes):
+            pil_image = Image.open(io.BytesIO(image)).convert('RGB')
+        elif isinstance(image, Image.Image):
+            pil_image = image.convert('RGB')
+        else:
+            raise TypeError(f"Unsupported image type: {type(image)}")
+        return self.preprocess(pil_image)
+    
+    def _prepare_text(self, text: str) -> torch.Tensor:
+        return self.tokenizer([text])[0]
+    
+    def _infer_images(self, tensors: List[torch.Tensor]) -> List[np.ndarray]:
+        with torch.no_grad():
+            features = self.model.encode_image(torch.stack(tensors).to(self.device))
+            features = features / features.norm(dim=-1, keepdim=True)
+        return list(features.cpu().numpy())
+    
+    def _infer_texts(self, tokens: List[torch.Tensor]) -> List[np.ndarray]:
+        with torch.no_grad():
+            features = self.model.encode_text(torch.stack(tokens).to(self.device))
+            features = features / features.norm(dim=-1, keepdim=True)
+        return list(features.cpu().numpy())
+    
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+    
     async def encode_image(self, image: Union[str, bytes, Image.Image]) -> Optional[np.ndarray]:
         """
         Encode image to feature vector
@@ -84,33 +144,7 @@ class OpenCLIPService:
             logger.warning("OpenCLIP service not enabled")
             return None
         
-        try:
-            # Load and preprocess image
-            if isinstance(image, str):
-                # File path
-                pil_image = Image.open(image).convert('RGB')
-            elif isinstance(image, bytes):
-                # Image bytes
-                pil_image = Image.open(io.BytesIO(image)).convert('RGB')
-            elif isinstance(image, Image.Image):
-                # PIL Image
-                pil_image = image.convert('RGB')
-            else:
-                logger.error(f"Unsupported image type: {type(image)}")
-                return None
-            
-            # Preprocess and encode
-            image_tensor = self.preprocess(pil_image).unsqueeze(0).to(self.device)
-            
-            with torch.no_grad():
-                image_features = self.model.encode_image(image_tensor)
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            
-            return image_features.cpu().numpy().flatten()
-            
-        except Exception as e:
-            logger.error(f"Error encoding image: {e}")
-            return None
+        return (await self.batch_encode_images([image]))[0]
     
     async def encode_text(self, text: str) -> Optional[np.ndarray]:
         """
@@ -126,19 +160,7 @@ class OpenCLIPService:
             logger.warning("OpenCLIP service not enabled")
             return None
         
-        try:
-            # Tokenize and encode
-            text_tokens = self.tokenizer([text]).to(self.device)
-            
-            with torch.no_grad():
-                text_features = self.model.encode_text(text_tokens)
-                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-            
-            return text_features.cpu().numpy().flatten()
-            
-        except Exception as e:
-            logger.error(f"Error encoding text: {e}")
-            return None
+        return (await self.batch_encode_texts([text]))[0]
     
     async def compute_similarity(self, 
                                image: Union[str, bytes, Image.Image], 
@@ -194,10 +216,10 @@ class OpenCLIPService:
             if image_features is None:
                 return {"error": "Failed to encode image"}
             
-            # Encode all text candidates
+            # Encode all text candidates in one batch
             similarities = []
-            for text in text_candidates:
-                text_features = await self.encode_text(text)
+            text_encodings = await self.batch_encode_texts(text_candidates)
+            for text, text_features in zip(text_candidates, text_encodings):
                 if text_features is not None:
                     similarity = np.dot(image_features, text_features)
                     similarities.append({
@@ -326,17 +348,27 @@ class OpenCLIPService:
             images: List of images to encode
             
         Returns:
-            List of feature vectors
+            List of feature vectors (None for images that could not be encoded)
         """
-        if not self.enabled:
+        if not self.enabled or not images:
             return [None] * len(images)
         
-        results = []
-        for image in images:
-            features = await self.encode_image(image)
-            results.append(features)
+        # File paths are read once (off the loop) so the bytes can key the cache
+        async def load(image):
+            if isinstance(image, str):
+                try:
+                    return await asyncio.to_thread(self._read_file, image)
+                except OSError as e:
+                    logger.error(f"Error reading image {image}: {e}")
+                    return None
+            return image
         
-        return results
+        loaded = await asyncio.gather(*(load(image) for image in images))
+        keys = [
+            self._cache_key("image", hashlib.sha256(image).hexdigest()) if isinstance(image, bytes) else None
+            for image in loaded
+        ]
+        return await self._encode_cached(self.image_batcher, loaded, keys)
     
     async def batch_encode_texts(self, texts: List[str]) -> List[Optional[np.ndarray]]:
         """
@@ -346,16 +378,36 @@ class OpenCLIPService:
             texts: List of texts to encode
             
         Returns:
-            List of feature vectors
+            List of feature vectors (None for texts that could not be encoded)
         """
-        if not self.enabled:
+        if not self.enabled or not texts:
             return [None] * len(texts)
         
-        results = []
-        for text in texts:
-            features = await self.encode_text(text)
-            results.append(features)
+        keys = [self._cache_key("text", hashlib.sha256(text.encode()).hexdigest()) for text in texts]
+        return await self._encode_cached(self.text_batcher, texts, keys)
+    
+    async def _encode_cached(
+        self, batcher: MicroBatcher, inputs: List[Any], keys: List[Optional[str]]
+    ) -> List[Optional[np.ndarray]]:
+        """One MGET for cached features, one batched encode for the rest, one pipelined SET."""
+        cacheable = [key for key in keys if key]
+        cached = dict(zip(cacheable, await cache_service.get_vectors_many(cacheable))) if cacheable else {}
+        
+        results: List[Optional[np.ndarray]] = [cached.get(key) if key else None for key in keys]
+        todo = [i for i, result in enumerate(results) if result is None and inputs[i] is not None]
+        if not todo:
+            return results
         
+        encoded = await batcher.submit_many([inputs[i] for i in todo])
+        to_cache = {}
+        for i, features in zip(todo, encoded):
+            results[i] = features
+            if features is not None and keys[i]:
+                to_cache[keys[i]] = features
+        if to_cache:
+            await cache_service.set_vectors_many(
+                to_cache, model=self.model_name, expire=settings.EMBEDDING_CACHE_TTL
+            )
         return results
     
     async def search_images_by_text(self, 
@@ -408,7 +460,11 @@ class OpenCLIPService:
             "model_name": self.model_name,
             "pretrained": self.pretrained,
             "device": self.device,
-            "available": OPENCLIP_AVAILABLE
+            "available": OPENCLIP_AVAILABLE,
+            "batching": {
+                "image": self.image_batcher.get_stats() if self.image_batcher else None,
+                "text": self.text_batcher.get_stats() if self.text_batcher else None
+            }
         }
     
     def is_image_file(self, filename: str) -> bool:
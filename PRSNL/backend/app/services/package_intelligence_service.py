@@ -14,8 +14,8 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from urllib.parse import urljoin
 
-import aiohttp
 from app.services.cache import cache_service
+from app.services.http_client_factory import ClientType, http_client_factory
 
 logger = logging.getLogger(__name__)
 
@@ -53,21 +53,19 @@ class PackageIntelligenceService:
     
     def __init__(self):
         self.session = None
+        self.headers = {'User-Agent': 'PRSNL-CodeMirror/1.0'}
         self.cache_ttl = 3600  # 1 hour cache for package info
         self.vuln_cache_ttl = 300  # 5 minutes for vulnerability data
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'PRSNL-CodeMirror/1.0'}
-        )
+        # Pooled client shared with the rest of the app; concurrent users of
+        # this singleton no longer close each other's session on exit
+        self.session = await http_client_factory.get_client(ClientType.GENERAL)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
     
     async def analyze_project_dependencies(
         self, 
@@ -269,28 +267,28 @@ class PackageIntelligenceService:
         
         try:
             url = f"https://registry.npmjs.org/{package_name}"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
+            response = await self.session.get(url, headers=self.headers, timeout=30)
+            if response.status_code == 200:
+                data = response.json()
                     
-                    latest_version = data.get('dist-tags', {}).get('latest', '')
-                    latest_info = data.get('versions', {}).get(latest_version, {})
+                latest_version = data.get('dist-tags', {}).get('latest', '')
+                latest_info = data.get('versions', {}).get(latest_version, {})
                     
-                    package_info = PackageInfo(
-                        name=package_name,
-                        version=latest_version,
-                        manager='npm',
-                        description=data.get('description'),
-                        license=latest_info.get('license'),
-                        homepage=data.get('homepage'),
-                        repository=data.get('repository', {}).get('url') if isinstance(data.get('repository'), dict) else data.get('repository'),
-                        last_updated=datetime.fromisoformat(data.get('time', {}).get(latest_version, '').replace('Z', '+00:00')) if data.get('time', {}).get(latest_version) else None,
-                        deprecated=latest_info.get('deprecated', False)
-                    )
+                package_info = PackageInfo(
+                    name=package_name,
+                    version=latest_version,
+                    manager='npm',
+                    description=data.get('description'),
+                    license=latest_info.get('license'),
+                    homepage=data.get('homepage'),
+                    repository=data.get('repository', {}).get('url') if isinstance(data.get('repository'), dict) else data.get('repository'),
+                    last_updated=datetime.fromisoformat(data.get('time', {}).get(latest_version, '').replace('Z', '+00:00')) if data.get('time', {}).get(latest_version) else None,
+                    deprecated=latest_info.get('deprecated', False)
+                )
                     
-                    # Cache the result
-                    await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
-                    return package_info
+                # Cache the result
+                await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
+                return package_info
                     
         except Exception as e:
             logger.error(f"Error fetching npm package info for {package_name}: {e}")
@@ -308,25 +306,25 @@ class PackageIntelligenceService:
         
         try:
             url = f"https://pypi.org/pypi/{package_name}/json"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    info = data.get('info', {})
+            response = await self.session.get(url, headers=self.headers, timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                info = data.get('info', {})
                     
-                    package_info = PackageInfo(
-                        name=package_name,
-                        version=info.get('version', ''),
-                        manager='pypi',
-                        description=info.get('summary'),
-                        license=info.get('license'),
-                        homepage=info.get('home_page'),
-                        repository=info.get('project_url'),
-                        last_updated=datetime.fromisoformat(data.get('releases', {}).get(info.get('version', ''), [{}])[-1].get('upload_time', '').replace('Z', '+00:00')) if data.get('releases') else None
-                    )
+                package_info = PackageInfo(
+                    name=package_name,
+                    version=info.get('version', ''),
+                    manager='pypi',
+                    description=info.get('summary'),
+                    license=info.get('license'),
+                    homepage=info.get('home_page'),
+                    repository=info.get('project_url'),
+                    last_updated=datetime.fromisoformat(data.get('releases', {}).get(info.get('version', ''), [{}])[-1].get('upload_time', '').replace('Z', '+00:00')) if data.get('releases') else None
+                )
                     
-                    # Cache the result
-                    await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
-                    return package_info
+                # Cache the result
+                await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
+                return package_info
                     
         except Exception as e:
             logger.error(f"Error fetching PyPI package info for {package_name}: {e}")
@@ -344,26 +342,26 @@ class PackageIntelligenceService:
         
         try:
             url = f"https://crates.io/api/v1/crates/{package_name}"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    crate_info = data.get('crate', {})
+            response = await self.session.get(url, headers=self.headers, timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                crate_info = data.get('crate', {})
                     
-                    package_info = PackageInfo(
-                        name=package_name,
-                        version=crate_info.get('newest_version', ''),
-                        manager='cargo',
-                        description=crate_info.get('description'),
-                        license=crate_info.get('license'),
-                        homepage=crate_info.get('homepage'),
-                        repository=crate_info.get('repository'),
-                        downloads=crate_info.get('downloads'),
-                        last_updated=datetime.fromisoformat(crate_info.get('updated_at', '').replace('Z', '+00:00')) if crate_info.get('updated_at') else None
-                    )
+                package_info = PackageInfo(
+                    name=package_name,
+                    version=crate_info.get('newest_version', ''),
+                    manager='cargo',
+                    description=crate_info.get('description'),
+                    license=crate_info.get('license'),
+                    homepage=crate_info.get('homepage'),
+                    repository=crate_info.get('repository'),
+                    downloads=crate_info.get('downloads'),
+                    last_updated=datetime.fromisoformat(crate_info.get('updated_at', '').replace('Z', '+00:00')) if crate_info.get('updated_at') else None
+                )
                     
-                    # Cache the result
-                    await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
-                    return package_info
+                # Cache the result
+                await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
+                return package_info
                     
         except Exception as e:
             logger.error(f"Error fetching Cargo package info for {package_name}: {e}")
@@ -382,24 +380,24 @@ class PackageIntelligenceService:
         try:
             # Use Maven Central search API (free but limited)
             url = f"https://search.maven.org/solrsearch/select?q=a:{artifact_id}&rows=1&wt=json"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    docs = data.get('response', {}).get('docs', [])
+            response = await self.session.get(url, headers=self.headers, timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                docs = data.get('response', {}).get('docs', [])
                     
-                    if docs:
-                        doc = docs[0]
-                        package_info = PackageInfo(
-                            name=artifact_id,
-                            version=doc.get('latestVersion', ''),
-                            manager='maven',
-                            description=f"Group: {doc.get('g', '')}, Artifact: {doc.get('id', '')}",
-                            last_updated=datetime.fromtimestamp(doc.get('timestamp', 0) / 1000) if doc.get('timestamp') else None
-                        )
+                if docs:
+                    doc = docs[0]
+                    package_info = PackageInfo(
+                        name=artifact_id,
+                        version=doc.get('latestVersion', ''),
+                        manager='maven',
+                        description=f"Group: {doc.get('g', '')}, Artifact: {doc.get('id', '')}",
+                        last_updated=datetime.fromtimestamp(doc.get('timestamp', 0) / 1000) if doc.get('timestamp') else None
+                    )
                         
-                        # Cache the result
-                        await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
-                        return package_info
+                    # Cache the result
+                    await cache_service.set(cache_key, package_info.__dict__, expire=self.cache_ttl)
+                    return package_info
                         
         except Exception as e:
             logger.error(f"Error fetching Maven package info for {artifact_id}: {e}")
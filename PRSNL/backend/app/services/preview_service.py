@@ -18,6 +18,7 @@ import httpx
 from bs4 import BeautifulSoup
 
 from app.services.cache_service import cache_service
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.utils.url_classifier import URLClassifier
 
 logger = logging.getLogger(__name__)
@@ -80,7 +81,7 @@ class PreviewService:
             owner, repo = match.groups()
             repo = repo.rstrip('.git')  # Remove .git suffix if present
             
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 # Fetch repository data from GitHub API
                 repo_data = await self._fetch_github_repo_data(client, owner, repo)
                 
@@ -335,7 +336,7 @@ class PreviewService:
                 'filter': 'withbody'  # Include question body
             }
             
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(api_url, params=params, timeout=10)
                 if response.status_code == 200:
                     data = response.json()
@@ -368,7 +369,7 @@ class PreviewService:
     async def _generate_documentation_preview(self, url: str, classification: Dict[str, Any]) -> Dict[str, Any]:
         """Generate rich preview for documentation sites."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(url, timeout=10)
                 if response.status_code == 200:
                     html_content = response.text
@@ -397,7 +398,7 @@ class PreviewService:
     async def _generate_development_preview(self, url: str, classification: Dict[str, Any]) -> Dict[str, Any]:
         """Generate generic development content preview."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(url, timeout=10)
                 if response.status_code == 200:
                     html_content = response.text
@@ -426,7 +427,7 @@ class PreviewService:
     async def _generate_basic_preview(self, url: str) -> Dict[str, Any]:
         """Generate basic preview for non-development content."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 response = await client.get(url, timeout=10)
                 if response.status_code == 200:
                     html_content = response.text
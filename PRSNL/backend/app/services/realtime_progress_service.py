@@ -10,6 +10,12 @@ Features:
 - Progress event structure with metadata
 - Error handling and connection management
 - Integration with all worker task types
+- Cross-process delivery: publishers (API or Celery workers) send each event
+  once to a Redis/DragonflyDB channel; every API process subscribes once and
+  fans out to its own WebSocket clients
+- Events are serialized once; high-frequency updates are coalesced per task
+  (latest wins, at most PROGRESS_MAX_UPDATES_PER_SECOND), terminal events are
+  always delivered immediately
 
 This service resolves the TODO comments in worker tasks for WebSocket real-time progress updates.
 """
@@ -18,14 +24,22 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
 
+from app.config import settings
+from app.services.dragonflydb_service import dragonflydb_service
 from app.services.websocket_manager import websocket_manager
 
 logger = logging.getLogger(__name__)
 
+# Pub/sub channel for progress channel X is PROGRESS_BUS_PREFIX + X
+PROGRESS_BUS_PREFIX = "progress:"
+
+# Seconds to publish locally only after the bus was unreachable
+BUS_RETRY_INTERVAL = 30.0
+
 class ProgressType(Enum):
     """Types of progress events"""
     TASK_STARTED = "task_started"
@@ -81,6 +95,51 @@ class RealtimeProgressService:
         self.websocket_manager = websocket_manager
         self.active_channels: Dict[str, Set[str]] = {}  # channel -> set of client_ids
         self.client_channels: Dict[str, Set[str]] = {}  # client_id -> set of channels
+        
+        # Per-task coalescing: latest pending (channels, payload) and last publish time
+        self.min_interval = 1.0 / max(settings.PROGRESS_MAX_UPDATES_PER_SECOND, 0.001)
+        self._pending: Dict[str, Tuple[List[str], str]] = {}
+        self._last_published: Dict[str, float] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        
+        self._listener_task: Optional[asyncio.Task] = None
+        self._bus_retry_at = 0.0
+        self.stats = {"published": 0, "coalesced": 0, "delivered_local": 0}
+    
+    async def start(self):
+        """Subscribe once to the progress bus and fan out to this process's clients"""
+        self._listener_task = asyncio.create_task(self._bus_listener())
+        logger.info("Realtime progress bus listener started")
+    
+    async def stop(self):
+        """Stop the bus listener and flush pending coalesced updates"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        for task_id in list(self._pending):
+            await self._flush(task_id)
+    
+    @property
+    def is_listening(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+    
+    async def _bus_listener(self):
+        """Forward bus messages to local subscribers of the matching channel"""
+        while True:
+            try:
+                async for message in dragonflydb_service.psubscribe(f"{PROGRESS_BUS_PREFIX}*"):
+                    channel = message['channel'][len(PROGRESS_BUS_PREFIX):]
+                    if channel in self.active_channels:
+                        await self._fan_out(channel, message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress bus listener error: {e}")
+                await asyncio.sleep(5)  # Reconnect after 5 seconds
     
     async def subscribe_to_channel(self, client_id: str, channel: str):
         """Subscribe a client to a specific progress channel"""
@@ -185,51 +244,114 @@ class RealtimeProgressService:
                 "service": "realtime_progress"
             })
             
-            # Send to specific channel if provided
-            if progress_event.channel:
-                await self.broadcast_to_channel(progress_event.channel, enhanced_event)
-            
-            # Also send to user-specific channel if user_id provided
+            # Task channel, plus the user-specific channel if user_id provided
+            channels = [progress_event.channel]
             if user_id:
-                user_channel = f"user_{user_id}"
-                await self.broadcast_to_channel(user_channel, enhanced_event)
+                channels.append(f"user_{user_id}")
+            
+            # Serialize once for every channel and client
+            payload = json.dumps(enhanced_event)
+            terminal = enhanced_event["is_complete"] or progress_type in (
+                ProgressType.TASK_COMPLETED.value, ProgressType.TASK_FAILED.value
+            )
+            await self._submit(task_id, channels, payload, terminal)
             
             # Log progress update
-            logger.info(f"Progress update sent: {task_id} - {progress_type} - {current_value}/{total_value} ({percentage:.1f}%) - {message}")
+            logger.debug(f"Progress update queued: {task_id} - {progress_type} - {current_value}/{total_value} ({percentage:.1f}%) - {message}")
             
         except Exception as e:
             logger.error(f"Failed to send progress update for task {task_id}: {e}")
     
+    async def _submit(self, task_id: str, channels: List[str], payload: str, terminal: bool):
+        """Publish now, or keep as the task's latest pending update until its next slot"""
+        loop = asyncio.get_running_loop()
+        if terminal:
+            # Final state supersedes anything pending and is never delayed
+            self._cancel_flush(task_id)
+            if self._pending.pop(task_id, None) is not None:
+                self.stats["coalesced"] += 1
+            self._last_published.pop(task_id, None)
+            await self._publish(channels, payload)
+            return
+        
+        if len(self._last_published) > 1024:
+            # Entries older than one interval no longer delay anything
+            cutoff = loop.time() - self.min_interval
+            self._last_published = {
+                tid: at for tid, at in self._last_published.items() if at > cutoff
+            }
+        
+        wait = self._last_published.get(task_id, float("-inf")) + self.min_interval - loop.time()
+        if wait <= 0 and task_id not in self._pending:
+            self._last_published[task_id] = loop.time()
+            await self._publish(channels, payload)
+            return
+        
+        if task_id in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[task_id] = (channels, payload)
+        if task_id not in self._flush_handles:
+            self._flush_handles[task_id] = loop.call_later(
+                max(wait, 0), lambda: asyncio.ensure_future(self._flush(task_id))
+            )
+    
+    async def _flush(self, task_id: str):
+        """Publish a task's latest pending update"""
+        self._cancel_flush(task_id)
+        pending = self._pending.pop(task_id, None)
+        if pending is None:
+            return
+        self._last_published[task_id] = asyncio.get_running_loop().time()
+        await self._publish(*pending)
+    
+    def _cancel_flush(self, task_id: str):
+        handle = self._flush_handles.pop(task_id, None)
+        if handle:
+            handle.cancel()
+    
+    async def _publish(self, channels: List[str], payload: str):
+        """Send a serialized event to the bus, or straight to local clients without one"""
+        loop = asyncio.get_running_loop()
+        if loop.time() >= self._bus_retry_at:
+            try:
+                for channel in channels:
+                    await dragonflydb_service.publish(f"{PROGRESS_BUS_PREFIX}{channel}", payload)
+                self.stats["published"] += 1
+                # The bus listener (if running here) delivers to local clients
+                if self.is_listening:
+                    return
+            except Exception as e:
+                logger.warning(f"Progress bus unavailable, delivering locally: {e}")
+                self._bus_retry_at = loop.time() + BUS_RETRY_INTERVAL
+        
+        self.stats["delivered_local"] += 1
+        for channel in channels:
+            await self._fan_out(channel, payload)
+    
     async def broadcast_to_channel(self, channel: str, message: Dict[str, Any]):
         """Broadcast a message to all clients subscribed to a channel"""
+        await self._fan_out(channel, json.dumps(message))
+    
+    async def _fan_out(self, channel: str, message_json: str):
+        """Send an already-serialized message to this process's subscribers of a channel"""
         try:
             if channel not in self.active_channels:
                 logger.debug(f"No subscribers for channel {channel}")
                 return
             
-            clients = self.active_channels[channel].copy()
-            message_json = json.dumps(message)
+            clients = list(self.active_channels[channel])
             
-            # Send to all subscribed clients
-            send_tasks = []
-            for client_id in clients:
-                send_tasks.append(self.send_to_client(client_id, message))
+            # Send to all subscribed clients concurrently
+            results = await asyncio.gather(
+                *(self.websocket_manager.send_personal_message(message_json, client_id) for client_id in clients),
+                return_exceptions=True
+            )
             
-            # Execute all sends concurrently
-            if send_tasks:
-                results = await asyncio.gather(*send_tasks, return_exceptions=True)
-                
-                # Handle any failed sends
-                failed_clients = []
-                for i, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        failed_client = list(clients)[i]
-                        failed_clients.append(failed_client)
-                        logger.warning(f"Failed to send to client {failed_client}: {result}")
-                
-                # Clean up failed clients
-                for failed_client in failed_clients:
-                    await self.client_disconnected(failed_client)
+            # Clean up failed clients
+            for client_id, result in zip(clients, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to send to client {client_id}: {result}")
+                    await self.client_disconnected(client_id)
             
             logger.debug(f"Broadcasted to channel {channel}: {len(clients)} clients")
             
@@ -312,6 +434,8 @@ class RealtimeProgressService:
             "active_channels": len(self.active_channels),
             "total_subscriptions": sum(len(clients) for clients in self.active_channels.values()),
             "unique_clients": len(self.client_channels),
+            "pending_updates": len(self._pending),
+            "bus": {**self.stats, "listening": self.is_listening},
             "channels": {
                 channel: len(clients) 
                 for channel, clients in self.active_channels.items()
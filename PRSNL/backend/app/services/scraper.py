@@ -7,11 +7,12 @@ from urllib.parse import urljoin
 import tempfile
 import os
 
-import httpx
 from bs4 import BeautifulSoup
 from readability.readability import Document
 from markitdown import MarkItDown
 
+from app.services.http_client_factory import ClientType, http_client_factory
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,18 +32,15 @@ class WebScraper:
     """Scrapes and extracts content from web pages with MarkItDown enhancement"""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1"
-            }
-        )
+        # Requests go through the shared crawl pool (which keeps connections
+        # alive itself; a Connection header is not allowed over HTTP/2)
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "DNT": "1",
+            "Upgrade-Insecure-Requests": "1"
+        }
         self.markitdown = MarkItDown()  # Initialize MarkItDown processor
     
     async def scrape(self, url: str) -> ScrapedData:
@@ -51,7 +49,8 @@ class WebScraper:
         """
         try:
             # Fetch the page
-            response = await self.client.get(url)
+            client = await http_client_factory.get_client(ClientType.CRAWL)
+            response = await client.get(url, headers=self.headers, timeout=30.0)
             response.raise_for_status()
             
             # Parse with BeautifulSoup
@@ -282,7 +281,8 @@ class WebScraper:
         """
         try:
             # Fetch the page
-            response = await self.client.get(url)
+            client = await http_client_factory.get_client(ClientType.CRAWL)
+            response = await client.get(url, headers=self.headers, timeout=30.0)
             response.raise_for_status()
             
             # Use MarkItDown to extract full content
@@ -339,4 +339,5 @@ class WebScraper:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
+        # The pooled client is closed by http_client_factory at shutdown
+        pass
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Scraper routing for the smart scraper
+Pure building blocks for SmartScraperService orchestration.
+
+- normalize_url gives re-captures and bulk imports of the same page one cache key
+- DomainScoreboard learns, per domain, how often each scraper returns a usable
+  page and how long it takes, and reorders scrapers once a domain has history
+- HostLimiter caps concurrent scrapes of one target host
+- hedged_race starts the next scraper when the current one returns a bad result
+  or has not answered within the hedge delay, and keeps the first good result
+"""
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_src'}
+DEFAULT_PORTS = {('http', 80), ('https', 443)}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for caching: lowercase scheme/host, no default port,
+    fragment, tracking parameters or trailing slash, and sorted query parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or (scheme, port) in DEFAULT_PORTS else f"{host}:{port}"
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_domain(url: str) -> str:
+    """Host of a URL without a leading www., used to key per-domain learning."""
+    host = (urlsplit(url.strip()).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+@dataclass
+class ScraperStats:
+    """Learned behaviour of one scraper on one domain"""
+    good_rate: float = 1.0
+    latency: float = 0.0  # EWMA seconds of good results
+    samples: int = 0
+
+    def record(self, good: bool, latency: float, alpha: float):
+        outcome = 1.0 if good else 0.0
+        self.good_rate = outcome if self.samples == 0 else self.good_rate + alpha * (outcome - self.good_rate)
+        self.samples += 1
+        if good:
+            self.latency = latency if self.latency == 0 else self.latency + alpha * (latency - self.latency)
+
+
+class DomainScoreboard:
+    """Per-domain scraper statistics, bounded to the most recently used domains"""
+
+    # Assumed good-result rate of a scraper without enough history on a domain,
+    # so the configured (cheapest-first) order wins until evidence says otherwise
+    PRIOR_GOOD_RATE = 0.75
+
+    def __init__(self, min_samples: int = 3, alpha: float = 0.3, max_domains: int = 4096):
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.max_domains = max_domains
+        self.domains: "OrderedDict[str, Dict[str, ScraperStats]]" = OrderedDict()
+
+    def get(self, domain: str, scraper: str) -> Optional[ScraperStats]:
+        scrapers = self.domains.get(domain)
+        return scrapers.get(scraper) if scrapers else None
+
+    def record(self, domain: str, scraper: str, good: bool, latency: float):
+        scrapers = self.domains.get(domain)
+        if scrapers is None:
+            scrapers = self.domains[domain] = {}
+            if len(self.domains) > self.max_domains:
+                self.domains.popitem(last=False)
+        else:
+            self.domains.move_to_end(domain)
+        scrapers.setdefault(scraper, ScraperStats()).record(good, latency, self.alpha)
+
+    def good_rate(self, domain: str, scraper: str) -> float:
+        stats = self.get(domain, scraper)
+        if stats is None or stats.samples < self.min_samples:
+            return self.PRIOR_GOOD_RATE
+        return stats.good_rate
+
+    def order(self, domain: str, scrapers: List[str]) -> List[str]:
+        """Scrapers by learned good-result rate; ties keep the given order."""
+        return sorted(scrapers, key=lambda scraper: -self.good_rate(domain, scraper))
+
+    def hedge_delay(self, domain: str, scraper: str, ceiling: float, floor: float = 1.0) -> float:
+        """How long to wait on `scraper` before starting the next one: twice its
+        learned latency on this domain, within [floor, ceiling]."""
+        stats = self.get(domain, scraper)
+        if stats is None or stats.latency == 0:
+            return ceiling
+        return max(floor, min(ceiling, 2 * stats.latency))
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+
+class HostLimiter:
+    """Per-host semaphores; state exists only while a host has scrapes in flight"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._hosts: Dict[str, list] = {}  # host -> [semaphore, users]
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._hosts.get(host) is entry:
+                del self._hosts[host]
+
+    def active_hosts(self) -> int:
+        return len(self._hosts)
+
+
+async def hedged_race(
+    attempts: List[Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]],
+    is_good: Callable[[Dict[str, Any]], bool],
+    hedge_after: Optional[float] = None
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Run scraper attempts in order and return (name, result) of the first good one.
+
+    The next attempt starts as soon as every running attempt has returned a bad
+    result, or `hedge_after` seconds after the previous one started if that is
+    set. Attempts still running when a good result arrives are cancelled. If no
+    attempt is good, the last bad result is returned, preferring one that still
+    reports success over a failure.
+    """
+    loop = asyncio.get_running_loop()
+    pending = list(attempts)
+    running: Dict[asyncio.Task, str] = {}
+    fallback: Tuple[Optional[str], Optional[Dict[str, Any]]] = (None, None)
+    next_start = 0.0
+
+    try:
+        while pending or running:
+            if pending and (not running or (hedge_after is not None and loop.time() >= next_start)):
+                name, attempt = pending.pop(0)
+                running[asyncio.ensure_future(attempt())] = name
+                if hedge_after is not None:
+                    next_start = loop.time() + hedge_after
+                continue
+
+            timeout = max(0.0, next_start - loop.time()) if pending and hedge_after is not None else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                if task.exception() is not None:
+                    if fallback[1] is None or not fallback[1].get("success"):
+                        fallback = (name, {"success": False, "error": str(task.exception()), "scraper_used": name})
+                    continue
+                result = task.result()
+                if is_good(result):
+                    return name, result
+                if fallback[1] is None or result.get("success") or not fallback[1].get("success"):
+                    fallback = (name, result)
+        return fallback
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
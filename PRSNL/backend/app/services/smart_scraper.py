@@ -1,13 +1,28 @@
 """
 Smart Scraper Service - Uses Jina Reader first, Firecrawl as fallback
 This saves Firecrawl credits while maintaining high success rates
+
+- Results are cached in Redis by normalized URL; entries older than
+  SCRAPE_CACHE_FRESH_SECONDS are revalidated against the origin's
+  ETag/Last-Modified before anything is re-scraped
+- Concurrent scrapes of the same URL share one request
+- Scraper order is learned per domain, and Firecrawl is started early when Jina
+  has not produced a good result within the (learned) hedge delay
+- Scrapes of one target host are limited to SCRAPER_PER_HOST_CONCURRENCY
 """
 import asyncio
+import copy
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 
+from app.config import settings
+from app.services.cache import cache_service
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.services.jina_reader import JinaReaderService
 from app.services.firecrawl_service import FirecrawlService
+from app.services.scraper_routing import DomainScoreboard, HostLimiter, hedged_race, normalize_url, url_domain
 
 logger = logging.getLogger(__name__)
 
@@ -25,14 +40,26 @@ class SmartScraperService:
             'total_requests': 0,
             'credits_saved': 0  # Estimated Firecrawl credits saved
         }
+        # Kept apart from self.stats, which callers reset to the keys above
+        self.cache_stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'escalations': 0  # scrapes that needed more than one scraper
+        }
+        self.scoreboard = DomainScoreboard(min_samples=settings.SCRAPER_DOMAIN_MIN_SAMPLES)
+        self.host_limits = HostLimiter(settings.SCRAPER_PER_HOST_CONCURRENCY)
+        self._inflight: Dict[str, asyncio.Future] = {}
         
-    async def scrape_url(self, url: str, force_firecrawl: bool = False) -> Dict[str, Any]:
+    async def scrape_url(self, url: str, force_firecrawl: bool = False, use_cache: bool = True) -> Dict[str, Any]:
         """
         Scrape URL using smart fallback strategy
         
         Args:
             url: URL to scrape
-            force_firecrawl: Skip Jina and go directly to Firecrawl
+            force_firecrawl: Skip Jina and the cache and go directly to Firecrawl
+            use_cache: Serve and store results in the scrape cache
             
         Returns:
             Dict with scraped content and metadata
@@ -42,26 +69,157 @@ class SmartScraperService:
         # Skip Jina if forced to use Firecrawl
         if force_firecrawl:
             logger.info(f"🔥 Forced Firecrawl scraping: {url}")
-            return await self._scrape_with_firecrawl(url)
+            return await self._orchestrate(url, ['firecrawl'])
+        
+        key = normalize_url(url)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            self.cache_stats['coalesced'] += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(existing))
+            except asyncio.CancelledError:
+                if not existing.cancelled():
+                    raise
+                # The owning scrape was cancelled; do our own
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._cached_scrape(url, key, use_cache)
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+    
+    async def _cached_scrape(self, url: str, key: str, use_cache: bool) -> Dict[str, Any]:
+        cache_on = use_cache and settings.SCRAPE_CACHE_ENABLED
+        cache_key = cache_service.make_key("scrape", hashlib.sha256(key.encode()).hexdigest()[:32])
+        
+        if cache_on:
+            entry = await cache_service.get(cache_key)
+            if entry and entry.get('result'):
+                if time.time() - entry.get('cached_at', 0) < settings.SCRAPE_CACHE_FRESH_SECONDS:
+                    self.cache_stats['hits'] += 1
+                    logger.info(f"📦 Scrape cache hit: {url}")
+                    return self._cached_result(entry)
+                if await self._not_modified(url, entry):
+                    self.cache_stats['revalidated'] += 1
+                    logger.info(f"📦 Scrape cache revalidated (304): {url}")
+                    entry['cached_at'] = time.time()
+                    await cache_service.set(cache_key, entry, expire=settings.SCRAPE_CACHE_TTL)
+                    return self._cached_result(entry)
+        
+        self.cache_stats['misses'] += 1
+        # Origin validators are fetched while the scrapers work
+        validators = asyncio.ensure_future(self._origin_validators(url)) if cache_on else None
+        try:
+            result = await self._orchestrate(url)
+        except BaseException:
+            if validators is not None:
+                validators.cancel()
+            raise
+        
+        if validators is not None:
+            entry = {'result': result, 'cached_at': time.time(), **(await validators)}
+            if self._is_good_result(result):
+                await cache_service.set(cache_key, entry, expire=settings.SCRAPE_CACHE_TTL)
+        return result
+    
+    def _cached_result(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        result = entry['result']
+        result['from_cache'] = True
+        return result
+    
+    async def _orchestrate(self, url: str, scrapers: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Race the scrapers for one URL in learned order and return the first good result"""
+        domain = url_domain(url)
+        hedge = settings.SCRAPER_HEDGE_ENABLED and self.firecrawl.enabled
+        if scrapers is None:
+            scrapers = ['jina', 'firecrawl']
+            if self.firecrawl.enabled:
+                scrapers = self.scoreboard.order(domain, scrapers)
+        
+        hedge_after = None
+        if hedge and len(scrapers) > 1:
+            hedge_after = self.scoreboard.hedge_delay(domain, scrapers[0], settings.SCRAPER_HEDGE_AFTER_SECONDS)
+        
+        launched: List[str] = []
         
-        # Strategy 1: Try Jina Reader first (free)
-        logger.info(f"📖 Attempting Jina Reader scraping: {url}")
-        jina_result = await self._scrape_with_jina(url)
+        def attempt(name: str):
+            return lambda: self._attempt(name, url, domain, launched)
         
-        if self._is_good_result(jina_result):
+        name, result = await hedged_race(
+            [(name, attempt(name)) for name in scrapers], self._is_good_result, hedge_after
+        )
+        if len(launched) > 1:
+            self.cache_stats['escalations'] += 1
+        
+        if name == 'jina' and self._is_good_result(result):
             self.stats['jina_success'] += 1
-            self.stats['credits_saved'] += 1  # Saved 1 Firecrawl credit
-            logger.info(f"✅ Jina success - saved 1 Firecrawl credit! ({len(jina_result['data']['content'])} chars)")
+            if 'firecrawl' not in launched:
+                self.stats['credits_saved'] += 1  # Saved 1 Firecrawl credit
+                logger.info(f"✅ Jina success - saved 1 Firecrawl credit! ({len(result['data']['content'])} chars)")
             # Ensure scraper_used is set correctly
-            jina_result['scraper_used'] = 'jina'
-            if 'data' in jina_result:
-                jina_result['data']['scraper_used'] = 'jina'
-            return jina_result
-        
-        # Strategy 2: Fallback to Firecrawl (costs credits)
-        logger.warning(f"⚠️ Jina failed, falling back to Firecrawl: {url}")
-        self.stats['jina_failure'] += 1
-        return await self._scrape_with_firecrawl(url)
+            result['scraper_used'] = 'jina'
+            if 'data' in result:
+                result['data']['scraper_used'] = 'jina'
+        return result
+    
+    async def _attempt(self, name: str, url: str, domain: str, launched: List[str]) -> Dict[str, Any]:
+        """One scraper run under the host limit, recorded on the domain scoreboard"""
+        launched.append(name)
+        async with self.host_limits.slot(domain):
+            started = time.monotonic()
+            if name == 'jina':
+                logger.info(f"📖 Attempting Jina Reader scraping: {url}")
+                result = await self._scrape_with_jina(url)
+            else:
+                result = await self._scrape_with_firecrawl(url)
+            elapsed = time.monotonic() - started
+        
+        good = self._is_good_result(result)
+        self.scoreboard.record(domain, name, good, elapsed)
+        if name == 'jina' and not good:
+            logger.warning(f"⚠️ Jina failed for {url}")
+            self.stats['jina_failure'] += 1
+        return result
+    
+    async def _origin_validators(self, url: str) -> Dict[str, str]:
+        """ETag/Last-Modified of the origin page, if it sends them"""
+        try:
+            client = await http_client_factory.get_client(ClientType.CRAWL)
+            response = await client.head(url, timeout=5)
+        except Exception as e:
+            logger.debug(f"Validator HEAD failed for {url}: {e}")
+            return {}
+        validators = {
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified')
+        }
+        return {key: value for key, value in validators.items() if value}
+    
+    async def _not_modified(self, url: str, entry: Dict[str, Any]) -> bool:
+        """Conditional request to the origin; True if it answers 304"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        if not headers:
+            return False
+        try:
+            client = await http_client_factory.get_client(ClientType.CRAWL)
+            # Streamed so a 200 is closed without downloading the body
+            async with client.stream('GET', url, headers=headers, timeout=5) as response:
+                return response.status_code == 304
+        except Exception as e:
+            logger.debug(f"Revalidation failed for {url}: {e}")
+            return False
     
     async def _scrape_with_jina(self, url: str) -> Dict[str, Any]:
         """Try scraping with Jina Reader"""
@@ -160,7 +318,10 @@ class SmartScraperService:
             **self.stats,
             'success_rate': (total_success / total_attempts * 100) if total_attempts > 0 else 0,
             'jina_success_rate': (self.stats['jina_success'] / total_attempts * 100) if total_attempts > 0 else 0,
-            'cost_savings': f"{self.stats['credits_saved']} Firecrawl credits saved"
+            'cost_savings': f"{self.stats['credits_saved']} Firecrawl credits saved",
+            'cache': dict(self.cache_stats),
+            'learned_domains': len(self.scoreboard),
+            'active_hosts': self.host_limits.active_hosts()
         }
     
     def log_stats(self):
@@ -172,6 +333,7 @@ class SmartScraperService:
         logger.info(f"  Jina success: {stats['jina_success']} ({stats['jina_success_rate']:.1f}%)")
         logger.info(f"  Firecrawl success: {stats['firecrawl_success']}")
         logger.info(f"  💰 Credits saved: {stats['credits_saved']}")
+        logger.info(f"  Cache: {stats['cache']}")
 
 # Global instance
 smart_scraper = SmartScraperService()
\ No newline at end of file
@@ -13,6 +13,7 @@ from typing import Optional
 import httpx
 from app.core.langfuse_wrapper import observe  # Safe wrapper to handle get_tracer error
 from app.config import settings
+from app.services.http_client_factory import ClientType, http_client_factory
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +43,7 @@ class TranscriptionService:
             # Azure OpenAI Whisper endpoint
             url = f"{self.azure_endpoint}/openai/deployments/{settings.AZURE_OPENAI_WHISPER_DEPLOYMENT}/audio/transcriptions?api-version={self.api_version}"
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with http_client_factory.client_session(ClientType.GENERAL) as client:
                 with open(audio_file_path, "rb") as audio_file:
                     # Determine MIME type based on file extension
                     file_ext = os.path.splitext(audio_file_path)[1].lower()
@@ -64,7 +65,8 @@ class TranscriptionService:
                         url,
                         headers=headers,
                         files=files,
-                        data=data
+                        data=data,
+                        timeout=120.0
                     )
                     response.raise_for_status()
                     
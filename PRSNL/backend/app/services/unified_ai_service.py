@@ -16,6 +16,8 @@ from app.core.langfuse_wrapper import observe  # Safe wrapper to handle get_trac
 from app.config import settings
 from app.services.ai_validation_service import ai_validation_service
 from app.services.cache import cache_service, CacheKeys
+from app.services.completion_cache import CompletionCache
+from app.services.embedding_pipeline import EmbeddingPipeline
 
 # Import LangGraph workflows if available
 try:
@@ -63,59 +65,35 @@ class UnifiedAIService:
         # Embedding model deployment - configured
         self.embedding_deployment = settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT  # text-embedding-ada-002
         self.embedding_available = bool(self.embedding_deployment and settings.AZURE_OPENAI_API_KEY)
+        self.embedding_pipeline = EmbeddingPipeline(self._embed_batch, model=self.embedding_deployment)
+        self.completion_cache = CompletionCache(
+            embed=self.generate_embeddings
+            if settings.AI_COMPLETION_SEMANTIC_CACHE and self.embedding_available else None
+        )
         
     @observe(name="generate_embeddings")
-    async def generate_embeddings(self, texts: List[str], cache_key_prefix: str = "emb") -> List[List[float]]:
-        """Generate embeddings for multiple texts with caching"""
-        if not self.embedding_available:
-            logger.warning("Embedding model not configured. Returning empty embeddings.")
-            # Return zero vectors as fallback
-            return [[0.0] * 1536 for _ in texts]
-            
-        embeddings = []
-        uncached_texts = []
-        uncached_indices = []
-        
-        # Check cache first
-        for i, text in enumerate(texts):
-            cache_key = f"{cache_key_prefix}:{hashlib.sha256(text.encode()).hexdigest()}"
-            cached = await cache_service.get(cache_key)
-            if cached:
-                embeddings.append(cached)
-            else:
-                embeddings.append(None)
-                uncached_texts.append(text)
-                uncached_indices.append(i)
+    async def generate_embeddings(
+        self, texts: List[str], cache_key_prefix: str = "emb"
+    ) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for multiple texts with caching.
         
-        # Generate embeddings for uncached texts
-        if uncached_texts:
-            try:
-                # Process in batches of 16 for efficiency
-                batch_size = 16
-                for i in range(0, len(uncached_texts), batch_size):
-                    batch = uncached_texts[i:i+batch_size]
-                    response = await self.client.embeddings.create(
-                        model=self.embedding_deployment,
-                        input=batch
-                    )
-                    
-                    for j, embedding in enumerate(response.data):
-                        idx = uncached_indices[i+j]
-                        emb_vector = embedding.embedding
-                        embeddings[idx] = emb_vector
-                        
-                        # Cache the embedding
-                        cache_key = f"{cache_key_prefix}:{hashlib.sha256(texts[idx].encode()).hexdigest()}"
-                        await cache_service.set(cache_key, emb_vector, expire=86400)  # 24 hours
-                        
-            except Exception as e:
-                logger.error(f"Error generating embeddings: {e}")
-                # Return None for failed embeddings
-                for idx in uncached_indices:
-                    if embeddings[idx] is None:
-                        embeddings[idx] = [0.0] * 1536  # Default embedding size
+        Returns one entry per input text; entries that could not be embedded
+        are None rather than placeholder vectors.
+        """
+        if not self.embedding_available:
+            logger.warning("Embedding model not configured. Returning no embeddings.")
+            return [None for _ in texts]
         
-        return embeddings
+        return await self.embedding_pipeline.embed(texts, cache_key_prefix)
+    
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Single provider call used by the embedding pipeline"""
+        response = await self.client.embeddings.create(
+            model=self.embedding_deployment,
+            input=texts
+        )
+        return [embedding.embedding for embedding in sorted(response.data, key=lambda d: d.index)]
     
     @observe(name="ai_complete")
     async def complete(
@@ -125,9 +103,43 @@ class UnifiedAIService:
         temperature: float = 0.7,
         max_tokens: int = 1000,
         response_format: Optional[Dict] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        use_cache: Optional[bool] = None
+    ) -> str:
+        """
+        Generate completion with Azure OpenAI.
+        
+        Identical requests are answered from the completion cache and concurrent
+        ones share a single call. Only temperature 0 requests are cached by
+        default; sampled callers that want reuse opt in with use_cache=True.
+        """
+        model = model or self.deployment_name
+        if use_cache is None:
+            use_cache = temperature == 0
+        if not (use_cache and settings.AI_COMPLETION_CACHE_ENABLED):
+            self.completion_cache.record_bypass()
+            return await self._complete_uncached(
+                prompt, system_prompt, temperature, max_tokens, response_format, model
+            )
+        
+        scope = CompletionCache.make_scope(model, system_prompt, temperature, max_tokens, response_format)
+        return await self.completion_cache.get_or_create(
+            scope, prompt,
+            lambda: self._complete_uncached(
+                prompt, system_prompt, temperature, max_tokens, response_format, model
+            )
+        )
+    
+    async def _complete_uncached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict],
+        model: str
     ) -> str:
-        """Generate completion with Azure OpenAI"""
+        """Single Azure OpenAI chat completion call"""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -135,7 +147,7 @@ class UnifiedAIService:
         
         try:
             kwargs = {
-                "model": model or self.deployment_name,
+                "model": model,
                 "messages": messages,
                 "temperature": temperature,
                 "max_tokens": max_tokens
@@ -251,6 +263,7 @@ Provide analysis in this exact JSON format:
                 prompt=prompt,
                 system_prompt=system_prompt,
                 temperature=0.3,
+                use_cache=True,
                 response_format={"type": "json_object"}
             )
             
@@ -290,6 +303,8 @@ Provide analysis in this exact JSON format:
         """Find semantic duplicates using embeddings"""
         # Generate embedding for new content
         new_embedding = (await self.generate_embeddings([content]))[0]
+        if new_embedding is None:
+            return []
         
         duplicates = []
         for item_id, embedding in embeddings_to_compare:
@@ -359,6 +374,7 @@ Respond in JSON format:
                 prompt=user_prompt,
                 system_prompt=system_prompt,
                 temperature=0.3,
+                use_cache=True,
                 max_tokens=200,
                 response_format={"type": "json_object"}
             )
@@ -452,6 +468,7 @@ Respond in JSON format:
                     prompt=prompt_with_format,
                     system_prompt=system_prompt,
                     temperature=0.3,
+                    use_cache=True,
                     max_tokens=500,
                     response_format={"type": "json_object"}
                 )
@@ -465,6 +482,7 @@ Respond in JSON format:
                     prompt=prompt,
                     system_prompt=system_prompt,
                     temperature=0.3,
+                    use_cache=True,
                     max_tokens=500
                 )
                 return response.strip()
@@ -507,6 +525,7 @@ Provide analysis in JSON format:
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=0.3,
+            use_cache=True,
             response_format={"type": "json_object"}
         )
         
@@ -610,6 +629,7 @@ Respond in JSON format:
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=0.3,
+            use_cache=True,
             response_format={"type": "json_object"}
         )
         
@@ -0,0 +1,412 @@
+"""
+In-process ANN Vector Index Service
+Keeps an approximate nearest-neighbour index of the current item embeddings
+in the worker so semantic search cost depends on k rather than corpus size.
+
+- Pluggable backends (HNSW via hnswlib by default)
+- Incremental sync from the embeddings table using an (updated_at, id) watermark
+- Periodic full rebuild to drop deleted items
+- On-disk snapshots so restarts only replay recent changes
+- Callers fall back to pgvector whenever the index is unavailable
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.config import settings
+from app.db.database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Try to import hnswlib
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    logger.warning("hnswlib not available - vector search will use pgvector")
+    HNSWLIB_AVAILABLE = False
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NIL_UUID = UUID(int=0)
+
+
+class VectorIndexBackend:
+    """Interface every ANN backend implements. Labels are item ids (str)."""
+
+    name = "base"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def reserve(self, count: int) -> None:
+        """Grow capacity ahead of an upsert; called from the event loop thread."""
+
+    def upsert(self, item_ids: Sequence[str], vectors: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def remove(self, item_ids: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return up to k (item_id, cosine_similarity) pairs, best first."""
+        raise NotImplementedError
+
+    def save(self, path: Path) -> None:
+        raise NotImplementedError
+
+    @classmethod
+    def load(cls, path: Path, dim: int) -> "VectorIndexBackend":
+        raise NotImplementedError
+
+
+class HNSWVectorIndex(VectorIndexBackend):
+    """HNSW graph index (cosine space) backed by hnswlib."""
+
+    name = "hnsw"
+
+    def __init__(self, dim: int, capacity: int = 10000):
+        super().__init__(dim)
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(
+            max_elements=max(capacity, 1024),
+            ef_construction=settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+            M=settings.VECTOR_INDEX_HNSW_M,
+            allow_replace_deleted=True,
+        )
+        self._index.set_ef(settings.VECTOR_INDEX_HNSW_EF_SEARCH)
+        self._label_by_item: Dict[str, int] = {}
+        self._item_by_label: Dict[int, str] = {}
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self._label_by_item)
+
+    def reserve(self, count: int) -> None:
+        # hnswlib cannot resize while a query runs, so this stays on the loop thread
+        needed = self._index.get_current_count() + count
+        capacity = self._index.get_max_elements()
+        if needed > capacity:
+            self._index.resize_index(max(needed, capacity * 2))
+
+    def upsert(self, item_ids: Sequence[str], vectors: np.ndarray) -> None:
+        if not len(item_ids):
+            return
+        labels = []
+        new_count = 0
+        for item_id in item_ids:
+            label = self._label_by_item.get(item_id)
+            if label is None:
+                label = self._next_label
+                self._next_label += 1
+                self._label_by_item[item_id] = label
+                self._item_by_label[label] = item_id
+                new_count += 1
+            labels.append(label)
+        self.reserve(new_count)
+        # Re-adding an existing label replaces its vector in place
+        self._index.add_items(
+            np.asarray(vectors, dtype=np.float32),
+            np.asarray(labels, dtype=np.int64),
+            replace_deleted=True,
+        )
+
+    def remove(self, item_ids: Sequence[str]) -> None:
+        for item_id in item_ids:
+            label = self._label_by_item.pop(item_id, None)
+            if label is None:
+                continue
+            self._item_by_label.pop(label, None)
+            try:
+                self._index.mark_deleted(label)
+            except RuntimeError:
+                pass
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        # ef must be >= k for hnswlib to return k results
+        self._index.set_ef(max(settings.VECTOR_INDEX_HNSW_EF_SEARCH, k))
+        labels, distances = self._index.knn_query(
+            np.asarray(query, dtype=np.float32).reshape(1, -1), k=k
+        )
+        results = []
+        for label, distance in zip(labels[0], distances[0]):
+            item_id = self._item_by_label.get(int(label))
+            if item_id is not None:
+                results.append((item_id, 1.0 - float(distance)))
+        return results
+
+    def save(self, path: Path) -> None:
+        self._index.save_index(str(path.with_suffix(".bin")))
+        with open(path.with_suffix(".labels.json"), "w") as f:
+            json.dump(
+                {"labels": self._label_by_item, "next_label": self._next_label}, f
+            )
+
+    @classmethod
+    def load(cls, path: Path, dim: int) -> "HNSWVectorIndex":
+        with open(path.with_suffix(".labels.json")) as f:
+            label_data = json.load(f)
+        instance = cls.__new__(cls)
+        VectorIndexBackend.__init__(instance, dim)
+        instance._index = hnswlib.Index(space="cosine", dim=dim)
+        instance._index.load_index(
+            str(path.with_suffix(".bin")), allow_replace_deleted=True
+        )
+        instance._index.set_ef(settings.VECTOR_INDEX_HNSW_EF_SEARCH)
+        instance._label_by_item = {k: int(v) for k, v in label_data["labels"].items()}
+        instance._item_by_label = {v: k for k, v in instance._label_by_item.items()}
+        instance._next_label = int(label_data["next_label"])
+        return instance
+
+
+# Registry of available backends; additional ANN libraries plug in here
+VECTOR_INDEX_BACKENDS: Dict[str, type] = {}
+if HNSWLIB_AVAILABLE:
+    VECTOR_INDEX_BACKENDS[HNSWVectorIndex.name] = HNSWVectorIndex
+
+
+class VectorIndexService:
+    """Maintains the in-process ANN index over items' current embeddings"""
+
+    def __init__(self):
+        self.backend_name = settings.VECTOR_INDEX_BACKEND
+        self.enabled = (
+            settings.VECTOR_INDEX_ENABLED and self.backend_name in VECTOR_INDEX_BACKENDS
+        )
+        self.snapshot_dir = Path(settings.VECTOR_INDEX_DIR)
+        self.sync_interval = settings.VECTOR_INDEX_SYNC_INTERVAL
+        self.rebuild_interval = settings.VECTOR_INDEX_REBUILD_INTERVAL
+        self.batch_size = 2000
+
+        self._index: Optional[VectorIndexBackend] = None
+        self._watermark: Tuple[datetime, UUID] = (_EPOCH, _NIL_UUID)
+        self._last_rebuild = 0.0
+        self._write_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._stats = {"queries": 0, "fallbacks": 0, "synced_rows": 0, "rebuilds": 0}
+
+    @property
+    def is_ready(self) -> bool:
+        return self.enabled and self._index is not None and len(self._index) > 0
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return self.snapshot_dir / f"items_{self.backend_name}"
+
+    async def start(self):
+        """Load the latest snapshot (or build from scratch) and start syncing."""
+        if not self.enabled:
+            logger.info("Vector index disabled - semantic search uses pgvector")
+            return
+        try:
+            if not await asyncio.to_thread(self._load_snapshot):
+                await self.rebuild()
+            else:
+                await self.sync()
+        except Exception as e:
+            logger.error(f"Vector index initialization failed, using pgvector: {e}")
+        self._sync_task = asyncio.create_task(self._sync_loop())
+        logger.info("Vector index service started")
+
+    async def stop(self):
+        """Stop background sync and write a final snapshot."""
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+        if self._index is not None:
+            await self.snapshot()
+        logger.info("Vector index service stopped")
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                if time.monotonic() - self._last_rebuild >= self.rebuild_interval:
+                    await self.rebuild()
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Vector index sync failed: {e}")
+
+    async def _stream_embeddings(self, since: Tuple[datetime, UUID]):
+        """Yield (item_ids, vectors, watermark) batches newer than `since`."""
+        pool = await get_db_pool()
+        last_updated, last_id = since
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT i.id AS item_id, e.id AS embedding_id, e.vector, e.updated_at
+                    FROM items i
+                    JOIN embeddings e ON i.embed_vector_id = e.id
+                    WHERE (e.updated_at, e.id) > ($1, $2)
+                    ORDER BY e.updated_at, e.id
+                    LIMIT $3
+                """, last_updated, last_id, self.batch_size)
+            if not rows:
+                return
+            last_updated, last_id = rows[-1]['updated_at'], rows[-1]['embedding_id']
+            yield (
+                [str(row['item_id']) for row in rows],
+                np.vstack([np.asarray(row['vector'], dtype=np.float32) for row in rows]),
+                (last_updated, last_id),
+            )
+
+    async def sync(self) -> int:
+        """Apply embeddings changed since the last watermark."""
+        if not self.enabled:
+            return 0
+        synced = 0
+        async with self._write_lock:
+            async for item_ids, vectors, watermark in self._stream_embeddings(self._watermark):
+                if self._index is None:
+                    self._index = VECTOR_INDEX_BACKENDS[self.backend_name](vectors.shape[1])
+                self._index.reserve(len(item_ids))
+                await asyncio.to_thread(self._index.upsert, item_ids, vectors)
+                self._watermark = watermark
+                synced += len(item_ids)
+        if synced:
+            self._stats["synced_rows"] += synced
+            logger.debug(f"Vector index synced {synced} embeddings")
+        return synced
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Build a fresh index from the embeddings table and swap it in."""
+        if not self.enabled:
+            return {"status": "disabled"}
+        start = time.monotonic()
+        new_index: Optional[VectorIndexBackend] = None
+        watermark = (_EPOCH, _NIL_UUID)
+        async for item_ids, vectors, batch_watermark in self._stream_embeddings(watermark):
+            if new_index is None:
+                new_index = VECTOR_INDEX_BACKENDS[self.backend_name](vectors.shape[1])
+            # The new index is not visible to queries yet, so resizing off-loop is safe
+            await asyncio.to_thread(new_index.upsert, item_ids, vectors)
+            watermark = batch_watermark
+
+        async with self._write_lock:
+            self._index = new_index
+            self._watermark = watermark
+            self._last_rebuild = time.monotonic()
+        self._stats["rebuilds"] += 1
+        await self.snapshot()
+
+        size = len(new_index) if new_index is not None else 0
+        elapsed = time.monotonic() - start
+        logger.info(f"Vector index rebuilt with {size} vectors in {elapsed:.2f}s")
+        return {"status": "rebuilt", "size": size, "seconds": round(elapsed, 3)}
+
+    async def snapshot(self) -> bool:
+        """Persist the index and its watermark so restarts only replay recent changes."""
+        async with self._write_lock:
+            if self._index is None:
+                return False
+            try:
+                await asyncio.to_thread(self._write_snapshot)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to snapshot vector index: {e}")
+                return False
+
+    def _write_snapshot(self):
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self._index.save(self._snapshot_path)
+        meta = {
+            "backend": self.backend_name,
+            "dim": self._index.dim,
+            "watermark_updated_at": self._watermark[0].isoformat(),
+            "watermark_id": str(self._watermark[1]),
+            "last_rebuild_wall": time.time() - (time.monotonic() - self._last_rebuild),
+        }
+        tmp_path = self._snapshot_path.with_suffix(".meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._snapshot_path.with_suffix(".meta.json"))
+
+    def _load_snapshot(self) -> bool:
+        meta_path = self._snapshot_path.with_suffix(".meta.json")
+        if not meta_path.exists():
+            return False
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("backend") != self.backend_name:
+                return False
+            backend_cls = VECTOR_INDEX_BACKENDS[self.backend_name]
+            self._index = backend_cls.load(self._snapshot_path, int(meta["dim"]))
+            self._watermark = (
+                datetime.fromisoformat(meta["watermark_updated_at"]),
+                UUID(meta["watermark_id"]),
+            )
+            age = time.time() - float(meta.get("last_rebuild_wall", 0))
+            self._last_rebuild = time.monotonic() - age
+            logger.info(f"Loaded vector index snapshot with {len(self._index)} vectors")
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vector index snapshot: {e}")
+            self._index = None
+            return False
+
+    async def upsert(self, item_id: str, vector: Sequence[float]) -> None:
+        """Apply a freshly written embedding without waiting for the next sync."""
+        if not self.enabled or self._index is None:
+            return
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        if vector.shape[1] != self._index.dim:
+            return
+        async with self._write_lock:
+            self._index.upsert([item_id], vector)
+
+    async def remove(self, item_ids: Sequence[str]) -> None:
+        if not self.enabled or self._index is None:
+            return
+        async with self._write_lock:
+            self._index.remove(list(item_ids))
+
+    async def search(
+        self, query_embedding: Sequence[float], k: int
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Top-k nearest items by cosine similarity.
+
+        Returns None when the index cannot answer (disabled, empty, or dimension
+        mismatch) so callers can fall back to pgvector.
+        """
+        index = self._index
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if not self.is_ready or query.shape[-1] != index.dim:
+            self._stats["fallbacks"] += 1
+            return None
+        self._stats["queries"] += 1
+        return index.search(query, k)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend_name,
+            "available_backends": list(VECTOR_INDEX_BACKENDS),
+            "size": len(self._index) if self._index is not None else 0,
+            "watermark": self._watermark[0].isoformat(),
+            **self._stats,
+        }
+
+
+# Create singleton instance
+vector_index_service = VectorIndexService()
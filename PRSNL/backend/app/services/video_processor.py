@@ -25,7 +25,11 @@ from app.services.platforms.twitter import TwitterProcessor
 from app.services.platforms.vimeo import VimeoProcessor
 from app.services.platforms.youtube import YouTubeProcessor
 from app.services.websocket_manager import websocket_manager
-from app.services.hybrid_transcription import hybrid_transcription_service, TranscriptionStrategy
+from app.services.hybrid_transcription import (
+    hybrid_transcription_service,
+    TranscriptionStrategy,
+    transcript_progress_listener,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -308,15 +312,19 @@ class VideoProcessor:
         
         return generated_thumbnail_path
 
-    async def transcribe_video(self, video_path: str) -> Optional[str]:
-        """Transcribes the given video file using hybrid transcription service."""
+    async def transcribe_video(self, video_path: str, task_id: Optional[str] = None) -> Optional[str]:
+        """Transcribes the given video file using hybrid transcription service.
+
+        When task_id is given, partial transcripts are streamed to its progress listeners.
+        """
         logger.info(f"Starting transcription for video: {video_path}")
         
         # Use hybrid transcription with automatic strategy selection
         result = await hybrid_transcription_service.transcribe_audio(
             audio_path=video_path,
             language="en",  # Default to English, could be made configurable
-            strategy=TranscriptionStrategy.AUTO
+            strategy=TranscriptionStrategy.AUTO,
+            on_segments=transcript_progress_listener(task_id, entity_id=task_id) if task_id else None
         )
         
         if result:
@@ -18,7 +18,6 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
-import httpx
 from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from youtube_transcript_api import YouTubeTranscriptApi
@@ -28,6 +27,7 @@ from app.config import settings
 from app.db.database import get_db
 from app.models.schemas import Item
 from app.services.embedding_service import EmbeddingService
+from app.services.http_client_factory import ClientType, http_client_factory
 from app.services.llm_processor import LLMProcessor
 
 logger = logging.getLogger(__name__)
@@ -38,7 +38,6 @@ class VideoStreamingService:
     def __init__(self):
         self.llm_processor = LLMProcessor()
         self.embedding_service = EmbeddingService()
-        self.client = httpx.AsyncClient(timeout=30.0)
         self.markitdown = MarkItDown()  # Initialize MarkItDown processor
         
         # Platform patterns
@@ -101,7 +100,8 @@ class VideoStreamingService:
             if platform == "youtube":
                 # Get YouTube metadata via oEmbed
                 oembed_url = f"https://www.youtube.com/oembed?url={url}&format=json"
-                response = await self.client.get(oembed_url)
+                client = await http_client_factory.get_client(ClientType.GENERAL)
+                response = await client.get(oembed_url, timeout=30.0)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -7,12 +7,12 @@ import io
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
 import pytesseract
 from PIL import Image
 
 from app.config import settings
 from app.services.ai_router import ai_router, AIProvider, AITask, TaskType
+from app.services.http_client_factory import ClientType, http_client_factory
 
 logger = logging.getLogger(__name__)
 
@@ -144,11 +144,12 @@ TAGS: [comma-separated tags]"""
             "max_tokens": 1000
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with http_client_factory.client_session(ClientType.AZURE_OPENAI) as client:
             response = await client.post(
                 f"{self.azure_endpoint}/openai/deployments/{settings.AZURE_OPENAI_DEPLOYMENT}/chat/completions?api-version={settings.AZURE_OPENAI_API_VERSION}",
                 headers=headers,
-                json=payload
+                json=payload,
+                timeout=30.0
             )
             response.raise_for_status()
             
@@ -3,6 +3,9 @@ Whisper.cpp Transcription Service
 
 High-quality offline transcription using whisper.cpp bindings.
 Provides better accuracy than Vosk for offline scenarios.
+
+Files are transcribed by ChunkedTranscriber (app/services/chunked_transcription.py):
+split on silence, transcribed in parallel on a process pool, stitched by time.
 """
 
 import asyncio
@@ -10,10 +13,14 @@ import logging
 import os
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Union
 
 import pywhispercpp.model as whisper_model
+from pywhispercpp.constants import MODELS_DIR
 from pywhispercpp.model import Model as WhisperModel
+from pywhispercpp.utils import download_model
+
+from app.services.chunked_transcription import ChunkedTranscriber, SegmentListener
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +35,15 @@ class WhisperCppTranscriptionService:
     - Word-level timestamps support
     - Language detection
     - Multi-language support
+    - Long files split into chunks transcribed in parallel
     """
     
     def __init__(self):
         self._models_cache: Dict[str, WhisperModel] = {}
-        self._models_dir = Path.home() / ".cache" / "whisper-cpp"
+        self._downloaded_models: Set[str] = set()
+        self.transcriber = ChunkedTranscriber()
+        # Same directory WhisperModel(name) loads from in the pool workers
+        self._models_dir = Path(MODELS_DIR)
         self._models_dir.mkdir(parents=True, exist_ok=True)
         
         # Available model sizes with quality/speed tradeoffs
@@ -49,8 +60,9 @@ class WhisperCppTranscriptionService:
     
     async def ensure_model_available(self, model_name: str = "base") -> bool:
         """
-        Ensure the specified model is available for use.
-        Downloads the model if not already present.
+        Ensure the specified model file is available for use.
+        Downloads the model if not already present, without loading it:
+        transcription runs in pool workers that load their own copy.
         
         Args:
             model_name: Model size to use (tiny, base, small, medium, large)
@@ -62,24 +74,22 @@ class WhisperCppTranscriptionService:
             logger.error(f"Invalid model name: {model_name}")
             return False
         
+        if model_name in self._downloaded_models:
+            return True
+        
         try:
-            # Check if model already loaded
-            if model_name in self._models_cache:
-                return True
-            
-            # Try to load the model
             model_path = self._models_dir / f"ggml-{model_name}.bin"
-            
-            # Download model if not exists
             if not model_path.exists():
                 logger.info(f"📥 Downloading whisper.cpp model: {model_name}")
-                # pywhispercpp will automatically download models
-                
-            # Load the model
-            model = WhisperModel(model_name)
-            self._models_cache[model_name] = model
             
-            logger.info(f"✅ Whisper.cpp model loaded: {model_name}")
+            # download_model is a no-op when the file exists; keep the
+            # disk check and any download off the event loop
+            downloaded = await asyncio.to_thread(download_model, model_name, str(self._models_dir))
+            if not downloaded:
+                return False
+            
+            self._downloaded_models.add(model_name)
+            logger.info(f"✅ Whisper.cpp model available: {model_name}")
             return True
             
         except Exception as e:
@@ -105,7 +115,8 @@ class WhisperCppTranscriptionService:
         model_name: str = "base",
         language: str = "en",
         word_timestamps: bool = True,
-        initial_prompt: Optional[str] = None
+        initial_prompt: Optional[str] = None,
+        on_segments: Optional[SegmentListener] = None
     ) -> Optional[Dict[str, any]]:
         """
         Transcribe audio file using whisper.cpp.
@@ -116,21 +127,19 @@ class WhisperCppTranscriptionService:
             language: Language code (e.g., "en", "es", "fr")
             word_timestamps: Whether to include word-level timestamps
             initial_prompt: Optional prompt to guide transcription
+            on_segments: Optional listener called with (segments, fraction_done) as
+                each stretch of the timeline is transcribed
             
         Returns:
             Transcription result with text, segments, and metadata
         """
         try:
-            # Ensure model is available
+            # Resolve (and on a cold cache download) the model once here, so the
+            # pool workers only ever load it from disk
             if not await self.ensure_model_available(model_name):
                 logger.error(f"Model {model_name} not available")
                 return None
             
-            # Get the model
-            model = self._get_model(model_name)
-            if not model:
-                return None
-            
             logger.info(f"🎙️ Transcribing with whisper.cpp ({model_name} model): {audio_path}")
             
             # Configure transcription parameters
@@ -142,50 +151,21 @@ class WhisperCppTranscriptionService:
                 "print_realtime": False
             }
             
-            # Run transcription in thread pool (whisper.cpp is CPU-bound)
-            loop = asyncio.get_event_loop()
-            segments = await loop.run_in_executor(
-                None,
-                lambda: model.transcribe(audio_path, **params)
+            # Chunks run on the transcriber's process pool (whisper.cpp is CPU-bound)
+            processed_segments, duration = await self.transcriber.transcribe(
+                audio_path, model_name, params, word_timestamps=word_timestamps, on_segments=on_segments
             )
             
-            # Process segments
-            full_text = ""
-            processed_segments = []
-            word_count = 0
-            
-            for segment in segments:
-                segment_text = segment.text.strip()
-                full_text += segment_text + " "
-                
-                segment_data = {
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment_text
-                }
-                
-                # Add word timestamps if available
-                if word_timestamps and hasattr(segment, 'words'):
-                    segment_data["words"] = [
-                        {
-                            "word": word.word,
-                            "start": word.start,
-                            "end": word.end,
-                            "probability": word.probability
-                        }
-                        for word in segment.words
-                    ]
-                    word_count += len(segment.words)
-                else:
-                    word_count += len(segment_text.split())
-                
-                processed_segments.append(segment_data)
+            word_count = sum(
+                len(segment["words"]) if "words" in segment else len(segment["text"].split())
+                for segment in processed_segments
+            )
             
             result = {
-                "text": full_text.strip(),
+                "text": " ".join(segment["text"] for segment in processed_segments if segment["text"]),
                 "segments": processed_segments,
                 "language": language,
-                "duration": processed_segments[-1]["end"] if processed_segments else 0,
+                "duration": duration,
                 "word_count": word_count,
                 "model": model_name,
                 "confidence": 0.85,  # whisper.cpp doesn't provide overall confidence
@@ -234,6 +214,8 @@ class WhisperCppTranscriptionService:
         info = {
             "available_models": self.available_models,
             "loaded_models": list(self._models_cache.keys()),
+            "transcription_workers": self.transcriber.workers,
+            "threads_per_worker": self.transcriber.threads_per_worker,
             "models_directory": str(self._models_dir),
             "recommended_model": "base"  # Good balance of quality and speed
         }
@@ -248,6 +230,7 @@ class WhisperCppTranscriptionService:
     def cleanup(self):
         """Clean up loaded models to free memory."""
         self._models_cache.clear()
+        self.transcriber.shutdown()
         logger.info("🧹 Whisper.cpp models cleaned up")
 
 
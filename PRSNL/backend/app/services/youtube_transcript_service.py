@@ -11,6 +11,8 @@ import os
 import time
 from typing import Dict, List, Optional, Tuple
 
+from app.services.http_client_factory import ClientType, http_client_factory
+
 logger = logging.getLogger(__name__)
 
 
@@ -171,8 +173,7 @@ class YouTubeTranscriptService:
                 
                 if subtitle_url:
                     # Fetch and parse subtitles
-                    import httpx
-                    async with httpx.AsyncClient() as client:
+                    async with http_client_factory.client_session(ClientType.GENERAL) as client:
                         response = await client.get(subtitle_url)
                         if response.status_code == 200:
                             transcript_text = self._parse_subtitle_content(response.text)
@@ -0,0 +1,85 @@
+"""
+MinHash signatures and LSH banding for near-duplicate text detection.
+
+Text is reduced to a set of hashed word shingles; a MinHash signature of
+`num_perm` values estimates Jaccard similarity between two shingle sets as the
+fraction of equal positions. Splitting the signature into `bands` of `rows`
+values and hashing each band gives bucket keys: two texts share at least one
+bucket with probability 1 - (1 - J^rows)^bands, so a lookup on band buckets
+finds likely near-duplicates without comparing against every item.
+"""
+import hashlib
+import re
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def _hash32(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=4).digest(), "little")
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashed word n-grams of lower-cased text (a single shingle for shorter texts)."""
+    words = _WORD_RE.findall(text.lower()) if text else []
+    if not words:
+        return set()
+    if len(words) < size:
+        return {_hash32(" ".join(words).encode("utf-8"))}
+    return {
+        _hash32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """Deterministic MinHash with LSH banding (same seed => comparable signatures)"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes: Set[int]) -> Optional[np.ndarray]:
+        """uint32 signature of a shingle set, or None for an empty set."""
+        if not shingle_hashes:
+            return None
+        values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+        # Universal hashing; uint64 products wrap, which is fine for hashing purposes
+        with np.errstate(over="ignore"):
+            permuted = ((values[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def text_signature(self, text: str) -> Optional[np.ndarray]:
+        return self.signature(shingles(text))
+
+    def band_buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        """(band, bucket) keys for a signature; buckets are signed 64-bit for BIGINT storage."""
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+        return buckets
+
+    @staticmethod
+    def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+        return float(np.count_nonzero(a == b)) / len(a)
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype("<u4").tobytes()
+
+    @staticmethod
+    def from_bytes(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype="<u4").astype(np.uint32)
@@ -0,0 +1,50 @@
+"""
+Opaque keyset cursors for paginated search results.
+
+A cursor captures the sort key of the last row on a page so the next page can
+be fetched with a `(sort_key...) < (cursor...)` predicate instead of OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+_DATETIME_PREFIX = "dt:"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _DATETIME_PREFIX + value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_DATETIME_PREFIX):
+        return datetime.fromisoformat(value[len(_DATETIME_PREFIX):])
+    return value
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque URL-safe token."""
+    payload = json.dumps(
+        {key: _encode_value(value) for key, value in values.items()},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {e}") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid pagination cursor")
+    return {key: _decode_value(value) for key, value in payload.items()}
@@ -0,0 +1,88 @@
+"""
+Compact binary codec for embedding vectors stored in the cache.
+
+A 1536-dim vector JSON-encoded is ~30 KB of text; as raw little-endian float32
+it is 6 KB, 3 KB as float16 and 1.5 KB as int8.
+
+Layout (little-endian):
+    magic    2 bytes  b"PV"
+    version  uint8
+    dtype    uint8    0 = float32, 1 = float16, 2 = int8 (symmetric, scaled)
+    dim      uint32
+    scale    float32  int8 dequantization scale (1.0 for float types)
+    mlen     uint8    model name length
+    model    mlen bytes (utf-8)
+    payload  dim * itemsize bytes
+"""
+import struct
+from typing import NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+MAGIC = b"PV"
+VERSION = 1
+
+_HEADER = struct.Struct("<2sBBIfB")
+_DTYPES = {
+    "float32": (0, np.dtype("<f4")),
+    "float16": (1, np.dtype("<f2")),
+    "int8": (2, np.dtype("i1")),
+}
+_DTYPE_BY_CODE = {code: (name, dtype) for name, (code, dtype) in _DTYPES.items()}
+
+
+class DecodedVector(NamedTuple):
+    vector: np.ndarray
+    model: str
+    dtype: str
+
+
+def encode_vector(
+    vector: Union[Sequence[float], np.ndarray],
+    model: str = "",
+    dtype: str = "float32"
+) -> bytes:
+    """Encode a vector with a header recording its dimension, storage dtype and model."""
+    if dtype not in _DTYPES:
+        raise ValueError(f"Unsupported vector dtype: {dtype}")
+    code, np_dtype = _DTYPES[dtype]
+    values = np.asarray(vector, dtype=np.float32).ravel()
+
+    scale = 1.0
+    if dtype == "int8":
+        max_abs = float(np.max(np.abs(values))) if values.size else 0.0
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        payload = np.clip(np.rint(values / scale), -127, 127).astype(np_dtype)
+    else:
+        payload = values.astype(np_dtype)
+
+    model_bytes = model.encode("utf-8")[:255]
+    header = _HEADER.pack(MAGIC, VERSION, code, values.size, scale, len(model_bytes))
+    return header + model_bytes + payload.tobytes()
+
+
+def is_encoded_vector(blob: Optional[bytes]) -> bool:
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:2]) == MAGIC
+
+
+def decode_vector(blob: bytes) -> DecodedVector:
+    """Decode a blob produced by encode_vector into a float32 array."""
+    if not is_encoded_vector(blob) or len(blob) < _HEADER.size:
+        raise ValueError("Not an encoded vector")
+    _, version, code, dim, scale, model_len = _HEADER.unpack_from(blob)
+    if version != VERSION or code not in _DTYPE_BY_CODE:
+        raise ValueError(f"Unsupported vector encoding (version={version}, dtype={code})")
+    dtype_name, np_dtype = _DTYPE_BY_CODE[code]
+
+    offset = _HEADER.size
+    model = bytes(blob[offset:offset + model_len]).decode("utf-8")
+    offset += model_len
+    if len(blob) - offset != dim * np_dtype.itemsize:
+        raise ValueError("Truncated vector payload")
+
+    values = np.frombuffer(blob, dtype=np_dtype, count=dim, offset=offset)
+    if dtype_name == "int8":
+        vector = values.astype(np.float32) * np.float32(scale)
+    else:
+        vector = values.astype(np.float32, copy=dtype_name != "float32")
+    return DecodedVector(vector, model, dtype_name)
@@ -1,112 +1,234 @@
+"""
+Item Worker
+Processes items announced on the item_created channel.
+
+- A dedicated listener connection pushes item ids onto a bounded asyncio queue;
+  when the queue is full ids are dropped and left to the next catch-up sweep,
+  so the listener never blocks
+- ITEM_WORKER_CONCURRENCY processors share the application pool and claim each
+  item in a short FOR UPDATE SKIP LOCKED transaction (migration 031), so several
+  workers or a sweep racing a notification never process an item twice
+- Pending items are swept from the table on start, after a listener reconnect
+  and every ITEM_WORKER_SWEEP_SECONDS, so notifications sent while the worker
+  was down are not lost
+"""
 import asyncio
-import json
 import logging
+from typing import Optional, Set
 from uuid import UUID
 
 import asyncpg
 
-from app.core.capture_engine import CaptureEngine
+from app.config import settings
 from app.db.database import get_db_pool
+from app.monitoring.metrics import ITEM_WORKER_BUSY, ITEM_WORKER_EVENTS, ITEM_WORKER_ITEMS, ITEM_WORKER_QUEUE_DEPTH
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-async def listen_for_notifications(db_url: str):
-    """
-    Connects to PostgreSQL and listens for 'item_created' notifications.
-    """
-    conn = None
-    try:
-        conn = await asyncpg.connect(db_url)
-        await conn.add_listener('item_created', handle_notification)
-        logger.info("Listening for 'item_created' notifications...")
+# Pending items the worker may take: unclaimed or with an expired claim, not
+# owned by the capture pipeline, and not out of attempts
+CLAIMABLE = """
+    i.status = 'pending'
+    AND (i.worker_claimed_at IS NULL OR i.worker_claimed_at < NOW() - make_interval(secs => $1))
+    AND i.worker_attempts < $2
+    AND NOT EXISTS (SELECT 1 FROM capture_jobs j WHERE j.item_id = i.id)
+"""
+
+
+class ItemWorker:
+    """Listener, bounded queue and concurrent processors for item_created"""
+
+    def __init__(
+        self,
+        db_url: str,
+        concurrency: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        sweep_interval: Optional[float] = None
+    ):
+        self.db_url = db_url
+        self.concurrency = concurrency or settings.ITEM_WORKER_CONCURRENCY
+        self.queue_size = queue_size or settings.ITEM_WORKER_QUEUE_SIZE
+        self.sweep_interval = sweep_interval or settings.ITEM_WORKER_SWEEP_SECONDS
+        self.lease_seconds = settings.ITEM_WORKER_LEASE_SECONDS
+        self.max_attempts = settings.ITEM_WORKER_MAX_ATTEMPTS
+
+        self.queue: Optional[asyncio.Queue] = None
+        self._queued: Set[UUID] = set()
+        self._sweep_now: Optional[asyncio.Event] = None
+        self.stats = {"queued": 0, "dropped": 0, "completed": 0, "failed": 0, "skipped": 0}
+
+    async def run(self):
+        """Run until cancelled."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._sweep_now = asyncio.Event()
+        tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._sweep_loop())]
+        tasks += [asyncio.create_task(self._process_loop(n)) for n in range(self.concurrency)]
+        logger.info(f"Item worker started with {self.concurrency} processors")
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("Item worker stopped")
+
+    def offer(self, item_id: UUID, source: str) -> bool:
+        """Queue an item id without blocking; False if it was already queued or the queue is full."""
+        if item_id in self._queued:
+            ITEM_WORKER_EVENTS.labels(source=source, result='duplicate').inc()
+            return False
+        try:
+            self.queue.put_nowait(item_id)
+        except asyncio.QueueFull:
+            # The sweep finds it in the table later
+            self.stats["dropped"] += 1
+            ITEM_WORKER_EVENTS.labels(source=source, result='dropped').inc()
+            return False
+        self._queued.add(item_id)
+        self.stats["queued"] += 1
+        ITEM_WORKER_EVENTS.labels(source=source, result='queued').inc()
+        ITEM_WORKER_QUEUE_DEPTH.set(self.queue.qsize())
+        return True
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self.offer(UUID(payload), 'notify')
+        except ValueError:
+            logger.error(f"Invalid UUID payload on {channel}: {payload}")
+
+    async def _listen(self):
+        """Keep a LISTEN connection open, reconnecting (and sweeping) after failures."""
+        delay = 1.0
         while True:
-            await asyncio.sleep(1) # Keep the listener alive
-    except Exception as e:
-        logger.error(f"Error in worker: {e}")
-    finally:
-        if conn:
-            await conn.close()
-            logger.info("Database connection closed.")
-
-async def handle_notification(connection, pid, channel, payload):
-    """
-    Callback function to handle incoming PostgreSQL notifications.
-    """
-    logger.info(f"Received notification on channel '{channel}': {payload}")
-    try:
-        # Payload should be the item ID
-        item_id = UUID(payload)
-        
-        # Use the existing connection to get item details
-        # (the pool may not be initialized in this context)
-        conn = connection
-        
-        # Add debug logging to see what database worker connects to
-        logger.info(f"🔍 WORKER: Processing item {item_id}")
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.db_url)
+                await conn.add_listener('item_created', self._on_notification)
+                logger.info("Listening for 'item_created' notifications...")
+                delay = 1.0
+                # Anything announced while we were disconnected is only in the table
+                self._sweep_now.set()
+                while not conn.is_closed():
+                    await asyncio.sleep(5)
+                logger.warning("item_created listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"item_created listener failed: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pending item sweep failed: {e}")
+            self._sweep_now.clear()
+            try:
+                await asyncio.wait_for(self._sweep_now.wait(), timeout=self.sweep_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sweep(self) -> int:
+        """Queue claimable pending items, oldest first, up to the free queue space."""
+        free = self.queue_size - self.queue.qsize()
+        if free <= 0:
+            return 0
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT i.id FROM items i
+                WHERE {CLAIMABLE}
+                ORDER BY i.created_at, i.id
+                LIMIT $3
+            """, float(self.lease_seconds), self.max_attempts, free)
+        queued = sum(self.offer(row['id'], 'sweep') for row in rows)
+        if queued:
+            logger.info(f"Queued {queued} pending items from catch-up sweep")
+        return queued
+
+    async def claim(self, item_id: UUID) -> Optional[asyncpg.Record]:
+        """Take the processing lease on an item; None if it is not pending or another worker has it."""
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchrow(f"""
+                UPDATE items SET worker_claimed_at = NOW(), worker_attempts = worker_attempts + 1
+                WHERE id = (
+                    SELECT i.id FROM items i
+                    WHERE i.id = $3 AND {CLAIMABLE}
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING url, processed_content, raw_content, enable_summarization, content_type
+            """, float(self.lease_seconds), self.max_attempts, item_id)
+
+    async def _process_loop(self, n: int):
+        # Imported here: CaptureEngine builds its AI clients at import time
+        from app.core.capture_engine import CaptureEngine
+        capture_engine = CaptureEngine()
+        while True:
+            item_id = await self.queue.get()
+            self._queued.discard(item_id)
+            ITEM_WORKER_QUEUE_DEPTH.set(self.queue.qsize())
+            ITEM_WORKER_BUSY.inc()
+            try:
+                await self.process(capture_engine, item_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing item {item_id}: {e}")
+            finally:
+                ITEM_WORKER_BUSY.dec()
+                self.queue.task_done()
+
+    async def process(self, capture_engine, item_id: UUID):
+        row = await self.claim(item_id)
+        if row is None:
+            self.stats["skipped"] += 1
+            ITEM_WORKER_ITEMS.labels(result='skipped').inc()
+            return
+
+        logger.info(f"Processing item {item_id}")
         try:
-            # Test if the columns exist first
-            test_columns = await conn.fetch("""
-                SELECT column_name FROM information_schema.columns 
-                WHERE table_name = 'items' 
-                AND column_name IN ('content_type', 'enable_summarization')
-            """)
-            logger.info(f"🔍 WORKER: Available columns: {[r['column_name'] for r in test_columns]}")
-            
-            row = await conn.fetchrow("""
-                SELECT url, processed_content, raw_content, enable_summarization, content_type, status
-                FROM items WHERE id = $1::uuid
-            """, str(item_id))
-        except Exception as e:
-            logger.error(f"🔍 WORKER ERROR: {e}")
-            raise
-            
-        if row:
-            # Only process if not already completed or failed
-            if row['status'] in ['pending']:
-                url = row['url']
+            await capture_engine.process_item(
+                item_id=item_id,
+                url=row['url'],
                 # Use raw_content (from form) if available, otherwise use processed_content
-                content = row['raw_content'] or row['processed_content']
-                enable_summarization = row.get('enable_summarization', False)
-                content_type = row.get('content_type', 'auto')
-                
-                # Initialize database pool for CaptureEngine
-                try:
-                    from app.db.database import create_db_pool
-                    await create_db_pool()
-                    logger.info(f"🔗 Database pool initialized for worker")
-                except Exception as pool_error:
-                    logger.error(f"❌ Failed to initialize database pool: {pool_error}")
-                    return
-                
-                # Create capture engine and process item
-                capture_engine = CaptureEngine()
-                # Process item directly
-                try:
-                    await capture_engine.process_item(
-                        item_id=item_id,
-                        url=url,
-                        content=content,
-                        enable_summarization=enable_summarization,
-                        content_type=content_type
-                    )
-                    logger.info(f"✅ Successfully processed item {item_id}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to process item {item_id}: {e}")
-                    # Update item status to failed
-                    try:
-                        await conn.execute('UPDATE items SET status = $1 WHERE id = $2', 'failed', item_id)
-                    except Exception as update_error:
-                        logger.error(f"Failed to update item status: {update_error}")
-            else:
-                logger.info(f"Item {item_id} already processed (status: {row['status']}")
-        else:
-            logger.error(f"Item not found: {item_id}")
-        
-    except ValueError as e:
-        logger.error(f"Invalid UUID payload: {payload} - {e}")
-    except Exception as e:
-        logger.error(f"Error handling notification: {e}")
+                content=row['raw_content'] or row['processed_content'],
+                enable_summarization=row['enable_summarization'] or False,
+                content_type=row['content_type'] or 'auto'
+            )
+        except Exception as e:
+            logger.error(f"Failed to process item {item_id}: {e}")
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                await conn.execute("UPDATE items SET status = 'failed' WHERE id = $1", item_id)
+            self.stats["failed"] += 1
+            ITEM_WORKER_ITEMS.labels(result='failed').inc()
+            return
+        self.stats["completed"] += 1
+        ITEM_WORKER_ITEMS.labels(result='completed').inc()
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "concurrency": self.concurrency,
+        }
+
+
+async def listen_for_notifications(db_url: str):
+    """
+    Run the item worker until cancelled, using the application's shared pool.
+    """
+    await ItemWorker(db_url).run()
+
 
 # Example usage (for testing worker.py directly)
 if __name__ == "__main__":
@@ -114,6 +236,15 @@ if __name__ == "__main__":
     import os
     from dotenv import load_dotenv
     load_dotenv()
-    
+
     DB_URL = os.getenv("DATABASE_URL", "postgresql://pronav@localhost:5432/prsnl")
-    asyncio.run(listen_for_notifications(DB_URL))
+
+    async def main():
+        from app.db.database import close_db_pool, create_db_pool
+        await create_db_pool()
+        try:
+            await listen_for_notifications(DB_URL)
+        finally:
+            await close_db_pool()
+
+    asyncio.run(main())
@@ -5,7 +5,6 @@ Phase 2: Implement sophisticated agent coordination patterns using Celery Groups
 for complex multi-agent workflows and intelligent result synthesis.
 """
 
-import asyncio
 import logging
 import json
 from datetime import datetime
@@ -13,8 +12,8 @@ from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 
 from celery import group, chord, chain
+from app.workers.async_runtime import db_connection, run_async
 from app.workers.celery_app import celery_app
-from app.db.database import get_db_connection
 from app.services.unified_ai_service import UnifiedAIService
 
 logger = logging.getLogger(__name__)
@@ -32,10 +31,7 @@ def orchestrate_multi_agent_workflow(self, workflow_config: Dict[str, Any], user
     - Hierarchical: Nested groups with multiple synthesis levels
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _orchestrate_multi_agent_workflow_async(self.request.id, workflow_config, user_id, context or {})
         )
         
@@ -48,8 +44,6 @@ def orchestrate_multi_agent_workflow(self, workflow_config: Dict[str, Any], user
             raise self.retry(countdown=60 * (2 ** self.request.retries))
         
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 async def _orchestrate_multi_agent_workflow_async(task_id: str, workflow_config: Dict[str, Any], user_id: str, context: Dict[str, Any]):
@@ -276,10 +270,7 @@ async def _execute_hierarchical_workflow(config: Dict[str, Any], user_id: str, c
 def advanced_content_analysis_task(self, user_id: str, params: Dict[str, Any], context: Dict[str, Any]):
     """Advanced content analysis with configurable AI processing"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _advanced_content_analysis_async(self.request.id, user_id, params, context)
         )
         
@@ -292,8 +283,6 @@ def advanced_content_analysis_task(self, user_id: str, params: Dict[str, Any], c
             raise self.retry(countdown=30 * (2 ** self.request.retries))
         
         return {"agent": "content_analysis", "error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 async def _advanced_content_analysis_async(task_id: str, user_id: str, params: Dict[str, Any], context: Dict[str, Any]):
@@ -307,7 +296,7 @@ async def _advanced_content_analysis_async(task_id: str, user_id: str, params: D
         analysis_type = params.get("analysis_type", "comprehensive")
         
         if content_source == "latest":
-            async with get_db_connection() as db:
+            async with db_connection() as db:
                 content_records = await db.fetch("""
                     SELECT content, metadata FROM embeddings 
                     WHERE user_id = $1 
@@ -317,7 +306,7 @@ async def _advanced_content_analysis_async(task_id: str, user_id: str, params: D
         else:
             # Handle specific content IDs
             content_ids = params.get("content_ids", [])
-            async with get_db_connection() as db:
+            async with db_connection() as db:
                 content_records = await db.fetch("""
                     SELECT content, metadata FROM embeddings 
                     WHERE user_id = $1 AND id = ANY($2::uuid[])
@@ -351,10 +340,7 @@ async def _advanced_content_analysis_async(task_id: str, user_id: str, params: D
 def advanced_pattern_detection_task(self, user_id: str, params: Dict[str, Any], context: Dict[str, Any]):
     """Advanced pattern detection across user's data"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _advanced_pattern_detection_async(self.request.id, user_id, params, context)
         )
         
@@ -367,8 +353,6 @@ def advanced_pattern_detection_task(self, user_id: str, params: Dict[str, Any],
             raise self.retry(countdown=30 * (2 ** self.request.retries))
         
         return {"agent": "pattern_detection", "error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 async def _advanced_pattern_detection_async(task_id: str, user_id: str, params: Dict[str, Any], context: Dict[str, Any]):
@@ -378,7 +362,7 @@ async def _advanced_pattern_detection_async(task_id: str, user_id: str, params:
         ai_service = UnifiedAIService()
         
         # Get historical patterns and data
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             existing_patterns = await db.fetch("""
                 SELECT pattern_signature, pattern_type, description, occurrence_count
                 FROM codemirror_patterns 
@@ -428,10 +412,7 @@ def intelligent_multi_agent_synthesis_task(self, agent_results: List[Dict[str, A
     results from parallel agent execution.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _intelligent_multi_agent_synthesis_async(self.request.id, agent_results, user_id, params, context)
         )
         
@@ -444,8 +425,6 @@ def intelligent_multi_agent_synthesis_task(self, agent_results: List[Dict[str, A
             raise self.retry(countdown=60 * (2 ** self.request.retries))
         
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 async def _intelligent_multi_agent_synthesis_async(task_id: str, agent_results: List[Dict[str, Any]], user_id: str, params: Dict[str, Any], context: Dict[str, Any]):
@@ -487,7 +466,7 @@ async def _intelligent_multi_agent_synthesis_async(task_id: str, agent_results:
         await _send_progress_update(task_id, user_id, "intelligent_synthesis", 3, 4, "Storing synthesis results")
         
         # Store synthesis results
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             synthesis_id = await db.fetchval("""
                 INSERT INTO agent_synthesis_results (
                     user_id, synthesis_type, agent_results, synthesis_output,
@@ -564,7 +543,7 @@ def advanced_insight_synthesis_task(self, previous_result: Dict[str, Any], user_
 
 async def _create_workflow_tracking(workflow_name: str, workflow_type: str, user_id: str, config: Dict[str, Any]) -> str:
     """Create workflow tracking record"""
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         workflow_id = await db.fetchval("""
             INSERT INTO agent_workflows (
                 user_id, workflow_name, workflow_type, workflow_config,
@@ -583,7 +562,7 @@ async def _create_workflow_tracking(workflow_name: str, workflow_type: str, user
 
 async def _update_workflow_tracking(workflow_id: str, status: str, execution_id: Optional[str] = None):
     """Update workflow tracking status"""
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         await db.execute("""
             UPDATE agent_workflows 
             SET status = $2, execution_id = $3, updated_at = CURRENT_TIMESTAMP
@@ -601,7 +580,7 @@ async def _send_progress_update(
 ):
     """Send progress update to database and WebSocket"""
     try:
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             await db.execute("""
                 INSERT INTO task_progress (
                     task_id, entity_id, progress_type, current_value,
@@ -5,7 +5,6 @@ Distributed tasks for AI-powered content analysis, embedding generation,
 and LLM processing to eliminate blocking operations.
 """
 
-import asyncio
 import logging
 import json
 from datetime import datetime
@@ -13,8 +12,8 @@ from typing import Dict, Any, List, Optional
 from uuid import UUID
 
 from app.core.langfuse_wrapper import observe  # Safe wrapper to handle get_tracer error
+from app.workers.async_runtime import db_connection, run_async
 from app.workers.celery_app import celery_app
-from app.db.database import get_db_connection
 from app.services.unified_ai_service import UnifiedAIService
 from app.services.embedding_service import EmbeddingService
 from app.services.llm_processor import LLMProcessor
@@ -37,11 +36,7 @@ def analyze_content_task(self, content_id: str, content: str, options: Dict[str,
         Analysis results with summary, tags, insights
     """
     try:
-        # Run async code in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _analyze_content_async(self.request.id, content_id, content, options or {})
         )
         
@@ -55,8 +50,6 @@ def analyze_content_task(self, content_id: str, content: str, options: Dict[str,
             raise self.retry(countdown=60 * (2 ** self.request.retries))
         
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 @observe(name="worker_analyze_content")
@@ -100,7 +93,7 @@ async def _analyze_content_async(task_id: str, content_id: str, content: str, op
         # 4. Store results in database
         await _send_progress_update(task_id, content_id, "ai_analysis", 4, 4, "Storing results")
         
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             await db.execute("""
                 UPDATE items 
                 SET 
@@ -150,10 +143,7 @@ def generate_embeddings_batch_task(self, items: List[Dict[str, Any]], cache_pref
         Batch processing results with embeddings
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _generate_embeddings_batch_async(self.request.id, items, cache_prefix)
         )
         
@@ -166,8 +156,6 @@ def generate_embeddings_batch_task(self, items: List[Dict[str, Any]], cache_pref
             raise self.retry(countdown=30 * (2 ** self.request.retries))
         
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 @observe(name="worker_generate_embeddings_batch")
@@ -196,7 +184,7 @@ async def _generate_embeddings_batch_async(task_id: str, items: List[Dict[str, A
             embeddings = await embedding_service.generate_embeddings_batch(batch_texts)
             
             # Store results in database
-            async with get_db_connection() as db:
+            async with db_connection() as db:
                 for j, item in enumerate(batch_items):
                     if j < len(embeddings):
                         # Store embedding
@@ -253,10 +241,7 @@ def process_with_llm_task(self, content: str, prompt_type: str, options: Dict[st
         LLM processing results
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _process_with_llm_async(self.request.id, content, prompt_type, options or {})
         )
         
@@ -269,8 +254,6 @@ def process_with_llm_task(self, content: str, prompt_type: str, options: Dict[st
             raise self.retry(countdown=60 * (2 ** self.request.retries))
         
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 @observe(name="worker_process_with_llm")
@@ -333,10 +316,7 @@ def smart_categorization_task(self, content_items: List[Dict[str, Any]]):
         Categorization results
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _smart_categorization_async(self.request.id, content_items)
         )
         
@@ -345,8 +325,6 @@ def smart_categorization_task(self, content_items: List[Dict[str, Any]]):
     except Exception as e:
         logger.error(f"Smart categorization failed: {e}", exc_info=True)
         return {"error": str(e), "status": "failed"}
-    finally:
-        loop.close()
 
 
 @observe(name="worker_smart_categorization")
@@ -370,7 +348,7 @@ async def _smart_categorization_async(task_id: str, content_items: List[Dict[str
             )
             
             # Update database
-            async with get_db_connection() as db:
+            async with db_connection() as db:
                 await db.execute("""
                     UPDATE items 
                     SET category = $2, subcategory = $3
@@ -414,7 +392,7 @@ async def _send_progress_update(
 ):
     """Send progress update to database and WebSocket"""
     try:
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             await db.execute("""
                 INSERT INTO task_progress (
                     task_id, entity_id, progress_type, current_value,
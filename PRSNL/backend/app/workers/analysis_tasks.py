@@ -4,14 +4,13 @@ Analysis Tasks for CodeMirror
 Advanced analysis tasks that can run independently or as part of workflows.
 """
 
-import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 
+from app.workers.async_runtime import db_connection, run_async
 from app.workers.celery_app import celery_app
-from app.db.database import get_db_connection
 from app.services.unified_ai_service import unified_ai_service
 
 logger = logging.getLogger(__name__)
@@ -25,10 +24,7 @@ def compare_repositories(repo_ids: List[str], user_id: str) -> Dict[str, Any]:
     Enterprise feature for identifying best practices across projects.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _compare_repositories_async(repo_ids, user_id)
         )
         
@@ -37,8 +33,6 @@ def compare_repositories(repo_ids: List[str], user_id: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Repository comparison failed: {e}", exc_info=True)
         raise
-    finally:
-        loop.close()
 
 
 async def _compare_repositories_async(repo_ids: List[str], user_id: str) -> Dict[str, Any]:
@@ -50,7 +44,7 @@ async def _compare_repositories_async(repo_ids: List[str], user_id: str) -> Dict
         "recommendations": []
     }
     
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         # Load analyses for all repositories
         analyses = await db.fetch("""
             SELECT ca.*, gr.full_name as repo_name
@@ -158,10 +152,7 @@ def generate_pattern_library(user_id: str) -> Dict[str, Any]:
     Creates a comprehensive catalog of patterns with examples and best practices.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _generate_pattern_library_async(user_id)
         )
         
@@ -170,8 +161,6 @@ def generate_pattern_library(user_id: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Pattern library generation failed: {e}", exc_info=True)
         raise
-    finally:
-        loop.close()
 
 
 async def _generate_pattern_library_async(user_id: str) -> Dict[str, Any]:
@@ -183,7 +172,7 @@ async def _generate_pattern_library_async(user_id: str) -> Dict[str, Any]:
         "generated_at": datetime.utcnow().isoformat()
     }
     
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         # Get all patterns for user
         patterns = await db.fetch("""
             SELECT 
@@ -265,20 +254,15 @@ def generate_daily_reports():
     Scheduled task that runs once per day.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        loop.run_until_complete(_generate_daily_reports_async())
+        run_async(_generate_daily_reports_async())
         
     except Exception as e:
         logger.error(f"Daily report generation failed: {e}", exc_info=True)
-    finally:
-        loop.close()
 
 
 async def _generate_daily_reports_async():
     """Async implementation of daily report generation."""
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         # Get users with recent analyses
         users = await db.fetch("""
             SELECT DISTINCT ga.user_id, u.email
@@ -318,7 +302,7 @@ async def _generate_user_report(user_id: UUID) -> Dict[str, Any]:
         "insights_summary": []
     }
     
-    async with get_db_connection() as db:
+    async with db_connection() as db:
         # Get recent analyses
         analyses = await db.fetch("""
             SELECT 
@@ -399,10 +383,7 @@ def export_analysis_data(
     Supports JSON, CSV, and PDF formats.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        result = run_async(
             _export_analysis_data_async(user_id, format, date_range)
         )
         
@@ -411,8 +392,6 @@ def export_analysis_data(
     except Exception as e:
         logger.error(f"Data export failed: {e}", exc_info=True)
         raise
-    finally:
-        loop.close()
 
 
 async def _export_analysis_data_async(
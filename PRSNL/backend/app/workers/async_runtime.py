@@ -0,0 +1,132 @@
+"""
+Worker Async Runtime
+
+One long-lived asyncio event loop per Celery worker process.
+
+- Started from worker_process_init (or lazily on first use, e.g. solo pool or
+  eager mode) and stopped from worker_process_shutdown
+- The loop runs in a daemon thread and owns the process's asyncpg pool and
+  Redis cache connection, so tasks reuse them instead of creating and tearing
+  them down on every run; HTTP goes through http_client_factory, which keeps
+  this loop's pooled clients until the runtime stops
+- Synchronous task bodies submit coroutines with run_async()
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Optional
+
+from app.config import settings
+from app.db import database
+from app.services.cache import cache_service
+from app.services.http_client_factory import http_client_factory
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRuntime:
+    """Background event loop with shared connections for one worker process"""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self.loop is not None
+
+    def start(self):
+        """Start the loop thread and open shared connections (idempotent)."""
+        with self._lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=self._run_loop, args=(loop,), name="worker-async-runtime", daemon=True
+            )
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._startup(), loop).result()
+            except BaseException:
+                # Leave nothing behind, so a later start() begins from scratch
+                self._stop_loop(loop, thread)
+                raise
+            self.loop, self._thread = loop, thread
+        logger.info("Worker async runtime started")
+
+    def stop(self, timeout: float = 10.0):
+        """Close shared connections and stop the loop thread."""
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            if loop is None:
+                return
+            self.loop = self._thread = None
+        self._stop_loop(loop, thread, timeout)
+        logger.info("Worker async runtime stopped")
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime loop and block until it finishes."""
+        if self.loop is None:
+            self.start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run_async() called from the runtime loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+        except BaseException:
+            # e.g. Celery's SoftTimeLimitExceeded raised while waiting
+            future.cancel()
+            raise
+
+    def _stop_loop(self, loop: asyncio.AbstractEventLoop, thread: threading.Thread, timeout: float = 10.0):
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Worker async runtime shutdown incomplete: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    async def _startup(self):
+        try:
+            await database.create_db_pool(
+                min_size=settings.WORKER_DB_POOL_MIN_SIZE,
+                max_size=settings.WORKER_DB_POOL_MAX_SIZE
+            )
+        except Exception as e:
+            logger.error(f"Worker database pool unavailable: {e}")
+        await cache_service.connect()
+
+    async def _shutdown(self):
+        await http_client_factory.close_loop_clients()
+        await cache_service.disconnect()
+        await database.close_db_pool()
+
+
+# Singleton instance (one per worker process)
+worker_runtime = WorkerRuntime()
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on this worker's shared event loop from synchronous task code."""
+    return worker_runtime.run(coro, timeout)
+
+
+@asynccontextmanager
+async def db_connection():
+    """Acquire a connection from the worker's shared pool."""
+    pool = await database.get_db_pool()
+    async with pool.acquire() as conn:
+        yield conn
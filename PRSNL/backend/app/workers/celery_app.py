@@ -10,7 +10,10 @@ import logging
 from typing import Dict, Any
 
 from celery import Celery, Task
-from celery.signals import worker_ready, task_prerun, task_postrun, task_failure
+from celery.signals import (
+    worker_ready, worker_process_init, worker_process_shutdown,
+    task_prerun, task_postrun, task_failure
+)
 from kombu import Exchange, Queue
 
 from app.config import settings
@@ -198,6 +201,20 @@ def worker_ready_handler(sender=None, **kwargs):
     logger.info(f"Celery worker ready: {sender}")
 
 
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """Start the process-wide async runtime (event loop, DB pool, cache, HTTP client)."""
+    from app.workers.async_runtime import worker_runtime
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+def worker_process_shutdown_handler(**kwargs):
+    """Close the process-wide async runtime."""
+    from app.workers.async_runtime import worker_runtime
+    worker_runtime.stop()
+
+
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kw):
     """Handle task pre-run event."""
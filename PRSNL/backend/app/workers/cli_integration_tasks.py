@@ -5,7 +5,6 @@ Background tasks for running CLI tools (GitPython, Semgrep, Comby, Watchdog)
 and processing their results through the enhanced CodeMirror pipeline.
 """
 
-import asyncio
 import logging
 import json
 import traceback
@@ -16,8 +15,8 @@ from uuid import UUID, uuid4
 from celery import group, chain, chord
 from celery.result import AsyncResult
 from app.core.langfuse_wrapper import observe  # Safe wrapper to handle get_tracer error
+from app.workers.async_runtime import db_connection, run_async
 from app.workers.celery_app import celery_app
-from app.db.database import get_db_connection
 from app.services.codemirror_service import codemirror_service
 from app.services.git_analysis_service import git_analysis_service
 from app.services.security_scan_service import security_scan_service
@@ -45,7 +44,7 @@ def run_comprehensive_cli_analysis(
         logger.info(f"Starting comprehensive CLI analysis for repo: {repo_path}")
         
         # Send initial progress
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "starting_cli_analysis",
@@ -56,7 +55,7 @@ def run_comprehensive_cli_analysis(
         
         # Record analysis request
         request_id = str(uuid4())
-        asyncio.run(_record_analysis_request(
+        run_async(_record_analysis_request(
             request_id, repo_path, analysis_id, analysis_config or {}
         ))
         
@@ -80,7 +79,7 @@ def run_comprehensive_cli_analysis(
         final_result = result.get(timeout=600)  # 10 minute timeout
         
         # Send completion progress
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "cli_analysis_complete",
@@ -98,7 +97,7 @@ def run_comprehensive_cli_analysis(
         logger.error(f"{error_msg}\n{traceback.format_exc()}")
         
         # Send error progress
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "cli_analysis_error", 
@@ -109,7 +108,7 @@ def run_comprehensive_cli_analysis(
         ))
         
         # Record error
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id if 'request_id' in locals() else str(uuid4()),
             "comprehensive",
             "error",
@@ -136,7 +135,7 @@ def run_git_analysis(
         logger.info(f"Starting Git analysis for repo: {repo_path}")
         
         # Send progress update
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "running_git_analysis",
@@ -151,7 +150,7 @@ def run_git_analysis(
         max_commits = config.get('max_commits')
         
         # Run git analysis
-        git_result = asyncio.run(
+        git_result = run_async(
             git_analysis_service.analyze_repository(
                 repo_path, 
                 analysis_depth=analysis_depth,
@@ -199,7 +198,7 @@ def run_git_analysis(
         
         # Record successful execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "git",
             "success",
@@ -216,7 +215,7 @@ def run_git_analysis(
         
         # Record failed execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "git",
             "error",
@@ -244,7 +243,7 @@ def run_security_scan(
         logger.info(f"Starting security scan for repo: {repo_path}")
         
         # Send progress update
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "running_security_scan",
@@ -254,7 +253,7 @@ def run_security_scan(
         ))
         
         # Run security scan
-        security_result = asyncio.run(
+        security_result = run_async(
             security_scan_service.scan_repository(repo_path)
         )
         
@@ -294,7 +293,7 @@ def run_security_scan(
         
         # Record successful execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "semgrep",
             "success",
@@ -315,7 +314,7 @@ def run_security_scan(
         
         # Record failed execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "semgrep",
             "error",
@@ -345,7 +344,7 @@ def run_code_search_analysis(
         logger.info(f"Starting code search analysis for repo: {repo_path}")
         
         # Send progress update
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "running_code_search",
@@ -355,7 +354,7 @@ def run_code_search_analysis(
         ))
         
         # Run code search analysis
-        search_result = asyncio.run(
+        search_result = run_async(
             code_search_service.search_repository(repo_path)
         )
         
@@ -437,7 +436,7 @@ def run_code_search_analysis(
         
         # Record successful execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "comby",
             "success",
@@ -458,7 +457,7 @@ def run_code_search_analysis(
         
         # Record failed execution
         execution_time = (datetime.utcnow() - execution_start).total_seconds()
-        asyncio.run(_record_cli_execution(
+        run_async(_record_cli_execution(
             request_id,
             "comby",
             "error",
@@ -486,7 +485,7 @@ def integrate_cli_results(
         logger.info(f"Integrating CLI results for analysis: {analysis_id}")
         
         # Send progress update
-        asyncio.run(realtime_service.send_progress_update(
+        run_async(realtime_service.send_progress_update(
             f"analysis_{analysis_id}",
             {
                 "status": "integrating_results",
@@ -506,14 +505,14 @@ def integrate_cli_results(
                 integrated_results.update(result_set)
         
         # Process through CodeMirror service
-        asyncio.run(
+        run_async(
             codemirror_service.process_cli_results(
                 analysis_id, user_id, integrated_results
             )
         )
         
         # Update analysis request status
-        asyncio.run(_update_analysis_request_status(
+        run_async(_update_analysis_request_status(
             request_id, "completed", analysis_id
         ))
         
@@ -561,7 +560,7 @@ def integrate_cli_results(
         logger.error(f"{error_msg}\n{traceback.format_exc()}")
         
         # Update analysis request status
-        asyncio.run(_update_analysis_request_status(
+        run_async(_update_analysis_request_status(
             request_id, "failed", error_message=str(e)
         ))
         
@@ -627,7 +626,7 @@ def process_file_watch_events(
             merged_results["file_events"] = trigger_events
             
             # Process through CodeMirror service
-            asyncio.run(
+            run_async(
                 codemirror_service.process_cli_results(
                     analysis_id, "file_watch", merged_results
                 )
@@ -665,7 +664,7 @@ async def _record_analysis_request(
     """Record analysis request in database"""
     
     try:
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             await db.execute("""
                 INSERT INTO codemirror_analysis_requests (
                     request_id, repository_path, analysis_types,
@@ -695,7 +694,7 @@ async def _update_analysis_request_status(
     """Update analysis request status"""
     
     try:
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             if status == "completed":
                 await db.execute("""
                     UPDATE codemirror_analysis_requests 
@@ -729,7 +728,7 @@ async def _record_cli_execution(
     """Record CLI tool execution details"""
     
     try:
-        async with get_db_connection() as db:
+        async with db_connection() as db:
             # Get analysis request ID
             analysis_request_id = await db.fetchval("""
                 SELECT id FROM codemirror_analysis_requests WHERE request_id = $1
@@ -803,7 +802,7 @@ def start_file_watching(
             process_file_watch_events.apply_async(args=[request_dict])
         
         # Start watching
-        success = asyncio.run(
+        success = run_async(
             file_watch_service.start_watching(config, analysis_callback)
         )
         
@@ -0,0 +1,112 @@
+-- Pre-aggregated Tag Names and Keyset Pagination Indexes for Search
+-- Migration 025: Denormalize item tags into items.tag_names
+-- Date: 2025-08-02
+--
+-- SearchEngine previously joined item_tags/tags and grouped by every item column
+-- to build each result's tag list. items.tag_names keeps the same list on the row
+-- (maintained by triggers) so search can read it directly and filter with a GIN
+-- index. Composite indexes back cursor pagination on (created_at, id).
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+-- =============================================
+-- Denormalized tag array
+-- =============================================
+
+ALTER TABLE items ADD COLUMN IF NOT EXISTS tag_names TEXT[] NOT NULL DEFAULT '{}';
+
+-- Backfill from the junction table
+UPDATE items i
+SET tag_names = agg.names
+FROM (
+    SELECT it.item_id, array_agg(t.name ORDER BY t.name) AS names
+    FROM item_tags it
+    JOIN tags t ON it.tag_id = t.id
+    GROUP BY it.item_id
+) agg
+WHERE agg.item_id = i.id;
+
+CREATE INDEX IF NOT EXISTS idx_items_tag_names ON items USING GIN(tag_names);
+
+-- Recompute one item's tag array
+CREATE OR REPLACE FUNCTION refresh_item_tag_names(target_item_id UUID)
+RETURNS void AS $$
+BEGIN
+    UPDATE items
+    SET tag_names = COALESCE((
+        SELECT array_agg(t.name ORDER BY t.name)
+        FROM item_tags it
+        JOIN tags t ON it.tag_id = t.id
+        WHERE it.item_id = target_item_id
+    ), '{}')
+    WHERE id = target_item_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep tag_names current when tags are attached or detached
+CREATE OR REPLACE FUNCTION sync_item_tag_names()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_item_tag_names(NEW.item_id);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        IF TG_OP = 'DELETE' OR OLD.item_id IS DISTINCT FROM NEW.item_id THEN
+            PERFORM refresh_item_tag_names(OLD.item_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS item_tags_sync_tag_names ON item_tags;
+CREATE TRIGGER item_tags_sync_tag_names
+    AFTER INSERT OR UPDATE OR DELETE ON item_tags
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_item_tag_names();
+
+-- Keep tag_names current when a tag is renamed
+CREATE OR REPLACE FUNCTION sync_renamed_tag_names()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE items
+    SET tag_names = (
+        SELECT array_agg(n ORDER BY n)
+        FROM unnest(array_replace(tag_names, OLD.name, NEW.name)) AS n
+    )
+    WHERE tag_names @> ARRAY[OLD.name];
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tags_sync_renamed_tag_names ON tags;
+CREATE TRIGGER tags_sync_renamed_tag_names
+    AFTER UPDATE OF name ON tags
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION sync_renamed_tag_names();
+
+-- =============================================
+-- Keyset pagination indexes
+-- =============================================
+
+CREATE INDEX IF NOT EXISTS idx_items_created_id ON items(created_at DESC, id DESC);
+
+-- =============================================
+-- Comments
+-- =============================================
+
+COMMENT ON COLUMN items.tag_names IS 'Denormalized, trigger-maintained tag names from item_tags/tags';
+COMMENT ON INDEX idx_items_created_id IS 'Supports cursor pagination on (created_at, id)';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('025', 'Add items.tag_names and keyset pagination indexes', NOW())
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,53 @@
+-- Resumable Embedding Backfill Checkpoints
+-- Migration 026: Progress table for EmbeddingBackfill jobs
+-- Date: 2025-08-03
+--
+-- Bulk embedding jobs (legacy migration, model re-embedding) walk items in id
+-- order and record the last fully written id here after every window, so a
+-- crashed or cancelled run resumes where it stopped instead of starting over.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+-- =============================================
+-- Checkpoint table
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS embedding_backfill_jobs (
+    job_name VARCHAR(200) PRIMARY KEY,
+    model_name VARCHAR(100) NOT NULL,
+    model_version VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (
+        status IN ('running', 'completed', 'failed')
+    ),
+    last_item_id UUID,
+    processed INTEGER NOT NULL DEFAULT 0,
+    written INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    items_per_second FLOAT,
+    error TEXT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_backfill_jobs_status ON embedding_backfill_jobs(status);
+
+-- =============================================
+-- Comments
+-- =============================================
+
+COMMENT ON TABLE embedding_backfill_jobs IS 'Progress checkpoints for resumable bulk embedding jobs';
+COMMENT ON COLUMN embedding_backfill_jobs.last_item_id IS 'Highest item id whose window has been fully written';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('026', 'Add embedding backfill checkpoints', NOW())
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,54 @@
+-- MinHash Near-Duplicate Index
+-- Migration 027: Per-item MinHash signatures and LSH band buckets
+-- Date: 2025-08-04
+--
+-- DuplicateDetectionService checks captures against these tables before
+-- falling back to embeddings: a lookup on (band, bucket) returns items whose
+-- shingle sets are likely similar, and their stored signatures give the
+-- estimated Jaccard similarity locally. Rows are maintained by
+-- NearDuplicateIndex (app/services/near_duplicate_index.py).
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+-- =============================================
+-- Signatures
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS item_minhash (
+    item_id UUID PRIMARY KEY REFERENCES items(id) ON DELETE CASCADE,
+    signature BYTEA, -- NULL when the item has no text to shingle
+    item_updated_at TIMESTAMPTZ NOT NULL
+);
+
+-- =============================================
+-- LSH band buckets
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS item_minhash_bands (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    item_id UUID NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, item_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_item_minhash_bands_item ON item_minhash_bands(item_id);
+
+-- =============================================
+-- Comments
+-- =============================================
+
+COMMENT ON TABLE item_minhash IS 'MinHash signature of each item''s title and content';
+COMMENT ON COLUMN item_minhash.item_updated_at IS 'items.updated_at the signature was computed from';
+COMMENT ON TABLE item_minhash_bands IS 'LSH band buckets for near-duplicate candidate lookup';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('027', 'Add MinHash near-duplicate index', NOW())
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,196 @@
+-- Incrementally Maintained Analytics Rollups
+-- Migration 028: Rollup tables for insights and library statistics
+-- Date: 2025-08-02
+--
+-- Dashboard endpoints (/insights/timeline-trends, /insights/top-tags,
+-- /library/stats/*) and app/db/queries/analytics.py aggregated raw items and
+-- item_tags on every request. Two rollup tables hold the same counts at
+-- (day, hour) and (day, tag) grain and are kept current by a row trigger on
+-- items: every insert, delete or change to a counted column subtracts the old
+-- row's contribution and adds the new one. Tags are read from items.tag_names
+-- (migration 025), whose own trigger updates items when tags change, so tag
+-- edits flow through the same path.
+--
+-- NULL user_id/category/status are stored as sentinels so the grouping columns
+-- can form a primary key (and an ON CONFLICT target).
+--
+-- Requires items.user_id from add_user_isolation.sql.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+-- =============================================
+-- Rollup tables
+-- =============================================
+
+-- Items per UTC day/hour, user, type, category and status
+CREATE TABLE IF NOT EXISTS analytics_item_rollup (
+    day DATE NOT NULL,
+    hour SMALLINT NOT NULL,
+    user_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    type TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    item_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour, user_id, type, category, status)
+);
+
+-- Tag usage per UTC day, user, type, category and status
+CREATE TABLE IF NOT EXISTS analytics_tag_rollup (
+    day DATE NOT NULL,
+    user_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    tag TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    item_count INTEGER NOT NULL DEFAULT 0,
+    last_seen TIMESTAMPTZ,
+    PRIMARY KEY (day, user_id, tag, type, category, status)
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_item_rollup_type ON analytics_item_rollup(type, day);
+CREATE INDEX IF NOT EXISTS idx_analytics_tag_rollup_tag ON analytics_tag_rollup(tag, day);
+
+-- =============================================
+-- Incremental maintenance
+-- =============================================
+
+-- Add (delta = 1) or remove (delta = -1) one item's contribution
+CREATE OR REPLACE FUNCTION apply_item_to_analytics_rollups(item items, delta INTEGER)
+RETURNS void AS $$
+DECLARE
+    item_day DATE := (item.created_at AT TIME ZONE 'UTC')::date;
+    item_hour SMALLINT := EXTRACT(HOUR FROM item.created_at AT TIME ZONE 'UTC')::smallint;
+    item_user UUID := COALESCE(item.user_id, '00000000-0000-0000-0000-000000000000');
+    item_category TEXT := COALESCE(item.category, '');
+    item_status TEXT := COALESCE(item.status, '');
+BEGIN
+    IF item.created_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO analytics_item_rollup AS r (day, hour, user_id, type, category, status, item_count)
+    VALUES (item_day, item_hour, item_user, item.type, item_category, item_status, delta)
+    ON CONFLICT (day, hour, user_id, type, category, status)
+    DO UPDATE SET item_count = r.item_count + EXCLUDED.item_count;
+
+    IF COALESCE(array_length(item.tag_names, 1), 0) > 0 THEN
+        INSERT INTO analytics_tag_rollup AS r (day, user_id, tag, type, category, status, item_count, last_seen)
+        SELECT DISTINCT item_day, item_user, tag, item.type, item_category, item_status, delta,
+               CASE WHEN delta > 0 THEN item.created_at END
+        FROM unnest(item.tag_names) AS tag
+        ON CONFLICT (day, user_id, tag, type, category, status)
+        DO UPDATE SET
+            item_count = r.item_count + EXCLUDED.item_count,
+            last_seen = GREATEST(r.last_seen, EXCLUDED.last_seen);
+    END IF;
+
+    IF delta < 0 THEN
+        DELETE FROM analytics_item_rollup
+        WHERE day = item_day AND hour = item_hour AND user_id = item_user
+          AND type = item.type AND category = item_category AND status = item_status
+          AND item_count <= 0;
+        DELETE FROM analytics_tag_rollup
+        WHERE day = item_day AND user_id = item_user AND tag = ANY(item.tag_names)
+          AND type = item.type AND category = item_category AND status = item_status
+          AND item_count <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_analytics_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM apply_item_to_analytics_rollups(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_item_to_analytics_rollups(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS items_sync_analytics_rollups ON items;
+CREATE TRIGGER items_sync_analytics_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF created_at, user_id, type, category, status, tag_names ON items
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_analytics_rollups();
+
+-- TRUNCATE skips row triggers, so clear the rollups with it
+CREATE OR REPLACE FUNCTION truncate_analytics_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    TRUNCATE analytics_item_rollup, analytics_tag_rollup;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS items_truncate_analytics_rollups ON items;
+CREATE TRIGGER items_truncate_analytics_rollups
+    AFTER TRUNCATE ON items
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION truncate_analytics_rollups();
+
+-- =============================================
+-- Full rebuild (backfill and repair)
+-- =============================================
+
+CREATE OR REPLACE FUNCTION refresh_analytics_rollups()
+RETURNS void AS $$
+BEGIN
+    -- Serialize against the row trigger while rebuilding
+    LOCK TABLE analytics_item_rollup, analytics_tag_rollup IN EXCLUSIVE MODE;
+    DELETE FROM analytics_item_rollup;
+    DELETE FROM analytics_tag_rollup;
+
+    INSERT INTO analytics_item_rollup (day, hour, user_id, type, category, status, item_count)
+    SELECT
+        (created_at AT TIME ZONE 'UTC')::date,
+        EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC')::smallint,
+        COALESCE(user_id, '00000000-0000-0000-0000-000000000000'),
+        type,
+        COALESCE(category, ''),
+        COALESCE(status, ''),
+        COUNT(*)
+    FROM items
+    WHERE created_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6;
+
+    INSERT INTO analytics_tag_rollup (day, user_id, tag, type, category, status, item_count, last_seen)
+    SELECT
+        (i.created_at AT TIME ZONE 'UTC')::date,
+        COALESCE(i.user_id, '00000000-0000-0000-0000-000000000000'),
+        tag,
+        i.type,
+        COALESCE(i.category, ''),
+        COALESCE(i.status, ''),
+        COUNT(DISTINCT i.id),
+        MAX(i.created_at)
+    FROM items i
+    CROSS JOIN LATERAL unnest(i.tag_names) AS tag
+    WHERE i.created_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_analytics_rollups();
+
+-- =============================================
+-- Comments
+-- =============================================
+
+COMMENT ON TABLE analytics_item_rollup IS 'Trigger-maintained item counts per UTC day/hour, user, type, category and status';
+COMMENT ON TABLE analytics_tag_rollup IS 'Trigger-maintained tag usage per UTC day, user, type, category and status';
+COMMENT ON FUNCTION refresh_analytics_rollups() IS 'Rebuilds analytics rollups from items (backfill or repair)';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('028', 'Add trigger-maintained analytics rollup tables', NOW())
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,28 @@
+-- Incremental Conversation Intelligence
+-- Migration 029: Stored structured extraction and processed-message watermark
+-- Date: 2025-08-05
+--
+-- ConversationIntelligenceAgent extracts every facet of a conversation with one
+-- structured LLM call (app/services/conversation_extraction.py). The full
+-- extraction is kept with the sequence number of the last message it covers,
+-- so re-processing a conversation that has grown only sends the new messages.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+ALTER TABLE ai_conversation_imports ADD COLUMN IF NOT EXISTS intelligence_extraction JSONB;
+ALTER TABLE ai_conversation_imports ADD COLUMN IF NOT EXISTS intelligence_processed_sequence INTEGER;
+
+COMMENT ON COLUMN ai_conversation_imports.intelligence_extraction IS 'Structured extraction covering all intelligence facets (ConversationExtraction)';
+COMMENT ON COLUMN ai_conversation_imports.intelligence_processed_sequence IS 'Highest message sequence_number included in intelligence_extraction';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('029', 'Add incremental conversation intelligence state', NOW())
+ON CONFLICT (version) DO NOTHING;
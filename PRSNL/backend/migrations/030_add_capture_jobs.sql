@@ -0,0 +1,70 @@
+-- Durable Capture Job Queue
+-- Migration 030: capture_jobs table for accept-then-process capture ingestion
+-- Date: 2025-08-06
+--
+-- POST /capture writes the item row and its first pipeline job in one
+-- transaction and returns. CapturePipeline (app/services/capture_pipeline.py)
+-- claims due jobs with FOR UPDATE SKIP LOCKED, runs one stage per job and
+-- enqueues the next stage on success. Failed jobs are retried with backoff via
+-- run_after; jobs left 'running' by a dead worker are re-queued once their
+-- lease expires. Inserts NOTIFY capture_jobs so idle workers wake immediately.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+-- =============================================
+-- Jobs
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS capture_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    item_id UUID NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Claim path: due jobs per stage, oldest first
+CREATE INDEX IF NOT EXISTS idx_capture_jobs_due
+    ON capture_jobs(stage, run_after, id) WHERE status = 'queued';
+
+-- Lease expiry scan
+CREATE INDEX IF NOT EXISTS idx_capture_jobs_running
+    ON capture_jobs(locked_at) WHERE status = 'running';
+
+CREATE INDEX IF NOT EXISTS idx_capture_jobs_item ON capture_jobs(item_id);
+
+-- =============================================
+-- Wake-up notifications
+-- =============================================
+
+CREATE OR REPLACE FUNCTION notify_capture_job() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('capture_jobs', NEW.stage);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS capture_jobs_notify ON capture_jobs;
+CREATE TRIGGER capture_jobs_notify
+    AFTER INSERT ON capture_jobs
+    FOR EACH ROW EXECUTE FUNCTION notify_capture_job();
+
+COMMENT ON TABLE capture_jobs IS 'Durable capture pipeline queue; one row per item stage (CapturePipeline)';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('030', 'Add durable capture job queue', NOW())
+ON CONFLICT (version) DO NOTHING;
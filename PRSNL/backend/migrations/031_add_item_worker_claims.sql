@@ -0,0 +1,34 @@
+-- Item Worker Claims
+-- Migration 031: Lease columns for the item_created worker
+-- Date: 2025-08-07
+--
+-- ItemWorker (app/worker.py) claims pending items with a short
+-- FOR UPDATE SKIP LOCKED transaction that stamps worker_claimed_at, then
+-- processes them outside the transaction. Several workers (or a restarted one
+-- sweeping for missed notifications) therefore never process an item twice,
+-- and a claim left by a crashed worker expires after ITEM_WORKER_LEASE_SECONDS.
+-- worker_attempts stops items that never leave 'pending' from looping forever.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+ALTER TABLE items ADD COLUMN IF NOT EXISTS worker_claimed_at TIMESTAMPTZ;
+ALTER TABLE items ADD COLUMN IF NOT EXISTS worker_attempts SMALLINT NOT NULL DEFAULT 0;
+
+-- Catch-up sweep: oldest pending items first
+CREATE INDEX IF NOT EXISTS idx_items_pending_created
+    ON items(created_at, id) WHERE status = 'pending';
+
+COMMENT ON COLUMN items.worker_claimed_at IS 'When an item worker last claimed this pending item (lease start)';
+COMMENT ON COLUMN items.worker_attempts IS 'Number of item worker claims for this item';
+
+-- =============================================
+-- Migration Completion
+-- =============================================
+
+INSERT INTO schema_migrations (version, description, applied_at)
+VALUES ('031', 'Add item worker claim lease columns', NOW())
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai_router_stats import CircuitBreaker, ProviderScoreboard, ProviderStats
+from app.services.ai_router_types import AIProvider, ProviderConfig, TaskType
+
+
+def make_providers():
+    return {
+        AIProvider.AZURE_OPENAI: ProviderConfig(
+            name=AIProvider.AZURE_OPENAI, max_tokens_per_request=4096,
+            supports_streaming=True, supports_vision=True, supports_embeddings=True,
+            avg_response_time_ms=500, cost_per_1k_tokens=0.03
+        ),
+        AIProvider.FALLBACK: ProviderConfig(
+            name=AIProvider.FALLBACK, max_tokens_per_request=1000,
+            supports_streaming=False, supports_vision=False, supports_embeddings=False,
+            avg_response_time_ms=10
+        ),
+    }
+
+
+def test_stats_track_ewma_and_window_percentiles():
+    stats = ProviderStats(latency_ms=100.0, error_rate=0.0)
+    for latency in range(1, 101):
+        stats.record(True, float(latency), tokens=0, alpha=0.5, window_size=50)
+    # Only the last 50 samples (51..100) remain in the window
+    assert stats.p50_ms == 76.0
+    assert stats.p95_ms == 98.0
+    assert 98 < stats.latency_ms < 100
+
+    stats.record(False, None, tokens=0, alpha=0.5, window_size=50)
+    assert stats.error_rate == 0.5
+    assert len(stats.sorted_window) == 50
+
+
+def test_breaker_opens_then_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+    breaker.record(False, now=0)
+    assert breaker.allow(now=0)
+    breaker.record(False, now=1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow(now=5)
+    assert breaker.available(now=11)
+
+    assert breaker.allow(now=11)
+    assert not breaker.allow(now=11)  # probe already in flight
+    breaker.record(False, now=12)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow(now=23)
+    breaker.record(True, now=23)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_half_open_probe_is_released():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record(False, now=0)
+    assert breaker.allow(now=10)
+
+    # The probe's request was cancelled (lost a hedge, client went away)
+    breaker.release_probe()
+    assert breaker.available(now=10)
+    assert breaker.allow(now=10)
+
+
+@pytest.mark.asyncio
+async def test_router_releases_probe_when_attempt_is_cancelled():
+    ai_router = pytest.importorskip("app.services.ai_router")
+    scoreboard = ProviderScoreboard(make_providers(), failure_threshold=1, cooldown=10)
+    breaker = scoreboard.breakers[AIProvider.AZURE_OPENAI]
+    breaker.record(False)
+    breaker.opened_at -= 10
+    assert breaker.allow()
+
+    async def hang(provider, task):
+        await asyncio.sleep(60)
+
+    router = SimpleNamespace(scoreboard=scoreboard)
+    task = SimpleNamespace(type=TaskType.TEXT_GENERATION)
+    attempt = asyncio.ensure_future(ai_router.AIRouter._execute_once(router, task, AIProvider.AZURE_OPENAI, hang))
+    await asyncio.sleep(0)
+    attempt.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await attempt
+
+    assert breaker.available() and breaker.allow()
+
+
+def test_unreported_probe_expires_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record(False, now=0)
+    assert breaker.allow(now=10)
+    assert not breaker.available(now=15)
+    assert breaker.available(now=20)
+    assert breaker.allow(now=20)
+
+
+def test_primary_provider_preferred_until_it_degrades():
+    board = ProviderScoreboard(make_providers(), failure_threshold=3, cooldown=60)
+    candidates = [AIProvider.FALLBACK, AIProvider.AZURE_OPENAI]
+    assert board.rank(candidates, TaskType.TEXT_GENERATION)[0] == AIProvider.AZURE_OPENAI
+
+    for _ in range(3):
+        board.record(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION, success=False)
+    assert board.rank(candidates, TaskType.TEXT_GENERATION) == [AIProvider.FALLBACK]
+    # Stats are per task type, so other task types keep their own history
+    assert board.get(AIProvider.AZURE_OPENAI, TaskType.EMBEDDING).samples == 0
+
+
+def test_token_heavy_tasks_still_prefer_the_primary_provider():
+    board = ProviderScoreboard(make_providers())
+    candidates = [AIProvider.FALLBACK, AIProvider.AZURE_OPENAI]
+    for _ in range(10):
+        board.record(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION, True, latency_ms=500, tokens=8000)
+        board.record(AIProvider.FALLBACK, TaskType.TEXT_GENERATION, True, latency_ms=10, tokens=8000)
+
+    assert board.rank(candidates, TaskType.TEXT_GENERATION)[0] == AIProvider.AZURE_OPENAI
+
+
+def test_hedge_delay_needs_enough_samples():
+    board = ProviderScoreboard(make_providers(), min_samples=5)
+    for _ in range(4):
+        board.record(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION, True, latency_ms=200)
+    assert board.hedge_delay(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION) is None
+    board.record(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION, True, latency_ms=900)
+    assert board.hedge_delay(AIProvider.AZURE_OPENAI, TaskType.TEXT_GENERATION) == 0.9
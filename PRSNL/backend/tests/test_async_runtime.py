@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("celery")
+
+from app.workers import async_runtime  # noqa: E402
+from app.workers.async_runtime import WorkerRuntime  # noqa: E402
+
+
+class FakeConnections:
+    def __init__(self, fail_connect=False):
+        self.fail_connect = fail_connect
+        self.events = []
+
+    async def create_db_pool(self, **kwargs):
+        self.events.append("db_open")
+
+    async def close_db_pool(self):
+        self.events.append("db_close")
+
+    async def connect(self):
+        if self.fail_connect:
+            raise ConnectionError("redis unreachable")
+        self.events.append("cache_open")
+
+    async def disconnect(self):
+        self.events.append("cache_close")
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    fake = FakeConnections()
+    monkeypatch.setattr(async_runtime.database, "create_db_pool", fake.create_db_pool)
+    monkeypatch.setattr(async_runtime.database, "close_db_pool", fake.close_db_pool)
+    monkeypatch.setattr(async_runtime.cache_service, "connect", fake.connect)
+    monkeypatch.setattr(async_runtime.cache_service, "disconnect", fake.disconnect)
+    return fake
+
+
+def runtime_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "worker-async-runtime"]
+
+
+def test_start_run_stop(connections):
+    runtime = WorkerRuntime()
+    runtime.start()
+    runtime.start()
+    assert runtime.is_running and len(runtime_threads()) == 1
+
+    async def loop_thread():
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+
+    assert runtime.run(loop_thread()) == "worker-async-runtime"
+
+    runtime.stop()
+    assert not runtime.is_running and runtime_threads() == []
+    assert connections.events == ["db_open", "cache_open", "cache_close", "db_close"]
+
+
+def test_failed_startup_leaves_no_loop_behind(connections):
+    runtime = WorkerRuntime()
+    connections.fail_connect = True
+    with pytest.raises(ConnectionError):
+        runtime.start()
+    assert not runtime.is_running and runtime_threads() == []
+
+    connections.fail_connect = False
+    runtime.start()
+    try:
+        assert len(runtime_threads()) == 1
+    finally:
+        runtime.stop()
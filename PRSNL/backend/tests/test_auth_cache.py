@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+from app.middleware.auth_cache import ExpiringLRU, TokenCache, UserMappingCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_claims_are_cached_until_token_expiry():
+    clock = Clock()
+    cache = TokenCache(max_entries=10, max_ttl=300, negative_ttl=30, clock=clock, wall_clock=clock)
+
+    cache.store("token", {"user_id": "abc", "exp": clock.now + 60})
+    hit, claims = cache.lookup("token")
+    assert hit and claims["user_id"] == "abc"
+
+    claims["user_id"] = "mutated"
+    assert cache.lookup("token")[1]["user_id"] == "abc"
+
+    clock.now += 61
+    assert cache.lookup("token") == (False, None)
+
+
+def test_expired_and_rejected_tokens():
+    clock = Clock()
+    cache = TokenCache(max_entries=10, max_ttl=300, negative_ttl=30, clock=clock, wall_clock=clock)
+
+    cache.store("stale", {"user_id": "abc", "exp": clock.now - 1})
+    assert cache.lookup("stale") == (False, None)
+
+    cache.reject("forged")
+    assert cache.lookup("forged") == (True, None)
+    clock.now += 31
+    assert cache.lookup("forged") == (False, None)
+    assert cache.get_stats()["negative_hits"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    lru = ExpiringLRU(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")
+    lru.set("c", 3, ttl=60)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+
+
+def test_user_mapping_cache_is_keyed_by_source():
+    clock = Clock()
+    mappings = UserMappingCache(max_entries=10, ttl=600, clock=clock)
+    user_id = uuid4()
+
+    mappings.set("keycloak", "ext-1", user_id)
+    assert mappings.get("keycloak", "ext-1") == user_id
+    assert mappings.get("fusionauth", "ext-1") is None
+
+    clock.now += 601
+    assert mappings.get("keycloak", "ext-1") is None
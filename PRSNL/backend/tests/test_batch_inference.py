@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.batch_inference import MicroBatcher
+
+
+def make_batcher(batch_sizes, **kwargs):
+    loop_thread = threading.current_thread()
+
+    def preprocess(item):
+        assert threading.current_thread() is not loop_thread
+        if item == "bad":
+            raise ValueError("cannot decode")
+        return item * 2
+
+    def infer(batch):
+        assert threading.current_thread() is not loop_thread
+        batch_sizes.append(len(batch))
+        time.sleep(0.01)
+        return [value + 1 for value in batch]
+
+    return MicroBatcher("test", preprocess, infer, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_batches():
+    sizes = []
+    batcher = make_batcher(sizes, max_batch_size=8, max_wait_ms=20)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+    finally:
+        batcher.shutdown()
+
+    assert results == [i * 2 + 1 for i in range(20)]
+    assert sum(sizes) == 20
+    assert max(sizes) <= 8
+    assert len(sizes) <= 4
+
+
+@pytest.mark.asyncio
+async def test_failed_inputs_do_not_fail_the_batch():
+    sizes = []
+    batcher = make_batcher(sizes, max_batch_size=4, max_wait_ms=5)
+    try:
+        results = await batcher.submit_many([1, "bad", 3])
+    finally:
+        batcher.shutdown()
+
+    assert results == [3, None, 7]
+    assert sum(sizes) == 2
+
+
+@pytest.mark.asyncio
+async def test_inference_errors_reach_every_waiter():
+    def infer(batch):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher("broken", lambda item: item, infer, max_batch_size=4, max_wait_ms=5)
+    try:
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    finally:
+        batcher.shutdown()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.get_stats()["failed"] == 2
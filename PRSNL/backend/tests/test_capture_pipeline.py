@@ -0,0 +1,68 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services import capture_pipeline as pipeline_module
+from app.services.capture_pipeline import CapturePipeline, PermanentJobError, plan_stages, retry_delay
+
+
+def test_stage_plans():
+    assert plan_stages('video', 'https://www.instagram.com/reel/abc') == ['instagram']
+    assert plan_stages('video', 'https://vimeo.com/123') == ['video']
+    assert plan_stages('repository', 'https://github.com/a/b') == ['repository', 'preview', 'content', 'enrich']
+    assert plan_stages('article', 'https://example.com/post', 'development') == ['preview', 'content', 'enrich']
+    assert plan_stages('note', None) == ['content', 'enrich']
+
+
+def test_retry_backoff_doubles():
+    assert [retry_delay(attempt, 10) for attempt in (1, 2, 3)] == [10, 20, 40]
+
+
+@pytest.mark.asyncio
+async def test_job_outcomes(monkeypatch):
+    pipeline = CapturePipeline()
+    pipeline._wake = asyncio.Event()
+    pipeline.max_attempts = 3
+    outcomes = []
+
+    async def load_item(item_id):
+        return {"id": item_id, "url": "https://example.com"}
+
+    async def complete(job):
+        outcomes.append(("done", job["id"]))
+
+    async def retry(job, error):
+        outcomes.append(("retry", job["id"]))
+
+    async def fail(job, error):
+        outcomes.append(("failed", job["id"]))
+
+    monkeypatch.setattr(pipeline_module, "_load_item", load_item)
+    monkeypatch.setattr(pipeline, "_complete", complete)
+    monkeypatch.setattr(pipeline, "_retry", retry)
+    monkeypatch.setattr(pipeline, "_fail", fail)
+
+    async def ok(item):
+        pass
+
+    async def flaky(item):
+        raise RuntimeError("timeout")
+
+    async def invalid(item):
+        raise PermanentJobError("unsupported")
+
+    pipeline.register("ok", ok, 1)
+    pipeline.register("flaky", flaky, 1)
+    pipeline.register("invalid", invalid, 1)
+
+    def job(job_id, stage, attempts=1):
+        return {"id": job_id, "item_id": uuid4(), "stage": stage, "payload": {}, "attempts": attempts}
+
+    for job_id, stage, attempts in [(1, "ok", 1), (2, "flaky", 1), (3, "flaky", 3), (4, "invalid", 1)]:
+        stage_state = pipeline.stages[stage]
+        stage_state.running += 1
+        await pipeline._run(stage_state, job(job_id, stage, attempts))
+
+    assert outcomes == [("done", 1), ("retry", 2), ("failed", 3), ("failed", 4)]
+    assert all(stage.running == 0 for stage in pipeline.stages.values())
@@ -0,0 +1,159 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from app.services import chunked_transcription as chunking
+from app.services.chunked_transcription import (
+    SAMPLE_RATE, ChunkedTranscriber, find_split_points, place_segments, plan_chunks
+)
+
+
+def speech_with_pauses(seconds, pause_at):
+    """Loud noise with 0.5s of silence starting at each `pause_at` second."""
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(seconds * SAMPLE_RATE) * 8000).astype(np.int16)
+    for at in pause_at:
+        samples[int(at * SAMPLE_RATE):int((at + 0.5) * SAMPLE_RATE)] = 0
+    return samples
+
+
+def test_splits_land_in_pauses_near_targets():
+    samples = speech_with_pauses(250, pause_at=[58, 122, 181])
+    splits = find_split_points(samples, chunk_seconds=60, search_seconds=5)
+
+    assert len(splits) == 3
+    for split, pause in zip(splits, [58, 122, 181]):
+        assert pause <= split / SAMPLE_RATE <= pause + 0.5
+
+
+def test_short_audio_is_not_split():
+    assert find_split_points(np.zeros(80 * SAMPLE_RATE, dtype=np.int16), 60, 5) == []
+
+
+def test_overlap_segments_are_kept_once():
+    chunks = plan_chunks(120 * SAMPLE_RATE, [60 * SAMPLE_RATE], overlap_samples=SAMPLE_RATE)
+    assert chunks[0] == (0, 61 * SAMPLE_RATE, 0, 60 * SAMPLE_RATE)
+    assert chunks[1] == (59 * SAMPLE_RATE, 120 * SAMPLE_RATE, 60 * SAMPLE_RATE, 120 * SAMPLE_RATE)
+
+    # The same words near the cut are heard by both chunks
+    read_start, _, keep_start, keep_end = chunks[0]
+    first = place_segments(
+        [{"start": 58.0, "end": 60.6, "text": "across the cut"}], read_start, keep_start, keep_end
+    )
+    read_start, _, keep_start, keep_end = chunks[1]
+    second = place_segments(
+        [{"start": 0.0, "end": 1.6, "text": "across the cut", "words": [{"word": "cut", "start": 1.2, "end": 1.6}]},
+         {"start": 2.0, "end": 4.0, "text": "after"}],
+        read_start, keep_start, keep_end
+    )
+    assert [s["text"] for s in first] == ["across the cut"]
+    assert [s["text"] for s in second] == ["after"]
+    assert second[0]["start"] == 61.0
+
+
+@pytest.mark.asyncio
+async def test_segments_are_stitched_and_streamed_in_order(monkeypatch):
+    samples = speech_with_pauses(200, pause_at=[58, 122, 181])
+
+    async def fake_load(self, path):
+        return samples
+
+    def fake_chunk(model_name, pcm, params, word_timestamps):
+        seconds = len(pcm) / SAMPLE_RATE
+        return [{"start": 0.0, "end": seconds / 2, "text": "a"}, {"start": seconds / 2, "end": seconds, "text": "b"}]
+
+    monkeypatch.setattr(ChunkedTranscriber, "load_audio", fake_load)
+    monkeypatch.setattr(chunking, "_transcribe_chunk", fake_chunk)
+
+    transcriber = ChunkedTranscriber(workers=2, chunk_seconds=60, overlap_seconds=1, search_seconds=5)
+    transcriber._pool = ThreadPoolExecutor(2)
+    streamed = []
+
+    async def listener(segments, progress):
+        streamed.append((len(segments), progress))
+
+    try:
+        segments, duration = await transcriber.transcribe("file.mp3", "base", {}, on_segments=listener)
+    finally:
+        transcriber.shutdown()
+
+    assert duration == 200
+    assert [s["start"] for s in segments] == sorted(s["start"] for s in segments)
+    assert len(streamed) == 3  # a 78s tail stays one chunk
+    assert [p for _, p in streamed] == sorted(p for _, p in streamed)
+    assert streamed[-1][1] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_empty_audio_returns_no_segments(monkeypatch):
+    async def fake_load(self, path):
+        return np.zeros(0, dtype=np.int16)
+
+    monkeypatch.setattr(ChunkedTranscriber, "load_audio", fake_load)
+    transcriber = ChunkedTranscriber(workers=1)
+
+    assert await transcriber.transcribe("empty.mp3", "base", {}, on_segments=lambda *args: None) == ([], 0.0)
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced_and_unfinished_chunks_retried(monkeypatch):
+    samples = speech_with_pauses(130, pause_at=[58])
+    calls = []
+
+    async def fake_load(self, path):
+        return samples
+
+    def fake_chunk(model_name, pcm, params, word_timestamps):
+        calls.append(len(pcm))
+        if len(calls) == 2:
+            raise BrokenProcessPool("worker died")
+        return [{"start": 0.0, "end": len(pcm) / SAMPLE_RATE, "text": "x"}]
+
+    pools = []
+
+    def fake_get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(1)
+            pools.append(self._pool)
+        return self._pool
+
+    monkeypatch.setattr(ChunkedTranscriber, "load_audio", fake_load)
+    monkeypatch.setattr(ChunkedTranscriber, "_get_pool", fake_get_pool)
+    monkeypatch.setattr(chunking, "_transcribe_chunk", fake_chunk)
+
+    transcriber = ChunkedTranscriber(workers=1, chunk_seconds=60, overlap_seconds=0, search_seconds=5)
+    streamed = []
+    try:
+        segments, _ = await transcriber.transcribe(
+            "file.mp3", "base", {}, on_segments=lambda segments, progress: streamed.append(progress)
+        )
+    finally:
+        transcriber.shutdown()
+
+    assert len(pools) == 2
+    assert len(calls) == 3 and len(segments) == 2
+    assert streamed == sorted(streamed) and streamed[-1] == 1.0 and len(streamed) == 2
+
+
+@pytest.mark.asyncio
+async def test_progress_listener_publishes_partial_transcripts(monkeypatch):
+    from app.services import hybrid_transcription
+
+    sent = []
+
+    async def fake_send_task_progress(**kwargs):
+        sent.append(kwargs)
+
+    monkeypatch.setattr(hybrid_transcription, "send_task_progress", fake_send_task_progress)
+    listener = hybrid_transcription.transcript_progress_listener("item-1", entity_id="item-1")
+
+    segments = [{"start": 0.0, "end": 1.5, "text": "hello"}]
+    await ChunkedTranscriber._notify(listener, segments, 0.25)
+
+    assert len(sent) == 1
+    assert sent[0]["task_id"] == "item-1"
+    assert sent[0]["current_value"] == 25
+    assert sent[0]["total_value"] == 100
+    assert sent[0]["metadata"] == {"segments": segments}
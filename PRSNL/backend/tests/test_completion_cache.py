@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from app.services import completion_cache as cache_module
+from app.services.completion_cache import CompletionCache
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, expire=None):
+        self.store[key] = value
+        return True
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    cache = FakeCache()
+    monkeypatch.setattr(cache_module, "cache_service", cache)
+    return cache
+
+
+SCOPE = CompletionCache.make_scope("gpt", "system", 0.3, 200, {"type": "json_object"})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call(fake_cache):
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    cache = CompletionCache(max_entries=10, ttl=60)
+    results = await asyncio.gather(*(cache.get_or_create(SCOPE, "prompt", create) for _ in range(5)))
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert cache.stats["miss"] == 1 and cache.stats["coalesced"] == 4
+    assert fake_cache.store[CompletionCache.make_key(SCOPE, "prompt")] == "answer"
+
+    assert await cache.get_or_create(SCOPE, "prompt", create) == "answer"
+    assert cache.stats["hit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scope_separates_parameters_and_lru_evicts(fake_cache):
+    async def create():
+        return "x"
+
+    other_scope = CompletionCache.make_scope("gpt", "system", 0.7, 200, {"type": "json_object"})
+    assert other_scope != SCOPE
+
+    cache = CompletionCache(max_entries=2, ttl=60)
+    for prompt in ("a", "b", "c"):
+        await cache.get_or_create(SCOPE, prompt, create)
+    assert list(cache._entries) == [CompletionCache.make_key(SCOPE, p) for p in ("b", "c")]
+
+
+@pytest.mark.asyncio
+async def test_failures_propagate_to_waiters_and_are_not_cached(fake_cache):
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    cache = CompletionCache(max_entries=10, ttl=60)
+    results = await asyncio.gather(
+        cache.get_or_create(SCOPE, "p", boom), cache.get_or_create(SCOPE, "p", boom),
+        return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert fake_cache.store == {} and not cache._entries
+
+
+@pytest.mark.asyncio
+async def test_semantic_lookup_reuses_near_identical_prompt(fake_cache):
+    vectors = {"summarize: hello world": [1.0, 0.0], "summarize: hello world!": [0.999, 0.01],
+               "something else": [0.0, 1.0]}
+
+    async def embed(texts):
+        return [vectors[text] for text in texts]
+
+    calls = []
+
+    async def create():
+        calls.append(1)
+        return f"answer {len(calls)}"
+
+    cache = CompletionCache(max_entries=10, ttl=60, semantic_threshold=0.98, embed=embed)
+    assert await cache.get_or_create(SCOPE, "summarize: hello world", create) == "answer 1"
+    assert await cache.get_or_create(SCOPE, "summarize: hello world!", create) == "answer 1"
+    assert await cache.get_or_create(SCOPE, "something else", create) == "answer 2"
+    assert cache.stats["semantic_hit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sampled_completions_are_not_served_from_cache(fake_cache, monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+    from app.services.unified_ai_service import UnifiedAIService
+
+    calls = []
+
+    async def complete_uncached(prompt, *args):
+        calls.append(prompt)
+        return f"answer {len(calls)}"
+
+    service = UnifiedAIService.__new__(UnifiedAIService)
+    service.deployment_name = "gpt"
+    service.completion_cache = CompletionCache(max_entries=10, ttl=60)
+    service._complete_uncached = complete_uncached
+
+    assert await service.complete("hi", temperature=0.7) == "answer 1"
+    assert await service.complete("hi", temperature=0.7) == "answer 2"
+    assert fake_cache.store == {}
+
+    assert await service.complete("hi", temperature=0) == "answer 3"
+    assert await service.complete("hi", temperature=0) == "answer 3"
+    assert await service.complete("hi", temperature=0.3, use_cache=True) == "answer 4"
+    assert await service.complete("hi", temperature=0.3, use_cache=True) == "answer 4"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_a_waiter(fake_cache):
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return f"answer {len(calls)}"
+
+    cache = CompletionCache(max_entries=10, ttl=60)
+    leader = asyncio.ensure_future(cache.get_or_create(SCOPE, "p", create))
+    await asyncio.sleep(0.01)
+    followers = [asyncio.ensure_future(cache.get_or_create(SCOPE, "p", create)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    assert results == ["answer 2"] * 3
+    assert len(calls) == 2 and not cache._in_flight
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from app.services.conversation_extraction import ConversationExtraction, ConversationExtractor
+
+
+class FakeAIService:
+    def __init__(self):
+        self.prompts = []
+
+    async def complete(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return json.dumps({
+            "summary": {"full_summary": f"call {len(self.prompts)}", "value_score": 8},
+            "concepts": {"topics": ["asyncio"]},
+            "gaps": {"knowledge_gaps": "not a list"},
+        })
+
+
+def make_messages(count, size=100, start=1):
+    return [
+        {"sequence_number": start + i, "role": "user" if i % 2 == 0 else "assistant",
+         "content_text": f"message {start + i} " + "x" * size}
+        for i in range(count)
+    ]
+
+
+CONVERSATION = {"title": "Event loops", "platform": "chatgpt"}
+
+
+def test_parse_keeps_valid_facets_and_defaults_invalid_ones():
+    extraction = ConversationExtractor.parse(json.dumps({
+        "summary": {"full_summary": "ok"},
+        "flow": {"resolution_points": ["not a number"]},
+    }))
+    assert extraction.summary.full_summary == "ok"
+    assert extraction.flow.resolution_points == []
+
+    fallback = ConversationExtractor.parse("plain text answer")
+    assert fallback.summary.full_summary == "plain text answer"
+
+
+@pytest.mark.asyncio
+async def test_short_conversation_is_one_call():
+    ai = FakeAIService()
+    extractor = ConversationExtractor(ai, chunk_chars=10_000, max_concurrency=2)
+
+    extraction = await extractor.extract(CONVERSATION, make_messages(6))
+
+    assert len(ai.prompts) == 1
+    assert extraction.summary.value_score == 8
+    assert extraction.concepts.topics == ["asyncio"]
+    assert extraction.gaps.knowledge_gaps == []
+
+
+@pytest.mark.asyncio
+async def test_long_conversation_is_mapped_then_reduced():
+    ai = FakeAIService()
+    extractor = ConversationExtractor(ai, chunk_chars=500, max_concurrency=2)
+    messages = make_messages(12)
+
+    chunks = extractor.chunk_messages(messages)
+    assert len(chunks) > 1
+    assert "".join(chunks).count("message ") == 12
+
+    await extractor.extract(CONVERSATION, messages)
+    assert len(ai.prompts) == len(chunks) + 1
+    assert "PARTIAL 1" in ai.prompts[-1]
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_sends_only_new_messages():
+    ai = FakeAIService()
+    extractor = ConversationExtractor(ai, chunk_chars=10_000)
+    previous = ConversationExtraction.model_validate({"summary": {"full_summary": "earlier"}}).model_dump()
+
+    await extractor.extract(CONVERSATION, make_messages(2, start=7), previous)
+    assert len(ai.prompts) == 1
+    assert "earlier" in ai.prompts[0]
+    assert "message 7" in ai.prompts[0] and "message 1 " not in ai.prompts[0]
+
+    unchanged = await extractor.extract(CONVERSATION, [], previous)
+    assert len(ai.prompts) == 1
+    assert unchanged.summary.full_summary == "earlier"
@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.services.duplicate_clustering import UnionFind, normalize_rows, similar_pairs
+
+
+def brute_force_pairs(matrix, threshold):
+    sims = matrix @ matrix.T
+    n = matrix.shape[0]
+    return {(i, j) for i in range(n) for j in range(i + 1, n) if sims[i, j] >= threshold}
+
+
+def test_normalize_rows_keeps_zero_rows():
+    matrix = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert matrix.dtype == np.float32
+    assert np.allclose(matrix[0], [0.6, 0.8])
+    assert np.allclose(matrix[1], [0.0, 0.0])
+
+
+def test_similar_pairs_matches_brute_force_across_blocks():
+    rng = np.random.default_rng(7)
+    base = rng.normal(size=(20, 16))
+    # Near copies of a few rows, placed so they land in different blocks
+    noisy = base[[0, 3, 11]] + rng.normal(scale=0.01, size=(3, 16))
+    matrix = normalize_rows(np.vstack([base, noisy]))
+
+    pairs = {(i, j) for i, j, _ in similar_pairs(matrix, threshold=0.9, block_size=4)}
+
+    assert pairs == brute_force_pairs(matrix, 0.9)
+    assert {(0, 20), (3, 21), (11, 22)} <= pairs
+
+
+def test_similar_pairs_against_other_matrix():
+    matrix = normalize_rows(np.eye(4))
+    query = normalize_rows(np.array([[0.0, 1.0, 0.0, 0.0], [1.0, 1.0, 0.0, 0.0]]))
+
+    pairs = {(i, j) for i, j, _ in similar_pairs(query, matrix, threshold=0.7, block_size=2)}
+
+    assert pairs == {(0, 1), (1, 0), (1, 1)}
+
+
+def test_union_find_groups_are_transitive():
+    union_find = UnionFind(5)
+    union_find.union(0, 1)
+    union_find.union(1, 2)
+    assert not union_find.union(0, 2)
+
+    new_id = union_find.add()
+    union_find.union(3, new_id)
+
+    groups = sorted(sorted(group) for group in union_find.groups())
+    assert groups == [[0, 1, 2], [3, 5]]
@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import embedding_pipeline as pipeline_module
+from app.services.embedding_pipeline import EmbeddingPipeline
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+        self.mget_calls = 0
+        self.mset_calls = 0
+
+    async def get_vectors_many(self, keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    async def set_vectors_many(self, mapping, model="", expire=None):
+        self.mset_calls += 1
+        self.store.update({key: np.asarray(vector, dtype=np.float32) for key, vector in mapping.items()})
+        return True
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    cache = FakeCache()
+    monkeypatch.setattr(pipeline_module, "cache_service", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_are_embedded_once(fake_cache):
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    pipeline = EmbeddingPipeline(embed_batch, batch_size=10, max_concurrency=2)
+    result = await pipeline.embed(["a", "bb", "a"])
+
+    assert result == [[1.0], [2.0], [1.0]]
+    assert calls == [["a", "bb"]]
+    assert fake_cache.mget_calls == 1
+    assert fake_cache.mset_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_texts_skip_provider(fake_cache):
+    async def embed_batch(texts):
+        raise AssertionError("provider should not be called")
+
+    pipeline = EmbeddingPipeline(embed_batch)
+    fake_cache.store[pipeline.make_key("cached")] = np.array([0.5], dtype=np.float32)
+
+    assert await pipeline.embed(["cached"]) == [[0.5]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_returns_none_not_zero_vectors(fake_cache):
+    async def embed_batch(texts):
+        if "bad" in texts:
+            raise RuntimeError("provider error")
+        return [[1.0] for _ in texts]
+
+    pipeline = EmbeddingPipeline(embed_batch, batch_size=1, max_concurrency=4)
+    result = await pipeline.embed(["good", "bad"])
+
+    assert result == [[1.0], None]
+    assert pipeline.make_key("bad") not in fake_cache.store
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_same_text_are_coalesced(fake_cache):
+    calls = 0
+    release = asyncio.Event()
+
+    async def embed_batch(texts):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [[1.0] for _ in texts]
+
+    pipeline = EmbeddingPipeline(embed_batch)
+    first = asyncio.create_task(pipeline.embed(["same"]))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(pipeline.embed(["same"]))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == [[1.0]]
+    assert await second == [[1.0]]
+    assert calls == 1
@@ -0,0 +1,151 @@
+import csv
+import gzip
+import io
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.services import export_stream
+from app.services.export_stream import (
+    ExportFilters, ItemExport, csv_chunks, gzip_chunks, json_chunks, ndjson_chunks, parse_export_cursor, row_cursor
+)
+
+
+def make_rows(count):
+    return [
+        {
+            "id": uuid4(),
+            "title": f"Item {n}",
+            "url": f"https://example.com/{n}",
+            "type": "article",
+            "summary": "a, \"quoted\" summary",
+            "tags": ["python"] if n % 2 else [],
+            "created_at": datetime(2025, 1, 1, 12, n),
+            "captured_at": None,
+            "search_vector": "'item':1",
+        }
+        for n in range(count)
+    ]
+
+
+class FakeExport(ItemExport):
+    def __init__(self, rows, batch_size):
+        super().__init__(ExportFilters(), batch_size=batch_size)
+        self.rows = rows
+
+    async def batches(self, columns="i.*"):
+        for start in range(0, len(self.rows), self.batch_size):
+            yield self.rows[start:start + self.batch_size]
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_filters_number_parameters_in_order():
+    filters = ExportFilters(tags=["python"], end_date=datetime(2025, 2, 1).date())
+    after = {"created_at": datetime(2025, 1, 1), "id": uuid4()}
+
+    where = filters.where(after)
+
+    assert "i.tag_names && $1::text[]" in where
+    assert "i.created_at <= $2" in where
+    assert "(i.created_at, i.id) < ($3, $4)" in where
+    assert filters.params[2:] == [after["created_at"], after["id"]]
+
+
+def test_export_cursor_round_trips_and_rejects_foreign_cursors():
+    row = make_rows(1)[0]
+    assert parse_export_cursor(row_cursor(row)) == {"created_at": row["created_at"], "id": row["id"]}
+    assert parse_export_cursor(None) is None
+    with pytest.raises(ValueError):
+        parse_export_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        parse_export_cursor(row_cursor({"created_at": row["created_at"], "id": "nope"}))
+
+
+@pytest.mark.asyncio
+async def test_json_and_ndjson_stream_one_batch_per_chunk():
+    rows = make_rows(5)
+
+    chunks = await collect(json_chunks(FakeExport(rows, batch_size=2), total=5, next_cursor=None))
+    document = json.loads("".join(chunks))
+    assert len(chunks) == 5  # header, three batches, footer
+    assert [item["title"] for item in document["items"]] == [row["title"] for row in rows]
+    assert "search_vector" not in document["items"][0]
+
+    lines = "".join(await collect(ndjson_chunks(FakeExport(rows, batch_size=2)))).splitlines()
+    checkpoints = [json.loads(line)["_checkpoint"] for line in lines if "_checkpoint" in line]
+    assert len(lines) == 8
+    assert parse_export_cursor(checkpoints[-1])["id"] == rows[-1]["id"]
+
+
+@pytest.mark.asyncio
+async def test_gzipped_csv_matches_rows():
+    rows = make_rows(7)
+    compressed = b"".join(await collect(gzip_chunks(csv_chunks(FakeExport(rows, batch_size=3)))))
+
+    parsed = list(csv.DictReader(io.StringIO(gzip.decompress(compressed).decode())))
+    assert [r["title"] for r in parsed] == [row["title"] for row in rows]
+    assert parsed[1]["tags"] == "python"
+    assert parsed[0]["summary"] == rows[0]["summary"]
+
+
+class FakeConnection:
+    """Serves `rows` (newest first) and lets a test insert a row between queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetchval(self, query, *params):
+        return len(self.rows)
+
+    async def fetchrow(self, query, *params):
+        offset = int(query.split("OFFSET")[1].split()[0])
+        return self.rows[offset]
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def cursor(self, query, *params, prefetch=None):
+        self.queries.append((query, params))
+        for row in self.rows:
+            if "LIMIT" in query or (row["created_at"], row["id"]) >= (params[-2], params[-1]):
+                yield row
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.asyncio
+async def test_limited_export_streams_up_to_the_boundary_row(monkeypatch):
+    rows = sorted(make_rows(5), key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    conn = FakeConnection(rows)
+
+    async def get_db_pool():
+        return FakePool(conn)
+
+    monkeypatch.setattr(export_stream, "get_db_pool", get_db_pool)
+    export = ItemExport(ExportFilters(), limit=3, batch_size=10)
+
+    total, next_cursor = await export.prepare()
+    # An item captured between prepare() and streaming lands at the front
+    conn.rows = [{**make_rows(1)[0], "created_at": datetime(2025, 1, 2)}] + rows
+
+    exported = [row for batch in await collect(export.batches()) for row in batch]
+
+    assert total == 3
+    assert parse_export_cursor(next_cursor)["id"] == rows[2]["id"]
+    assert exported[-1]["id"] == rows[2]["id"]
+    assert "LIMIT" not in conn.queries[0][0]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.services.duplicate_clustering import normalize_rows
+from app.services.graph_edge_builder import (
+    GraphEdgeBuilder,
+    ann_knn_edges,
+    exact_knn_edges,
+    threshold_edges,
+)
+
+
+def clustered_vectors(seed=0, clusters=5, per_cluster=8, dim=32):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = np.repeat(centers, per_cluster, axis=0) + rng.normal(scale=0.05, size=(clusters * per_cluster, dim))
+    return normalize_rows(points), per_cluster
+
+
+def test_threshold_edges_match_pairwise_loop():
+    matrix, _ = clustered_vectors()
+    expected = {
+        (i, j)
+        for i in range(len(matrix))
+        for j in range(i + 1, len(matrix))
+        if float(np.dot(matrix[i], matrix[j])) >= 0.8
+    }
+    edges = threshold_edges(matrix, 0.8)
+    assert {(i, j) for i, j, _ in edges} == expected
+    assert all(i < j for i, j, _ in edges)
+
+
+def test_exact_knn_edges_stay_within_clusters():
+    matrix, per_cluster = clustered_vectors()
+    edges = exact_knn_edges(matrix, k=3, threshold=0.5, block_size=7)
+
+    assert edges
+    assert all(i // per_cluster == j // per_cluster for i, j, _ in edges)
+    degree = np.bincount([i for i, _, _ in edges] + [j for _, j, _ in edges], minlength=len(matrix))
+    assert degree.min() >= 3
+
+
+def test_ann_knn_edges_agree_with_exact():
+    matrix, _ = clustered_vectors(seed=1)
+    exact = {(i, j) for i, j, _ in exact_knn_edges(matrix, k=3, threshold=0.5)}
+    approx = {(i, j) for i, j, _ in ann_knn_edges(matrix, k=3, threshold=0.5)}
+    assert len(exact & approx) / len(exact) > 0.9
+
+
+def test_builder_switches_strategy_by_size():
+    matrix, _ = clustered_vectors()
+    builder = GraphEdgeBuilder()
+    builder.exact_limit = 10
+    builder.max_neighbors = 2
+
+    edges = builder.compute(matrix, 0.5)
+    degree = np.bincount([i for i, _, _ in edges] + [j for _, j, _ in edges], minlength=len(matrix))
+    # k-NN mode: far fewer edges than the dense threshold graph
+    assert len(edges) < len(threshold_edges(matrix, 0.5))
+    assert degree.min() >= 2
+    assert builder.compute(matrix[:1], 0.5) == []
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+
+import httpcore
+import httpx
+import pytest
+
+from app.services.http_client_factory import ClientType, HTTPClientFactory
+from app.services.http_transport import CachingResolver, HostLimitedTransport, RetryBudget
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, unreachable=()):
+        self.unreachable = set(unreachable)
+        self.connected = []
+        self.timeouts = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connected.append(host)
+        self.timeouts.append(timeout)
+        if host in self.unreachable:
+            raise httpcore.ConnectError(f"{host} unreachable")
+        return host
+
+
+def test_retry_budget_limits_retries_to_a_fraction_of_requests():
+    clock = Clock()
+    budget = RetryBudget(ratio=0.2, min_per_second=0.1, window=10, clock=clock)
+
+    for _ in range(10):
+        budget.record_request()
+    # 0.2 * 10 requests + 0.1/s * 10s
+    assert [budget.try_retry() for _ in range(4)] == [True, True, True, False]
+    assert budget.get_stats()["denied"] == 1
+
+    clock.now += 11
+    assert budget.try_retry()
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_and_fails_over(monkeypatch):
+    clock = Clock()
+    backend = FakeBackend(unreachable={"10.0.0.1"})
+    resolver = CachingResolver(ttl=60, backend=backend, clock=clock)
+    lookups = []
+
+    async def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        return [(None, None, None, "", ("10.0.0.1", port)), (None, None, None, "", ("10.0.0.2", port))]
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+
+    assert await resolver.connect_tcp("example.com", 443) == "10.0.0.2"
+    assert await resolver.connect_tcp("example.com", 443) == "10.0.0.2"
+    assert lookups == ["example.com"]
+    assert backend.connected == ["10.0.0.1", "10.0.0.2", "10.0.0.2"]
+    assert resolver.get_stats()["hits"] == 1 and resolver.get_stats()["failovers"] == 1
+
+    clock.now += 61
+    await resolver.connect_tcp("example.com", 443)
+    assert lookups == ["example.com", "example.com"]
+
+    backend.unreachable.add("10.0.0.2")
+    with pytest.raises(httpcore.ConnectError):
+        await resolver.connect_tcp("example.com", 443)
+    assert resolver.get_stats()["cached_hosts"] == 0
+
+
+def fake_getaddrinfo(monkeypatch, addresses, lookups=None):
+    async def getaddrinfo(host, port, **kwargs):
+        if lookups is not None:
+            lookups.append(host)
+        return [(None, None, None, "", (address, port)) for address in addresses]
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+
+
+@pytest.mark.asyncio
+async def test_failover_shares_the_connect_timeout(monkeypatch):
+    backend = FakeBackend(unreachable={"10.0.0.1", "10.0.0.2", "10.0.0.3"})
+    resolver = CachingResolver(backend=backend)
+    fake_getaddrinfo(monkeypatch, ["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+
+    with pytest.raises(httpcore.ConnectError):
+        await resolver.connect_tcp("example.com", 443, timeout=9)
+    assert backend.timeouts[0] == pytest.approx(3, abs=0.1)
+    assert all(timeout <= 9 for timeout in backend.timeouts)
+
+
+@pytest.mark.asyncio
+async def test_factory_clients_connect_through_the_resolver(monkeypatch):
+    factory = HTTPClientFactory()
+    backend = FakeBackend(unreachable={"10.0.0.1"})
+    factory._resolver = CachingResolver(backend=backend)
+    lookups = []
+    fake_getaddrinfo(monkeypatch, ["10.0.0.1"], lookups)
+
+    client = await factory.get_client(ClientType.CRAWL)
+    with pytest.raises(httpx.ConnectError):
+        await client.get("http://example.test/")
+    assert lookups == ["example.test"] and backend.connected == ["10.0.0.1"]
+    await factory.close_all_clients()
+
+
+@pytest.mark.asyncio
+async def test_factory_keeps_one_client_per_loop_and_closes_them_on_their_loop():
+    factory = HTTPClientFactory()
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        other = asyncio.run_coroutine_threadsafe(factory.get_client(), other_loop).result(timeout=5)
+        mine = await factory.get_client()
+        assert mine is not other and not other.is_closed
+        assert await factory.get_client() is mine
+        assert asyncio.run_coroutine_threadsafe(factory.get_client(), other_loop).result(timeout=5) is other
+
+        await factory.close_all_clients()
+        assert mine.is_closed and other.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(timeout=5)
+        other_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_host_limit_holds_slot_until_body_is_closed():
+    transport = HostLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, text="ok")), 1)
+    client = httpx.AsyncClient(transport=transport)
+
+    async with client.stream("GET", "https://a.example/1"):
+        blocked = asyncio.ensure_future(client.get("https://a.example/2"))
+        other_host = await client.get("https://b.example/")
+        await asyncio.sleep(0.01)
+        assert other_host.status_code == 200
+        assert not blocked.done()
+        assert transport.get_stats()["in_flight"] == 1
+
+    assert (await blocked).text == "ok"
+    stats = transport.get_stats()
+    assert stats["waited"] == 1 and stats["in_flight"] == 0 and stats["active_hosts"] == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_host_limit_wait_honours_the_pool_timeout():
+    transport = HostLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, text="ok")), 1)
+    client = httpx.AsyncClient(transport=transport)
+
+    async with client.stream("GET", "https://a.example/1"):
+        with pytest.raises(httpx.PoolTimeout):
+            await client.get("https://a.example/2", timeout=httpx.Timeout(5.0, pool=0.05))
+        assert transport.get_stats()["timed_out"] == 1
+
+    stats = transport.get_stats()
+    assert stats["in_flight"] == 0 and stats["active_hosts"] == 0
+    assert (await client.get("https://a.example/3")).text == "ok"
+    await client.aclose()
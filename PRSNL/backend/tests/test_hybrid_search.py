@@ -0,0 +1,44 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import encode_cursor
+
+
+@pytest.fixture(autouse=True)
+def azure_credentials(monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+
+
+@pytest.fixture
+def search_service():
+    return pytest.importorskip("app.services.enhanced_search_service")
+
+
+def test_parse_cursor():
+    from app.services.hybrid_search_engine import HybridSearchEngine
+
+    item_id = uuid4()
+    assert HybridSearchEngine.parse_cursor(encode_cursor({"score": 0.25, "id": item_id})) == (0.25, item_id)
+    assert HybridSearchEngine.parse_cursor(None) is None
+    with pytest.raises(ValueError):
+        HybridSearchEngine.parse_cursor(encode_cursor({"id": str(item_id)}))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["%%%not-base64", encode_cursor({"score": "high", "id": "x"}), encode_cursor({})])
+async def test_malformed_cursor_is_rejected_before_searching(search_service, monkeypatch, cursor):
+    calls = []
+
+    async def search(*args, **kwargs):
+        calls.append(kwargs)
+        return {"results": []}
+
+    monkeypatch.setattr(search_service.hybrid_search_engine, "search", search)
+
+    with pytest.raises(HTTPException) as raised:
+        await search_service.enhanced_search_service.hybrid_search("query", cursor=cursor)
+    assert raised.value.status_code == 400
+    assert calls == []
@@ -0,0 +1,50 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.worker import ItemWorker
+
+
+def make_worker(queue_size=2):
+    worker = ItemWorker("postgresql://unused", concurrency=2, queue_size=queue_size)
+    worker.queue = asyncio.Queue(maxsize=queue_size)
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded_and_deduplicated():
+    worker = make_worker(queue_size=2)
+    first, second, third = uuid4(), uuid4(), uuid4()
+
+    assert worker.offer(first, 'notify')
+    assert not worker.offer(first, 'sweep')
+    assert worker.offer(second, 'notify')
+    assert not worker.offer(third, 'notify')
+
+    assert worker.queue.qsize() == 2
+    assert worker.stats["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_claimed_items_are_processed(monkeypatch):
+    worker = make_worker()
+    claimable = uuid4()
+    processed = []
+
+    async def claim(item_id):
+        if item_id != claimable:
+            return None
+        return {"url": "https://example.com", "raw_content": None, "processed_content": None,
+                "enable_summarization": True, "content_type": None}
+
+    class Engine:
+        async def process_item(self, **kwargs):
+            processed.append(kwargs)
+
+    monkeypatch.setattr(worker, "claim", claim)
+    await asyncio.gather(worker.process(Engine(), claimable), worker.process(Engine(), uuid4()))
+
+    assert [call["item_id"] for call in processed] == [claimable]
+    assert processed[0]["content_type"] == "auto"
+    assert worker.stats["completed"] == 1 and worker.stats["skipped"] == 1
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import realtime_progress_service as progress_module
+from app.services.realtime_progress_service import RealtimeProgressService
+
+
+@pytest.fixture
+def published(monkeypatch):
+    sent = []
+
+    async def fake_publish(channel, message):
+        sent.append((channel, json.loads(message)))
+        return 1
+
+    monkeypatch.setattr(progress_module.dragonflydb_service, "publish", fake_publish)
+    return sent
+
+
+def test_progress_updates_are_coalesced_per_task(published):
+    async def scenario():
+        service = RealtimeProgressService()
+        service.min_interval = 0.05
+        for step in range(10):
+            await service.send_progress_update("t1", "ai_processing", step, 100, f"step {step}")
+        # First update goes out immediately, the rest collapse into one pending
+        assert [event["current_value"] for _, event in published] == [0]
+        await asyncio.sleep(0.1)
+        assert [event["current_value"] for _, event in published] == [0, 9]
+        assert service.stats["coalesced"] == 8
+
+    asyncio.run(scenario())
+
+
+def test_terminal_update_is_immediate_and_replaces_pending(published):
+    async def scenario():
+        service = RealtimeProgressService()
+        service.min_interval = 10
+        await service.send_progress_update("t1", "ai_processing", 1, 100, "start", user_id="u1")
+        await service.send_progress_update("t1", "ai_processing", 50, 100, "halfway")
+        await service.send_progress_update("t1", "task_completed", 100, 100, "done")
+        channels = [channel for channel, _ in published]
+        assert channels == ["progress:task_t1", "progress:user_u1", "progress:task_t1"]
+        assert published[-1][1]["is_complete"] is True
+        assert not service._pending and not service._flush_handles
+
+    asyncio.run(scenario())
+
+
+def test_local_delivery_serializes_once(monkeypatch):
+    async def scenario():
+        service = RealtimeProgressService()
+        service._bus_retry_at = float("inf")  # bus unavailable
+        received = []
+
+        async def send_personal_message(message, client_id):
+            received.append((client_id, message))
+
+        monkeypatch.setattr(service.websocket_manager, "send_personal_message", send_personal_message)
+        service.active_channels["task_t1"] = {"a", "b"}
+        await service.send_progress_update("t1", "ai_processing", 100, 100, "done")
+        assert sorted(client for client, _ in received) == ["a", "b"]
+        assert received[0][1] is received[1][1]
+
+    asyncio.run(scenario())
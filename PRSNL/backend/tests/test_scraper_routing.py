@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.services.scraper_routing import DomainScoreboard, HostLimiter, hedged_race, normalize_url, url_domain
+
+
+def good(content="x" * 200):
+    return {"success": True, "data": {"content": content}}
+
+
+def is_good(result):
+    return result.get("success") and len(result["data"]["content"]) >= 100
+
+
+def scraper(result, delay, calls, name):
+    async def run():
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return result
+    return run
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/Post/?utm_source=x&b=2&a=1#top") == "https://example.com/Post?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/a?fbclid=1") == "http://example.com:8080/a"
+    assert url_domain("https://www.Example.com/a") == "example.com"
+
+
+def test_domain_scoreboard_learns_order_and_hedge_delay():
+    board = DomainScoreboard(min_samples=3)
+    assert board.order("spa.dev", ["jina", "firecrawl"]) == ["jina", "firecrawl"]
+
+    for _ in range(3):
+        board.record("spa.dev", "jina", False, 4.0)
+        board.record("spa.dev", "firecrawl", True, 2.0)
+    assert board.order("spa.dev", ["jina", "firecrawl"]) == ["firecrawl", "jina"]
+    assert board.order("blog.dev", ["jina", "firecrawl"]) == ["jina", "firecrawl"]
+
+    assert board.hedge_delay("spa.dev", "firecrawl", ceiling=8) == 4.0
+    assert board.hedge_delay("blog.dev", "jina", ceiling=8) == 8
+
+
+@pytest.mark.asyncio
+async def test_hedge_starts_fallback_and_cancels_slow_primary():
+    calls = []
+    name, result = await hedged_race(
+        [("jina", scraper(good(), 5, calls, "jina")), ("firecrawl", scraper(good("y" * 150), 0.01, calls, "firecrawl"))],
+        is_good, hedge_after=0.05
+    )
+    assert name == "firecrawl" and result["data"]["content"] == "y" * 150
+    assert calls == ["jina", "firecrawl"]
+
+
+@pytest.mark.asyncio
+async def test_fast_good_primary_never_starts_fallback():
+    calls = []
+    name, _ = await hedged_race(
+        [("jina", scraper(good(), 0.01, calls, "jina")), ("firecrawl", scraper(good(), 0.01, calls, "firecrawl"))],
+        is_good, hedge_after=1
+    )
+    assert name == "jina" and calls == ["jina"]
+
+
+@pytest.mark.asyncio
+async def test_bad_result_falls_back_without_waiting_for_hedge():
+    calls = []
+    bad = {"success": True, "data": {"content": "blocked"}}
+    name, _ = await asyncio.wait_for(hedged_race(
+        [("jina", scraper(bad, 0, calls, "jina")), ("firecrawl", scraper(good(), 0, calls, "firecrawl"))],
+        is_good, hedge_after=10
+    ), timeout=1)
+    assert name == "firecrawl"
+
+    name, result = await hedged_race([("jina", scraper(bad, 0, calls, "jina"))], is_good)
+    assert name == "jina" and result is bad
+
+
+@pytest.mark.asyncio
+async def test_successful_bad_result_beats_a_later_failure():
+    calls = []
+    failed = {"success": False, "error": "Jina timed out"}
+    firecrawl_page = {"success": True, "data": {"content": "Error 404 explained"}}
+    name, result = await hedged_race(
+        [("jina", scraper(failed, 0.1, calls, "jina")), ("firecrawl", scraper(firecrawl_page, 0, calls, "firecrawl"))],
+        is_good, hedge_after=0.01
+    )
+    assert calls == ["jina", "firecrawl"]
+    assert name == "firecrawl" and result is firecrawl_page
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_caps_concurrency():
+    limiter = HostLimiter(2)
+    running, peak = 0, 0
+
+    async def scrape():
+        nonlocal running, peak
+        async with limiter.slot("example.com"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(scrape() for _ in range(6)))
+    assert peak == 2
+    assert limiter.active_hosts() == 0
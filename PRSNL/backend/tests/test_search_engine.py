@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.core.search_engine import SearchEngine
+from app.utils.pagination import encode_cursor
+
+
+def test_parse_cursor_returns_sort_key_values():
+    item_id = uuid4()
+    created_at = datetime(2025, 7, 14, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor({"rank": 0.5, "created_at": created_at, "id": item_id})
+
+    assert SearchEngine.parse_cursor(cursor, ranked=True) == [0.5, created_at, item_id]
+    assert SearchEngine.parse_cursor(cursor, ranked=False) == [created_at, item_id]
+    assert SearchEngine.parse_cursor(None, ranked=True) is None
+
+
+@pytest.mark.parametrize("values", [
+    {"created_at": datetime(2025, 7, 14, tzinfo=timezone.utc), "id": str(uuid4())},
+    {"rank": 0.5, "id": str(uuid4())},
+    {"rank": 0.5, "created_at": "yesterday", "id": str(uuid4())},
+    {"rank": 0.5, "created_at": datetime(2025, 7, 14, tzinfo=timezone.utc), "id": "not-a-uuid"},
+    {"rank": [], "created_at": datetime(2025, 7, 14, tzinfo=timezone.utc), "id": str(uuid4())},
+])
+def test_parse_cursor_rejects_malformed_cursors(values):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        SearchEngine.parse_cursor(encode_cursor(values), ranked=True)
+
+
+class FakeConnection:
+    """Returns `matches` rows for any search and answers count queries with len(matches)."""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    async def fetch(self, sql, *params):
+        limit, offset = params[-2], params[-1]
+        return self.matches[offset:offset + limit]
+
+    async def fetchval(self, sql, *params):
+        if sql.lstrip().startswith("EXPLAIN"):
+            return json.dumps([{"Plan": {"Plan Rows": len(self.matches)}}])
+        return len(self.matches)
+
+
+@pytest.mark.asyncio
+async def test_search_total_counts_all_matches_not_the_page():
+    search_api = pytest.importorskip("app.api.search")
+    created_at = datetime(2025, 7, 14, tzinfo=timezone.utc)
+    matches = [
+        {"id": uuid4(), "title": f"Item {i}", "url": None, "snippet": "", "created_at": created_at,
+         "tags": [], "rank": 1.0 - i / 100}
+        for i in range(5)
+    ]
+
+    response = await search_api.search_items(
+        query="item", limit=2, offset=0, cursor=None, db_connection=FakeConnection(matches)
+    )
+
+    assert len(response["results"]) == 2
+    assert response["total"] == 5
+    assert response["next_cursor"] is not None
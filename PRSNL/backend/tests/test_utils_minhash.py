@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from app.utils.minhash import MinHasher, shingles
+
+BASE = (
+    "PostgreSQL keyset pagination avoids large offsets by filtering on the last "
+    "seen sort key, which keeps every page an index range scan no matter how deep "
+    "the client pages into the result set"
+)
+
+
+def test_shingles_normalize_case_and_punctuation():
+    assert shingles("Hello, World!") == shingles("hello world")
+    assert shingles("") == set()
+    assert len(shingles("one two three four five six")) == 2
+
+
+def test_signature_is_deterministic_across_instances():
+    a = MinHasher(seed=3).text_signature(BASE)
+    b = MinHasher(seed=3).text_signature(BASE)
+    assert a.dtype == np.uint32
+    assert np.array_equal(a, b)
+    assert MinHasher().text_signature("") is None
+
+
+def test_jaccard_estimate_tracks_overlap():
+    hasher = MinHasher()
+    near = BASE.replace("every page", "each page")
+    unrelated = "Whisper transcribes audio in thirty second windows and returns segments with timestamps for each chunk"
+
+    base_sig = hasher.text_signature(BASE)
+    assert hasher.jaccard(base_sig, hasher.text_signature(BASE)) == 1.0
+    assert hasher.jaccard(base_sig, hasher.text_signature(near)) > 0.6
+    assert hasher.jaccard(base_sig, hasher.text_signature(unrelated)) < 0.2
+
+
+def test_near_duplicates_share_a_band_bucket():
+    hasher = MinHasher()
+    base_buckets = set(hasher.band_buckets(hasher.text_signature(BASE)))
+    near_buckets = set(hasher.band_buckets(hasher.text_signature(BASE + " quickly")))
+
+    assert len(base_buckets) == hasher.bands
+    assert base_buckets & near_buckets
+    assert all(-(1 << 63) <= bucket < (1 << 63) for _, bucket in base_buckets)
+
+
+def test_signature_bytes_round_trip():
+    hasher = MinHasher()
+    signature = hasher.text_signature(BASE)
+    assert np.array_equal(hasher.from_bytes(hasher.to_bytes(signature)), signature)
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=32)
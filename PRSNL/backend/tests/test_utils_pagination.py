@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestPaginationCursor:
+
+    def test_round_trip_preserves_sort_key_types(self):
+        item_id = uuid4()
+        created_at = datetime(2025, 7, 14, 12, 30, tzinfo=timezone.utc)
+        cursor = encode_cursor({"score": 0.0327868852459, "created_at": created_at, "id": item_id})
+
+        decoded = decode_cursor(cursor)
+
+        assert decoded["score"] == 0.0327868852459
+        assert decoded["created_at"] == created_at
+        assert decoded["id"] == str(item_id)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor({"score": 1.5, "id": "a" * 64})
+        assert "=" not in cursor
+        assert "+" not in cursor and "/" not in cursor
+
+    @pytest.mark.parametrize("cursor", [None, ""])
+    def test_empty_cursor_means_first_page(self, cursor):
+        assert decode_cursor(cursor) is None
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor!", "W10"])
+    def test_malformed_cursor_raises_value_error(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
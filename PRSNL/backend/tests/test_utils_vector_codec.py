@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.utils.vector_codec import decode_vector, encode_vector, is_encoded_vector
+
+
+class TestVectorCodec:
+
+    @pytest.fixture
+    def vector(self):
+        rng = np.random.default_rng(42)
+        return rng.standard_normal(1536).astype(np.float32)
+
+    def test_float32_round_trip_is_exact(self, vector):
+        blob = encode_vector(vector, model="text-embedding-ada-002")
+        decoded = decode_vector(blob)
+
+        assert decoded.model == "text-embedding-ada-002"
+        assert decoded.dtype == "float32"
+        assert decoded.vector.dtype == np.float32
+        np.testing.assert_array_equal(decoded.vector, vector)
+
+    @pytest.mark.parametrize("dtype, max_bytes, atol", [
+        ("float32", 6200, 0.0),
+        ("float16", 3200, 1e-2),
+        ("int8", 1700, 0.05),
+    ])
+    def test_compact_sizes_and_precision(self, vector, dtype, max_bytes, atol):
+        blob = encode_vector(vector, model="m", dtype=dtype)
+        assert len(blob) < max_bytes
+        np.testing.assert_allclose(decode_vector(blob).vector, vector, atol=atol)
+
+    def test_accepts_plain_lists(self):
+        decoded = decode_vector(encode_vector([0.25, -0.5, 1.0], dtype="float16"))
+        assert decoded.vector.tolist() == [0.25, -0.5, 1.0]
+
+    def test_legacy_json_values_are_not_vectors(self):
+        assert not is_encoded_vector(b"[0.1, 0.2]")
+        assert not is_encoded_vector(None)
+        with pytest.raises(ValueError):
+            decode_vector(b"[0.1, 0.2]")
+
+    def test_truncated_payload_is_rejected(self, vector):
+        blob = encode_vector(vector)
+        with pytest.raises(ValueError):
+            decode_vector(blob[:-4])
+
+    def test_unknown_dtype_is_rejected(self, vector):
+        with pytest.raises(ValueError):
+            encode_vector(vector, dtype="bfloat16")